@@ -9,6 +9,7 @@ from io import StringIO
 from typing import Optional
 
 from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, model_validator
 from sqlalchemy.orm import Session
@@ -18,13 +19,21 @@ from app.db.database import SessionLocal, get_db
 from app.db.models import User
 from app.services.auth_service import decode_token
 from app.services.neo4j_service import is_neo4j_available
-from app.services.scan_service import compare_scans, get_scan, get_scan_history, run_scan
+from app.services.scan_service import (
+    SCAN_DONE_EVENT,
+    compare_scans,
+    get_scan,
+    get_scan_history,
+    run_scan,
+    stream_scan,
+)
 from app.services.scheduler_service import (
     add_scheduled_scan,
     list_scheduled_scans,
     remove_scheduled_scan,
     update_scheduled_scan,
 )
+from src.core.orchestrator import ANALYSIS_FIELDS
 from src.utils.validators import normalize_domain
 
 logger = logging.getLogger(__name__)
@@ -100,7 +109,10 @@ async def start_scan(
     """Start a domain scan. Results are persisted only for authenticated users."""
     try:
         user_id = user.id if user else None
-        scan_id, results = run_scan(request.domain, db, user_id=user_id)
+        # The pipeline drives its own event loop, so it runs off the request loop.
+        scan_id, results = await asyncio.to_thread(
+            run_scan, request.domain, db, None, user_id
+        )
         return {
             "success": True,
             "scan_id": scan_id,
@@ -279,20 +291,30 @@ async def update_schedule(
 @router.websocket("/ws/scan")
 async def websocket_scan(websocket: WebSocket):
     """
-    WebSocket: start scan with real-time progress.
+    WebSocket: start scan with real-time progress and partial results.
     Client sends: {"domain": "example.com", "token": "jwt..."} (token optional; if present, scan is saved)
-    Server sends: {"stage": "dns", "progress": 20, "message": "..."} then {"stage": "done", "results": {...}, "saved": true/false}
+    Server sends:
+      {"stage": "dns", "progress": 20, "message": "..."} for progress,
+      {"stage": "partial", "section": "dns", "data": {"dns_info": {...}}} as each enricher finishes
+      (result sections only, see STREAMED_FIELDS),
+      then {"stage": "done", "scan_id": "...", "results": {...}, "saved": true/false}.
+    The final "results" carries only the analysis fields (summary, alerts, correlation, ...);
+    enricher sections have already been delivered as partials.
     """
     await websocket.accept()
-    progress_queue: asyncio.Queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+    outbox: asyncio.Queue = asyncio.Queue()
 
     def on_progress(stage: str, progress: int, message: str) -> None:
-        progress_queue.put_nowait({"stage": stage, "progress": progress, "message": message})
+        # Analysis progress is reported from a worker thread.
+        loop.call_soon_threadsafe(
+            outbox.put_nowait, {"stage": stage, "progress": progress, "message": message}
+        )
 
-    async def send_progress() -> None:
+    async def send_outbox() -> None:
         while True:
-            msg = await progress_queue.get()
-            if msg.get("stage") == "done":
+            msg = await outbox.get()
+            if msg is None:
                 break
             await websocket.send_json(msg)
 
@@ -315,25 +337,31 @@ async def websocket_scan(websocket: WebSocket):
                     user_id = None
 
         db = SessionLocal()
-        progress_task = asyncio.create_task(send_progress())
+        sender = asyncio.create_task(send_outbox())
         try:
-            scan_id, results = await asyncio.to_thread(
-                run_scan, domain, db, on_progress, user_id
-            )
-            progress_task.cancel()
-            try:
-                await progress_task
-            except asyncio.CancelledError:
-                pass
+            scan_id, results = None, None
+            async for name, payload in stream_scan(domain, db, on_progress, user_id):
+                if name == SCAN_DONE_EVENT:
+                    scan_id, results = payload
+                else:
+                    outbox.put_nowait({
+                        "stage": "partial",
+                        "section": name,
+                        "data": jsonable_encoder(payload),
+                    })
+            # Drain queued progress/partials in order before "done".
+            outbox.put_nowait(None)
+            await sender
 
             await websocket.send_json({
                 "stage": "done",
                 "progress": 100,
                 "scan_id": scan_id,
-                "results": results.model_dump(mode="json"),
+                "results": results.model_dump(mode="json", include=set(ANALYSIS_FIELDS)),
                 "saved": user_id is not None,
             })
         finally:
+            sender.cancel()
             db.close()
     except WebSocketDisconnect:
         logger.debug("WebSocket scan client disconnected")
@@ -16,6 +16,9 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.endpoints import auth, investigations, notifications, scan
 from app.db.database import init_db
+from src.core.executor import get_executor
+from src.core.port_cache import get_port_cache
+from src.core.resolver import get_resolver
 
 logger = logging.getLogger(__name__)
 
@@ -78,3 +81,21 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+
+@app.get("/health/executor")
+async def executor_health():
+    """Shared scan executor: thread count, utilization and per-pool queue depth."""
+    return get_executor().stats()
+
+
+@app.get("/health/dns")
+async def dns_cache_health():
+    """Shared DNS resolver: cache size and hit rates."""
+    return get_resolver().stats()
+
+
+@app.get("/health/ports")
+async def port_cache_health():
+    """Shared port scan cache: entries, hits and probes."""
+    return get_port_cache().stats()
@@ -70,10 +70,20 @@ def _compare_whois(w1: Dict, w2: Dict) -> Dict[str, Any]:
     }
 
 
+def _certs_by_host(ssl: Dict) -> Dict[str, Dict]:
+    """Host -> certificate; one certificate may be served by many hosts."""
+    return {
+        host: cert
+        for cert in (ssl.get("certificates") or [])
+        for host in (cert.get("hosts") or [cert.get("host", "")])
+        if host
+    }
+
+
 def _compare_ssl(ssl1: Dict, ssl2: Dict) -> Dict[str, Any]:
     """Compare SSL certificates by host."""
-    certs1 = {c.get("host", ""): c for c in (ssl1.get("certificates") or []) if c.get("host")}
-    certs2 = {c.get("host", ""): c for c in (ssl2.get("certificates") or []) if c.get("host")}
+    certs1 = _certs_by_host(ssl1)
+    certs2 = _certs_by_host(ssl2)
     hosts1 = set(certs1.keys())
     hosts2 = set(certs2.keys())
     hosts_both = hosts1 & hosts2
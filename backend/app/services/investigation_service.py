@@ -443,8 +443,9 @@ def _enricher_ssl(domain: str, entity_type: str, entity_value: str, progress: Ca
     source_id = _entity_to_cy_id(entity_type, entity_value)
     for cert in certs:
         cert_dict = cert if isinstance(cert, dict) else _to_dict(cert)
-        host = cert_dict.get("host", "")
-        if host:
+        for host in cert_dict.get("hosts") or [cert_dict.get("host", "")]:
+            if not host:
+                continue
             nodes.append({
                 "type": "certificate",
                 "value": host,
@@ -173,8 +173,9 @@ def persist_scan_to_neo4j(scan_id: str, domain: str, results: Dict[str, Any]) ->
                 )
 
             for cert in (results.get("ssl_info") or {}).get("certificates") or []:
-                host = cert.get("host", "")
-                if host:
+                for host in cert.get("hosts") or [cert.get("host", "")]:
+                    if not host:
+                        continue
                     session.run(
                         """
                         MERGE (c:Certificate {host: $host})
@@ -2,70 +2,136 @@
 Scan service - orchestrates scanning and persistence.
 """
 
+import asyncio
 import json
 import logging
 import uuid
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
 from app.db.models import ScanRecord
 from src.core.models import ScanResult
-from src.core.orchestrator import scan_domain
+from src.core.orchestrator import SCAN_RESULT_EVENT, rescan_domain, scan_domain, stream_scan_domain
 from src.utils.validators import normalize_domain
 
 logger = logging.getLogger(__name__)
 
+# Final event name yielded by ``stream_scan``.
+SCAN_DONE_EVENT = "done"
+
 
 def _generate_scan_id() -> str:
     """Generate a globally-unique scan ID."""
     return f"scan_{uuid.uuid4().hex[:12]}"
 
 
+def _persist_scan(
+    db: Session,
+    scan_id: str,
+    domain: str,
+    results: ScanResult,
+    user_id: int,
+) -> None:
+    """Save a finished scan to the DB, then best-effort to Neo4j and notifications."""
+    record = ScanRecord(
+        scan_id=scan_id,
+        domain=domain,
+        results=results.model_dump_json(),
+        user_id=user_id,
+    )
+    db.add(record)
+    db.commit()
+
+    try:
+        from app.services.neo4j_service import persist_scan_to_neo4j
+
+        persist_scan_to_neo4j(scan_id, domain, results.model_dump(mode="json"))
+    except Exception as exc:
+        logger.warning("Neo4j persist failed for scan %s: %s", scan_id, exc)
+
+    try:
+        from app.services.notification_service import create_notifications_after_scan
+
+        create_notifications_after_scan(
+            db, user_id, domain, scan_id, results.model_dump(mode="json"),
+        )
+    except Exception as exc:
+        logger.warning("Notification creation failed for scan %s: %s", scan_id, exc)
+
+
+def _previous_result(previous: Optional[ScanRecord], domain: str) -> Optional[ScanResult]:
+    """Parse a stored scan of ``domain`` for a delta re-scan; None means full scan."""
+    if previous is None or not previous.results or normalize_domain(previous.domain) != domain:
+        return None
+    try:
+        return ScanResult.model_validate_json(previous.results)
+    except ValueError as exc:
+        logger.warning("Stored scan %s unusable for delta re-scan: %s", previous.scan_id, exc)
+        return None
+
+
+def get_latest_scan_record(db: Session, domain: str, user_id: int) -> Optional[ScanRecord]:
+    """Most recent stored scan of ``domain`` by ``user_id``."""
+    return (
+        db.query(ScanRecord)
+        .filter(ScanRecord.domain == normalize_domain(domain), ScanRecord.user_id == user_id)
+        .order_by(ScanRecord.created_at.desc())
+        .first()
+    )
+
+
 def run_scan(
     domain: str,
     db: Session,
     on_progress: Optional[Callable[[str, int, str], None]] = None,
     user_id: Optional[int] = None,
+    previous: Optional[ScanRecord] = None,
 ) -> tuple[str, ScanResult]:
     """
     Run a scan. Persist to DB only when ``user_id`` is provided (authenticated).
 
+    With ``previous`` (an earlier stored scan of the same domain) this is a
+    delta re-scan: only new or changed IPs and hosts are port/SSL/tech probed.
+
     Returns:
         (scan_id, ScanResult)
     """
     domain = normalize_domain(domain)
     scan_id = _generate_scan_id()
-    results = scan_domain(domain, on_progress=on_progress)
-
+    previous_result = _previous_result(previous, domain)
+    if previous_result is not None:
+        results = rescan_domain(domain, previous_result, on_progress=on_progress)
+    else:
+        results = scan_domain(domain, on_progress=on_progress)
     if user_id is not None:
-        record = ScanRecord(
-            scan_id=scan_id,
-            domain=domain,
-            results=results.model_dump_json(),
-            user_id=user_id,
-        )
-        db.add(record)
-        db.commit()
-
-        try:
-            from app.services.neo4j_service import persist_scan_to_neo4j
-
-            persist_scan_to_neo4j(scan_id, domain, results.model_dump(mode="json"))
-        except Exception as exc:
-            logger.warning("Neo4j persist failed for scan %s: %s", scan_id, exc)
+        _persist_scan(db, scan_id, domain, results, user_id)
+    return scan_id, results
 
-        try:
-            from app.services.notification_service import create_notifications_after_scan
 
-            create_notifications_after_scan(
-                db, user_id, domain, scan_id, results.model_dump(mode="json"),
-            )
-        except Exception as exc:
-            logger.warning("Notification creation failed for scan %s: %s", scan_id, exc)
+async def stream_scan(
+    domain: str,
+    db: Session,
+    on_progress: Optional[Callable[[str, int, str], None]] = None,
+    user_id: Optional[int] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streaming variant of ``run_scan`` for live clients.
 
-    return scan_id, results
+    Yields ``(enricher_name, partial)`` as each section is merged, then
+    ``(SCAN_DONE_EVENT, (scan_id, ScanResult))`` after the scan has been
+    persisted (only when ``user_id`` is provided).
+    """
+    domain = normalize_domain(domain)
+    scan_id = _generate_scan_id()
+    async for name, payload in stream_scan_domain(domain, on_progress=on_progress):
+        if name != SCAN_RESULT_EVENT:
+            yield name, payload
+            continue
+        if user_id is not None:
+            await asyncio.to_thread(_persist_scan, db, scan_id, domain, payload, user_id)
+        yield SCAN_DONE_EVENT, (scan_id, payload)
 
 
 def get_scan(db: Session, scan_id: str) -> Optional[Dict[str, Any]]:
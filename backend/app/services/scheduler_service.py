@@ -12,7 +12,7 @@ from sqlalchemy.orm import Session
 
 from app.db.database import SessionLocal
 from app.db.models import ScheduledScan
-from app.services.scan_service import run_scan
+from app.services.scan_service import get_latest_scan_record, run_scan
 
 logger = logging.getLogger(__name__)
 
@@ -22,10 +22,11 @@ _scheduler: Optional[BackgroundScheduler] = None
 
 
 def _run_scheduled_scan(schedule_id: int, domain: str, user_id: int) -> None:
-    """Execute a scheduled scan (called by APScheduler)."""
+    """Execute a scheduled scan (called by APScheduler) as a delta of the last one."""
     db = SessionLocal()
     try:
-        run_scan(domain, db, user_id=user_id)
+        previous = get_latest_scan_record(db, domain, user_id)
+        run_scan(domain, db, user_id=user_id, previous=previous)
         record = db.query(ScheduledScan).filter(ScheduledScan.id == schedule_id).first()
         if record:
             record.last_run_at = datetime.utcnow()
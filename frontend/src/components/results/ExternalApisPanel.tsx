@@ -54,6 +54,15 @@ interface ExternalApisPanelProps {
     pulsedive?: { domain?: string; risk?: string; risk_recommendation?: string; threats?: string[]; feeds?: string[]; properties?: Record<string, unknown> }
     wayback?: { domain?: string; first_snapshot_timestamp?: string; first_snapshot_url?: string; original_url?: string; error?: string }
     ssllabs?: { domain?: string; grade?: string; weak_protocols?: string[]; has_weak_protocols?: boolean; error?: string }
+    tls_audit?: {
+      domain?: string
+      weak_protocols?: string[]
+      has_weak_protocols?: boolean
+      weak_ciphers?: string[]
+      has_weak_ciphers?: boolean
+      endpoints?: Array<{ ip: string; protocols?: Record<string, string>; weak_ciphers?: Array<{ family: string; cipher?: string }>; error?: string }>
+      error?: string
+    }
   }
 }
 
@@ -675,6 +684,48 @@ const ExternalApisPanel = ({ data }: ExternalApisPanelProps) => {
         </Card>
       )}
 
+      {data.tls_audit && (
+        <Card>
+          <CardContent>
+            <Typography variant="h6" gutterBottom sx={{ display: 'flex', alignItems: 'center', gap: 1 }}>
+              <ApiIcon /> {t('results.localTlsAudit')}
+              <HelpTooltip topic="api_tls_audit" />
+            </Typography>
+            <Typography variant="body2" color="text.secondary" sx={{ mb: 1 }}>
+              {t('results.tlsCipherAudit')}
+            </Typography>
+            {data.tls_audit.error ? (
+              <Chip icon={<WarningIcon />} label={data.tls_audit.error} size="small" color="warning" variant="outlined" />
+            ) : (
+              <Box sx={{ display: 'flex', alignItems: 'center', gap: 1, flexWrap: 'wrap' }}>
+                {data.tls_audit.has_weak_protocols && data.tls_audit.weak_protocols?.length ? (
+                  <Chip
+                    icon={<WarningIcon />}
+                    label={t('results.weakProtocols', { protocols: data.tls_audit.weak_protocols.join(', ') })}
+                    size="small"
+                    color="error"
+                    variant="outlined"
+                  />
+                ) : (
+                  <Chip icon={<CheckCircleIcon />} label={t('results.noWeakProtocols')} size="small" color="success" variant="outlined" />
+                )}
+                {data.tls_audit.has_weak_ciphers && data.tls_audit.weak_ciphers?.length ? (
+                  <Chip
+                    icon={<WarningIcon />}
+                    label={t('results.weakCiphers', { ciphers: data.tls_audit.weak_ciphers.join(', ') })}
+                    size="small"
+                    color="error"
+                    variant="outlined"
+                  />
+                ) : (
+                  <Chip icon={<CheckCircleIcon />} label={t('results.noWeakCiphers')} size="small" color="success" variant="outlined" />
+                )}
+              </Box>
+            )}
+          </CardContent>
+        </Card>
+      )}
+
       {data.ssllabs && (
         <Card>
           <CardContent>
@@ -58,7 +58,17 @@ const SSLInfoPanel = ({ sslInfo }: SSLInfoPanelProps) => {
               <TableBody>
                 {sslInfo.certificates.map((cert, idx) => (
                   <TableRow key={idx}>
-                    <TableCell sx={{ fontFamily: 'monospace' }}>{cert.host}</TableCell>
+                    <TableCell sx={{ fontFamily: 'monospace' }}>
+                      {cert.host}
+                      {(cert.hosts?.length ?? 0) > 1 && (
+                        <Chip
+                          label={`+${cert.hosts!.length - 1}`}
+                          title={cert.hosts!.join('\n')}
+                          size="small"
+                          sx={{ ml: 1 }}
+                        />
+                      )}
+                    </TableCell>
                     <TableCell>
                       {cert.not_before ? formatDateTime(cert.not_before, { dateStyle: 'medium' }) : '—'}
                     </TableCell>
@@ -39,6 +39,13 @@ const DomainInput = () => {
         setProgress(p)
         setProgressMessage(translateScanProgressMessage(msg, t))
       },
+      onPartial: (results) => {
+        setCurrentScan({
+          target_domain: normalized,
+          subdomains: [],
+          ...results,
+        } as ScanResults)
+      },
       onDone: (scanId, results) => {
         try {
           const resultDomain =
@@ -132,6 +132,7 @@ const en = {
     homeCta: 'Home — enter a domain',
     completedSummary: 'Scan completed • {{count}} subdomains found',
     completedDate: '• {{date}}',
+    incompleteSections: 'Some sections are incomplete (time budget or error): {{sections}}',
     tabs: {
       overview: 'Overview',
       dns: 'DNS Records',
@@ -147,9 +148,7 @@ const en = {
     graphLimit: 'Showing first 50 of {{count}} subdomains in graph',
     processingResultsError: 'Error processing results',
     progress: {
-      phase1: 'Running DNS, WHOIS, Subdomains...',
-      phase2: 'Running SSL, Port, Tech...',
-      phase3: 'Running GeoIP, External APIs...',
+      enrichers: 'Running enrichers...',
       enrichmentComplete: 'Enrichment complete',
       analyzingRisks: 'Analyzing risks and correlations...',
       buildingSummary: 'Building scan summary...',
@@ -451,6 +450,9 @@ const en = {
     tlsCipherAudit: 'TLS/cipher audit (weak protocols: TLS 1.0, TLS 1.1, SSLv3)',
     grade: 'Grade: {{grade}}',
     weakProtocols: 'Weak: {{protocols}}',
+    weakCiphers: 'Weak ciphers: {{ciphers}}',
+    noWeakCiphers: 'No weak ciphers',
+    localTlsAudit: 'Local TLS audit',
     geolocation: 'Geolocation',
     noGeolocationData: 'No geolocation data available. Add GeoLite2-City.mmdb to the backend and rescan.',
     noData: 'No data available',
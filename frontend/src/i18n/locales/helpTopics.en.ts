@@ -293,6 +293,13 @@ export const helpTopicsEn = {
     whyBad: 'Empty result — domain was never archived or request error.',
     tips: 'Works automatically. First snapshot URL — link to archived version.',
   },
+  api_tls_audit: {
+    title: 'Local TLS audit',
+    what: 'Direct handshakes with each HTTPS address of the domain: one per protocol version (SSLv3–TLS 1.3) and one per weak cipher family (NULL, anonymous, EXPORT, RC4, DES, 3DES).',
+    whyImportant: 'Shows the same weak protocols as SSL Labs within seconds, without the external service and its rate limits.',
+    whyBad: 'Weak protocols or ciphers accepted — possible downgrade attacks and decryptable traffic.',
+    tips: 'Works automatically. "untested" means the scanner itself cannot offer that protocol (SSLv3 is disabled in most builds).',
+  },
   api_ssllabs: {
     title: 'SSL Labs',
     what: 'Qualys service for TLS/SSL audit. Checks protocols (TLS 1.0, 1.1, SSLv3), ciphers, grade (A–F). Weak protocols — outdated insecure protocols.',
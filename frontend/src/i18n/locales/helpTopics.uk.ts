@@ -300,6 +300,13 @@ export const helpTopicsUk: {
     whyBad: 'Порожній результат — домен ніколи не архівували або помилка запиту.',
     tips: 'Працює автоматично. URL першого знімка — посилання на архівну версію.',
   },
+  api_tls_audit: {
+    title: 'Локальний аудит TLS',
+    what: 'Прямі рукостискання з кожною HTTPS-адресою домену: по одному на версію протоколу (SSLv3–TLS 1.3) і на кожне сімейство слабких шифрів (NULL, anonymous, EXPORT, RC4, DES, 3DES).',
+    whyImportant: 'Показує ті самі слабкі протоколи, що й SSL Labs, за секунди, без зовнішнього сервісу та його лімітів.',
+    whyBad: 'Приймаються слабкі протоколи чи шифри — можливі downgrade-атаки та розшифрування трафіку.',
+    tips: 'Працює автоматично. "untested" означає, що сканер сам не може запропонувати цей протокол (SSLv3 вимкнено в більшості збірок).',
+  },
   api_ssllabs: {
     title: 'SSL Labs',
     what: 'Сервіс Qualys для аудиту TLS/SSL. Перевіряє протоколи (TLS 1.0, 1.1, SSLv3), шифри, оцінку (A–F). Weak protocols — застарілі небезпечні протоколи.',
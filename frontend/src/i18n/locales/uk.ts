@@ -132,6 +132,7 @@ const uk = {
     homeCta: 'Головна — ввести домен',
     completedSummary: 'Сканування завершено • знайдено піддоменів: {{count}}',
     completedDate: '• {{date}}',
+    incompleteSections: 'Деякі розділи неповні (вичерпано час або помилка): {{sections}}',
     tabs: {
       overview: 'Огляд',
       dns: 'DNS-записи',
@@ -147,9 +148,7 @@ const uk = {
     graphLimit: 'У графі показано перші 50 з {{count}} піддоменів',
     processingResultsError: 'Помилка обробки результатів',
     progress: {
-      phase1: 'Виконую DNS, WHOIS, піддомени...',
-      phase2: 'Виконую SSL, порти, стек технологій...',
-      phase3: 'Виконую GeoIP, зовнішні API...',
+      enrichers: 'Виконую збагачення даних...',
       enrichmentComplete: 'Збагачення даних завершено',
       analyzingRisks: 'Аналіз ризиків і зв’язків...',
       buildingSummary: 'Формування підсумку сканування...',
@@ -451,6 +450,9 @@ const uk = {
     tlsCipherAudit: 'Аудит TLS/шифрів (слабкі протоколи: TLS 1.0, TLS 1.1, SSLv3)',
     grade: 'Оцінка: {{grade}}',
     weakProtocols: 'Слабкі: {{protocols}}',
+    weakCiphers: 'Слабкі шифри: {{ciphers}}',
+    noWeakCiphers: 'Слабких шифрів немає',
+    localTlsAudit: 'Локальний аудит TLS',
     geolocation: 'Геолокація',
     noGeolocationData: 'Дані геолокації відсутні. Додайте GeoLite2-City.mmdb до backend і виконайте повторне сканування.',
     noData: 'Дані відсутні',
@@ -2,9 +2,7 @@ import type { TFunction } from 'i18next'
 
 /** Messages emitted by src/core/pipeline.py and src/core/orchestrator.py over WebSocket */
 const FIXED_MESSAGE_KEYS: Record<string, string> = {
-  'Running DNS, WHOIS, Subdomains...': 'scan.progress.phase1',
-  'Running SSL, Port, Tech...': 'scan.progress.phase2',
-  'Running GeoIP, External APIs...': 'scan.progress.phase3',
+  'Running enrichers...': 'scan.progress.enrichers',
   'Enrichment complete': 'scan.progress.enrichmentComplete',
   'Analyzing risks and correlations...': 'scan.progress.analyzingRisks',
   'Building scan summary...': 'scan.progress.buildingSummary',
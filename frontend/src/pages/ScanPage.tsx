@@ -80,6 +80,14 @@ const ScanPage = () => {
     }
   }, [currentScan])
 
+  const incompleteSections = useMemo(
+    () =>
+      Object.entries(currentScan?.section_status ?? {})
+        .filter(([, status]) => status !== 'complete')
+        .map(([section, status]) => `${section} (${status})`),
+    [currentScan]
+  )
+
   const handleTabChange = (_: React.SyntheticEvent, newValue: number) => {
     setTabValue(newValue)
   }
@@ -156,6 +164,12 @@ const ScanPage = () => {
           </Box>
         </Box>
 
+        {incompleteSections.length > 0 && (
+          <Alert severity="warning" sx={{ mb: 2 }}>
+            {t('scan.incompleteSections', { sections: incompleteSections.join(', ') })}
+          </Alert>
+        )}
+
         {/* Tabs */}
         <Paper sx={{ mb: 2, overflow: 'hidden' }}>
           <Tabs
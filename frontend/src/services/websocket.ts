@@ -1,6 +1,7 @@
 /**
  * WebSocket for real-time scan progress.
- * Connects to ws://host/api/ws/scan, sends {domain}, receives progress and results.
+ * Connects to ws://host/api/ws/scan, sends {domain}, receives progress, partial
+ * enricher sections as they finish, and the final analysis results.
  */
 
 import i18n from '../i18n'
@@ -11,6 +12,12 @@ export interface ScanProgressMessage {
   message?: string
 }
 
+export interface ScanPartialMessage {
+  stage: 'partial'
+  section: string
+  data: Record<string, unknown>
+}
+
 export interface ScanDoneMessage {
   stage: 'done'
   progress: number
@@ -24,12 +31,20 @@ export interface ScanErrorMessage {
   error: string
 }
 
-export type ScanWsMessage = ScanProgressMessage | ScanDoneMessage | ScanErrorMessage
+export type ScanWsMessage =
+  | ScanProgressMessage
+  | ScanPartialMessage
+  | ScanDoneMessage
+  | ScanErrorMessage
 
 export function isDoneMessage(msg: ScanWsMessage): msg is ScanDoneMessage {
   return msg.stage === 'done'
 }
 
+function isPartialMessage(msg: ScanWsMessage): msg is ScanPartialMessage {
+  return msg.stage === 'partial'
+}
+
 function isErrorMessage(msg: ScanWsMessage): msg is ScanErrorMessage {
   return 'error' in msg
 }
@@ -43,6 +58,8 @@ const getWsUrl = () => {
 
 export interface ScanWebSocketCallbacks {
   onProgress?: (progress: number, message: string) => void
+  /** Called with all sections received so far each time an enricher finishes. */
+  onPartial?: (results: Record<string, unknown>) => void
   onDone?: (scanId: string, results: Record<string, unknown>, saved?: boolean) => void
   onError?: (error: string) => void
 }
@@ -54,6 +71,7 @@ export function runScanViaWebSocket(
 ): () => void {
   const wsUrl = getWsUrl()
   const ws = new WebSocket(wsUrl)
+  let sections: Record<string, unknown> = {}
 
   ws.onopen = () => {
     const payload: { domain: string; token?: string } = { domain }
@@ -69,8 +87,12 @@ export function runScanViaWebSocket(
         ws.close()
         return
       }
-      if (isDoneMessage(data)) {
-        callbacks.onDone?.(data.scan_id, data.results, (data as { saved?: boolean }).saved)
+      if (isPartialMessage(data)) {
+        sections = { ...sections, ...data.data }
+        callbacks.onPartial?.(sections)
+      } else if (isDoneMessage(data)) {
+        // "done" carries only analysis fields; enricher sections arrived as partials.
+        callbacks.onDone?.(data.scan_id, { ...sections, ...data.results }, data.saved)
         ws.close()
       } else {
         callbacks.onProgress?.(data.progress, data.message || '')
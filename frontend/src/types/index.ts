@@ -40,6 +40,11 @@ export interface WhoisInfo {
 
 export interface CertificateInfo {
   host: string
+  /** Every host that served this certificate (one entry per distinct certificate). */
+  hosts?: string[]
+  /** Hosts assumed to share it (same addresses as a host in ``hosts``), not handshaken. */
+  inferred_hosts?: string[]
+  fingerprint_sha256?: string | null
   subject_cn?: string
   issuer?: string
   san?: string[]
@@ -49,8 +54,19 @@ export interface CertificateInfo {
   error?: string
 }
 
+export interface TlsHandshake {
+  host: string
+  connect_ms?: number | null
+  handshake_ms?: number | null
+  tls_version?: string | null
+  cipher?: string | null
+  fingerprint_sha256?: string | null
+  error?: string | null
+}
+
 export interface SslInfo {
   certificates?: CertificateInfo[]
+  handshakes?: TlsHandshake[]
   error?: string
 }
 
@@ -67,6 +83,21 @@ export interface PortScanResult {
   error?: string
 }
 
+export interface HostLiveness {
+  host: string
+  addresses?: string[]
+  open_ports?: number[]
+}
+
+export interface LivenessInfo {
+  ports?: number[]
+  hosts?: Record<string, HostLiveness>
+  /** IP -> probed ports that accepted. */
+  open_ports?: Record<string, number[]>
+  /** IPs where every probe timed out. */
+  unresponsive?: string[]
+}
+
 export type RiskLevel = 'LOW' | 'MEDIUM' | 'HIGH'
 
 export interface Alert {
@@ -133,6 +164,8 @@ export interface RiskGroupItem {
   recommendation?: string | null
 }
 
+export type SectionStatus = 'complete' | 'timeout' | 'error' | 'skipped'
+
 export interface ScanResults {
   target_domain: string
   scan_date?: string
@@ -142,10 +175,15 @@ export interface ScanResults {
   subdomains: string[]
   ssl_info?: SslInfo
   port_scan?: PortScanResult[]
+  liveness?: LivenessInfo
   tech_stack?: Record<string, unknown>
   geoip_info?: Record<string, { country?: string; city?: string; latitude?: number; longitude?: number }>
   external_apis?: Record<string, unknown>
   alerts?: Alert[]
+  /** Section field -> outcome; anything but 'complete' means partial data. */
+  section_status?: Record<string, SectionStatus>
+  /** Delta re-scans: section -> asset (IP, host, URL) -> ISO time it was last probed. */
+  carried_forward?: Record<string, Record<string, string>>
   summary?: {
     total_subdomains?: number
     total_ip_addresses?: number
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Offline DNS brute-force benchmark against the in-process stand-in server.
+
+Usage (from repo root):
+  python scripts/benchmark_bruteforce.py --words 100000 --hits 500 \\
+      --latency-ms 2 --capacity 300 --wildcard
+
+  # a real wordlist (synthetic names are used for the hits)
+  python scripts/benchmark_bruteforce.py --wordlist data/wordlists/subdomains-top1mil.txt
+
+Prints JSON with the engine stats (queries/s, errors, peak and final
+concurrency, wildcard-filtered hits) and whether every planted name was found.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.core.bruteforce import BruteforceEngine, iter_wordlist
+from src.core.standin_dns import StandInDnsServer
+
+_DOMAIN = "bench.example"
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    if args.wordlist:
+        planted = list(itertools.islice(iter_wordlist(Path(args.wordlist)), 0, None, max(1, args.spread)))
+        planted = planted[: args.hits]
+        words = iter_wordlist(Path(args.wordlist), args.words)
+    else:
+        planted = [f"w{i}" for i in range(0, args.words, max(1, args.words // max(1, args.hits)))][: args.hits]
+        words = (f"w{i}" for i in range(args.words))
+    records = {f"{word}.{_DOMAIN}": [f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"]
+               for i, word in enumerate(planted)}
+    server = StandInDnsServer(
+        records,
+        wildcard=(_DOMAIN, ["192.0.2.1"]) if args.wildcard else None,
+        latency=args.latency_ms / 1000,
+        capacity=args.capacity or None,
+    )
+    async with server:
+        engine = BruteforceEngine(
+            nameservers=[server.address],
+            concurrency=args.concurrency,
+            max_concurrency=args.max_concurrency,
+            timeout=args.timeout,
+        )
+        result = await engine.run(_DOMAIN, words)
+    stats = result.stats()
+    stats["planted"] = len(records)
+    stats["missed"] = sorted(set(records) - set(result.found))[:20]
+    stats["server_servfails"] = server.servfails
+    return stats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=20000, help="candidates (0 = whole wordlist)")
+    parser.add_argument("--wordlist", help="stream words from this file instead of synthetic ones")
+    parser.add_argument("--spread", type=int, default=97, help="plant every Nth wordlist entry")
+    parser.add_argument("--hits", type=int, default=200, help="names that exist")
+    parser.add_argument("--wildcard", action="store_true", help="answer every other name too")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="server answer delay")
+    parser.add_argument("--capacity", type=int, default=0, help="pending answers before SERVFAIL (0 = none)")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--max-concurrency", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=2.0)
+    args = parser.parse_args()
+
+    stats = asyncio.run(_run(args))
+    print(json.dumps(stats, indent=2))
+    return 1 if stats["missed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
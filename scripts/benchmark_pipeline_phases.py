@@ -6,7 +6,10 @@ Usage (from repo root):
   python scripts/benchmark_pipeline_phases.py example.com
 
 Prints JSON with wall-clock seconds. Sequential mode runs enrichers in dependency
-order on a single thread (no phase-1/2 overlap).
+order on a single thread (no overlap); parallel mode records when each enricher
+completed inside the dependency-graph scheduler, plus a per-host / per-enricher
+span summary. ``--trace scan.json`` also writes the full Chrome trace (open it in
+chrome://tracing or https://ui.perfetto.dev).
 """
 
 from __future__ import annotations
@@ -23,26 +26,21 @@ if str(_ROOT) not in sys.path:
 
 from src.core.context import ScanContextData
 from src.core.orchestrator import _build_pipeline
+from src.core.tracing import Tracer
 
 
-def _parallel_with_marks(domain: str) -> tuple[float, dict, int]:
+def _parallel_with_marks(domain: str, tracer: Tracer | None = None) -> tuple[float, dict, int]:
     marks: dict[str, float] = {}
     t0 = time.perf_counter()
 
     def on_progress(stage: str, pct: int, msg: str) -> None:
-        elapsed = time.perf_counter() - t0
-        if stage == "phase1" and "phase1" not in marks:
-            marks["phase1"] = elapsed
-        elif stage == "phase2" and "phase2" not in marks:
-            marks["phase2"] = elapsed
-        elif stage == "phase3" and "phase3" not in marks:
-            marks["phase3"] = elapsed
-        elif stage == "analysis":
-            marks.setdefault("analysis", elapsed)
+        # Stages are enricher names (first report = completion) plus "pipeline"/"analysis".
+        if stage != "pipeline":
+            marks.setdefault(stage, time.perf_counter() - t0)
 
     pipe = _build_pipeline(on_progress=on_progress)
     t_run = time.perf_counter()
-    data = pipe.run(domain)
+    data = pipe.run(domain, tracer=tracer)
     wall = time.perf_counter() - t_run
     subs = len(data.get("subdomains") or [])
     return wall, marks, subs
@@ -83,20 +81,28 @@ def main() -> None:
         "--mode",
         choices=("both", "parallel", "sequential"),
         default="both",
-        help="parallel: overlapping pipeline only; sequential: strict one-by-one enrichers; both (default).",
+        help="parallel: dependency-graph pipeline only; sequential: strict one-by-one enrichers; both (default).",
     )
+    ap.add_argument("--trace", metavar="PATH", help="Write the parallel run's Chrome trace JSON here.")
     args = ap.parse_args()
     domain = args.domain.lower().strip()
 
     out: dict = {"domain": domain}
 
     if args.mode in ("both", "parallel"):
-        t_par, marks, subs_p = _parallel_with_marks(domain)
+        tracer = Tracer(domain)
+        t_par, marks, subs_p = _parallel_with_marks(domain, tracer)
         out["parallel"] = {
             "wall_seconds": round(t_par, 3),
-            "phase_markers_seconds_from_start": {k: round(v, 3) for k, v in sorted(marks.items())},
+            "enricher_done_seconds_from_start": {k: round(v, 3) for k, v in sorted(marks.items())},
             "subdomain_count": subs_p,
+            "trace_summary": {
+                category: {name: {**v, "seconds": round(v["seconds"], 3)} for name, v in items.items()}
+                for category, items in tracer.summary().items()
+            },
         }
+        if args.trace:
+            tracer.export_chrome_trace(args.trace)
 
     if args.mode in ("both", "sequential"):
         t_seq, per, subs_s = _sequential(domain)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Offline port-scan benchmark against loopback addresses.
+
+Usage (from repo root, Linux - every 127.x.y.z address is local):
+  python scripts/benchmark_portscan.py --ips 50 --profile top-1000 --concurrency 500
+
+A few listeners (one sending a banner) are started on the first IP; every other
+port is closed. Prints JSON with the elapsed time, connects per second and the
+open ports found, and exits non-zero if a listener was missed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.core.shared import ResourceLimits
+from src.enrichers.port import _scan_ip_ports, parse_ports
+
+
+async def _serve_banner(reader, writer) -> None:
+    writer.write(b"SSH-2.0-benchmark\r\n")
+    await writer.drain()
+    writer.close()
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    ips = [f"127.0.{i // 250}.{i % 250 + 1}" for i in range(args.ips)]
+    ports = parse_ports(args.profile)
+    listen_ports = ports[: args.listeners]
+    servers = [await asyncio.start_server(_serve_banner, ips[0], port) for port in listen_ports]
+    limits = ResourceLimits(tcp_connect=args.concurrency)
+    try:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(
+            _scan_ip_ports(ip, ports, timeout=args.timeout, limits=limits) for ip in ips
+        ))
+        elapsed = time.perf_counter() - started
+    finally:
+        for server in servers:
+            server.close()
+    found = sorted(p.port for p in results[0].open_ports)
+    connects = len(ips) * len(ports)
+    return {
+        "ips": len(ips),
+        "ports": len(ports),
+        "connects": connects,
+        "seconds": round(elapsed, 2),
+        "connects_per_second": round(connects / elapsed) if elapsed else None,
+        "open_ports": found,
+        "banners": sum(1 for p in results[0].open_ports if p.banner),
+        "missed": sorted(set(listen_ports) - set(found)),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ips", type=int, default=50, help="loopback IPs to scan")
+    parser.add_argument("--profile", default="top-1000", help="ports (see parse_ports)")
+    parser.add_argument("--listeners", type=int, default=3, help="open ports on the first IP")
+    parser.add_argument("--concurrency", type=int, default=500, help="global connect budget")
+    parser.add_argument("--timeout", type=float, default=1.0)
+    args = parser.parse_args()
+
+    stats = asyncio.run(_run(args))
+    print(json.dumps(stats, indent=2))
+    return 1 if stats["missed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Deterministic, offline scan benchmark on top of the record/replay harness.
+
+Usage (from repo root):
+  # once, with network access: record every DNS / HTTP / connect / TLS answer
+  python scripts/benchmark_replay.py record example.com -o bench/example.com.json
+
+  # any time, offline: replay with injected latency and check regressions
+  python scripts/benchmark_replay.py replay bench/example.com.json \\
+      --latency dns=20,http=80,connect=10,tls=30 --repeat 3 \\
+      --max-wall 5 --max-rss-mb 400 --max-threads 120
+
+Replay prints JSON with wall-clock seconds per run, peak RSS, peak thread count,
+shared DNS cache hit rates and cassette misses (lookups the scan made that were not recorded, e.g. after
+a code change). With any ``--max-*`` threshold exceeded the exit code is 1.
+Record and replay with the same API keys configured, and without Redis, so the
+scan makes the same requests both times.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.core.orchestrator import scan_domain
+from src.core.replay import Cassette, Recorder, ReplayEnvironment, ReplayLatency, replay_counts
+from src.core.resolver import get_resolver
+
+_THREAD_SAMPLE_SECONDS = 0.01
+
+
+def _parse_latency(spec: str) -> ReplayLatency:
+    """``"50"`` (all kinds) or ``"dns=20,http=80"``, in milliseconds."""
+    if "=" not in spec:
+        seconds = float(spec) / 1000
+        return ReplayLatency(dns=seconds, http=seconds, connect=seconds, tls=seconds)
+    latency = ReplayLatency()
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        kind, _, value = part.partition("=")
+        if not hasattr(latency, kind):
+            raise argparse.ArgumentTypeError(f"unknown latency kind: {kind}")
+        setattr(latency, kind, float(value) / 1000)
+    return latency
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource  # local import: POSIX only
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class _ThreadSampler:
+    """Samples ``threading.active_count()`` in the background; keeps the peak."""
+
+    def __init__(self) -> None:
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="thread-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(_THREAD_SAMPLE_SECONDS):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self) -> "_ThreadSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _record(args: argparse.Namespace) -> int:
+    domain = args.domain.lower().strip()
+    cassette = Cassette(domain=domain)
+    t0 = time.perf_counter()
+    with Recorder(cassette):
+        scan_domain(domain)
+    wall = time.perf_counter() - t0
+    cassette.save(args.output)
+    print(json.dumps({
+        "domain": domain,
+        "cassette": args.output,
+        "live_wall_seconds": round(wall, 3),
+        "recorded": replay_counts(cassette),
+    }, indent=2))
+    return 0
+
+
+def _replay(args: argparse.Namespace) -> int:
+    cassette = Cassette.load(args.cassette)
+    walls: list[float] = []
+    with ReplayEnvironment(cassette, args.latency) as env, _ThreadSampler() as threads:
+        for _ in range(args.repeat):
+            get_resolver().clear()  # every run starts with a cold DNS cache
+            t0 = time.perf_counter()
+            scan_domain(cassette.domain)
+            walls.append(time.perf_counter() - t0)
+
+    out: dict = {
+        "domain": cassette.domain,
+        "recorded_at": cassette.recorded_at,
+        "latency_ms": {k: round(v * 1000, 1) for k, v in vars(args.latency).items()},
+        "wall_seconds": [round(w, 3) for w in walls],
+        "median_wall_seconds": round(statistics.median(walls), 3),
+        "peak_rss_mb": _peak_rss_mb(),
+        "peak_threads": threads.peak,
+        "dns_cache": get_resolver().stats(),
+        "misses": sorted(set(env.misses)),
+    }
+    measured = {
+        "max_wall": out["median_wall_seconds"],
+        "max_rss_mb": out["peak_rss_mb"],
+        "max_threads": out["peak_threads"],
+    }
+    out["regressions"] = {
+        name: {"limit": limit, "measured": measured[name]}
+        for name in measured
+        if (limit := getattr(args, name)) is not None
+        and measured[name] is not None
+        and measured[name] > limit
+    }
+    print(json.dumps(out, indent=2))
+    return 1 if out["regressions"] else 0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Run a live scan and write its cassette.")
+    rec.add_argument("domain")
+    rec.add_argument("-o", "--output", required=True, help="Cassette path (JSON).")
+
+    rep = sub.add_parser("replay", help="Replay a cassette offline and report metrics.")
+    rep.add_argument("cassette")
+    rep.add_argument(
+        "--latency",
+        type=_parse_latency,
+        default=ReplayLatency(),
+        help='Injected latency in ms: "50" for every kind or "dns=20,http=80,connect=10,tls=30".',
+    )
+    rep.add_argument("--repeat", type=int, default=1, help="Scans to run (median wall is checked).")
+    rep.add_argument("--max-wall", type=float, help="Fail if median wall seconds exceed this.")
+    rep.add_argument("--max-rss-mb", type=float, help="Fail if peak RSS (MiB) exceeds this.")
+    rep.add_argument("--max-threads", type=int, help="Fail if the peak thread count exceeds this.")
+
+    args = ap.parse_args()
+    sys.exit(_record(args) if args.command == "record" else _replay(args))
+
+
+if __name__ == "__main__":
+    main()
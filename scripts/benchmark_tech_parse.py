@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Per-URL cost of the tech probe's body handling against a local HTTP server.
+
+Usage (from repo root):
+  python scripts/benchmark_tech_parse.py --sizes 20000,200000,2000000 --requests 50
+
+Synthetic pages (a small head with meta tags, then filler markup up to each
+size) are served over loopback. Each page is fetched ``--requests`` times:
+
+* ``legacy``  - ``resp.text()`` on the whole body, BeautifulSoup over the
+  first 50 KB, CMS substrings searched in the whole text (the probe before
+  bounded reads; needs beautifulsoup4);
+* ``bounded`` - ``_read_text_prefix`` up to ``TECH_BODY_MAX_BYTES`` and the
+  head-only ``_parse_meta_tags``.
+
+Prints JSON with milliseconds per URL and the peak traced allocation of one
+request, and exits non-zero if the two disagree on the meta tags.
+
+``fingerprints`` is the cost of matching the bounded text against the bundled
+ruleset plus ``--synthetic-rules`` generated technologies (each with a body,
+a script-source and a header pattern), as the probe does for every URL.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import string
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+import aiohttp
+from aiohttp import web
+
+_ROOT = Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.config.settings import TECH_BODY_MAX_BYTES
+from src.enrichers.fingerprints import DEFAULT_FINGERPRINTS, Fingerprints
+from src.enrichers.tech import _head_meta, _parse_meta_tags, _read_text_prefix
+
+_HEAD = (
+    '<!doctype html><html><head><title>bench</title>'
+    '<meta name="generator" content="WordPress 6.5">'
+    '<link rel="stylesheet" href="/wp-content/themes/bench/style.css"></head><body>'
+)
+_FILLER = '<div class="post"><p>Lorem ipsum dolor sit amet, <a href="/p">consectetur</a>.</p></div>\n'
+
+
+def _page(size: int) -> bytes:
+    body = _HEAD + _FILLER * max(0, (size - len(_HEAD)) // len(_FILLER) + 1)
+    return (body[:size] + "</body></html>").encode("utf-8")
+
+
+def _legacy_parse(html: str) -> Tuple[Optional[str], Optional[str]]:
+    from bs4 import BeautifulSoup
+
+    generator = cms = None
+    soup = BeautifulSoup(html[:50000], "html.parser")
+    meta_gen = soup.find("meta", attrs={"name": "generator"})
+    if meta_gen and meta_gen.get("content"):
+        generator = meta_gen["content"].strip()
+    meta_cms = soup.find("meta", attrs={"name": re.compile(r"cms|generator", re.I)})
+    if meta_cms and meta_cms.get("content"):
+        cms = meta_cms["content"].strip()
+    if not cms and "wp-content" in html:
+        cms = "WordPress"
+    elif not cms and "drupal" in html.lower():
+        cms = "Drupal"
+    return generator, cms
+
+
+async def _legacy(resp: aiohttp.ClientResponse) -> Tuple[Optional[str], Optional[str]]:
+    return _legacy_parse(await resp.text())
+
+
+async def _bounded(resp: aiohttp.ClientResponse) -> Tuple[Optional[str], Optional[str]]:
+    return _parse_meta_tags(await _read_text_prefix(resp, TECH_BODY_MAX_BYTES))
+
+
+def _ruleset(synthetic: int) -> Fingerprints:
+    technologies = json.loads(DEFAULT_FINGERPRINTS.read_text(encoding="utf-8"))["technologies"]
+    rng = random.Random(0)
+    alphabet = string.ascii_lowercase + "-_/."
+
+    def word(length: int) -> str:
+        return "".join(rng.choice(alphabet) for _ in range(length))
+
+    for i in range(synthetic):
+        technologies[f"Synthetic {i}"] = {
+            "html": re.escape(word(rng.randint(6, 14))) + r"[^>]*?v([\d.]+)\;version:\1",
+            "scriptSrc": re.escape(word(8)) + r"(?:\.min)?\.js",
+            "headers": {f"x-synthetic-{i % 300}": f"^{word(6)}"},
+        }
+    return Fingerprints(technologies)
+
+
+def _match_cost(fingerprints: Fingerprints, page: bytes, rounds: int) -> dict:
+    text = page[:TECH_BODY_MAX_BYTES].decode("utf-8", errors="replace")
+    headers = {"server": "nginx/1.24.0", "x-powered-by": "PHP/8.2"}
+    started = time.perf_counter()
+    for _ in range(rounds):
+        detections = fingerprints.match(headers=headers, meta=_head_meta(text), html=text)
+    elapsed = time.perf_counter() - started
+    return {"ms_per_url": round(elapsed / rounds * 1000, 3), "detected": [d.name for d in detections]}
+
+
+async def _measure(session: aiohttp.ClientSession, url: str, handle: Callable, requests: int) -> dict:
+    async def fetch():
+        async with session.get(url) as resp:
+            return await handle(resp)
+
+    meta = await fetch()  # warm-up; also the answer compared between variants
+    started = time.perf_counter()
+    for _ in range(requests):
+        await fetch()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    await fetch()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms_per_url": round(elapsed / requests * 1000, 3), "peak_kib": round(peak / 1024, 1), "meta": meta}
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    try:
+        import bs4  # noqa: F401
+        variants = {"legacy": _legacy, "bounded": _bounded}
+    except ImportError:
+        variants = {"bounded": _bounded}
+
+    pages = {size: _page(size) for size in args.sizes}
+
+    async def serve(request: web.Request) -> web.Response:
+        return web.Response(body=pages[int(request.match_info["size"])], content_type="text/html", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/{size}", serve)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    results = []
+    try:
+        async with aiohttp.ClientSession() as session:
+            for size in args.sizes:
+                row = {"page_bytes": len(pages[size])}
+                for name, handle in variants.items():
+                    row[name] = await _measure(session, f"http://127.0.0.1:{port}/{size}", handle, args.requests)
+                results.append(row)
+    finally:
+        await runner.cleanup()
+    started = time.perf_counter()
+    fingerprints = _ruleset(args.synthetic_rules)
+    compile_seconds = time.perf_counter() - started
+    for row, size in zip(results, args.sizes):
+        row["fingerprints"] = _match_cost(fingerprints, pages[size], args.requests)
+    return {
+        "body_max_bytes": TECH_BODY_MAX_BYTES,
+        "requests": args.requests,
+        "ruleset": {**fingerprints.stats(), "compile_seconds": round(compile_seconds, 2)},
+        "pages": results,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--sizes", type=lambda value: [int(v) for v in value.split(",")], default=[20000, 200000, 2000000],
+        help="comma-separated page sizes in bytes",
+    )
+    parser.add_argument("--requests", type=int, default=50, help="timed fetches per page and variant")
+    parser.add_argument("--synthetic-rules", type=int, default=3000, help="generated technologies added to the ruleset")
+    args = parser.parse_args()
+
+    stats = asyncio.run(_run(args))
+    print(json.dumps(stats, indent=2))
+    mismatched = [
+        row["page_bytes"] for row in stats["pages"]
+        if "legacy" in row and row["legacy"]["meta"] != row["bounded"]["meta"]
+    ]
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -53,7 +53,7 @@ def _benchmark_both(domain: str) -> dict:
     t_par, marks, subs_p = _parallel_with_marks(domain)
     out["parallel"] = {
         "wall_seconds": round(t_par, 3),
-        "phase_markers_seconds_from_start": {k: round(v, 3) for k, v in sorted(marks.items())},
+        "enricher_done_seconds_from_start": {k: round(v, 3) for k, v in sorted(marks.items())},
         "subdomain_count": subs_p,
     }
     t_seq, per, subs_s = _sequential(domain)
@@ -68,7 +68,7 @@ def _benchmark_both(domain: str) -> dict:
     out["comparison"] = {
         "sequential_minus_parallel_seconds": gain,
         "parallel_faster_by_seconds": gain,
-        "note": "parallel = EnricherPipeline.run() with overlapping phases; "
+        "note": "parallel = EnricherPipeline.run() with the dependency-graph scheduler; "
         "sequential = same enrichers dns→…→geoip one after another on one context.",
     }
     return out
@@ -116,7 +116,7 @@ def _full_scan_with_log(domain: str) -> dict:
     summary = d.get("summary") or {}
     alerts = d.get("alerts") or []
 
-    # First-seen timestamps per stage for phase table
+    # First-seen timestamps per stage for the stage-window table
     first: dict[str, float] = {}
     for row in log:
         st = row["stage"]
@@ -144,18 +144,19 @@ def _full_scan_with_log(domain: str) -> dict:
     }
 
 
-def _derive_phase_windows(first: dict[str, float], wall: float) -> dict:
+def _derive_stage_windows(first: dict[str, float], wall: float) -> dict:
     """Approximate wall intervals from first progress callback per stage."""
-    p1 = first.get("phase1", 0.0)
-    p2 = first.get("phase2", wall)
-    p3 = first.get("phase3", wall)
     an = first.get("analysis", wall)
+    enrichers = {
+        stage: elapsed
+        for stage, elapsed in first.items()
+        if stage not in ("pipeline", "analysis")
+    }
     return {
-        "approx_pipeline_phase1_to_phase2_s": round(max(0.0, p2 - p1), 3),
-        "approx_pipeline_phase2_to_phase3_s": round(max(0.0, p3 - p2), 3),
-        "approx_pipeline_phase3_until_analysis_callback_s": round(max(0.0, an - p3), 3),
+        "approx_enricher_done_s": {k: round(v, 3) for k, v in sorted(enrichers.items(), key=lambda kv: kv[1])},
+        "approx_pipeline_until_analysis_callback_s": round(max(0.0, an - first.get("pipeline", 0.0)), 3),
         "approx_analysis_block_s": round(max(0.0, wall - an), 3),
-        "note": "Timestamps are first on_progress fire per stage; sub-steps overlap inside pipeline.",
+        "note": "Timestamps are first on_progress fire per stage; enrichers overlap inside the pipeline DAG.",
     }
 
 
@@ -185,7 +186,7 @@ def main() -> None:
 
     print(f"Full scan_domain({domain!r})…", flush=True)
     scan_block = _full_scan_with_log(domain)
-    scan_block["phase_windows_from_progress"] = _derive_phase_windows(
+    scan_block["stage_windows_from_progress"] = _derive_stage_windows(
         scan_block["first_event_elapsed_s_by_stage"],
         scan_block["wall_seconds_total"],
     )
@@ -2,19 +2,20 @@
 Correlation — grouping subdomain→IP, reverse DNS for neighbors.
 """
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Any, Optional, Set, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import dns.resolver
 import dns.exception
 
+from src.core.executor import POOL_DNS, get_executor
+from src.core.resolver import get_resolver
 from src.core.models import DNSInfo, SslInfo
 
 
 def _resolve_subdomain_a(subdomain: str) -> List[str]:
     """Resolve A records for a subdomain."""
     try:
-        answers = dns.resolver.resolve(subdomain, "A")
+        answers = get_resolver().resolve(subdomain, "A")
         return [str(r) for r in answers]
     except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN, dns.exception.DNSException):
         return []
@@ -23,7 +24,7 @@ def _resolve_subdomain_a(subdomain: str) -> List[str]:
 def _ptr_lookup(ip: str) -> Optional[str]:
     """Reverse DNS lookup for IP."""
     try:
-        answers = dns.resolver.resolve_address(ip)
+        answers = get_resolver().resolve_address(ip)
         if answers:
             return str(answers[0]).rstrip(".")
     except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN, dns.exception.DNSException):
@@ -36,6 +37,7 @@ def group_subdomains_by_ip(
     dns_info: Optional[DNSInfo],
     root_domain: str,
     resolve_subdomains: bool = True,
+    resolve: Callable[[str], List[str]] = _resolve_subdomain_a,
 ) -> Dict[str, List[str]]:
     """
     Group subdomains by their resolved IP.
@@ -52,34 +54,37 @@ def group_subdomains_by_ip(
         return result
 
     # Resolve each subdomain to IP (limit to first 100 for performance)
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {executor.submit(_resolve_subdomain_a, sub): sub for sub in subdomains[:100]}
-        for future in as_completed(futures):
-            sub = futures[future]
-            try:
-                resolved_ips = future.result()
-                for ip in resolved_ips:
-                    if sub not in result.setdefault(ip, []):
-                        result[ip].append(sub)
-            except Exception:
-                pass
+    executor = get_executor()
+    futures = {executor.submit(POOL_DNS, resolve, sub): sub for sub in subdomains[:100]}
+    for future in executor.as_completed(futures):
+        sub = futures[future]
+        try:
+            resolved_ips = future.result()
+            for ip in resolved_ips:
+                if sub not in result.setdefault(ip, []):
+                    result[ip].append(sub)
+        except Exception:
+            pass
 
     return result
 
 
-def reverse_dns_neighbors(ips: List[str]) -> Dict[str, str]:
+def reverse_dns_neighbors(
+    ips: List[str],
+    lookup: Callable[[str], Optional[str]] = _ptr_lookup,
+) -> Dict[str, str]:
     """PTR lookup for IPs — find other hostnames on same server."""
     ptr_map: Dict[str, str] = {}
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {executor.submit(_ptr_lookup, ip): ip for ip in ips[:50]}
-        for future in as_completed(futures):
-            ip = futures[future]
-            try:
-                ptr = future.result()
-                if ptr:
-                    ptr_map[ip] = ptr
-            except Exception:
-                pass
+    executor = get_executor()
+    futures = {executor.submit(POOL_DNS, lookup, ip): ip for ip in ips[:50]}
+    for future in executor.as_completed(futures):
+        ip = futures[future]
+        try:
+            ptr = future.result()
+            if ptr:
+                ptr_map[ip] = ptr
+        except Exception:
+            pass
     return ptr_map
 
 
@@ -93,15 +98,14 @@ def shared_certificate_hosts(ssl_info: Optional[SslInfo]) -> List[Dict[str, Any]
     for cert in ssl_info.certificates:
         if getattr(cert, "error", None):
             continue
-        host = (cert.host or "").lower().strip()
+        hosts = {(host or "").lower().strip() for host in cert.all_hosts()} - {""}
         san = sorted({str(name).lower().strip() for name in (cert.san or []) if name})
         subject = (cert.subject_cn or "").lower().strip()
         key_parts = san or ([subject] if subject else [])
         if not key_parts:
             continue
         key = "|".join(key_parts)
-        if host:
-            groups.setdefault(key, set()).add(host)
+        groups.setdefault(key, set()).update(hosts)
         for name in san:
             groups.setdefault(key, set()).add(name.lstrip("*."))
         san_counts[key] = len(san)
@@ -126,19 +130,26 @@ def build_correlation_summary(
     dns_info: Optional[DNSInfo],
     ssl_info: Optional[SslInfo] = None,
     root_domain: str = "",
+    resolve: Callable[[str], List[str]] = _resolve_subdomain_a,
+    lookup: Callable[[str], Optional[str]] = _ptr_lookup,
 ) -> Dict[str, Any]:
-    """Build correlation summary with IP grouping and reverse DNS."""
+    """
+    Build correlation summary with IP grouping and reverse DNS.
+
+    ``resolve`` (subdomain -> A records) and ``lookup`` (IP -> PTR name) default
+    to plain resolver queries; ``CorrelationEnricher`` passes memoized ones.
+    """
     ips: Set[str] = set()
     if dns_info:
         ips.update(dns_info.a_records or [])
         ips.update(dns_info.aaaa_records or [])
 
     ip_to_subs = group_subdomains_by_ip(
-        subdomains, dns_info, root_domain or (dns_info.domain if dns_info else ""), True
+        subdomains, dns_info, root_domain or (dns_info.domain if dns_info else ""), True, resolve=resolve
     )
     ips.update(ip_to_subs.keys())
 
-    ptr_records = reverse_dns_neighbors(list(ips))
+    ptr_records = reverse_dns_neighbors(list(ips), lookup=lookup)
 
     return {
         "subdomain_count": len(subdomains),
@@ -147,3 +158,9 @@ def build_correlation_summary(
         "ptr_records": ptr_records,
         "shared_certificate_hosts": shared_certificate_hosts(ssl_info),
     }
+
+
+def correlated_ips(correlation: Optional[Dict[str, Any]]) -> List[str]:
+    """IPs of ``correlation["ip_to_subdomains"]``, most-shared first (ties by IP)."""
+    ip_to_subs = (correlation or {}).get("ip_to_subdomains") or {}
+    return sorted(ip_to_subs, key=lambda ip: (-len(ip_to_subs[ip] or []), ip))
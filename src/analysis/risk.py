@@ -109,13 +109,15 @@ def detect_ssl_risks(ssl_info: Optional[SslInfo]) -> List[Alert]:
         return alerts
 
     for cert in ssl_info.certificates:
-        if cert.is_expired:
+        if not cert.is_expired:
+            continue
+        for host in cert.all_hosts():
             alerts.append(
                 Alert(
                     type="expired_ssl",
                     level=RiskLevel.MEDIUM,
-                    message=f"Expired certificate for {cert.host}",
-                    target=cert.host,
+                    message=f"Expired certificate for {host}",
+                    target=host,
                 )
             )
 
@@ -241,22 +243,42 @@ def detect_security_headers_risks(tech_stack: Optional[Dict[str, Any]]) -> List[
     return alerts
 
 
-def detect_ssllabs_risks(external_apis: Optional[Dict[str, Any]]) -> List[Alert]:
-    """Alert when SSL Labs reports weak TLS protocols (TLS 1.0, TLS 1.1, SSLv3)."""
+def detect_weak_tls_risks(external_apis: Optional[Dict[str, Any]]) -> List[Alert]:
+    """
+    Alert on weak TLS protocols (TLS 1.0, TLS 1.1, SSLv3) and weak cipher
+    suites reported by the local TLS audit or, when enabled, SSL Labs.
+    """
     alerts: List[Alert] = []
-    ssllabs = (external_apis or {}).get("ssllabs") or {}
-    if not ssllabs.get("has_weak_protocols"):
-        return alerts
-    weak = ssllabs.get("weak_protocols") or []
-    alerts.append(
-        Alert(
-            type="weak_tls",
-            level=RiskLevel.MEDIUM,
-            message=f"Weak TLS protocols: {', '.join(weak)} — vulnerable to downgrade attacks",
-            target=ssllabs.get("domain"),
-            details={"weak_protocols": weak},
+    sources = [(external_apis or {}).get(key) or {} for key in ("tls_audit", "ssllabs")]
+    domain = next((source.get("domain") for source in sources if source.get("domain")), None)
+    weak = list(dict.fromkeys(
+        protocol for source in sources if source.get("has_weak_protocols")
+        for protocol in source.get("weak_protocols") or []
+    ))
+    if weak:
+        alerts.append(
+            Alert(
+                type="weak_tls",
+                level=RiskLevel.MEDIUM,
+                message=f"Weak TLS protocols: {', '.join(weak)} — vulnerable to downgrade attacks",
+                target=domain,
+                details={"weak_protocols": weak},
+            )
+        )
+    ciphers = list(dict.fromkeys(
+        cipher for source in sources if source.get("has_weak_ciphers")
+        for cipher in source.get("weak_ciphers") or []
+    ))
+    if ciphers:
+        alerts.append(
+            Alert(
+                type="weak_tls",
+                level=RiskLevel.MEDIUM,
+                message=f"Weak TLS cipher suites accepted: {', '.join(ciphers)}",
+                target=domain,
+                details={"weak_ciphers": ciphers},
+            )
         )
-    )
     return alerts
 
 
@@ -446,7 +468,7 @@ def run_risk_analysis(
     alerts.extend(detect_outdated_tech(tech_stack))
     alerts.extend(detect_security_headers_risks(tech_stack))
     alerts.extend(detect_abuseipdb_risks(external_apis))
-    alerts.extend(detect_ssllabs_risks(external_apis))
+    alerts.extend(detect_weak_tls_risks(external_apis))
     alerts.extend(detect_phishtank_risks(external_apis))
     alerts.extend(detect_pulsedive_risks(external_apis))
     alerts.extend(detect_criminalip_risks(external_apis))
@@ -25,16 +25,107 @@ def _env_bool(name: str, default: bool = False) -> bool:
 # DNS settings
 DNS_TIMEOUT = 5  # seconds
 DNS_RETRIES = 3
+# Shared DNS cache (src/core/resolver.py). Answers are kept for their record
+# TTL capped at DNS_CACHE_MAX_TTL; NXDOMAIN / no-data answers for the zone's
+# SOA negative TTL, or DNS_CACHE_NEGATIVE_TTL when the response carries none.
+DNS_CACHE_MAX_ENTRIES = int(os.getenv("DNS_CACHE_MAX_ENTRIES", "10000"))
+DNS_CACHE_MAX_TTL = int(os.getenv("DNS_CACHE_MAX_TTL", "3600"))
+DNS_CACHE_NEGATIVE_TTL = int(os.getenv("DNS_CACHE_NEGATIVE_TTL", "300"))
+# Also share answers between processes through Redis (needs REDIS_URL).
+DNS_CACHE_REDIS = _env_bool("DNS_CACHE_REDIS", default=True)
+# Upstream resolver pool (src/core/upstreams.py): "ip" or "ip:port",
+# comma-separated (empty = the system resolver). A query not answered within
+# the upstream's DNS_HEDGE_PERCENTILE latency (DNS_HEDGE_DELAY until enough
+# samples, never below DNS_HEDGE_MIN_DELAY) is also sent to the fastest other
+# upstream. Upstreams answering REFUSED or timing out DNS_UPSTREAM_MAX_FAILURES
+# times in a row are skipped for DNS_UPSTREAM_BENCH_SECONDS.
+DNS_UPSTREAMS = [item.strip() for item in os.getenv("DNS_UPSTREAMS", "").split(",") if item.strip()]
+DNS_UPSTREAM_TIMEOUT = float(os.getenv("DNS_UPSTREAM_TIMEOUT", "3"))
+DNS_HEDGE_PERCENTILE = float(os.getenv("DNS_HEDGE_PERCENTILE", "0.9"))
+DNS_HEDGE_DELAY = float(os.getenv("DNS_HEDGE_DELAY", "0.2"))
+DNS_HEDGE_MIN_DELAY = float(os.getenv("DNS_HEDGE_MIN_DELAY", "0.02"))
+DNS_UPSTREAM_MAX_FAILURES = int(os.getenv("DNS_UPSTREAM_MAX_FAILURES", "3"))
+DNS_UPSTREAM_BENCH_SECONDS = float(os.getenv("DNS_UPSTREAM_BENCH_SECONDS", "60"))
+# DNS brute-force engine (src/core/bruteforce.py). Resolvers are "ip" or
+# "ip:port", comma-separated (empty = DNS_UPSTREAMS, then the system resolvers). The wordlist
+# defaults to data/wordlists/subdomains-top1mil.txt, then subdomains-small.txt;
+# BRUTEFORCE_MAX_WORDS 0 = the whole list. Queries in flight start at
+# BRUTEFORCE_CONCURRENCY and adapt up to BRUTEFORCE_MAX_CONCURRENCY. With a
+# checkpoint directory, interrupted runs resume where they stopped.
+BRUTEFORCE_RESOLVERS = [
+    item.strip() for item in os.getenv("BRUTEFORCE_RESOLVERS", "").split(",") if item.strip()
+]
+BRUTEFORCE_WORDLIST = os.getenv("BRUTEFORCE_WORDLIST", "")
+BRUTEFORCE_MAX_WORDS = int(os.getenv("BRUTEFORCE_MAX_WORDS", "0"))
+BRUTEFORCE_CONCURRENCY = int(os.getenv("BRUTEFORCE_CONCURRENCY", "100"))
+BRUTEFORCE_MAX_CONCURRENCY = int(os.getenv("BRUTEFORCE_MAX_CONCURRENCY", "1000"))
+BRUTEFORCE_TIMEOUT = float(os.getenv("BRUTEFORCE_TIMEOUT", "2"))
+BRUTEFORCE_CHECKPOINT_DIR = os.getenv("BRUTEFORCE_CHECKPOINT_DIR", "")
 
 # HTTP settings
 HTTP_TIMEOUT = 10
 HTTP_RETRIES = 3
 # Set HTTP_VERIFY_SSL=false to skip TLS verification (e.g. self-signed targets).
 HTTP_VERIFY_SSL = _env_bool("HTTP_VERIFY_SSL", default=True)
+# Technology fingerprint ruleset: a Wappalyzer-style JSON file, or a directory
+# of them (empty = data/fingerprints/technologies.json).
+TECH_FINGERPRINTS = os.getenv("TECH_FINGERPRINTS", "")
+# Bytes of each page the tech probe downloads; meta tags and CMS hints are
+# taken from this prefix, the rest of the body is never read.
+TECH_BODY_MAX_BYTES = int(os.getenv("TECH_BODY_MAX_BYTES", "65536"))
 # Per-port TCP connect timeout for the port scanner.
 PORT_SCAN_TIMEOUT = float(os.getenv("PORT_SCAN_TIMEOUT", "3"))
+# Ports scanned on every IP: profiles "top-20", "top-100", "top-1000", single
+# ports and ranges, comma-separated (e.g. "top-100,8000-8100"). Larger
+# profiles are opt-in: they multiply the connects sent to every target IP.
+PORT_SCAN_PROFILE = os.getenv("PORT_SCAN_PROFILE", "top-20")
+# Connects in flight across all port scans of the process (batch scans use
+# ResourceLimits.tcp_connect instead); banner grabs on open ports run as a
+# separate stage with at most PORT_BANNER_CONCURRENCY connections.
+PORT_SCAN_CONCURRENCY = int(os.getenv("PORT_SCAN_CONCURRENCY", "500"))
+PORT_BANNER_CONCURRENCY = int(os.getenv("PORT_BANNER_CONCURRENCY", "50"))
+# Port scan results are reused per IP and port profile for PORT_CACHE_TTL
+# seconds (0 = always rescan), across scans and - through Redis, when
+# configured - across processes.
+PORT_CACHE_TTL = int(os.getenv("PORT_CACHE_TTL", "3600"))
+PORT_CACHE_MAX_ENTRIES = int(os.getenv("PORT_CACHE_MAX_ENTRIES", "10000"))
+PORT_CACHE_REDIS = _env_bool("PORT_CACHE_REDIS", default=True)
+# Liveness pre-probe (src/enrichers/liveness.py): TCP connects to these ports
+# on every address of the apex and its subdomains before SSL / tech deep-probe.
+LIVENESS_PORTS = [
+    int(item) for item in os.getenv("LIVENESS_PORTS", "80,443").split(",") if item.strip()
+]
+LIVENESS_TIMEOUT = float(os.getenv("LIVENESS_TIMEOUT", "1.5"))
+# Most IPs port-scanned per domain: apex A/AAAA records first, then subdomain IPs.
+PORT_SCAN_MAX_IPS = int(os.getenv("PORT_SCAN_MAX_IPS", "20"))
+# TLS certificate collection: handshakes in flight across all scans of the
+# process (batch scans use ResourceLimits.tcp_connect instead) and the most
+# hosts checked per domain, apex first (0 = every discovered host).
+SSL_CONCURRENCY = int(os.getenv("SSL_CONCURRENCY", "100"))
+SSL_MAX_HOSTS = int(os.getenv("SSL_MAX_HOSTS", "0"))
+# Protocol / weak-cipher checks run locally (src/enrichers/tls_audit.py); the
+# SSL Labs API (slow long-poll, rate-limited) is only queried when enabled.
+SSLLABS_ENABLED = _env_bool("SSLLABS_ENABLED", default=False)
+# Group hosts with the same addresses + CNAME target (or the same wildcard
+# answer) so SSL / tech probe one host per group (src/enrichers/host_groups.py).
+HOST_GROUPING = _env_bool("HOST_GROUPING", default=True)
+# Hosts resolved for grouping per domain, apex first (0 = every discovered host).
+HOST_GROUPING_MAX_HOSTS = int(os.getenv("HOST_GROUPING_MAX_HOSTS", "500"))
 CRTSH_TIMEOUT = int(os.getenv("CRTSH_TIMEOUT", "60"))
+# Whole-scan enrichment budget in seconds (0 = unlimited). Enrichers still
+# running when it expires are cancelled and their sections marked "timeout".
+SCAN_DEADLINE_SECONDS = float(os.getenv("SCAN_DEADLINE_SECONDS", "0"))
+# Delta re-scans carry unchanged ports/certs/tech results forward for at most
+# this many hours before probing them again (0 = carry indefinitely).
+DELTA_SCAN_MAX_AGE_HOURS = float(os.getenv("DELTA_SCAN_MAX_AGE_HOURS", "168"))
 USER_AGENT = "NetScout OSINT Scanner 1.0"
+# Process-wide executor (src/core/executor.py): total thread budget and
+# per-pool caps on concurrently running tasks (CPU 0 = os.cpu_count()).
+EXECUTOR_MAX_THREADS = int(os.getenv("EXECUTOR_MAX_THREADS", "64"))
+EXECUTOR_DNS_THREADS = int(os.getenv("EXECUTOR_DNS_THREADS", "32"))
+EXECUTOR_SOCKET_THREADS = int(os.getenv("EXECUTOR_SOCKET_THREADS", "48"))
+EXECUTOR_CPU_THREADS = int(os.getenv("EXECUTOR_CPU_THREADS", "0"))
+EXECUTOR_ENRICHER_THREADS = int(os.getenv("EXECUTOR_ENRICHER_THREADS", "32"))
 
 # Output settings
 RESULTS_DIR = "results"
@@ -0,0 +1,397 @@
+"""
+DNS brute-force engine - streaming wordlists, wildcard filtering, adaptive
+concurrency and resumable runs.
+
+    engine = BruteforceEngine(checkpoint_path=Path("results/bruteforce/example.com.json"))
+    result = await engine.run("example.com", iter_wordlist(path), source=str(path))
+    result.found  # {"www.example.com": ["93.184.216.34"], ...}
+
+* candidates are pulled from the word iterator only when a query slot frees
+  up, so a top-1M wordlist is never held in memory;
+* before the run, random labels are resolved to detect a wildcard zone; hits
+  whose addresses all belong to the wildcard answer (or that CNAME to the
+  wildcard's target) are dropped;
+* queries go straight to a pool of upstream resolvers, round-robin, and a
+  timed-out or SERVFAIL query is retried on the next one. They bypass the
+  shared resolver cache, which a million NXDOMAINs would flush;
+* the number of queries in flight adapts (AIMD): it grows while the timeout /
+  SERVFAIL rate stays under ``error_threshold`` and halves when it does not;
+* with ``checkpoint_path``, progress is written periodically and when the run
+  is cancelled; a later run for the same domain and wordlist resumes there.
+
+``scripts/benchmark_bruteforce.py`` runs the engine against the stand-in DNS
+server in ``src/core/standin_dns.py``.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import secrets
+import string
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import dns.asyncquery
+import dns.exception
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.resolver
+
+from src.config.settings import (
+    BRUTEFORCE_CONCURRENCY,
+    BRUTEFORCE_MAX_CONCURRENCY,
+    BRUTEFORCE_RESOLVERS,
+    BRUTEFORCE_TIMEOUT,
+    DNS_UPSTREAMS,
+)
+from src.core.upstreams import Nameserver, parse_nameserver
+
+logger = logging.getLogger(__name__)
+
+_WILDCARD_PROBES = 3
+_RANDOM_LABEL_LENGTH = 16
+_CHECKPOINT_SECONDS = 10.0
+_ANSWERED = (dns.rcode.NOERROR, dns.rcode.NXDOMAIN)
+_WORD_CHARS = set(string.ascii_lowercase + string.digits + "-_.")
+
+
+def iter_wordlist(path: Path, limit: int = 0) -> Iterator[str]:
+    """
+    Stream brute-force labels from ``path`` one line at a time.
+
+    Blank lines, ``#`` comments and entries that are not valid labels are
+    skipped; ``limit`` > 0 stops after that many words.
+    """
+    count = 0
+    with open(path, encoding="utf-8", errors="ignore") as handle:
+        for line in handle:
+            word = line.strip().lower().strip(".")
+            if not word or word.startswith("#") or len(word) > 200 or not set(word) <= _WORD_CHARS:
+                continue
+            yield word
+            count += 1
+            if limit and count >= limit:
+                return
+
+
+def _default_nameservers() -> List[Nameserver]:
+    if BRUTEFORCE_RESOLVERS:
+        return [parse_nameserver(spec) for spec in BRUTEFORCE_RESOLVERS]
+    if DNS_UPSTREAMS:
+        return [parse_nameserver(spec) for spec in DNS_UPSTREAMS]
+    system = dns.resolver.get_default_resolver()
+    return [(str(ns), system.port) for ns in system.nameservers]
+
+
+def _fingerprint(response: dns.message.Message) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """A addresses and CNAME targets in an answer section."""
+    addresses: Set[str] = set()
+    targets: Set[str] = set()
+    for rrset in response.answer:
+        if rrset.rdtype == dns.rdatatype.A:
+            addresses.update(rdata.address for rdata in rrset)
+        elif rrset.rdtype == dns.rdatatype.CNAME:
+            targets.update(rdata.target.to_text().lower() for rdata in rrset)
+    return frozenset(addresses), frozenset(targets)
+
+
+class AdaptiveLimit:
+    """
+    AIMD limit on queries in flight, driven by the upstream error rate.
+
+    After every round (at least ``window`` outcomes, and at least one per
+    slot) the limit grows by 10% if the share of timeouts / SERVFAILs stayed
+    under ``error_threshold``, and halves otherwise. Outcomes of queries sent
+    before the last decrease are ignored, so one overload burst halves the
+    limit once rather than once per window of its stragglers.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 10,
+        maximum: int = 1000,
+        error_threshold: float = 0.05,
+        window: int = 100,
+    ):
+        if not 1 <= minimum <= maximum:
+            raise ValueError("AdaptiveLimit needs 1 <= minimum <= maximum")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.error_threshold = error_threshold
+        self.window = window
+        self.limit = max(minimum, min(initial, maximum))
+        self.peak = self.limit
+        self.epoch = 0
+        self._samples = 0
+        self._errors = 0
+
+    def record(self, ok: bool, epoch: Optional[int] = None) -> None:
+        """Count one outcome of a query sent during ``epoch`` (default: now)."""
+        if epoch is not None and epoch != self.epoch:
+            return
+        self._samples += 1
+        if not ok:
+            self._errors += 1
+        if self._samples < max(self.window, self.limit):
+            return
+        if self._errors / self._samples > self.error_threshold:
+            self.limit = max(self.minimum, self.limit // 2)
+            self.epoch += 1
+        else:
+            self.limit = min(self.maximum, self.limit + max(1, self.limit // 10))
+        self.peak = max(self.peak, self.limit)
+        self._samples = self._errors = 0
+
+
+@dataclass
+class BruteforceResult:
+    """Outcome of one brute-force run (``found`` maps names to A addresses)."""
+
+    domain: str
+    found: Dict[str, List[str]] = field(default_factory=dict)
+    wildcard_addresses: List[str] = field(default_factory=list)
+    wildcard_filtered: int = 0
+    candidates: int = 0
+    resumed_from: int = 0
+    queries: int = 0
+    errors: int = 0
+    failed: int = 0
+    peak_concurrency: int = 0
+    final_concurrency: int = 0
+    seconds: float = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "found": len(self.found),
+            "wildcard": bool(self.wildcard_addresses),
+            "wildcard_filtered": self.wildcard_filtered,
+            "candidates": self.candidates,
+            "resumed_from": self.resumed_from,
+            "queries": self.queries,
+            "errors": self.errors,
+            "failed": self.failed,
+            "peak_concurrency": self.peak_concurrency,
+            "final_concurrency": self.final_concurrency,
+            "seconds": round(self.seconds, 3),
+            "qps": round(self.queries / self.seconds, 1) if self.seconds else 0.0,
+        }
+
+
+@dataclass
+class _Wildcard:
+    addresses: FrozenSet[str] = frozenset()
+    targets: FrozenSet[str] = frozenset()
+
+    def matches(self, addresses: FrozenSet[str], targets: FrozenSet[str]) -> bool:
+        if targets & self.targets:
+            return True
+        return bool(addresses) and addresses <= self.addresses
+
+
+class BruteforceEngine:
+    """
+    Resolves ``<word>.<domain>`` for every word of a (streamed) wordlist.
+
+    Args:
+        nameservers: Upstream resolvers as (address, port); defaults to
+            ``BRUTEFORCE_RESOLVERS`` or the system resolvers.
+        concurrency: Queries in flight at the start of a run.
+        max_concurrency: Upper bound for the adaptive limit.
+        timeout: Per-query timeout (seconds).
+        retries: Extra attempts (on the next resolver) after a timeout / SERVFAIL.
+        checkpoint_path: JSON file for resumable runs (None = no checkpoints).
+        checkpoint_seconds: Interval between checkpoint writes.
+    """
+
+    def __init__(
+        self,
+        nameservers: Optional[Sequence[Nameserver]] = None,
+        concurrency: int = BRUTEFORCE_CONCURRENCY,
+        max_concurrency: int = BRUTEFORCE_MAX_CONCURRENCY,
+        timeout: float = BRUTEFORCE_TIMEOUT,
+        retries: int = 2,
+        checkpoint_path: Optional[Path] = None,
+        checkpoint_seconds: float = _CHECKPOINT_SECONDS,
+    ):
+        self.nameservers = list(nameservers or _default_nameservers())
+        if not self.nameservers:
+            raise ValueError("BruteforceEngine needs at least one nameserver")
+        self.concurrency = concurrency
+        self.max_concurrency = max(concurrency, max_concurrency)
+        self.timeout = timeout
+        self.retries = retries
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_seconds = checkpoint_seconds
+        self._next_ns = itertools.cycle(self.nameservers)
+
+    # -- public API ---------------------------------------------------------
+
+    async def run(self, domain: str, words: Iterable[str], source: str = "") -> BruteforceResult:
+        """
+        Brute-force ``domain`` with ``words``.
+
+        ``source`` identifies the wordlist; a checkpoint is only resumed when
+        both domain and source match.
+        """
+        domain = domain.lower().strip().rstrip(".")
+        started = time.perf_counter()
+        position, found = self._load_checkpoint(domain, source)
+        result = BruteforceResult(domain=domain, found=found, resumed_from=position)
+        limit = AdaptiveLimit(self.concurrency, minimum=min(10, self.concurrency), maximum=self.max_concurrency)
+
+        wildcard = await self._detect_wildcard(domain, result, limit)
+        result.wildcard_addresses = sorted(wildcard.addresses)
+
+        candidates = itertools.islice(iter(words), position, None)
+        next_index = position
+        # Indices in flight, in issue order; the checkpoint position is the
+        # first one not yet answered.
+        window: Deque[int] = deque()
+        answered: Set[int] = set()
+        running: Dict["asyncio.Task[Optional[dns.message.Message]]", Tuple[int, str]] = {}
+        done_queue: "asyncio.Queue[asyncio.Task]" = asyncio.Queue()
+        exhausted = False
+        last_checkpoint = time.monotonic()
+        try:
+            while True:
+                while not exhausted and len(running) < limit.limit:
+                    word = next(candidates, None)
+                    if word is None:
+                        exhausted = True
+                        break
+                    name = f"{word}.{domain}"
+                    task = asyncio.ensure_future(self._query(name, result, limit))
+                    task.add_done_callback(done_queue.put_nowait)
+                    running[task] = (next_index, name)
+                    window.append(next_index)
+                    next_index += 1
+                if not running:
+                    break
+                batch = [await done_queue.get()]
+                while not done_queue.empty():
+                    batch.append(done_queue.get_nowait())
+                for task in batch:
+                    index, name = running.pop(task)
+                    answered.add(index)
+                    self._collect(result, wildcard, name, task.result())
+                while window and window[0] in answered:
+                    answered.discard(window.popleft())
+                if self.checkpoint_path and time.monotonic() - last_checkpoint >= self.checkpoint_seconds:
+                    self._save_checkpoint(domain, source, window[0] if window else next_index, result.found)
+                    last_checkpoint = time.monotonic()
+        finally:
+            result.candidates = next_index
+            result.peak_concurrency = limit.peak
+            result.final_concurrency = limit.limit
+            result.seconds = time.perf_counter() - started
+            if running:
+                for task in running:
+                    task.cancel()
+                self._save_checkpoint(domain, source, window[0] if window else next_index, result.found)
+        self._clear_checkpoint()
+        return result
+
+    # -- queries ------------------------------------------------------------
+
+    async def _query(
+        self,
+        name: str,
+        result: BruteforceResult,
+        limit: AdaptiveLimit,
+    ) -> Optional[dns.message.Message]:
+        """A query for ``name``; None if every attempt timed out or failed."""
+        for _ in range(self.retries + 1):
+            address, port = next(self._next_ns)
+            epoch = limit.epoch
+            result.queries += 1
+            try:
+                response = await dns.asyncquery.udp(
+                    dns.message.make_query(name, dns.rdatatype.A), address, timeout=self.timeout, port=port
+                )
+            except (dns.exception.DNSException, OSError):
+                response = None
+            ok = response is not None and response.rcode() in _ANSWERED
+            limit.record(ok, epoch)
+            if ok:
+                return response
+            result.errors += 1
+        result.failed += 1
+        return None
+
+    async def _detect_wildcard(
+        self,
+        domain: str,
+        result: BruteforceResult,
+        limit: AdaptiveLimit,
+    ) -> _Wildcard:
+        """Resolve random labels; whatever answers them is the wildcard."""
+        probes = [
+            f"{secrets.token_hex(_RANDOM_LABEL_LENGTH // 2)}.{domain}" for _ in range(_WILDCARD_PROBES)
+        ]
+        addresses: Set[str] = set()
+        targets: Set[str] = set()
+        for response in await asyncio.gather(*(self._query(p, result, limit) for p in probes)):
+            if response is not None and response.rcode() == dns.rcode.NOERROR:
+                probe_addresses, probe_targets = _fingerprint(response)
+                addresses |= probe_addresses
+                targets |= probe_targets
+        if addresses or targets:
+            logger.info("Wildcard DNS on %s: %s", domain, sorted(addresses | targets))
+        return _Wildcard(frozenset(addresses), frozenset(targets))
+
+    @staticmethod
+    def _collect(
+        result: BruteforceResult,
+        wildcard: _Wildcard,
+        name: str,
+        response: Optional[dns.message.Message],
+    ) -> None:
+        if response is None or response.rcode() != dns.rcode.NOERROR:
+            return
+        addresses, targets = _fingerprint(response)
+        if not addresses:
+            return
+        if wildcard.matches(addresses, targets):
+            result.wildcard_filtered += 1
+            return
+        result.found[name] = sorted(addresses)
+
+    # -- checkpoints --------------------------------------------------------
+
+    def _load_checkpoint(self, domain: str, source: str) -> Tuple[int, Dict[str, List[str]]]:
+        if not self.checkpoint_path or not self.checkpoint_path.exists():
+            return 0, {}
+        try:
+            state = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable brute-force checkpoint %s: %s", self.checkpoint_path, exc)
+            return 0, {}
+        if state.get("domain") != domain or state.get("source") != source:
+            return 0, {}
+        return int(state.get("position") or 0), dict(state.get("found") or {})
+
+    def _save_checkpoint(self, domain: str, source: str, position: int, found: Dict[str, List[str]]) -> None:
+        if not self.checkpoint_path:
+            return
+        state = {"domain": domain, "source": source, "position": position, "found": found}
+        tmp = self.checkpoint_path.with_suffix(self.checkpoint_path.suffix + ".tmp")
+        try:
+            self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(state), encoding="utf-8")
+            os.replace(tmp, self.checkpoint_path)
+        except OSError as exc:
+            logger.warning("Brute-force checkpoint write failed %s: %s", self.checkpoint_path, exc)
+
+    def _clear_checkpoint(self) -> None:
+        if self.checkpoint_path:
+            try:
+                self.checkpoint_path.unlink(missing_ok=True)
+            except OSError as exc:
+                logger.debug("Brute-force checkpoint removal failed: %s", exc)
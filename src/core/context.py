@@ -1,23 +1,47 @@
 """
 Scan context - accumulated data passed between enrichers.
+
+An enricher running inside ``EnricherPipeline`` can hand some of its fields
+to the pipeline before it returns with ``publish`` (see
+``AbstractEnricher.publishes``); outside a pipeline ``publish`` is a no-op.
 """
 
+import contextvars
 from dataclasses import dataclass, field, fields
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.models import DNSInfo, LivenessInfo, PortScanResult, SslInfo, WhoisInfo
+
+# Per-section outcome recorded by the pipeline (see ``ScanContextData.section_status``).
+SECTION_COMPLETE = "complete"
+SECTION_TIMEOUT = "timeout"
+SECTION_ERROR = "error"
+SECTION_SKIPPED = "skipped"
 
-from src.core.models import DNSInfo, PortScanResult, SslInfo, WhoisInfo
+Publisher = Callable[[Dict[str, Any]], None]
+
+# Set by the pipeline in each running enricher's context.
+_current_publisher: contextvars.ContextVar[Optional[Publisher]] = contextvars.ContextVar(
+    "netscout_publisher", default=None
+)
 
 # Fields that can be merged from enricher results back into the context.
 # Mirrors the dataclass field names below (excluding `domain`).
 _MERGEABLE_FIELDS = (
     "dns_info",
     "whois_info",
+    "ip_addresses",
     "subdomains",
+    "host_groups",
+    "liveness",
     "ssl_info",
+    "tls_peers",
     "port_scan",
     "tech_stack",
     "external_apis",
+    "external_ip_apis",
     "geoip_info",
+    "correlation",
 )
 
 
@@ -28,19 +52,49 @@ class ScanContextData:
     domain: str
     dns_info: Optional[DNSInfo] = None
     whois_info: Optional[WhoisInfo] = None
+    # Apex A/AAAA addresses, published by the DNS enricher before the rest of dns_info.
+    ip_addresses: List[str] = field(default_factory=list)
     subdomains: List[str] = field(default_factory=list)
+    # Hosts fronting the same endpoint (see src/enrichers/host_groups.py).
+    host_groups: List[Dict[str, Any]] = field(default_factory=list)
+    # Which hosts answer on the web ports (see src/enrichers/liveness.py).
+    liveness: Optional[LivenessInfo] = None
     ssl_info: Optional[SslInfo] = None
+    # Certificates the tech probe captured from its own HTTPS connections.
+    tls_peers: Optional[SslInfo] = None
     port_scan: List[PortScanResult] = field(default_factory=list)
     tech_stack: Optional[Dict[str, Any]] = None
     external_apis: Optional[Dict[str, Any]] = None
+    # Per-IP provider results for subdomain addresses; merged into external_apis.
+    external_ip_apis: Optional[Dict[str, Any]] = None
     geoip_info: Optional[Dict[str, Any]] = None
+    correlation: Optional[Dict[str, Any]] = None
+    # Section field -> SECTION_* outcome, filled in by the pipeline.
+    section_status: Dict[str, str] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, Any]:
         """Snapshot of the context as a plain dict (consumed by enrichers)."""
         return {f.name: getattr(self, f.name) for f in fields(self)}
 
-    def merge(self, data: Dict[str, Any]) -> None:
-        """Apply enricher result back into the context (only known fields)."""
+    def merge(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply enricher result back into the context; return the fields applied."""
+        applied: Dict[str, Any] = {}
         for name in _MERGEABLE_FIELDS:
             if name in data:
                 setattr(self, name, data[name])
+                applied[name] = data[name]
+        return applied
+
+
+def publish(data: Dict[str, Any]) -> None:
+    """Hand ``data`` (fields of the running enricher's ``publishes``) to the pipeline now."""
+    publisher = _current_publisher.get()
+    if publisher is not None:
+        publisher(data)
+
+
+def context_with_publisher(base: contextvars.Context, publisher: Publisher) -> contextvars.Context:
+    """Copy of ``base`` in which ``publish`` calls ``publisher``."""
+    context = base.copy()
+    context.run(_current_publisher.set, publisher)
+    return context
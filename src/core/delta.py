@@ -0,0 +1,130 @@
+"""
+Delta re-scans - deep-probe only assets that changed since the previous scan.
+
+Scheduled monitoring re-scans the same domain every few hours, and most of its
+IPs and hosts have not changed in between. A ``ScanBaseline`` wraps the
+previous ``ScanResult``; the port, SSL and tech enrichers constructed with one
+re-run discovery as usual (DNS and subdomains always run in full) and then
+probe only:
+
+* IPs / hosts / URLs that were not probed by the previous scan,
+* hosts whose A records differ from the previous correlation data,
+* assets whose previous result was an error or whose section did not complete,
+* assets carried forward for longer than ``max_age``.
+
+Everything else is reused from the previous scan and listed in
+``ScanResult.carried_forward`` with the time it was actually probed.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.analysis.correlation import _resolve_subdomain_a
+from src.config.settings import DELTA_SCAN_MAX_AGE_HOURS
+from src.core.context import SECTION_COMPLETE
+from src.core.models import ScanResult
+from src.core.shared import SharedWork, shared_call
+
+
+def _previous_host_ips(previous: ScanResult) -> Dict[str, Set[str]]:
+    """Invert the previous correlation's ``ip -> [hosts]`` map."""
+    ip_to_hosts = (previous.correlation or {}).get("ip_to_subdomains") or {}
+    host_ips: Dict[str, Set[str]] = {}
+    for ip, hosts in ip_to_hosts.items():
+        for host in hosts or []:
+            host_ips.setdefault(host.lower(), set()).add(ip)
+    return host_ips
+
+
+class ScanBaseline:
+    """
+    Previous scan of a domain plus the bookkeeping of one delta re-scan.
+
+    Thread-safe: enrichers consult it from worker threads and the event loop.
+    Build a fresh baseline for every re-scan.
+    """
+
+    def __init__(
+        self,
+        previous: ScanResult,
+        max_age: Optional[timedelta] = None,
+        resolve: Callable[[str], List[str]] = _resolve_subdomain_a,
+    ):
+        self.previous = previous
+        self.scan_date = previous.scan_date or datetime.utcnow()
+        if max_age is None and DELTA_SCAN_MAX_AGE_HOURS > 0:
+            max_age = timedelta(hours=DELTA_SCAN_MAX_AGE_HOURS)
+        self.max_age = max_age
+        self._resolve = resolve
+        self._host_ips = _previous_host_ips(previous)
+        self._lookups = SharedWork()
+        self._lock = threading.Lock()
+        self._carried: Dict[str, Dict[str, datetime]] = {}
+
+    def probed_at(self, section: str, asset: str) -> datetime:
+        """When the previous result for ``asset`` was probed."""
+        earlier = self.previous.carried_forward.get(section) or {}
+        return earlier.get(asset) or self.scan_date
+
+    def _section_complete(self, section: str) -> bool:
+        # Scans stored before section_status existed count as complete.
+        return self.previous.section_status.get(section, SECTION_COMPLETE) == SECTION_COMPLETE
+
+    def _fresh(self, section: str, asset: str) -> bool:
+        if self.max_age is None:
+            return True
+        return datetime.utcnow() - self.probed_at(section, asset) <= self.max_age
+
+    def host_changed(self, host: str) -> bool:
+        """True if ``host`` now resolves to different A records than in the previous scan."""
+        host = host.lower()
+        current = shared_call(self._lookups, "host_a", host, lambda: set(self._resolve(host)))
+        return current != self._host_ips.get(host, set())
+
+    def split(
+        self,
+        section: str,
+        assets: Iterable[str],
+        previous: Dict[str, Any],
+        host: Optional[Callable[[str], Optional[str]]] = None,
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Partition ``assets`` into results to carry forward and assets to probe.
+
+        Args:
+            section: Result field (``"port_scan"``, ``"ssl_info"``, ...).
+            assets: Assets the enricher would probe in a full scan.
+            previous: Reusable previous results by asset; a ``None`` value means
+                "probed, nothing found" and is carried like any other result.
+            host: Maps an asset to the hostname whose A records must be
+                unchanged (None for IP assets).
+
+        Returns:
+            ``(carried, to_probe)``; carried assets are recorded for
+            ``carried_forward``.
+        """
+        carried: Dict[str, Any] = {}
+        to_probe: List[str] = []
+        complete = self._section_complete(section)
+        for asset in assets:
+            hostname = host(asset) if host else None
+            if (
+                complete
+                and asset in previous
+                and self._fresh(section, asset)
+                and not (hostname and self.host_changed(hostname))
+            ):
+                carried[asset] = previous[asset]
+            else:
+                to_probe.append(asset)
+        with self._lock:
+            section_carried = self._carried.setdefault(section, {})
+            for asset in carried:
+                section_carried[asset] = self.probed_at(section, asset)
+        return carried, to_probe
+
+    def carried_forward(self) -> Dict[str, Dict[str, datetime]]:
+        """``ScanResult.carried_forward`` for the re-scan (non-empty sections only)."""
+        with self._lock:
+            return {section: dict(assets) for section, assets in self._carried.items() if assets}
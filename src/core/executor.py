@@ -0,0 +1,315 @@
+"""
+Process-wide executor - one bounded thread budget for all blocking scan work.
+
+Enrichers used to open a ``ThreadPoolExecutor`` per call (and nest them: every
+IP of a port scan got its own 20-thread pool), so a handful of concurrent API
+scans created hundreds of short-lived threads. All blocking work now goes
+through one ``ExecutorService``:
+
+    executor = get_executor()
+    futures = {executor.submit(POOL_DNS, resolve, name): name for name in names}
+    for future in executor.as_completed(futures):
+        ...
+
+* ``max_workers`` caps the number of threads in the process;
+* every pool (``POOL_DNS``, ``POOL_SOCKET``, ``POOL_CPU``, ``POOL_ENRICHER``)
+  has its own cap on concurrently running tasks;
+* a thread that waits in ``as_completed`` runs its own queued subtasks
+  instead of idling, so nested submission (an enricher fanning out DNS
+  queries, a per-IP task fanning out port probes) cannot deadlock the pool;
+* work runs in a copy of the submitter's context (the active scan tracer
+  follows it into the worker);
+* ``stats()`` reports queue depth and utilization per pool.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, TypeVar
+
+from src.config.settings import (
+    EXECUTOR_CPU_THREADS,
+    EXECUTOR_DNS_THREADS,
+    EXECUTOR_ENRICHER_THREADS,
+    EXECUTOR_MAX_THREADS,
+    EXECUTOR_SOCKET_THREADS,
+)
+
+T = TypeVar("T")
+
+# Pools (per-category concurrency limits).
+POOL_DNS = "dns"            # resolver queries
+POOL_SOCKET = "socket"      # TCP connects, TLS handshakes, blocking HTTP clients
+POOL_CPU = "cpu"            # parsing, local database lookups
+POOL_ENRICHER = "enricher"  # sync enricher bodies and analysis (mostly waiting on the pools above)
+
+_IDLE_SECONDS = 60.0
+# Longest a helping waiter sleeps before re-checking for runnable subtasks.
+_HELP_POLL_SECONDS = 0.05
+
+
+class _Task:
+    __slots__ = ("pool", "fn", "args", "future", "context", "queued_at", "claimed")
+
+    def __init__(self, pool: str, fn: Callable[..., Any], args: tuple, future: Future):
+        self.pool = pool
+        self.fn = fn
+        self.args = args
+        self.future = future
+        self.context = contextvars.copy_context()
+        self.queued_at = time.perf_counter()
+        self.claimed = False
+
+
+class _PoolView(Executor):
+    """``concurrent.futures.Executor`` facade for one pool (for ``loop.run_in_executor``)."""
+
+    def __init__(self, service: "ExecutorService", pool: str):
+        self._service = service
+        self._pool = pool
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        if kwargs:
+            return self._service.submit(self._pool, lambda: fn(*args, **kwargs))
+        return self._service.submit(self._pool, fn, *args)
+
+
+class ExecutorService:
+    """
+    Bounded, shared thread pool with per-pool limits.
+
+    Threads are started on demand up to ``max_workers`` and exit after a minute
+    idle. Tasks of a pool that is at its limit stay queued; other pools keep
+    running, so a burst of port probes cannot starve DNS lookups.
+    """
+
+    def __init__(self, max_workers: int = 64, limits: Optional[Dict[str, int]] = None):
+        if max_workers < 1:
+            raise ValueError("ExecutorService.max_workers must be >= 1")
+        self.max_workers = max_workers
+        self.limits: Dict[str, int] = {
+            pool: max(1, min(limit, max_workers)) for pool, limit in (limits or {}).items()
+        }
+        self._lock = threading.Lock()
+        # Idle workers wait on _cond; threads in as_completed wait on _done.
+        self._cond = threading.Condition(self._lock)
+        self._done = threading.Condition(self._lock)
+        self._queues: Dict[str, Deque[_Task]] = {}
+        self._queued: Dict[str, int] = {}
+        self._running: Dict[str, int] = {}
+        self._rotation: List[str] = []
+        self._workers = 0
+        self._idle = 0
+        self._local = threading.local()
+        self._views: Dict[str, _PoolView] = {}
+        # Metrics.
+        self._submitted: Dict[str, int] = {}
+        self._completed: Dict[str, int] = {}
+        self._wait_seconds: Dict[str, float] = {}
+        self._peak_workers = 0
+        self._peak_queued = 0
+
+    # -- submission ---------------------------------------------------------
+
+    def _limit(self, pool: str) -> int:
+        return self.limits.get(pool, self.max_workers)
+
+    def submit(self, pool: str, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        """Queue ``fn(*args)`` on ``pool``; it runs in a copy of the caller's context."""
+        task = _Task(pool, fn, args, Future())
+        with self._cond:
+            if pool not in self._queues:
+                self._queues[pool] = deque()
+                self._rotation.append(pool)
+            self._queues[pool].append(task)
+            self._queued[pool] = self._queued.get(pool, 0) + 1
+            self._submitted[pool] = self._submitted.get(pool, 0) + 1
+            self._peak_queued = max(self._peak_queued, sum(self._queued.values()))
+            if self._runnable() > self._idle and self._workers < self.max_workers:
+                self._workers += 1
+                self._peak_workers = max(self._peak_workers, self._workers)
+                threading.Thread(target=self._work, name="netscout-executor", daemon=True).start()
+            self._cond.notify()
+        return task.future
+
+    def _runnable(self) -> int:
+        """Queued tasks that could start right now (lock held)."""
+        return sum(
+            max(0, min(queued, self._limit(pool) - self._running.get(pool, 0)))
+            for pool, queued in self._queued.items()
+        )
+
+    def pool(self, pool: str) -> Executor:
+        """Executor facade submitting into ``pool``."""
+        with self._lock:
+            view = self._views.get(pool)
+            if view is None:
+                view = self._views[pool] = _PoolView(self, pool)
+            return view
+
+    async def run(self, pool: str, fn: Callable[..., T], *args: Any) -> T:
+        """Await ``fn(*args)`` on ``pool`` from the event loop."""
+        return await asyncio.wrap_future(self.submit(pool, fn, *args))
+
+    # -- scheduling ---------------------------------------------------------
+
+    def _claim(self, task: _Task) -> None:
+        """Mark a queued task as taken (caller holds the lock and reserves its slot)."""
+        task.claimed = True
+        self._queued[task.pool] -= 1
+        self._running[task.pool] = self._running.get(task.pool, 0) + 1
+        self._wait_seconds[task.pool] = (
+            self._wait_seconds.get(task.pool, 0.0) + time.perf_counter() - task.queued_at
+        )
+
+    def _next_task(self) -> Optional[_Task]:
+        """First queued task of a pool below its limit, rotating between pools (lock held)."""
+        for _ in range(len(self._rotation)):
+            pool = self._rotation.pop(0)
+            self._rotation.append(pool)
+            queue = self._queues[pool]
+            while queue and queue[0].claimed:
+                queue.popleft()  # already run by a helping waiter
+            if queue and self._running.get(pool, 0) < self._limit(pool):
+                task = queue.popleft()
+                self._claim(task)
+                return task
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                task = self._next_task()
+                while task is None:
+                    self._idle += 1
+                    woke = self._cond.wait(timeout=_IDLE_SECONDS)
+                    self._idle -= 1
+                    task = self._next_task()
+                    if task is None and not woke:
+                        self._workers -= 1
+                        return
+            self._run(task)
+
+    def _run(self, task: _Task) -> None:
+        held: List[str] = getattr(self._local, "held", None) or []
+        self._local.held = held
+        held.append(task.pool)
+        try:
+            if task.future.set_running_or_notify_cancel():
+                try:
+                    result = task.context.run(task.fn, *task.args)
+                except BaseException as exc:
+                    task.future.set_exception(exc)
+                else:
+                    task.future.set_result(result)
+        finally:
+            held.pop()
+            with self._lock:
+                self._running[task.pool] -= 1
+                self._completed[task.pool] = self._completed.get(task.pool, 0) + 1
+                self._cond.notify()
+                self._done.notify_all()
+
+    # -- waiting ------------------------------------------------------------
+
+    def _help(self, tasks: Iterable[_Task]) -> bool:
+        """Run one of ``tasks`` inline if it is still queued and allowed to run here."""
+        held = getattr(self._local, "held", None) or []
+        with self._lock:
+            for task in tasks:
+                if task.claimed or task.future.done():
+                    continue
+                # A waiter may reuse the slot it holds for its own pool; other
+                # pools need a free slot like any worker.
+                if task.pool not in held and self._running.get(task.pool, 0) >= self._limit(task.pool):
+                    continue
+                if task.pool in held:
+                    self._running[task.pool] = self._running.get(task.pool, 0) - 1
+                self._claim(task)
+                break
+            else:
+                return False
+        try:
+            self._run(task)
+        finally:
+            if task.pool in held:
+                with self._lock:
+                    self._running[task.pool] += 1
+        return True
+
+    def as_completed(self, futures: Iterable[Future]) -> Iterator[Future]:
+        """
+        Yield ``futures`` as they finish. While none has, the calling thread
+        runs their queued tasks itself (see module docstring).
+        """
+        pending: Set[Future] = set(futures)
+        tasks = self._tasks_for(pending)
+        while pending:
+            done = {f for f in pending if f.done()}
+            if done:
+                pending -= done
+                yield from done
+                continue
+            if self._help(tasks):
+                continue
+            with self._lock:
+                if not any(f.done() for f in pending):
+                    self._done.wait(timeout=_HELP_POLL_SECONDS)
+
+    def _tasks_for(self, futures: Set[Future]) -> List[_Task]:
+        with self._lock:
+            return [task for queue in self._queues.values() for task in queue if task.future in futures]
+
+    # -- metrics ------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Thread count, utilization and per-pool queue depth / running / limits."""
+        with self._lock:
+            pools = {}
+            for pool in sorted(set(self.limits) | set(self._queues)):
+                queued = self._queued.get(pool, 0)
+                started = self._submitted.get(pool, 0) - queued
+                pools[pool] = {
+                    "limit": self._limit(pool),
+                    "queued": queued,
+                    "running": self._running.get(pool, 0),
+                    "submitted": self._submitted.get(pool, 0),
+                    "completed": self._completed.get(pool, 0),
+                    "avg_queue_wait_seconds": round(self._wait_seconds.get(pool, 0.0) / max(1, started), 4),
+                }
+            busy = self._workers - self._idle
+            return {
+                "max_workers": self.max_workers,
+                "workers": self._workers,
+                "busy_workers": busy,
+                "utilization": round(busy / self.max_workers, 3),
+                "queued": sum(self._queued.values()),
+                "peak_workers": self._peak_workers,
+                "peak_queued": self._peak_queued,
+                "pools": pools,
+            }
+
+
+_executor: Optional[ExecutorService] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ExecutorService:
+    """Get or create the process-wide executor (sized from settings)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ExecutorService(
+                max_workers=EXECUTOR_MAX_THREADS,
+                limits={
+                    POOL_DNS: EXECUTOR_DNS_THREADS,
+                    POOL_SOCKET: EXECUTOR_SOCKET_THREADS,
+                    POOL_CPU: EXECUTOR_CPU_THREADS or os.cpu_count() or 4,
+                    POOL_ENRICHER: EXECUTOR_ENRICHER_THREADS,
+                },
+            )
+        return _executor
@@ -3,7 +3,7 @@ Pydantic models - single source of truth for data schemas.
 """
 
 from .dns import DNSInfo, EmailSecurityInfo, MXRecord
-from .port import OpenPort, PortScanResult
+from .port import HostLiveness, LivenessInfo, OpenPort, PortScanResult
 from .risk import Alert, RiskLevel
 from .scan import (
     RiskBreakdownItem,
@@ -13,9 +13,9 @@ from .scan import (
     ScanResult,
     ScanSummary,
 )
-from .ssl import CertificateInfo, SslInfo
+from .ssl import CertificateInfo, SslInfo, TlsHandshake
 from .subdomain import SubdomainInfo
-from .tech import SecurityHeadersInfo, TechStack
+from .tech import SecurityHeadersInfo, TechDetection, TechStack
 from .whois import WhoisInfo
 
 __all__ = [
@@ -26,10 +26,14 @@ __all__ = [
     "SubdomainInfo",
     "SslInfo",
     "CertificateInfo",
+    "TlsHandshake",
     "PortScanResult",
     "OpenPort",
+    "HostLiveness",
+    "LivenessInfo",
     "Alert",
     "RiskLevel",
+    "TechDetection",
     "TechStack",
     "SecurityHeadersInfo",
     "ScanResult",
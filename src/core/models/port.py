@@ -2,8 +2,10 @@
 Port scan models.
 """
 
+from datetime import datetime
+
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 class OpenPort(BaseModel):
@@ -21,3 +23,32 @@ class PortScanResult(BaseModel):
     ip: str
     open_ports: List[OpenPort] = Field(default_factory=list)
     error: Optional[str] = None
+    # When the IP was actually probed; older than the scan for cached results.
+    observed_at: Optional[datetime] = None
+
+
+class HostLiveness(BaseModel):
+    """Liveness pre-probe outcome for one host: its A records and the probed ports that accepted."""
+
+    host: str
+    addresses: List[str] = Field(default_factory=list)
+    open_ports: List[int] = Field(default_factory=list)
+
+
+class LivenessInfo(BaseModel):
+    """
+    Liveness map of a scan: TCP connects to ``ports`` on every address of the
+    apex and its subdomains.
+    """
+
+    ports: List[int] = Field(default_factory=list)
+    hosts: Dict[str, HostLiveness] = Field(default_factory=dict)
+    # IP -> probed ports that accepted.
+    open_ports: Dict[str, List[int]] = Field(default_factory=dict)
+    # IPs where every probe timed out (not even a refusal came back).
+    unresponsive: List[str] = Field(default_factory=list)
+
+    def host_ports(self, host: str) -> Optional[List[int]]:
+        """Open probed ports of ``host``; None when it was not probed (e.g. no A records)."""
+        entry = self.hosts.get(host)
+        return None if entry is None else entry.open_ports
@@ -9,7 +9,7 @@ from typing import List, Optional, Dict, Any
 from .dns import DNSInfo
 from .whois import WhoisInfo
 from .ssl import SslInfo
-from .port import PortScanResult
+from .port import LivenessInfo, PortScanResult
 from .risk import Alert
 
 
@@ -98,9 +98,16 @@ class ScanResult(BaseModel):
     subdomains: List[str] = Field(default_factory=list)
     ssl_info: Optional[SslInfo] = None
     port_scan: List[PortScanResult] = Field(default_factory=list)
+    liveness: Optional[LivenessInfo] = None
     tech_stack: Optional[Dict[str, Any]] = None
     external_apis: Optional[Dict[str, Any]] = None
     geoip_info: Optional[Dict[str, Any]] = None
     correlation: Optional[Dict[str, Any]] = None
     alerts: List[Alert] = Field(default_factory=list)
     summary: ScanSummary = Field(default_factory=ScanSummary)
+    # Section field -> "complete" | "timeout" | "error" | "skipped". Sections
+    # missing here were not produced by any enricher (e.g. older stored scans).
+    section_status: Dict[str, str] = Field(default_factory=dict)
+    # Delta re-scans only: section -> asset (IP, host, URL) -> when the result
+    # carried forward from an earlier scan was actually probed.
+    carried_forward: Dict[str, Dict[str, datetime]] = Field(default_factory=dict)
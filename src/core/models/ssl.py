@@ -8,9 +8,17 @@ from datetime import datetime
 
 
 class CertificateInfo(BaseModel):
-    """SSL certificate details for a host."""
+    """
+    SSL certificate details. One entry per distinct certificate: ``hosts``
+    lists every host that served it, ``host`` is the first of them.
+    ``inferred_hosts`` are grouped with one of them by shared addresses only
+    and were not handshaken, so they may serve another certificate.
+    """
 
     host: str
+    hosts: List[str] = Field(default_factory=list)
+    inferred_hosts: List[str] = Field(default_factory=list)
+    fingerprint_sha256: Optional[str] = None  # hex SHA-256 of the DER certificate
     subject_cn: Optional[str] = None
     issuer: Optional[str] = None
     san: List[str] = Field(default_factory=list)  # Subject Alternative Names
@@ -19,9 +27,26 @@ class CertificateInfo(BaseModel):
     is_expired: bool = False
     error: Optional[str] = None
 
+    def all_hosts(self) -> List[str]:
+        """Hosts serving this certificate (``[host]`` for results stored before ``hosts``)."""
+        return self.hosts or [self.host]
+
+
+class TlsHandshake(BaseModel):
+    """One TLS connection attempt: timing, negotiated version and outcome."""
+
+    host: str
+    connect_ms: Optional[float] = None
+    handshake_ms: Optional[float] = None
+    tls_version: Optional[str] = None
+    cipher: Optional[str] = None
+    fingerprint_sha256: Optional[str] = None
+    error: Optional[str] = None
+
 
 class SslInfo(BaseModel):
     """Aggregated SSL certificate information."""
 
     certificates: List[CertificateInfo] = Field(default_factory=list)
+    handshakes: List[TlsHandshake] = Field(default_factory=list)
     error: Optional[str] = None
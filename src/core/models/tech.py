@@ -16,11 +16,21 @@ class SecurityHeadersInfo(BaseModel):
     referrer_policy: Optional[str] = None
 
 
+class TechDetection(BaseModel):
+    """One technology matched by the fingerprint rules (``matched_by``: headers, html, implies, ...)."""
+
+    name: str
+    version: Optional[str] = None
+    categories: List[str] = Field(default_factory=list)
+    matched_by: List[str] = Field(default_factory=list)
+
+
 class TechStack(BaseModel):
     """Detected technologies for a URL."""
 
     url: str
     technologies: List[str] = Field(default_factory=list)
+    detections: List[TechDetection] = Field(default_factory=list)
     headers: Dict[str, str] = Field(default_factory=dict)
     security_headers: Optional[SecurityHeadersInfo] = None
     server: Optional[str] = None
@@ -30,4 +40,9 @@ class TechStack(BaseModel):
     security_txt: Optional[str] = None
     meta_generator: Optional[str] = None
     meta_cms: Optional[str] = None
+    # Final (post-redirect) origin; favicon, robots.txt and security.txt are its, shared by every URL ending there.
+    origin: Optional[str] = None
+    # Set on entries copied from another host of the same host group without
+    # proof they serve the same site: the URL actually fetched.
+    inferred_from: Optional[str] = None
     error: Optional[str] = None
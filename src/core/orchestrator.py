@@ -1,26 +1,85 @@
 """
 Scan Orchestrator - coordinates the enricher pipeline and produces a ScanResult.
+
+``scan_domain`` is the blocking entry point. ``stream_scan_domain`` is its
+async counterpart for live UIs: it yields every enricher section of the result
+as soon as it is merged, then the final ``ScanResult``. ``scan_domains`` scans a batch of
+domains concurrently on one event loop and HTTP session, sharing work keyed by
+IP / nameserver / host across the batch (see ``src.core.shared``).
+``rescan_domain`` repeats a scan but only deep-probes assets that changed
+since the previous result (see ``src.core.delta``).
 """
 
+import asyncio
+import logging
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import aiohttp
 
-from src.analysis.correlation import build_correlation_summary
+from src.analysis.correlation import build_correlation_summary, shared_certificate_hosts
 from src.analysis.normalizer import normalize_dns_info, normalize_domains
 from src.analysis.risk import run_risk_analysis
 from src.analysis.risk_scoring_v3 import compute_risk_v3
+from src.core.context import ScanContextData
+from src.core.delta import ScanBaseline
+from src.core.executor import POOL_ENRICHER, get_executor
 from src.core.models import ScanResult, ScanSummary
+from src.config.settings import SCAN_DEADLINE_SECONDS, USER_AGENT
 from src.core.pipeline import EnricherPipeline, ProgressCallback
+from src.core.port_cache import get_port_cache
+from src.core.shared import ResourceLimits, SharedWork
+from src.core.tracing import CATEGORY_ANALYSIS, Tracer, context_with_tracer, trace_span, use_tracer
+from src.enrichers._http import make_aiohttp_session
+from src.enrichers.correlation import CorrelationEnricher
 from src.enrichers.dns import DnsEnricher
-from src.enrichers.external_apis import ExternalApiEnricher
+from src.enrichers.host_groups import HostGroupingEnricher
+from src.enrichers.external_apis import ExternalApiEnricher, ExternalIpApiEnricher, merge_external_apis
 from src.enrichers.geoip import GeoipEnricher
-from src.enrichers.port import PortEnricher
-from src.enrichers.ssl import SslEnricher
+from src.enrichers.liveness import LivenessEnricher
+from src.enrichers.port import PortEnricher, SubdomainPortEnricher
+from src.enrichers.ssl import SslEnricher, TlsCapture
 from src.enrichers.subdomain import SubdomainEnricher
 from src.enrichers.tech import TechEnricher
 from src.enrichers.whois import WhoisEnricher
 from src.utils.validators import is_valid_domain, normalize_domain
 
+logger = logging.getLogger(__name__)
+
+# Domains scanned at the same time by ``scan_domains`` unless overridden.
+DEFAULT_BATCH_CONCURRENCY = 8
+
+# Event name yielded by ``stream_scan_domain`` once analysis is done.
+SCAN_RESULT_EVENT = "result"
+
+# ScanResult fields produced by analysis rather than by an enricher; a client
+# that already received every streamed section only needs these at the end.
+# external_apis is completed at the end with the external_ip_apis section.
+ANALYSIS_FIELDS = (
+    "target_domain",
+    "scan_date",
+    "correlation",
+    "external_apis",
+    "alerts",
+    "summary",
+    "section_status",
+)
+
+# ScanResult fields filled by enrichers, streamed as soon as they are merged.
+# Context-only fields (ip_addresses, host_groups, tls_peers, ...) and partial
+# analysis inputs stay server-side; together with ANALYSIS_FIELDS these are
+# everything a live client renders.
+STREAMED_FIELDS = (
+    "dns_info",
+    "whois_info",
+    "subdomains",
+    "ssl_info",
+    "port_scan",
+    "liveness",
+    "tech_stack",
+    "geoip_info",
+)
+
 # DNS record-list attributes summed into total_dns_records.
 _DNS_RECORD_FIELDS = (
     "a_records",
@@ -32,18 +91,38 @@ _DNS_RECORD_FIELDS = (
 )
 
 
-def _build_pipeline(on_progress: Optional[ProgressCallback] = None) -> EnricherPipeline:
-    """Build the default enrichment pipeline with all stock enrichers."""
+def _build_pipeline(
+    on_progress: Optional[ProgressCallback] = None,
+    shared: Optional[SharedWork] = None,
+    limits: Optional[ResourceLimits] = None,
+    baseline: Optional[ScanBaseline] = None,
+) -> EnricherPipeline:
+    """
+    Build the default enrichment pipeline with all stock enrichers.
+
+    ``shared`` and ``limits`` are passed by batch scans so every domain's
+    pipeline draws on the same memo and concurrency caps; ``baseline`` by
+    delta re-scans so port/SSL/tech probes skip unchanged assets. Port scans
+    go through the process-wide ``PortScanCache``. SSL reads the TLS sessions
+    of tech's page fetches while both run.
+    """
+    port_cache = get_port_cache()
+    tls_capture = TlsCapture()
     return (
         EnricherPipeline(on_progress=on_progress)
-        .add_enricher(DnsEnricher())
+        .add_enricher(DnsEnricher(shared=shared, limits=limits))
         .add_enricher(WhoisEnricher())
         .add_enricher(SubdomainEnricher(enable_bruteforce=False))
-        .add_enricher(SslEnricher())
-        .add_enricher(PortEnricher())
-        .add_enricher(TechEnricher())
-        .add_enricher(ExternalApiEnricher())
-        .add_enricher(GeoipEnricher())
+        .add_enricher(HostGroupingEnricher(shared=shared, limits=limits))
+        .add_enricher(LivenessEnricher(shared=shared, limits=limits))
+        .add_enricher(CorrelationEnricher(shared=shared, limits=limits))
+        .add_enricher(SslEnricher(shared=shared, limits=limits, baseline=baseline, tls_peers=tls_capture))
+        .add_enricher(PortEnricher(shared=shared, limits=limits, baseline=baseline, cache=port_cache))
+        .add_enricher(SubdomainPortEnricher(shared=shared, limits=limits, baseline=baseline, cache=port_cache))
+        .add_enricher(TechEnricher(baseline=baseline, tls_capture=tls_capture))
+        .add_enricher(ExternalApiEnricher(shared=shared, limits=limits))
+        .add_enricher(ExternalIpApiEnricher(shared=shared))
+        .add_enricher(GeoipEnricher(shared=shared))
     )
 
 
@@ -92,29 +171,68 @@ def _build_summary(
     )
 
 
-def scan_domain(
+def _effective_deadline(deadline: Optional[float]) -> Optional[float]:
+    """Explicit deadline, else SCAN_DEADLINE_SECONDS (0 = unlimited)."""
+    if deadline is not None:
+        return deadline
+    return SCAN_DEADLINE_SECONDS or None
+
+
+def _validated_domain(domain: str) -> str:
+    domain = normalize_domain(domain)
+    if not is_valid_domain(domain):
+        raise ValueError(f"Invalid domain: {domain}")
+    return domain
+
+
+def _normalize_section(partial: Dict[str, Any]) -> Dict[str, Any]:
+    """The ``STREAMED_FIELDS`` of a section, normalized like the final result."""
+    normalized = {key: value for key, value in partial.items() if key in STREAMED_FIELDS}
+    if normalized.get("dns_info"):
+        normalized["dns_info"] = normalize_dns_info(normalized["dns_info"])
+    if "subdomains" in normalized:
+        normalized["subdomains"] = normalize_domains(normalized["subdomains"] or [])
+    return normalized
+
+
+def _finish_correlation(
+    domain: str,
+    data: Dict[str, Any],
+    subdomains: List[str],
+    dns_info: Any,
+) -> Dict[str, Any]:
+    """
+    Complete the pipeline's correlation section with certificate sharing.
+
+    Pipelines without ``CorrelationEnricher`` get the full (blocking)
+    correlation here; if the enricher ran but failed, the section stays empty.
+    """
+    ssl_info = data.get("ssl_info")
+    correlation = data.get("correlation")
+    if correlation is None and "correlation" not in (data.get("section_status") or {}):
+        with trace_span("correlation", CATEGORY_ANALYSIS, domain=domain):
+            return build_correlation_summary(subdomains, dns_info, ssl_info, domain)
+    correlation = dict(correlation or {})
+    correlation["shared_certificate_hosts"] = shared_certificate_hosts(ssl_info)
+    return correlation
+
+
+def build_scan_result(
     domain: str,
+    data: Dict[str, Any],
     on_progress: Optional[ProgressCallback] = None,
-    pipeline: Optional[EnricherPipeline] = None,
 ) -> ScanResult:
     """
-    Perform a full domain scan via the enricher pipeline and risk analysis.
+    Run risk analysis and correlation over merged pipeline data.
 
     Args:
-        domain: Domain to scan (will be normalized and validated).
+        domain: Normalized target domain.
+        data: Final pipeline context (``EnricherPipeline.run`` output).
         on_progress: Optional callback `(stage, percent, message)`.
-        pipeline: Custom pipeline; if None, the default is used.
 
     Returns:
         Fully populated ScanResult.
     """
-    domain = normalize_domain(domain)
-    if not is_valid_domain(domain):
-        raise ValueError(f"Invalid domain: {domain}")
-
-    pipe = pipeline or _build_pipeline(on_progress)
-    data = pipe.run(domain)
-
     if on_progress:
         on_progress("analysis", 92, "Analyzing risks and correlations...")
 
@@ -124,6 +242,7 @@ def scan_domain(
 
     if dns_info:
         dns_info = normalize_dns_info(dns_info)
+    external_apis = merge_external_apis(data.get("external_apis"), data.get("external_ip_apis"))
 
     alerts, risk_score, risk_composite, risk_breakdown = run_risk_analysis(
         dns_info=dns_info,
@@ -131,11 +250,11 @@ def scan_domain(
         port_scan=data.get("port_scan") or [],
         subdomains=subdomains,
         tech_stack=data.get("tech_stack"),
-        external_apis=data.get("external_apis"),
+        external_apis=external_apis,
         apex_domain=domain,
     )
     risk_v3 = compute_risk_v3(alerts, domain)
-    correlation = build_correlation_summary(subdomains, dns_info, data.get("ssl_info"), domain)
+    correlation = _finish_correlation(domain, data, subdomains, dns_info)
 
     if on_progress:
         on_progress("analysis", 97, "Building scan summary...")
@@ -159,10 +278,246 @@ def scan_domain(
         subdomains=subdomains,
         ssl_info=data.get("ssl_info"),
         port_scan=data.get("port_scan") or [],
+        liveness=data.get("liveness"),
         tech_stack=data.get("tech_stack"),
-        external_apis=data.get("external_apis"),
+        external_apis=external_apis,
         geoip_info=data.get("geoip_info"),
         correlation=correlation,
         alerts=alerts,
         summary=summary,
+        section_status=dict(data.get("section_status") or {}),
+    )
+
+
+def scan_domain(
+    domain: str,
+    on_progress: Optional[ProgressCallback] = None,
+    pipeline: Optional[EnricherPipeline] = None,
+    deadline: Optional[float] = None,
+    tracer: Optional[Tracer] = None,
+) -> ScanResult:
+    """
+    Perform a full domain scan via the enricher pipeline and risk analysis.
+
+    Args:
+        domain: Domain to scan (will be normalized and validated).
+        on_progress: Optional callback `(stage, percent, message)`.
+        pipeline: Custom pipeline; if None, the default is used. Per-enricher
+            budgets are set on the pipeline (``EnricherPipeline(budgets=...)``).
+        deadline: Seconds the enrichment phase may take; defaults to
+            SCAN_DEADLINE_SECONDS. Sections cut off by it are marked in
+            ``ScanResult.section_status``.
+        tracer: Optional span recorder covering enrichers, HTTP requests,
+            DNS queries, connects and analysis (see ``src.core.tracing``).
+
+    Returns:
+        Fully populated ScanResult.
+    """
+    domain = _validated_domain(domain)
+    pipe = pipeline or _build_pipeline(on_progress)
+    with use_tracer(tracer):
+        data = pipe.run(domain, deadline=_effective_deadline(deadline), tracer=tracer)
+        return build_scan_result(domain, data, on_progress)
+
+
+def rescan_domain(
+    domain: str,
+    previous: ScanResult,
+    on_progress: Optional[ProgressCallback] = None,
+    deadline: Optional[float] = None,
+    tracer: Optional[Tracer] = None,
+) -> ScanResult:
+    """
+    Delta re-scan of ``domain`` against its ``previous`` result.
+
+    DNS, WHOIS, subdomains and external APIs run in full; port, SSL and tech
+    probes only cover IPs and hosts that are new or changed (see
+    ``src.core.delta``). Reused results are listed in
+    ``ScanResult.carried_forward`` with their original probe times.
+
+    Raises:
+        ValueError: if the domain is invalid or ``previous`` is for another domain.
+    """
+    domain = _validated_domain(domain)
+    if previous.target_domain.lower() != domain:
+        raise ValueError(f"Previous scan is for {previous.target_domain}, not {domain}")
+    baseline = ScanBaseline(previous)
+    pipe = _build_pipeline(on_progress, baseline=baseline)
+    result = scan_domain(domain, on_progress, pipeline=pipe, deadline=deadline, tracer=tracer)
+    result.carried_forward = baseline.carried_forward()
+    return result
+
+
+async def stream_scan_domain(
+    domain: str,
+    on_progress: Optional[ProgressCallback] = None,
+    pipeline: Optional[EnricherPipeline] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    deadline: Optional[float] = None,
+    tracer: Optional[Tracer] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Scan ``domain`` and yield results incrementally.
+
+    Yields ``(enricher_name, partial)`` for every section as soon as it is
+    merged (its ``STREAMED_FIELDS`` only, normalized like the final result;
+    sections without any are not yielded), then
+    ``(SCAN_RESULT_EVENT, ScanResult)`` once analysis has finished.
+
+    Args:
+        session: HTTP session to share with other scans; when None the
+            pipeline opens one for this scan.
+        deadline: Enrichment budget in seconds (see ``scan_domain``).
+        tracer: Optional span recorder (see ``scan_domain``).
+
+    Raises:
+        ValueError: if the domain is invalid.
+    """
+    domain = _validated_domain(domain)
+    pipe = pipeline or _build_pipeline(on_progress)
+    context = ScanContextData(domain=domain)
+    stream = pipe.stream(
+        domain,
+        session=session,
+        context=context,
+        deadline=_effective_deadline(deadline),
+        tracer=tracer,
+    )
+    async for name, partial in stream:
+        section = _normalize_section(partial)
+        if section:
+            yield name, section
+    # Analysis can block (full correlation when the pipeline has no
+    # CorrelationEnricher); keep it off the event loop.
+    result = await get_executor().run(
+        POOL_ENRICHER,
+        context_with_tracer(tracer).run, build_scan_result, domain, context.to_dict(), on_progress
+    )
+    yield SCAN_RESULT_EVENT, result
+
+
+def _batch_targets(domains: Iterable[str]) -> List[str]:
+    """Normalize and dedupe batch input; invalid domains are logged and skipped."""
+    targets: List[str] = []
+    for raw in domains:
+        try:
+            domain = _validated_domain(raw)
+        except ValueError as exc:
+            logger.warning("Skipping batch target: %s", exc)
+            continue
+        if domain not in targets:
+            targets.append(domain)
+    return targets
+
+
+async def scan_domains_async(
+    domains: Iterable[str],
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    limits: Optional[ResourceLimits] = None,
+    shared: Optional[SharedWork] = None,
+    deadline: Optional[float] = None,
+    tracer: Optional[Tracer] = None,
+) -> AsyncIterator[ScanResult]:
+    """
+    Scan many domains concurrently, yielding each ScanResult as it completes.
+
+    All scans run on the current event loop and one pooled aiohttp session.
+    Port scans, GeoIP, ASN/abuse lookups, PTR and nameserver lookups are
+    computed once per IP / NS across the batch, and ``limits`` caps DNS
+    queries, TCP connects and per-provider HTTP connections globally.
+
+    Args:
+        domains: Domains to scan; invalid entries and duplicates are skipped.
+        concurrency: Maximum number of domains scanned at the same time.
+        limits: Global resource caps; defaults to ``ResourceLimits()``.
+        shared: Work memo; pass one to share work across several batches.
+        deadline: Per-domain enrichment budget in seconds (see ``scan_domain``).
+        tracer: Optional span recorder for the whole batch (spans carry the domain).
+
+    A domain whose scan fails is logged and produces no result.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+    limits = limits or ResourceLimits()
+    shared = shared or SharedWork()
+    targets = iter(_batch_targets(domains))
+    deadline = _effective_deadline(deadline)
+    headers = {"User-Agent": USER_AGENT}
+
+    async with make_aiohttp_session(headers, limit_per_host=limits.http_per_host) as session:
+
+        async def scan_one(domain: str) -> ScanResult:
+            pipe = _build_pipeline(shared=shared, limits=limits)
+            context = ScanContextData(domain=domain)
+            stream = pipe.stream(
+                domain, session=session, context=context, deadline=deadline, tracer=tracer
+            )
+            async for _ in stream:
+                pass
+            return await get_executor().run(
+                POOL_ENRICHER,
+                context_with_tracer(tracer).run, build_scan_result, domain, context.to_dict()
+            )
+
+        running: Dict["asyncio.Future[ScanResult]", str] = {}
+
+        def fill() -> None:
+            while len(running) < concurrency:
+                domain = next(targets, None)
+                if domain is None:
+                    return
+                running[asyncio.ensure_future(scan_one(domain))] = domain
+
+        try:
+            fill()
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                results: List[ScanResult] = []
+                for task in done:
+                    domain = running.pop(task)
+                    try:
+                        results.append(task.result())
+                    except Exception as exc:
+                        logger.warning("Batch scan failed for %s: %s", domain, exc)
+                # Keep the batch saturated while the consumer handles results.
+                fill()
+                for result in results:
+                    yield result
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+
+def scan_domains(
+    domains: Iterable[str],
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    limits: Optional[ResourceLimits] = None,
+    shared: Optional[SharedWork] = None,
+    deadline: Optional[float] = None,
+    tracer: Optional[Tracer] = None,
+) -> Iterator[ScanResult]:
+    """
+    Blocking wrapper around ``scan_domains_async`` (must not be called from a
+    running loop). Results are yielded in completion order.
+    """
+    loop = asyncio.new_event_loop()
+    batch = scan_domains_async(
+        domains,
+        concurrency=concurrency,
+        limits=limits,
+        shared=shared,
+        deadline=deadline,
+        tracer=tracer,
     )
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(batch.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(batch.aclose())
+        loop.run_until_complete(loop.shutdown_default_executor())
+        loop.close()
@@ -1,101 +1,253 @@
 """
-Enricher Pipeline - executes enrichers in parallel phases for speed.
+Enricher Pipeline - executes enrichers as a dependency graph for speed.
 
-Phase 1 and Phase 2 overlap: Port starts as soon as DNS completes,
-SSL/Tech start as soon as subdomain discovery completes.
+Each enricher declares the context fields it ``requires`` and ``produces``.
+An enricher is started as soon as every producer of its required fields has
+finished (successfully or not), so e.g. correlation starts right after DNS
+and subdomains instead of waiting for SSL/tech to drain. Fields listed in a
+producer's ``publishes`` count as soon as it publishes them: the port scan
+starts on the DNS enricher's early ``ip_addresses`` while MX/TXT, PTR and
+AXFR are still running.
+
+The scheduler is async-native: a scan runs on one event loop with one pooled
+aiohttp session. ``AsyncEnricher``s are awaited directly on that loop; sync
+enrichers run on the process-wide executor (``src.core.executor``). ``stream`` yields each
+enricher's partial result as soon as it is merged into the context.
+
+Time budgets: each enricher may have its own budget (``budgets`` by name) and
+the scan may have an overall ``deadline``. An enricher that overruns is
+cancelled (coroutines are cancelled; executor threads cannot be interrupted,
+so they are abandoned and their late results discarded), enrichers that could
+not start before the deadline are skipped, and every section's outcome is
+recorded in ``context.section_status``.
+
+Tracing: when a ``Tracer`` is passed (or already active), every enricher gets
+a span and enricher tasks/threads run with that tracer active, so HTTP, DNS
+and connect spans recorded inside them land in the same trace.
 """
 
-from concurrent.futures import Future, ThreadPoolExecutor, as_completed
-from typing import Any, Callable, Dict, List, Optional, Set
+import asyncio
+import contextvars
+from concurrent.futures import Executor
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import aiohttp
 
-from src.core.context import ScanContextData
-from src.enrichers.base import AbstractEnricher
+from src.config.settings import USER_AGENT
+from src.core.context import (
+    SECTION_COMPLETE,
+    SECTION_ERROR,
+    SECTION_SKIPPED,
+    SECTION_TIMEOUT,
+    ScanContextData,
+    context_with_publisher,
+)
+from src.core.executor import POOL_ENRICHER, get_executor
+from src.core.tracing import CATEGORY_ENRICHER, Tracer, context_with_tracer, current_tracer
+from src.enrichers._http import make_aiohttp_session
+from src.enrichers.base import AbstractEnricher, AsyncEnricher
 
 ProgressCallback = Callable[[str, int, str], None]
 ReportFn = Callable[[str, str, int], None]
-
-# Phase 1: independent (run in parallel)
-PHASE1_ENRICHERS = ["dns", "whois", "subdomain"]
-# Phase 2: depend on Phase 1 - port needs dns_info, ssl/tech need subdomains
-PHASE2_ENRICHERS = ["ssl", "port", "tech"]
-# Phase 3: depend on Phase 2 (external APIs, geoip)
-PHASE3_ENRICHERS = ["external_apis", "geoip"]
+# (enricher name, context fields that enricher just merged)
+PartialResult = Tuple[str, Dict[str, Any]]
 
 # Monotonic WebSocket/UI progress (0-90 in pipeline; orchestrator uses 92-97;
-# API sends 100 on done).
-ENRICH_COMPLETE_PROGRESS = {
-    "dns": 14,
-    "whois": 22,
-    "subdomain": 32,
-    "port": 48,
-    "ssl": 58,
-    "tech": 68,
-    "external_apis": 84,
-    "geoip": 88,
-}
+# API sends 100 on done). Enricher completions are spread evenly in between.
+_START_PROGRESS = 5
+_END_PROGRESS = 90
+
+
+def _producers(enrichers: List[AbstractEnricher]) -> Dict[str, Set[int]]:
+    """Map each context field to the indices of the enrichers producing it."""
+    producers: Dict[str, Set[int]] = {}
+    for idx, enricher in enumerate(enrichers):
+        for field_name in enricher.produces:
+            producers.setdefault(field_name, set()).add(idx)
+    return producers
 
-_FALLBACK_PROGRESS = 88
+
+def _dependency_graph(enrichers: List[AbstractEnricher]) -> Dict[int, Set[int]]:
+    """
+    Map each enricher (by index) to the indices of the enrichers it waits on.
+
+    A required field with no producer in the pipeline is treated as satisfied.
+
+    Raises:
+        ValueError: if the declared dependencies form a cycle.
+    """
+    producers = _producers(enrichers)
+
+    graph: Dict[int, Set[int]] = {}
+    for idx, enricher in enumerate(enrichers):
+        deps: Set[int] = set()
+        for field_name in enricher.requires:
+            deps |= producers.get(field_name, set())
+        deps.discard(idx)
+        graph[idx] = deps
+
+    # Kahn's algorithm: every node must be reachable from the dependency-free roots.
+    remaining = {idx: set(deps) for idx, deps in graph.items()}
+    ready = [idx for idx, deps in remaining.items() if not deps]
+    visited = 0
+    while ready:
+        done = ready.pop()
+        visited += 1
+        for idx, deps in remaining.items():
+            if done in deps:
+                deps.discard(done)
+                if not deps:
+                    ready.append(idx)
+    if visited != len(graph):
+        cyclic = sorted(enrichers[idx].name for idx, deps in remaining.items() if deps)
+        raise ValueError(f"Enricher dependency cycle between: {', '.join(cyclic)}")
+    return graph
 
 
 class EnricherPipeline:
-    """Executes enrichers in parallel phases. Phase 2 starts as soon as its deps are ready."""
+    """Executes enrichers as a DAG: each one starts as soon as its inputs are merged."""
 
     def __init__(
         self,
         enrichers: Optional[List[AbstractEnricher]] = None,
         on_progress: Optional[ProgressCallback] = None,
+        budgets: Optional[Dict[str, float]] = None,
     ):
         self.enrichers = enrichers or []
         self.on_progress = on_progress
+        # Enricher name -> max seconds it may run.
+        self.budgets = budgets or {}
 
     def add_enricher(self, enricher: AbstractEnricher) -> "EnricherPipeline":
         self.enrichers.append(enricher)
         return self
 
-    def _collect_future(
+    @staticmethod
+    def _sections(enricher: AbstractEnricher) -> Tuple[str, ...]:
+        """Section keys an enricher's status is recorded under."""
+        return enricher.produces or (enricher.name,)
+
+    def _mark(
         self,
-        future: Future,
-        enricher: AbstractEnricher,
         context: ScanContextData,
-        report: Optional[ReportFn],
+        enricher: AbstractEnricher,
+        status: str,
+        published: Iterable[str] = (),
     ) -> None:
-        """Drain one future into the context, reporting progress or error."""
-        target = ENRICH_COMPLETE_PROGRESS.get(enricher.name, _FALLBACK_PROGRESS)
+        """Record ``status`` for every section the enricher produces (except ``published`` ones)."""
+        for field_name in self._sections(enricher):
+            if field_name not in published:
+                context.section_status[field_name] = status
+
+    @staticmethod
+    def _apply_publication(
+        context: ScanContextData,
+        enricher: AbstractEnricher,
+        data: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Merge the fields an enricher published early; return the ones applied."""
+        applied = context.merge({k: v for k, v in data.items() if k in enricher.publishes})
+        for field_name in applied:
+            context.section_status[field_name] = SECTION_COMPLETE
+        return applied
+
+    @staticmethod
+    def _schedule(
+        work: Awaitable[Dict[str, Any]],
+        task_context: contextvars.Context,
+    ) -> "asyncio.Future[Dict[str, Any]]":
+        """Wrap ``work`` in a task that runs in ``task_context``."""
+        if asyncio.iscoroutine(work):
+            return asyncio.get_running_loop().create_task(work, context=task_context)
+        return asyncio.ensure_future(work)
+
+    def _collect_task(
+        self,
+        task: "asyncio.Future[Dict[str, Any]]",
+        enricher: AbstractEnricher,
+        context: ScanContextData,
+        report: ReportFn,
+        target: int,
+        published: Iterable[str] = (),
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Drain one finished task into the context; return the merged fields (None on error).
+
+        Fields the enricher already ``published`` keep their status if it fails.
+        """
         try:
-            context.merge(future.result())
-            if report:
-                report(enricher.name, f"{enricher.name} complete", target)
+            applied = context.merge(task.result())
+        except asyncio.TimeoutError:
+            self._mark(context, enricher, SECTION_TIMEOUT, published)
+            report(enricher.name, f"{enricher.name} timed out", target)
+            return None
         except Exception as exc:
-            if report:
-                report(enricher.name, f"Error: {exc}", target)
+            self._mark(context, enricher, SECTION_ERROR, published)
+            report(enricher.name, f"Error: {exc}", target)
+            return None
+        self._mark(context, enricher, SECTION_COMPLETE)
+        report(enricher.name, f"{enricher.name} complete", target)
+        return applied
 
-    def _run_phase(
+    def _time_limit(self, enricher: AbstractEnricher, remaining: Optional[float]) -> Optional[float]:
+        """Seconds the enricher may run: its own budget capped by the scan deadline."""
+        limits = [t for t in (self.budgets.get(enricher.name), remaining) if t is not None]
+        return min(limits) if limits else None
+
+    def _start(
         self,
+        enricher: AbstractEnricher,
         domain: str,
-        context: ScanContextData,
-        enricher_names: List[str],
-        report: Optional[ReportFn],
-    ) -> None:
-        """Run a phase of enrichers in parallel."""
-        phase_enrichers = [e for e in self.enrichers if e.name in enricher_names]
-        if not phase_enrichers:
-            return
-
-        with ThreadPoolExecutor(max_workers=len(phase_enrichers)) as executor:
-            futures = {
-                executor.submit(enr.enrich, domain, context.to_dict()): enr
-                for enr in phase_enrichers
-            }
-            for future in as_completed(futures):
-                self._collect_future(future, futures[future], context, report)
-
-    def run(self, domain: str) -> Dict[str, Any]:
-        """Run enrichers with overlapping phases for faster scanning."""
-        context = ScanContextData(domain=domain)
-        phase1_enrichers = [e for e in self.enrichers if e.name in PHASE1_ENRICHERS]
-        phase2_enrichers = {e.name: e for e in self.enrichers if e.name in PHASE2_ENRICHERS}
-        phase2_started: Set[str] = set()
-        phase2_futures: Dict[Future, AbstractEnricher] = {}
+        snapshot: Dict[str, Any],
+        session: aiohttp.ClientSession,
+        executor: Executor,
+        task_context: contextvars.Context,
+    ) -> Awaitable[Dict[str, Any]]:
+        """Await async enrichers on the loop; bridge sync ones through the executor."""
+        if isinstance(enricher, AsyncEnricher):
+            return enricher.enrich_async(domain, snapshot, session)
+        loop = asyncio.get_running_loop()
+        # A context can only be entered by one thread at a time: copy per call.
+        return loop.run_in_executor(
+            executor, task_context.copy().run, enricher.enrich, domain, snapshot
+        )
+
+    async def stream(
+        self,
+        domain: str,
+        session: Optional[aiohttp.ClientSession] = None,
+        context: Optional[ScanContextData] = None,
+        deadline: Optional[float] = None,
+        tracer: Optional[Tracer] = None,
+    ) -> AsyncIterator[PartialResult]:
+        """
+        Run enrichers in dependency order, yielding ``(enricher_name, partial_result)``
+        as each one is merged into the context.
+
+        Args:
+            domain: Target domain.
+            session: HTTP session shared by async enrichers; when None one is
+                opened for this scan and closed afterwards.
+            context: Context to merge into (read it after iteration for the
+                final state); a fresh one is used when None.
+            deadline: Seconds the whole run may take; None means unlimited.
+            tracer: Records enricher spans (and everything traced inside
+                them); defaults to the tracer active in the caller's context.
+
+        Failed and timed-out enrichers are reported via ``on_progress`` and
+        yield nothing. Closing the iterator early cancels enrichers that are
+        still running.
+        """
+        context = context or ScanContextData(domain=domain)
+        graph = _dependency_graph(self.enrichers)
+        producers = _producers(self.enrichers)
+        pending: Set[int] = set(graph)
+        finished: Set[int] = set()
+        running: Dict["asyncio.Future[Dict[str, Any]]", int] = {}
+        # Enricher index -> fields it has published early.
+        published: Dict[int, Set[str]] = {}
+        publications: "asyncio.Queue[Tuple[int, Dict[str, Any]]]" = asyncio.Queue()
 
         progress_floor = 0
 
@@ -107,62 +259,160 @@ class EnricherPipeline:
             if self.on_progress:
                 self.on_progress(stage, clamped, message)
 
-        max_workers = len(phase1_enrichers) + len(PHASE2_ENRICHERS)
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-
-            def maybe_start_phase2(completed_name: str) -> None:
-                """Schedule Phase 2 enrichers as soon as their dependencies arrive."""
-                if completed_name == "dns" and context.dns_info and "port" not in phase2_started:
-                    port_enr = phase2_enrichers.get("port")
-                    if port_enr:
-                        phase2_started.add("port")
-                        fut = executor.submit(port_enr.enrich, domain, context.to_dict())
-                        phase2_futures[fut] = port_enr
-                if completed_name == "subdomain":
-                    for name in ("ssl", "tech"):
-                        if name in phase2_started:
-                            continue
-                        enr = phase2_enrichers.get(name)
-                        if enr:
-                            phase2_started.add(name)
-                            fut = executor.submit(enr.enrich, domain, context.to_dict())
-                            phase2_futures[fut] = enr
-
-            report("phase1", "Running DNS, WHOIS, Subdomains...", 5)
-            p1_futures = {
-                executor.submit(enr.enrich, domain, context.to_dict()): enr
-                for enr in phase1_enrichers
-            }
-            for future in as_completed(p1_futures):
-                enricher = p1_futures[future]
-                target = ENRICH_COMPLETE_PROGRESS.get(enricher.name, progress_floor + 1)
-                try:
-                    context.merge(future.result())
-                    maybe_start_phase2(enricher.name)
-                    report(enricher.name, f"{enricher.name} complete", target)
-                except Exception as exc:
-                    report(enricher.name, f"Error: {exc}", target)
-
-            if phase2_futures:
-                report("phase2", "Running SSL, Port, Tech...", 36)
-                for future in as_completed(phase2_futures):
-                    self._collect_future(future, phase2_futures[future], context, report)
-
-            for name in PHASE2_ENRICHERS:
-                if name in phase2_started:
-                    continue
-                enricher = phase2_enrichers.get(name)
-                if not enricher:
-                    continue
-                target = ENRICH_COMPLETE_PROGRESS.get(name, progress_floor + 1)
+        def completion_target() -> int:
+            span = _END_PROGRESS - _START_PROGRESS
+            return _START_PROGRESS + span * len(finished) // max(1, len(graph))
+
+        headers = {"User-Agent": USER_AGENT}
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + deadline if deadline is not None else None
+        tracer = tracer or current_tracer()
+        task_context = context_with_tracer(tracer)
+        started_at: Dict[int, float] = {}
+
+        def trace_enricher(idx: int, outcome: str) -> None:
+            if tracer is not None:
+                start = started_at.get(idx, tracer.now())
+                tracer.record(
+                    self.enrichers[idx].name, CATEGORY_ENRICHER, start, outcome=outcome, domain=domain
+                )
+
+        def inputs_ready(idx: int) -> bool:
+            """Every producer of every required field has finished or published it."""
+            for field_name in self.enrichers[idx].requires:
+                for producer in producers.get(field_name, ()):
+                    if producer == idx or producer in finished:
+                        continue
+                    if field_name not in published.get(producer, ()):
+                        return False
+            return True
+
+        def publisher_for(idx: int) -> Callable[[Dict[str, Any]], None]:
+            def publish_fields(data: Dict[str, Any]) -> None:
                 try:
-                    context.merge(enricher.enrich(domain, context.to_dict()))
-                    report(name, f"{name} complete", target)
-                except Exception as exc:
-                    report(name, f"Error: {exc}", target)
+                    loop.call_soon_threadsafe(publications.put_nowait, (idx, dict(data)))
+                except RuntimeError:
+                    pass  # loop closed: the enricher was abandoned at the deadline
+            return publish_fields
 
-        report("phase3", "Running GeoIP, External APIs...", 72)
-        self._run_phase(domain, context, PHASE3_ENRICHERS, report)
+        report("pipeline", "Running enrichers...", _START_PROGRESS)
+        async with (nullcontext(session) if session else make_aiohttp_session(headers)) as http:
+            executor = get_executor().pool(POOL_ENRICHER)
 
-        report("pipeline", "Enrichment complete", 90)
+            def start_ready() -> None:
+                """Start every pending enricher whose inputs are available."""
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for idx in sorted(pending):
+                        if not inputs_ready(idx):
+                            continue
+                        pending.discard(idx)
+                        enricher = self.enrichers[idx]
+                        remaining = None if deadline_at is None else deadline_at - loop.time()
+                        if remaining is not None and remaining <= 0:
+                            # Out of time: skip it and let its dependents be skipped too.
+                            finished.add(idx)
+                            self._mark(context, enricher, SECTION_SKIPPED)
+                            trace_enricher(idx, SECTION_SKIPPED)
+                            report(enricher.name, f"{enricher.name} skipped", completion_target())
+                            progressed = True
+                            continue
+                        enricher_context = context_with_publisher(task_context, publisher_for(idx))
+                        work = self._start(
+                            enricher, domain, context.to_dict(), http, executor, enricher_context
+                        )
+                        limit = self._time_limit(enricher, remaining)
+                        if limit is not None:
+                            work = asyncio.wait_for(work, timeout=limit)
+                        if tracer is not None:
+                            started_at[idx] = tracer.now()
+                        running[self._schedule(work, enricher_context)] = idx
+
+            next_publication = asyncio.ensure_future(publications.get())
+            try:
+                start_ready()
+                while running:
+                    done, _ = await asyncio.wait(
+                        [*running, next_publication], return_when=asyncio.FIRST_COMPLETED
+                    )
+                    merged: List[PartialResult] = []
+                    for task in done:
+                        if task is next_publication:
+                            continue
+                        idx = running.pop(task)
+                        finished.add(idx)
+                        enricher = self.enrichers[idx]
+                        applied = self._collect_task(
+                            task, enricher, context, report, completion_target(), published.get(idx, ())
+                        )
+                        trace_enricher(idx, context.section_status[self._sections(enricher)[0]])
+                        if applied is not None:
+                            merged.append((enricher.name, applied))
+                    if next_publication.done():
+                        items = [next_publication.result()]
+                        while not publications.empty():
+                            items.append(publications.get_nowait())
+                        for idx, data in items:
+                            if idx in finished:
+                                continue  # its final result is already merged
+                            enricher = self.enrichers[idx]
+                            applied = self._apply_publication(context, enricher, data)
+                            if applied:
+                                published.setdefault(idx, set()).update(applied)
+                                merged.append((enricher.name, applied))
+                        next_publication = asyncio.ensure_future(publications.get())
+                    # Start dependents before handing control to the consumer.
+                    start_ready()
+                    for item in merged:
+                        yield item
+            finally:
+                next_publication.cancel()
+                for task in running:
+                    task.cancel()
+                if running:
+                    await asyncio.gather(*running, return_exceptions=True)
+
+        report("pipeline", "Enrichment complete", _END_PROGRESS)
+
+    async def run_async(
+        self,
+        domain: str,
+        session: Optional[aiohttp.ClientSession] = None,
+        deadline: Optional[float] = None,
+        tracer: Optional[Tracer] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run the whole pipeline and return the final scan context as a plain dict.
+
+        Args:
+            domain: Target domain.
+            session: HTTP session shared by async enrichers (see ``stream``).
+            deadline: Seconds the whole run may take (see ``stream``).
+            tracer: Span recorder (see ``stream``).
+        """
+        context = ScanContextData(domain=domain)
+        stream = self.stream(
+            domain, session=session, context=context, deadline=deadline, tracer=tracer
+        )
+        async for _ in stream:
+            pass
         return context.to_dict()
+
+    def run(
+        self,
+        domain: str,
+        deadline: Optional[float] = None,
+        tracer: Optional[Tracer] = None,
+    ) -> Dict[str, Any]:
+        """Sync wrapper around ``run_async`` (must not be called from a running loop)."""
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(
+                self.run_async(domain, deadline=deadline, tracer=tracer)
+            )
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            # Unlike asyncio.run, don't join default-executor threads: work
+            # abandoned at the deadline must not hold the caller past it.
+            loop.close()
@@ -0,0 +1,304 @@
+"""
+Port scan result store - IP-keyed, TTL-bound, shared across scans and users.
+
+Many monitored domains sit on the same hosting and CDN addresses. Pipelines
+built by the orchestrator scan IPs through ``get_port_cache()``:
+
+    result = await get_port_cache().get_or_scan(ip, ports, lambda: _scan_ip_ports(ip, ports))
+
+* results are keyed by IP and port profile and kept for ``PORT_CACHE_TTL``;
+  each carries ``observed_at``, the time it was actually probed;
+* concurrent scans of the same IP in this process wait on one probe; if the
+  probing scan is cancelled (deadline, budget), a waiting one takes over;
+* with ``REDIS_URL`` set, results are shared between processes (API workers,
+  Celery tasks) under ``portscan:<ip>|<profile>`` keys, and a short Redis
+  lock makes scans in other processes wait for the probe instead of
+  repeating it;
+* failed scans (``error`` set) are not stored;
+* ``stats()`` reports hits, coalesced waits and probes.
+"""
+
+import asyncio
+import hashlib
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+from src.config.settings import PORT_CACHE_MAX_ENTRIES, PORT_CACHE_REDIS, PORT_CACHE_TTL
+from src.core.executor import POOL_SOCKET, get_executor
+from src.core.models import PortScanResult
+from src.core.shared import Abandoned, failure_for, wait_shared
+from src.services import cache_service
+from src.services._redis import get_shared_redis
+
+logger = logging.getLogger(__name__)
+
+_REDIS_PREFIX = "portscan:"
+_LOCK_PREFIX = "portscan-lock:"
+# How long another process may hold a probe before we scan anyway, and how
+# often waiters look for its result.
+_LOCK_SECONDS = 120
+_POLL_SECONDS = 0.5
+
+CacheKey = Tuple[str, str]
+
+
+def profile_key(ports: Sequence[int]) -> str:
+    """Short, order-independent identifier of a port list."""
+    digest = hashlib.sha1(",".join(map(str, sorted(set(ports)))).encode("ascii")).hexdigest()
+    return digest[:12]
+
+
+class PortScanCache:
+    """
+    Single-flight, TTL-bound port scan results (thread-safe; any event loop).
+
+    Args:
+        ttl: Seconds a result is reused; 0 disables the cache.
+        max_entries: In-process entries (least recently used go first).
+        use_redis: Share results and probes through Redis when configured.
+    """
+
+    def __init__(
+        self,
+        ttl: float = PORT_CACHE_TTL,
+        max_entries: int = PORT_CACHE_MAX_ENTRIES,
+        use_redis: bool = PORT_CACHE_REDIS,
+    ):
+        if max_entries < 1:
+            raise ValueError("PortScanCache.max_entries must be >= 1")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.use_redis = use_redis
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[CacheKey, Tuple[PortScanResult, float]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, "Future[PortScanResult]"] = {}
+        # Metrics.
+        self._hits = 0
+        self._redis_hits = 0
+        self._coalesced = 0
+        self._probes = 0
+
+    # -- public API ---------------------------------------------------------
+
+    async def get_or_scan(
+        self,
+        ip: str,
+        ports: Sequence[int],
+        scan: Callable[[], Awaitable[PortScanResult]],
+    ) -> PortScanResult:
+        """Cached result for ``ip`` / ``ports``, else the result of ``scan()``."""
+        if self.ttl <= 0:
+            return _observed(await scan())
+        key = (ip, profile_key(ports))
+        result = self._memory_get(key)
+        if result is None and self._redis_enabled():
+            result = await get_executor().run(POOL_SOCKET, self._redis_get, key)
+        if result is not None:
+            return result
+
+        while True:
+            future, owner = self._claim(key)
+            if owner:
+                break
+            try:
+                return await wait_shared(future)
+            except Abandoned:
+                continue  # the probing caller was cancelled; take over
+        try:
+            result = await self._probe(key, scan)
+        except BaseException as exc:
+            self._fail(key, future, exc)
+            raise
+        self._store(key, future, result)
+        return result
+
+    def clear(self) -> None:
+        """Drop the in-process results (the Redis tier is left alone)."""
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._cache),
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "redis_hits": self._redis_hits,
+                "coalesced": self._coalesced,
+                "probes": self._probes,
+            }
+
+    # -- probing ------------------------------------------------------------
+
+    async def _probe(self, key: CacheKey, scan: Callable[[], Awaitable[PortScanResult]]) -> PortScanResult:
+        """Scan, unless another process is already probing ``key`` (then wait for it)."""
+        token = None
+        if self._redis_enabled():
+            token = await get_executor().run(POOL_SOCKET, self._redis_lock, key)
+            if token is None:
+                result = await self._wait_for_peer(key)
+                if result is not None:
+                    return result
+        with self._lock:
+            self._probes += 1
+        try:
+            result = _observed(await scan())
+        except BaseException:
+            if token is not None:
+                get_executor().submit(POOL_SOCKET, self._redis_unlock, key, token)
+            raise
+        if self._redis_enabled():
+            await get_executor().run(POOL_SOCKET, self._redis_publish, key, result, token)
+        return result
+
+    async def _wait_for_peer(self, key: CacheKey) -> Optional[PortScanResult]:
+        """Poll for another process's result until its lock goes away."""
+        deadline = time.monotonic() + _LOCK_SECONDS
+        executor = get_executor()
+        while time.monotonic() < deadline:
+            await asyncio.sleep(_POLL_SECONDS)
+            result = await executor.run(POOL_SOCKET, self._redis_get, key)
+            if result is not None:
+                return result
+            if not await executor.run(POOL_SOCKET, self._redis_locked, key):
+                # The peer may have stored its result since our last read.
+                return await executor.run(POOL_SOCKET, self._redis_get, key)
+        return None
+
+    # -- cache tiers --------------------------------------------------------
+
+    def _memory_get(self, key: CacheKey) -> Optional[PortScanResult]:
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is None:
+                return None
+            if cached[1] <= time.time():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            self._hits += 1
+            return cached[0]
+
+    def _memory_put(self, key: CacheKey, result: PortScanResult, expires_at: float) -> None:
+        """Store ``result`` (lock held)."""
+        self._cache[key] = (result, expires_at)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _redis_enabled(self) -> bool:
+        return self.use_redis and get_shared_redis() is not None
+
+    def _redis_get(self, key: CacheKey) -> Optional[PortScanResult]:
+        data = cache_service.get(_REDIS_PREFIX + "|".join(key))
+        if not data:
+            return None
+        try:
+            result = PortScanResult.model_validate(data)
+        except Exception:
+            return None
+        expires_at = _observed_ts(result) + self.ttl
+        if expires_at <= time.time():
+            return None
+        with self._lock:
+            self._memory_put(key, result, expires_at)
+            self._redis_hits += 1
+        return result
+
+    def _redis_put(self, key: CacheKey, result: PortScanResult) -> None:
+        ttl = int(_observed_ts(result) + self.ttl - time.time())
+        if ttl >= 1:
+            cache_service.set(_REDIS_PREFIX + "|".join(key), result.model_dump(mode="json"), ttl)
+
+    def _redis_publish(self, key: CacheKey, result: PortScanResult, token: Optional[str]) -> None:
+        """Store ``result``, then release the probe lock, so waiting processes find it."""
+        if result.error is None:
+            self._redis_put(key, result)
+        if token is not None:
+            self._redis_unlock(key, token)
+
+    def _redis_lock(self, key: CacheKey) -> Optional[str]:
+        """Token if we now hold the probe lock for ``key``; None if another process does."""
+        client = get_shared_redis()
+        token = secrets.token_hex(8)
+        try:
+            acquired = client.set(_LOCK_PREFIX + "|".join(key), token, nx=True, ex=_LOCK_SECONDS)
+        except Exception as exc:
+            logger.debug("Port cache lock failed for %s: %s", key, exc)
+            return token  # Redis trouble: probe without coordination
+        return token if acquired else None
+
+    def _redis_locked(self, key: CacheKey) -> bool:
+        try:
+            return bool(get_shared_redis().exists(_LOCK_PREFIX + "|".join(key)))
+        except Exception:
+            return False
+
+    def _redis_unlock(self, key: CacheKey, token: str) -> None:
+        lock_key = _LOCK_PREFIX + "|".join(key)
+        try:
+            client = get_shared_redis()
+            if client.get(lock_key) == token:
+                client.delete(lock_key)
+        except Exception as exc:
+            logger.debug("Port cache unlock failed for %s: %s", key, exc)
+
+    # -- single flight ------------------------------------------------------
+
+    def _claim(self, key: CacheKey) -> Tuple["Future[PortScanResult]", bool]:
+        """Return (future, owner); ``owner`` is True when the caller must probe."""
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[1] > time.time():
+                # Stored by another caller since our cache miss.
+                self._hits += 1
+                future: "Future[PortScanResult]" = Future()
+                future.set_result(cached[0])
+                return future, False
+            future = self._inflight.get(key)
+            if future is not None:
+                self._coalesced += 1
+                return future, False
+            future = self._inflight[key] = Future()
+            return future, True
+
+    def _store(self, key: CacheKey, future: "Future[PortScanResult]", result: PortScanResult) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            if result.error is None:
+                self._memory_put(key, result, _observed_ts(result) + self.ttl)
+        future.set_result(result)
+
+    def _fail(self, key: CacheKey, future: "Future[PortScanResult]", exc: BaseException) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_exception(failure_for(exc))
+
+
+def _observed(result: PortScanResult) -> PortScanResult:
+    if result.observed_at is not None:
+        return result
+    return result.model_copy(update={"observed_at": datetime.now(timezone.utc)})
+
+
+def _observed_ts(result: PortScanResult) -> float:
+    return result.observed_at.timestamp() if result.observed_at else time.time()
+
+
+_port_cache: Optional[PortScanCache] = None
+_port_cache_lock = threading.Lock()
+
+
+def get_port_cache() -> PortScanCache:
+    """Get or create the process-wide port scan cache (sized from settings)."""
+    global _port_cache
+    with _port_cache_lock:
+        if _port_cache is None:
+            _port_cache = PortScanCache()
+        return _port_cache
@@ -0,0 +1,688 @@
+"""
+Record/replay harness for offline, reproducible scan benchmarks.
+
+``Recorder`` taps every network boundary of a live scan and fills a
+``Cassette`` (a JSON file); ``ReplayEnvironment`` later serves that cassette
+from local stand-ins, so the same scan runs offline with identical answers:
+
+    cassette = Cassette(domain="example.com")
+    with Recorder(cassette):
+        scan_domain("example.com")
+    cassette.save("example.com.cassette.json")
+
+    with ReplayEnvironment(Cassette.load(...), ReplayLatency(dns=0.02, http=0.08)):
+        scan_domain("example.com")          # no packet leaves the host
+
+What is replayed, and how:
+
+* DNS (dnspython) - a UDP DNS server on 127.0.0.1 answers with the recorded
+  wire responses; ``dns.resolver.default_resolver`` points at it. The shared
+  resolver's cache and the port scan cache are emptied (and their Redis tiers
+  bypassed) on entry and exit, so every scan queries the cassette.
+* HTTP (aiohttp: crt.sh, RIPEstat, urlscan, tech probes, ...) - a local HTTPS
+  listener (self-signed certificate, needs ``cryptography``) plus a plain HTTP
+  one; sessions from ``make_aiohttp_session`` resolve every host to them.
+* Port-scan connects and banners, TLS certificates, TLS audits, AXFR
+  attempts, WHOIS and DNSDumpster use raw sockets or third-party clients, so
+  they are replayed at their function boundary (``_scan_port``,
+  ``_get_cert_info``, ``_audit_endpoint``, ...); taps on
+  coroutine functions wait with ``asyncio.sleep``.
+
+Every stand-in waits for the configured latency before answering. Lookups that
+are not in the cassette fail (SERVFAIL, HTTP 599, "closed", ...) and are
+listed in ``ReplayEnvironment.misses``. Cassettes contain full request URLs,
+so record with the same API keys as the replay and keep them private.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import socket
+import ssl
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import aiohttp
+import dns.asyncresolver
+import dns.exception
+import dns.message
+import dns.name
+import dns.rcode
+import dns.rdatatype
+import dns.resolver
+from aiohttp import web
+from aiohttp.abc import AbstractResolver
+from multidict import CIMultiDict
+from yarl import URL
+
+from src.core.models import CertificateInfo, OpenPort, TlsHandshake, WhoisInfo
+from src.core.port_cache import get_port_cache
+from src.core.resolver import get_resolver
+from src.enrichers import _http
+from src.enrichers import dns as dns_enricher
+from src.enrichers import port as port_enricher
+from src.enrichers import ssl as ssl_enricher
+from src.enrichers import subdomain as subdomain_enricher
+from src.enrichers import tls_audit
+from src.enrichers import whois as whois_enricher
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+
+# Response headers that describe the original transfer, not the content.
+_HOP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+# Status served for HTTP requests that are not in the cassette.
+HTTP_MISS_STATUS = 599
+
+
+@dataclass
+class ReplayLatency:
+    """Injected latency in seconds per kind of operation."""
+
+    dns: float = 0.0
+    http: float = 0.0
+    connect: float = 0.0
+    tls: float = 0.0
+
+
+@dataclass
+class Cassette:
+    """
+    Recorded network answers for one scan.
+
+    Attributes:
+        dns: ``"qname.|RDTYPE"`` -> ``{"wire": base64}``, ``{"rcode": "NXDOMAIN"}``
+            or ``{"error": "timeout"}``.
+        http: ``"METHOD url"`` -> responses in the order they were received
+            (polled endpoints answer differently over time).
+        calls: Function-level taps, ``kind`` -> key -> JSON result.
+    """
+
+    domain: str = ""
+    recorded_at: str = ""
+    dns: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    http: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    calls: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        http = {
+            key: [
+                {**entry, "body": base64.b64encode(bytes(entry.get("body") or b"")).decode("ascii")}
+                for entry in entries
+            ]
+            for key, entries in self.http.items()
+        }
+        return {
+            "version": CASSETTE_VERSION,
+            "domain": self.domain,
+            "recorded_at": self.recorded_at,
+            "dns": self.dns,
+            "http": http,
+            "calls": self.calls,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Cassette":
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version: {data.get('version')!r}")
+        http = {
+            key: [{**entry, "body": base64.b64decode(entry.get("body") or "")} for entry in entries]
+            for key, entries in (data.get("http") or {}).items()
+        }
+        return cls(
+            domain=data.get("domain") or "",
+            recorded_at=data.get("recorded_at") or "",
+            dns=data.get("dns") or {},
+            http=http,
+            calls=data.get("calls") or {},
+        )
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.to_dict(), fh, indent=1, sort_keys=True)
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with open(path, encoding="utf-8") as fh:
+            return cls.from_dict(json.load(fh))
+
+
+def dns_key(qname: Any, rdtype: Any) -> str:
+    """Cassette key for a DNS question."""
+    name = qname if isinstance(qname, dns.name.Name) else dns.name.from_text(str(qname))
+    return f"{name.to_text().lower()}|{dns.rdatatype.to_text(dns.rdatatype.RdataType.make(rdtype))}"
+
+
+def http_key(method: str, url: Any) -> str:
+    """Cassette key for an HTTP request."""
+    return f"{method.upper()} {URL(str(url))}"
+
+
+# ---------------------------------------------------------------------------
+# Function-level taps
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class _CallTap:
+    """A function replayed by key: ``key(*args)`` -> ``encode(result)``."""
+
+    kind: str
+    owner: Any
+    attr: str
+    key: Callable[..., str]
+    encode: Callable[[Any], Any]
+    decode: Callable[[Any], Any]
+    latency: str
+    miss: Callable[..., Any]
+
+
+def _model_or_none(model: Any) -> Callable[[Any], Any]:
+    return lambda value: None if value is None else model.model_validate(value)
+
+
+def _dump_or_none(value: Any) -> Any:
+    return None if value is None else value.model_dump(mode="json")
+
+
+def _encode_tls(result: Any) -> Any:
+    handshake, cert = result
+    return {"handshake": handshake.model_dump(mode="json"), "certificate": _dump_or_none(cert)}
+
+
+def _decode_tls(value: Any) -> Any:
+    if value is None or "handshake" not in value:
+        # Recorded before handshakes were kept: the certificate alone (or None).
+        cert = None if value is None else CertificateInfo.model_validate(value)
+        handshake = TlsHandshake(host=cert.host if cert else "", error=cert.error if cert else "No certificate")
+        return handshake, None if cert is None or cert.error else cert
+    return TlsHandshake.model_validate(value["handshake"]), _model_or_none(CertificateInfo)(value["certificate"])
+
+
+_CALL_TAPS = (
+    _CallTap(
+        kind="port",
+        owner=port_enricher,
+        attr="_scan_port",
+        key=lambda ip, port, *args, **kwargs: f"{ip}:{port}",
+        encode=_dump_or_none,
+        decode=_model_or_none(OpenPort),
+        latency="connect",
+        miss=lambda *args, **kwargs: None,
+    ),
+    _CallTap(
+        kind="port_banner",
+        owner=port_enricher,
+        attr="_grab_banner",
+        key=lambda ip, port, *args, **kwargs: f"{ip}:{port}",
+        encode=lambda banner: banner,
+        decode=lambda banner: banner,
+        latency="connect",
+        miss=lambda *args, **kwargs: None,
+    ),
+    _CallTap(
+        kind="tls_cert",
+        owner=ssl_enricher,
+        attr="_get_cert_info",
+        key=lambda host, port=443, *args, **kwargs: f"{host}:{port}",
+        encode=_encode_tls,
+        decode=_decode_tls,
+        latency="tls",
+        miss=lambda host, *args, **kwargs: (TlsHandshake(host=host, error="Not recorded"), None),
+    ),
+    _CallTap(
+        kind="tls_audit",
+        owner=tls_audit,
+        attr="_audit_endpoint",
+        key=lambda ip, server_name, port=443, *args, **kwargs: f"{server_name}@{ip}:{port}",
+        encode=lambda endpoint: endpoint,
+        decode=lambda endpoint: endpoint,
+        latency="tls",
+        miss=lambda ip, server_name, port=443, *args, **kwargs: {
+            "ip": ip, "protocols": {}, "weak_ciphers": [], "error": "Not recorded",
+        },
+    ),
+    _CallTap(
+        kind="axfr",
+        owner=dns_enricher.DnsEnricher,
+        attr="_try_zone_transfer",
+        key=lambda _self, domain, *args, **kwargs: domain,
+        encode=list,
+        decode=tuple,
+        latency="connect",
+        miss=lambda *args, **kwargs: (False, None),
+    ),
+    _CallTap(
+        kind="whois",
+        owner=whois_enricher.WhoisEnricher,
+        attr="enrich",
+        key=lambda _self, domain, *args, **kwargs: domain,
+        encode=lambda result: {"whois_info": result["whois_info"].model_dump(mode="json")},
+        decode=lambda value: {"whois_info": WhoisInfo.model_validate(value["whois_info"])},
+        latency="connect",
+        miss=lambda _self, domain, *args, **kwargs: {
+            "whois_info": WhoisInfo(domain=domain, error="WHOIS lookup failed: not recorded"),
+        },
+    ),
+    _CallTap(
+        kind="dnsdumpster",
+        owner=subdomain_enricher,
+        attr="_fetch_dnsdumpster",
+        key=lambda domain, *args, **kwargs: domain,
+        encode=sorted,
+        decode=set,
+        latency="http",
+        miss=lambda *args, **kwargs: set(),
+    ),
+)
+
+
+def _patch(stack: ExitStack, owner: Any, attr: str, replacement: Any) -> None:
+    original = owner.__dict__[attr] if isinstance(owner, type) else getattr(owner, attr)
+    setattr(owner, attr, replacement)
+    stack.callback(setattr, owner, attr, original)
+
+
+def _isolate_caches(stack: ExitStack) -> None:
+    """
+    Empty the shared resolver and port scan caches now and on exit; skip
+    Redis and the upstream pool (which bypasses ``dns.resolver``) meanwhile.
+    """
+    resolver = get_resolver()
+    resolver.clear()
+    stack.callback(resolver.clear)
+    _patch(stack, resolver, "use_redis", False)
+    _patch(stack, resolver, "upstreams", None)
+    port_cache = get_port_cache()
+    port_cache.clear()
+    stack.callback(port_cache.clear)
+    _patch(stack, port_cache, "use_redis", False)
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+class Recorder:
+    """
+    Context manager that records a live scan into ``cassette``.
+
+    Taps are process-wide (module attributes and aiohttp sessions created
+    while active), so record one scan at a time.
+    """
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+        self._lock = threading.Lock()
+        self._stack = ExitStack()
+
+    def __enter__(self) -> "Recorder":
+        self.cassette.recorded_at = datetime.now(timezone.utc).isoformat()
+        _isolate_caches(self._stack)
+        self._patch_dns()
+        for tap in _CALL_TAPS:
+            _patch(self._stack, tap.owner, tap.attr, self._recording_call(tap))
+        previous = _http.set_transport_override(
+            _http.TransportOverride(trace_configs=(self._http_trace_config,))
+        )
+        self._stack.callback(_http.set_transport_override, previous)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stack.close()
+
+    # -- DNS ----------------------------------------------------------------
+
+    def _patch_dns(self) -> None:
+        original = dns.resolver.Resolver.resolve
+        original_async = dns.asyncresolver.Resolver.resolve
+        recorder = self
+
+        def resolve(resolver, qname, rdtype=dns.rdatatype.A, *args, **kwargs):
+            key = dns_key(qname, rdtype)
+            try:
+                answer = original(resolver, qname, rdtype, *args, **kwargs)
+            except dns.exception.DNSException as exc:
+                recorder._store_dns_error(key, exc)
+                raise
+            recorder._store_dns(key, {"wire": _b64(answer.response.to_wire())})
+            return answer
+
+        async def resolve_async(resolver, qname, rdtype=dns.rdatatype.A, *args, **kwargs):
+            key = dns_key(qname, rdtype)
+            try:
+                answer = await original_async(resolver, qname, rdtype, *args, **kwargs)
+            except dns.exception.DNSException as exc:
+                recorder._store_dns_error(key, exc)
+                raise
+            recorder._store_dns(key, {"wire": _b64(answer.response.to_wire())})
+            return answer
+
+        _patch(self._stack, dns.resolver.Resolver, "resolve", resolve)
+        _patch(self._stack, dns.asyncresolver.Resolver, "resolve", resolve_async)
+
+    def _store_dns_error(self, key: str, exc: dns.exception.DNSException) -> None:
+        if isinstance(exc, dns.resolver.NXDOMAIN):
+            self._store_dns(key, {"rcode": "NXDOMAIN"})
+        elif isinstance(exc, dns.resolver.NoAnswer):
+            response = exc.kwargs.get("response")
+            self._store_dns(key, {"wire": _b64(response.to_wire())} if response else {"rcode": "NOERROR"})
+        elif isinstance(exc, dns.exception.Timeout):
+            self._store_dns(key, {"error": "timeout"})
+        else:
+            self._store_dns(key, {"rcode": "SERVFAIL"})
+
+    def _store_dns(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self.cassette.dns[key] = entry
+
+    # -- HTTP ---------------------------------------------------------------
+
+    def _http_trace_config(self) -> aiohttp.TraceConfig:
+        async def on_response(_session, ctx, params) -> None:
+            response = params.response
+            entry = {
+                "status": response.status,
+                "headers": [
+                    [name, value] for name, value in response.headers.items()
+                    if name.lower() not in _HOP_HEADERS
+                ],
+                "body": bytearray(),
+            }
+            with self._lock:
+                self.cassette.http.setdefault(http_key(params.method, params.url), []).append(entry)
+            ctx.replay_entry = entry
+
+        async def on_chunk(_session, ctx, params) -> None:
+            entry = getattr(ctx, "replay_entry", None)
+            if entry is not None:
+                entry["body"] += params.chunk
+
+        config = aiohttp.TraceConfig()
+        config.on_request_redirect.append(on_response)
+        config.on_request_end.append(on_response)
+        config.on_response_chunk_received.append(on_chunk)
+        return config
+
+    # -- function taps ------------------------------------------------------
+
+    def _recording_call(self, tap: _CallTap) -> Callable[..., Any]:
+        original = getattr(tap.owner, tap.attr)
+
+        def store(result, args, kwargs) -> None:
+            encoded = tap.encode(result)
+            with self._lock:
+                self.cassette.calls.setdefault(tap.kind, {})[tap.key(*args, **kwargs)] = encoded
+
+        if asyncio.iscoroutinefunction(original):
+            async def call_async(*args, **kwargs):
+                result = await original(*args, **kwargs)
+                store(result, args, kwargs)
+                return result
+
+            return call_async
+
+        def call(*args, **kwargs):
+            result = original(*args, **kwargs)
+            store(result, args, kwargs)
+            return result
+
+        return call
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+class _DnsProtocol(asyncio.DatagramProtocol):
+    def __init__(self, env: "ReplayEnvironment"):
+        self.env = env
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        try:
+            query = dns.message.from_wire(data)
+        except dns.exception.DNSException:
+            return
+        reply = self.env._dns_reply(query)
+        if reply is not None:
+            asyncio.get_running_loop().call_later(self.env.latency.dns, self.transport.sendto, reply, addr)
+
+
+class _LocalResolver(AbstractResolver):
+    """Resolves every host to the replay listeners (HTTP for port 80, HTTPS otherwise)."""
+
+    def __init__(self, http_port: int, https_port: int):
+        self._http_port = http_port
+        self._https_port = https_port
+
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET) -> List[Dict[str, Any]]:
+        return [{
+            "hostname": host,
+            "host": "127.0.0.1",
+            "port": self._http_port if port == 80 else self._https_port,
+            "family": socket.AF_INET,
+            "proto": 0,
+            "flags": socket.AI_NUMERICHOST,
+        }]
+
+    async def close(self) -> None:
+        return None
+
+
+def _self_signed_context(workdir: Path) -> ssl.SSLContext:
+    """Server TLS context with a throwaway self-signed certificate."""
+    try:
+        from cryptography import x509  # local import: optional dep
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.x509.oid import NameOID
+    except ImportError as exc:
+        raise RuntimeError("HTTPS replay needs the 'cryptography' package") from exc
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "netscout-replay")])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=30))
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = workdir / "replay.crt", workdir / "replay.key"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    return context
+
+
+class ReplayEnvironment:
+    """
+    Context manager serving ``cassette`` to every scan run inside it.
+
+    The DNS and HTTP(S) listeners run on a private event loop in a background
+    thread, so scans keep their own loops. Taps are process-wide.
+    """
+
+    def __init__(self, cassette: Cassette, latency: Optional[ReplayLatency] = None):
+        self.cassette = cassette
+        self.latency = latency or ReplayLatency()
+        self.misses: List[str] = []
+        self._lock = threading.Lock()
+        self._http_served: Dict[str, int] = {}
+        self._stack = ExitStack()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._dns_transport: Optional[asyncio.DatagramTransport] = None
+        self.dns_port = 0
+        self.http_port = 0
+        self.https_port = 0
+
+    def __enter__(self) -> "ReplayEnvironment":
+        try:
+            self._start_servers()
+            self._install_taps()
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stack.close()
+
+    # -- servers ------------------------------------------------------------
+
+    def _start_servers(self) -> None:
+        workdir = Path(self._stack.enter_context(tempfile.TemporaryDirectory(prefix="netscout-replay-")))
+        tls_context = _self_signed_context(workdir)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="replay-servers", daemon=True)
+        self._thread.start()
+        self._stack.callback(self._stop_loop)
+        asyncio.run_coroutine_threadsafe(self._serve(tls_context), self._loop).result()
+        self._stack.callback(self._run_in_loop, self._shutdown())
+
+    async def _serve(self, tls_context: ssl.SSLContext) -> None:
+        loop = asyncio.get_running_loop()
+        self._dns_transport, _ = await loop.create_datagram_endpoint(
+            lambda: _DnsProtocol(self), local_addr=("127.0.0.1", 0)
+        )
+        self.dns_port = self._dns_transport.get_extra_info("sockname")[1]
+
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._handle_http)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        http_site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        https_site = web.TCPSite(self._runner, "127.0.0.1", 0, ssl_context=tls_context)
+        await http_site.start()
+        await https_site.start()
+        (_, self.http_port), (_, self.https_port) = [address[:2] for address in self._runner.addresses]
+
+    async def _shutdown(self) -> None:
+        if self._dns_transport is not None:
+            self._dns_transport.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def _run_in_loop(self, coro) -> None:
+        asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def _stop_loop(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _miss(self, what: str) -> None:
+        with self._lock:
+            self.misses.append(what)
+
+    def _dns_reply(self, query: dns.message.Message) -> Optional[bytes]:
+        if not query.question:
+            return None
+        question = query.question[0]
+        key = dns_key(question.name, question.rdtype)
+        entry = self.cassette.dns.get(key)
+        if entry is None:
+            self._miss(f"dns {key}")
+            entry = {"rcode": "SERVFAIL"}
+        if entry.get("error") == "timeout":
+            return None
+        if entry.get("wire"):
+            response = dns.message.from_wire(base64.b64decode(entry["wire"]))
+            response.id = query.id
+            return response.to_wire()
+        response = dns.message.make_response(query)
+        response.set_rcode(dns.rcode.from_text(entry.get("rcode") or "SERVFAIL"))
+        return response.to_wire()
+
+    async def _handle_http(self, request: web.Request) -> web.Response:
+        await asyncio.sleep(self.latency.http)
+        key = http_key(request.method, request.url)
+        entries = self.cassette.http.get(key)
+        if not entries:
+            self._miss(f"http {key}")
+            return web.Response(status=HTTP_MISS_STATUS, text="not recorded")
+        with self._lock:
+            served = self._http_served.get(key, 0)
+            self._http_served[key] = served + 1
+        entry = entries[min(served, len(entries) - 1)]
+        headers = CIMultiDict((name, value) for name, value in entry.get("headers") or [])
+        return web.Response(status=entry["status"], headers=headers, body=bytes(entry.get("body") or b""))
+
+    # -- taps ---------------------------------------------------------------
+
+    def _install_taps(self) -> None:
+        _isolate_caches(self._stack)
+        resolver = dns.resolver.Resolver(configure=False)
+        resolver.nameservers = ["127.0.0.1"]
+        resolver.port = self.dns_port
+        previous_resolver = dns.resolver.default_resolver
+        dns.resolver.default_resolver = resolver
+        self._stack.callback(setattr, dns.resolver, "default_resolver", previous_resolver)
+
+        for tap in _CALL_TAPS:
+            _patch(self._stack, tap.owner, tap.attr, self._replaying_call(tap))
+
+        http_port, https_port = self.http_port, self.https_port
+        previous = _http.set_transport_override(_http.TransportOverride(
+            resolver=lambda: _LocalResolver(http_port, https_port),
+            verify_ssl=False,
+        ))
+        self._stack.callback(_http.set_transport_override, previous)
+
+    def _replaying_call(self, tap: _CallTap) -> Callable[..., Any]:
+        recorded = self.cassette.calls.get(tap.kind) or {}
+
+        def answer(args, kwargs):
+            key = tap.key(*args, **kwargs)
+            if key not in recorded:
+                self._miss(f"{tap.kind} {key}")
+                return tap.miss(*args, **kwargs)
+            return tap.decode(recorded[key])
+
+        if asyncio.iscoroutinefunction(getattr(tap.owner, tap.attr)):
+            async def call_async(*args, **kwargs):
+                await asyncio.sleep(getattr(self.latency, tap.latency))
+                return answer(args, kwargs)
+
+            return call_async
+
+        def call(*args, **kwargs):
+            time.sleep(getattr(self.latency, tap.latency))
+            return answer(args, kwargs)
+
+        return call
+
+
+def replay_counts(cassette: Cassette) -> Dict[str, int]:
+    """Number of recorded entries per kind (for benchmark reports)."""
+    counts: Dict[str, int] = {"dns": len(cassette.dns), "http": sum(map(len, cassette.http.values()))}
+    for kind, entries in cassette.calls.items():
+        counts[kind] = len(entries)
+    return counts
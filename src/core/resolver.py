@@ -0,0 +1,387 @@
+"""
+Shared DNS resolver - TTL-respecting cache, single-flight queries, Redis tier.
+
+Every DNS consumer (DNS / correlation / reverse-DNS enrichers, subdomain
+brute-force, delta re-scans) resolves through one ``DnsResolverService``:
+
+    resolver = get_resolver()
+    answers = resolver.resolve("example.com", "A")        # worker threads
+    answers = await resolver.resolve_async(name, "A")     # event loop
+    answers = resolver.resolve_address("93.184.216.34")   # PTR
+
+Answers are returned as lists of ``dns.rdata.Rdata``; NXDOMAIN and "no data"
+raise ``dns.resolver.NXDOMAIN`` / ``dns.resolver.NoAnswer`` like
+``dns.resolver.resolve`` does, so callers keep their error handling.
+
+* positive answers are cached for their TTL (capped by ``DNS_CACHE_MAX_TTL``);
+* NXDOMAIN / no-data answers are cached for the SOA negative TTL (RFC 2308),
+  falling back to ``DNS_CACHE_NEGATIVE_TTL``; timeouts and server failures
+  are not cached;
+* concurrent identical queries (from threads and the event loop alike) share
+  one upstream query;
+* with ``REDIS_URL`` set, answers are also shared between processes through
+  Redis (``dns:<name>|<type>`` keys, expiring with the answer);
+* ``stats()`` reports hit rates.
+
+Cache misses go to the upstream pool of ``src/core/upstreams.py`` (hedged
+across ``DNS_UPSTREAMS``) when one is configured, otherwise to
+``dns.resolver``'s default resolver (the async path copies its nameservers),
+so the replay harness and tests can redirect them.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import dns.asyncresolver
+import dns.name
+import dns.rdata
+import dns.rdataclass
+import dns.rdatatype
+import dns.resolver
+import dns.reversename
+
+from src.config.settings import (
+    DNS_CACHE_MAX_ENTRIES,
+    DNS_CACHE_MAX_TTL,
+    DNS_CACHE_NEGATIVE_TTL,
+    DNS_CACHE_REDIS,
+)
+from src.core.executor import POOL_DNS, get_executor
+from src.core.shared import Abandoned, failure_for, wait_shared
+from src.core.upstreams import UpstreamPool
+from src.services import cache_service
+from src.services._redis import get_shared_redis
+
+RCODE_NOERROR = "NOERROR"
+RCODE_NXDOMAIN = "NXDOMAIN"
+# NOERROR without records of the requested type ("no data").
+RCODE_NOANSWER = "NOANSWER"
+
+_REDIS_PREFIX = "dns:"
+
+CacheKey = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class _Entry:
+    rcode: str
+    records: Tuple[dns.rdata.Rdata, ...]
+    expires_at: float  # time.time()
+
+    def to_cache(self) -> Dict[str, Any]:
+        return {
+            "rcode": self.rcode,
+            "records": [rdata.to_text() for rdata in self.records],
+            "expires_at": self.expires_at,
+        }
+
+    @classmethod
+    def from_cache(cls, data: Dict[str, Any], rdtype: str) -> "_Entry":
+        records = tuple(
+            dns.rdata.from_text(dns.rdataclass.IN, rdtype, text) for text in data.get("records") or []
+        )
+        return cls(rcode=data["rcode"], records=records, expires_at=float(data["expires_at"]))
+
+
+def _cache_key(qname: Union[str, dns.name.Name], rdtype: Union[str, int]) -> CacheKey:
+    name = qname if isinstance(qname, dns.name.Name) else dns.name.from_text(str(qname))
+    return name.to_text().lower(), dns.rdatatype.to_text(dns.rdatatype.RdataType.make(rdtype))
+
+
+def _negative_ttl(response: Optional[Any]) -> Optional[float]:
+    """SOA-derived negative caching TTL of a response (RFC 2308), if present."""
+    for rrset in getattr(response, "authority", None) or []:
+        if rrset.rdtype == dns.rdatatype.SOA and len(rrset):
+            return float(min(rrset.ttl, rrset[0].minimum))
+    return None
+
+
+def _nxdomain_response(exc: dns.resolver.NXDOMAIN) -> Optional[Any]:
+    responses = exc.kwargs.get("responses") or {}
+    return next(iter(responses.values()), None)
+
+
+def _raise_negative(entry: _Entry) -> None:
+    if entry.rcode == RCODE_NXDOMAIN:
+        raise dns.resolver.NXDOMAIN()
+    if entry.rcode == RCODE_NOANSWER:
+        raise dns.resolver.NoAnswer()
+
+
+class DnsResolverService:
+    """
+    Caching, coalescing DNS resolver (thread-safe; usable from the event loop).
+
+    Args:
+        max_entries: In-process cache size (least recently used entries go first).
+        max_ttl: Upper bound on how long any answer is cached (seconds).
+        negative_ttl: Cache time for negative answers without an SOA record.
+        use_redis: Read and write the Redis tier when Redis is configured.
+        upstreams: Hedged upstream pool for cache misses (None = the system
+            resolver).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DNS_CACHE_MAX_ENTRIES,
+        max_ttl: float = DNS_CACHE_MAX_TTL,
+        negative_ttl: float = DNS_CACHE_NEGATIVE_TTL,
+        use_redis: bool = DNS_CACHE_REDIS,
+        upstreams: Optional[UpstreamPool] = None,
+    ):
+        if max_entries < 1:
+            raise ValueError("DnsResolverService.max_entries must be >= 1")
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.use_redis = use_redis
+        self.upstreams = upstreams
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._inflight: Dict[CacheKey, "Future[_Entry]"] = {}
+        self._async_resolver: Optional[Tuple[dns.resolver.Resolver, dns.asyncresolver.Resolver]] = None
+        # Metrics.
+        self._hits = 0
+        self._negative_hits = 0
+        self._redis_hits = 0
+        self._coalesced = 0
+        self._queries = 0
+        self._errors = 0
+
+    # -- public API ---------------------------------------------------------
+
+    def resolve(
+        self,
+        qname: Union[str, dns.name.Name],
+        rdtype: Union[str, int] = "A",
+    ) -> List[dns.rdata.Rdata]:
+        """Resolve ``qname``/``rdtype`` from cache or upstream (blocking)."""
+        key = _cache_key(qname, rdtype)
+        entry = self._memory_get(key) or self._redis_get(key)
+        if entry is None:
+            while True:
+                future, owner = self._claim(key)
+                if owner:
+                    try:
+                        entry = self._entry_from(self._query(key))
+                    except BaseException as exc:
+                        self._fail(key, future, exc)
+                        raise
+                    self._store(key, future, entry)
+                    self._redis_put(key, entry)
+                    break
+                try:
+                    entry = future.result()
+                    break
+                except Abandoned:
+                    continue  # the querying caller was cancelled; take over
+        return self._answer(entry)
+
+    async def resolve_async(
+        self,
+        qname: Union[str, dns.name.Name],
+        rdtype: Union[str, int] = "A",
+    ) -> List[dns.rdata.Rdata]:
+        """Async counterpart of ``resolve``; upstream queries do not use a thread."""
+        key = _cache_key(qname, rdtype)
+        entry = self._memory_get(key)
+        if entry is None and self._redis_enabled():
+            entry = await get_executor().run(POOL_DNS, self._redis_get, key)
+        if entry is None:
+            while True:
+                future, owner = self._claim(key)
+                if owner:
+                    try:
+                        entry = self._entry_from(await self._query_async(key))
+                    except BaseException as exc:
+                        self._fail(key, future, exc)
+                        raise
+                    self._store(key, future, entry)
+                    if self._redis_enabled():
+                        get_executor().submit(POOL_DNS, self._redis_put, key, entry)
+                    break
+                try:
+                    entry = await wait_shared(future)
+                    break
+                except Abandoned:
+                    continue  # the querying caller was cancelled; take over
+        return self._answer(entry)
+
+    def resolve_address(self, ip: str) -> List[dns.rdata.Rdata]:
+        """PTR records of ``ip`` (IPv4 or IPv6)."""
+        return self.resolve(dns.reversename.from_address(ip), "PTR")
+
+    def clear(self) -> None:
+        """Drop the in-process cache (the Redis tier is left alone)."""
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache size and hit rates since start."""
+        with self._lock:
+            lookups = self._hits + self._redis_hits + self._coalesced + self._queries
+            return {
+                "entries": len(self._cache),
+                "max_entries": self.max_entries,
+                "lookups": lookups,
+                "hits": self._hits,
+                "negative_hits": self._negative_hits,
+                "redis_hits": self._redis_hits,
+                "coalesced": self._coalesced,
+                "upstream_queries": self._queries,
+                "upstream_errors": self._errors,
+                "hit_rate": round((lookups - self._queries) / lookups, 3) if lookups else 0.0,
+                "upstreams": self.upstreams.stats() if self.upstreams is not None else None,
+            }
+
+    # -- cache tiers --------------------------------------------------------
+
+    def _memory_get(self, key: CacheKey) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            self._hits += 1
+            if entry.rcode != RCODE_NOERROR:
+                self._negative_hits += 1
+            return entry
+
+    def _memory_put(self, key: CacheKey, entry: _Entry) -> None:
+        """Store ``entry`` (lock held)."""
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _redis_enabled(self) -> bool:
+        return self.use_redis and get_shared_redis() is not None
+
+    def _redis_get(self, key: CacheKey) -> Optional[_Entry]:
+        if not self._redis_enabled():
+            return None
+        data = cache_service.get(_REDIS_PREFIX + "|".join(key))
+        if not data:
+            return None
+        try:
+            entry = _Entry.from_cache(data, key[1])
+        except Exception:
+            return None
+        if entry.expires_at <= time.time():
+            return None
+        with self._lock:
+            self._memory_put(key, entry)
+            self._redis_hits += 1
+        return entry
+
+    def _redis_put(self, key: CacheKey, entry: _Entry) -> None:
+        ttl = int(entry.expires_at - time.time())
+        if ttl >= 1 and self._redis_enabled():
+            cache_service.set(_REDIS_PREFIX + "|".join(key), entry.to_cache(), ttl)
+
+    # -- single flight ------------------------------------------------------
+
+    def _claim(self, key: CacheKey) -> Tuple["Future[_Entry]", bool]:
+        """Return (future, owner); ``owner`` is True when the caller must query upstream."""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry.expires_at > time.time():
+                # Stored by another caller since our cache miss.
+                self._hits += 1
+                future: "Future[_Entry]" = Future()
+                future.set_result(entry)
+                return future, False
+            future = self._inflight.get(key)
+            if future is not None:
+                self._coalesced += 1
+                return future, False
+            future = self._inflight[key] = Future()
+            self._queries += 1
+            return future, True
+
+    def _store(self, key: CacheKey, future: "Future[_Entry]", entry: _Entry) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            if entry.expires_at > time.time():
+                self._memory_put(key, entry)
+        future.set_result(entry)
+
+    def _fail(self, key: CacheKey, future: "Future[_Entry]", exc: BaseException) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            if not isinstance(exc, asyncio.CancelledError):
+                self._errors += 1
+        future.set_exception(failure_for(exc))
+
+    # -- upstream -----------------------------------------------------------
+
+    def _query(self, key: CacheKey) -> Any:
+        """Blocking upstream query; returns an Answer or the negative exception."""
+        if self.upstreams is not None:
+            return self.upstreams.query(key[0], key[1])
+        try:
+            return dns.resolver.resolve(key[0], key[1])
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer) as exc:
+            return exc
+
+    async def _query_async(self, key: CacheKey) -> Any:
+        """Non-blocking upstream query against the pool or the default resolver's nameservers."""
+        if self.upstreams is not None:
+            return await self.upstreams.query_async(key[0], key[1])
+        try:
+            return await self._get_async_resolver().resolve(key[0], key[1])
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer) as exc:
+            return exc
+
+    def _get_async_resolver(self) -> dns.asyncresolver.Resolver:
+        default = dns.resolver.get_default_resolver()
+        with self._lock:
+            if self._async_resolver is None or self._async_resolver[0] is not default:
+                resolver = dns.asyncresolver.Resolver(configure=False)
+                resolver.nameservers = list(default.nameservers)
+                resolver.port = default.port
+                resolver.timeout = default.timeout
+                resolver.lifetime = default.lifetime
+                self._async_resolver = (default, resolver)
+            return self._async_resolver[1]
+
+    def _entry_from(self, outcome: Any) -> _Entry:
+        """Cache entry for an upstream Answer or negative exception."""
+        now = time.time()
+        if isinstance(outcome, dns.resolver.NXDOMAIN):
+            return self._negative_entry(RCODE_NXDOMAIN, _nxdomain_response(outcome), now)
+        if isinstance(outcome, dns.resolver.NoAnswer):
+            return self._negative_entry(RCODE_NOANSWER, outcome.kwargs.get("response"), now)
+        ttl = max(0.0, min(outcome.expiration - now, self.max_ttl))
+        return _Entry(RCODE_NOERROR, tuple(outcome), now + ttl)
+
+    def _negative_entry(self, rcode: str, response: Optional[Any], now: float) -> _Entry:
+        ttl = _negative_ttl(response)
+        ttl = self.negative_ttl if ttl is None else ttl
+        return _Entry(rcode, (), now + min(ttl, self.max_ttl))
+
+    @staticmethod
+    def _answer(entry: _Entry) -> List[dns.rdata.Rdata]:
+        _raise_negative(entry)
+        return list(entry.records)
+
+
+_resolver: Optional[DnsResolverService] = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver() -> DnsResolverService:
+    """Get or create the process-wide resolver (sized from settings)."""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = DnsResolverService(upstreams=UpstreamPool.from_settings())
+        return _resolver
@@ -0,0 +1,292 @@
+"""
+Batch-wide shared state - single-flight work memo and global resource limits.
+
+``scan_domains`` scans many domains at once. Domains that share infrastructure
+(IPs, nameservers) would otherwise repeat the same port scans, GeoIP lookups and
+ASN queries; enrichers constructed with a ``SharedWork`` compute each key once
+per batch, and enrichers constructed with ``ResourceLimits`` respect global caps
+on DNS queries and TCP connects across all concurrent scans.
+
+Both are optional: enrichers built without them behave exactly as in a single
+``scan_domain`` call.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, ContextManager, Deque, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+WorkKey = Tuple[str, Hashable]
+
+
+class Abandoned(Exception):
+    """
+    Outcome of an in-flight computation whose owner was cancelled (its scan
+    hit a deadline or budget). Waiters claim the key again and one of them
+    computes it, so one scan's cancellation never fails another's.
+    """
+
+
+async def wait_shared(future: "Future[T]") -> T:
+    """
+    Await another caller's in-flight ``future`` from the event loop.
+
+    Unlike ``asyncio.wrap_future``, cancelling the waiter leaves ``future``
+    alone for its other waiters. Raises ``Abandoned`` when the owner was
+    cancelled.
+    """
+    if not future.done():
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+
+        def wake(_: "Future[T]") -> None:
+            try:
+                loop.call_soon_threadsafe(lambda: waiter.done() or waiter.set_result(None))
+            except RuntimeError:
+                pass  # the waiting loop has closed
+
+        future.add_done_callback(wake)
+        await waiter
+    return future.result()
+
+
+def failure_for(exc: BaseException) -> BaseException:
+    """What waiters of a failed computation see: ``Abandoned`` if the owner was cancelled."""
+    return Abandoned() if isinstance(exc, asyncio.CancelledError) else exc
+
+
+class SharedWork:
+    """
+    Thread-safe single-flight memo keyed by ``(kind, key)``.
+
+    The first caller for a key computes the value; concurrent callers wait for
+    it and later callers get the cached result. Failures are propagated to the
+    callers that were waiting and then forgotten, so a later caller retries.
+    If the computing caller is cancelled, a waiting caller takes over.
+    Usable from worker threads (``get_or_compute``) and from the event loop
+    (``get_or_compute_async``) at the same time.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._futures: Dict[WorkKey, "Future"] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _claim(self, work_key: WorkKey) -> Tuple["Future", bool]:
+        """Return (future, owner); ``owner`` is True when the caller must compute it."""
+        with self._lock:
+            future = self._futures.get(work_key)
+            if future is not None:
+                self.hits += 1
+                return future, False
+            future = Future()
+            self._futures[work_key] = future
+            self.misses += 1
+            return future, True
+
+    def _fail(self, work_key: WorkKey, future: "Future", exc: BaseException) -> None:
+        with self._lock:
+            self._futures.pop(work_key, None)
+        future.set_exception(failure_for(exc))
+
+    def get_or_compute(self, kind: str, key: Hashable, compute: Callable[[], T]) -> T:
+        """Return the value for ``(kind, key)``, calling ``compute`` at most once at a time."""
+        work_key = (kind, key)
+        while True:
+            future, owner = self._claim(work_key)
+            if owner:
+                try:
+                    future.set_result(compute())
+                except BaseException as exc:
+                    self._fail(work_key, future, exc)
+                    raise
+            try:
+                return future.result()
+            except Abandoned:
+                continue
+
+    async def get_or_compute_async(
+        self,
+        kind: str,
+        key: Hashable,
+        compute: Callable[[], Awaitable[T]],
+    ) -> T:
+        """Async counterpart of ``get_or_compute``; ``compute`` returns a coroutine."""
+        work_key = (kind, key)
+        while True:
+            future, owner = self._claim(work_key)
+            if owner:
+                break
+            try:
+                return await wait_shared(future)
+            except Abandoned:
+                continue
+        try:
+            result = await compute()
+        except BaseException as exc:
+            self._fail(work_key, future, exc)
+            raise
+        future.set_result(result)
+        return result
+
+
+def shared_call(
+    shared: Optional[SharedWork],
+    kind: str,
+    key: Hashable,
+    compute: Callable[[], T],
+) -> T:
+    """``shared.get_or_compute`` when a memo is configured, else a plain call."""
+    if shared is None:
+        return compute()
+    return shared.get_or_compute(kind, key, compute)
+
+
+async def shared_call_async(
+    shared: Optional[SharedWork],
+    kind: str,
+    key: Hashable,
+    compute: Callable[[], Awaitable[T]],
+) -> T:
+    """Async counterpart of ``shared_call``."""
+    if shared is None:
+        return await compute()
+    return await shared.get_or_compute_async(kind, key, compute)
+
+
+class SlotPool:
+    """
+    Counting semaphore shared by worker threads and event loops.
+
+    ``with pool:`` blocks the calling thread; ``async with pool:`` waits
+    without blocking the loop. Waiters are served first come, first served
+    whichever side they are on, so one budget can cap blocking TLS handshakes
+    and asyncio port-scan connects together, across any number of loops.
+    """
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError("SlotPool.size must be >= 1")
+        self.size = size
+        self._lock = threading.Lock()
+        self._free = size
+        # Thread waiters are concurrent futures; loop waiters (loop, asyncio future).
+        self._waiters: Deque[Any] = deque()
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return
+            waiter: "Future[None]" = Future()
+            self._waiters.append(waiter)
+        waiter.result()
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return
+            waiter = loop.create_future()
+            self._waiters.append((loop, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # the slot was handed over as we were cancelled
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                if self._hand_over(self._waiters.popleft()):
+                    return
+            self._free = min(self.size, self._free + 1)
+
+    def _hand_over(self, waiter: Any) -> bool:
+        """Give the released slot to ``waiter``; False if it is gone (lock held)."""
+        if isinstance(waiter, Future):
+            try:
+                waiter.set_result(None)
+                return True
+            except InvalidStateError:
+                return False  # cancelled
+        loop, future = waiter
+        if future.done():
+            return False
+        try:
+            same_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            same_loop = False
+        if same_loop:
+            future.set_result(None)
+            return True
+        try:
+            loop.call_soon_threadsafe(self._deliver, future)
+        except RuntimeError:
+            return False  # loop closed
+        return True
+
+    def _deliver(self, future: "asyncio.Future[None]") -> None:
+        if future.done():
+            self.release()  # cancelled in the meantime: pass the slot on
+        else:
+            future.set_result(None)
+
+    def __enter__(self) -> "SlotPool":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    async def __aenter__(self) -> "SlotPool":
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.release()
+
+
+@dataclass
+class ResourceLimits:
+    """
+    Global concurrency caps shared by every scan in a batch.
+
+    Attributes:
+        dns: Concurrent DNS queries issued by enrichers (thread-level).
+        tcp_connect: Concurrent outbound TCP connects (port scan, TLS handshakes),
+            from threads and the event loop alike.
+        http_per_host: Concurrent HTTP connections per upstream host (i.e. per
+            provider) on the batch's shared aiohttp session.
+    """
+
+    dns: int = 64
+    tcp_connect: int = 256
+    http_per_host: int = 8
+    dns_slots: threading.BoundedSemaphore = field(init=False, repr=False)
+    tcp_slots: SlotPool = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        for name in ("dns", "tcp_connect", "http_per_host"):
+            if getattr(self, name) < 1:
+                raise ValueError(f"ResourceLimits.{name} must be >= 1")
+        self.dns_slots = threading.BoundedSemaphore(self.dns)
+        self.tcp_slots = SlotPool(self.tcp_connect)
+
+
+def dns_slot(limits: Optional[ResourceLimits]) -> ContextManager:
+    """Context manager holding one DNS slot (no-op without limits)."""
+    return limits.dns_slots if limits else nullcontext()
+
+
+def tcp_slot(limits: Optional[ResourceLimits]) -> ContextManager:
+    """Context manager holding one TCP-connect slot (no-op without limits)."""
+    return limits.tcp_slots if limits else nullcontext()
@@ -0,0 +1,148 @@
+"""
+Stand-in DNS server - a small UDP responder for brute-force benchmarks and tests.
+
+    async with StandInDnsServer({"www.example.com": ["10.0.0.1"]}) as server:
+        engine = BruteforceEngine(nameservers=[server.address])
+        ...
+
+Answers A queries for ``records``; with ``wildcard`` set, any other name under
+the wildcard zone gets the wildcard addresses; everything else is NXDOMAIN.
+``latency`` delays every answer and ``capacity`` answers SERVFAIL while more
+than that many answers are pending, like a rate-limiting upstream; with
+``refuse`` every query is answered REFUSED.
+"""
+
+import asyncio
+import socket
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+
+Nameserver = Tuple[str, int]
+
+# Large receive buffer so bursts of queries are not dropped by the kernel
+# before the (shared) event loop gets to read them.
+_RECEIVE_BUFFER_BYTES = 4 * 1024 * 1024
+
+
+class _Protocol(asyncio.DatagramProtocol):
+    def __init__(self, server: "StandInDnsServer"):
+        self.server = server
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.server._answer(self.transport, data, addr)
+
+
+class StandInDnsServer:
+    """
+    In-process authoritative UDP server on ``host`` (random port by default).
+
+    Args:
+        records: Fully qualified name -> A addresses.
+        wildcard: ``(zone, addresses)`` answered for every other name under ``zone``.
+        latency: Seconds before each answer is sent.
+        capacity: Most answers pending at once; queries beyond it get SERVFAIL.
+        ttl: TTL of the answers.
+        refuse: Answer REFUSED to everything.
+    """
+
+    def __init__(
+        self,
+        records: Optional[Dict[str, Iterable[str]]] = None,
+        wildcard: Optional[Tuple[str, Iterable[str]]] = None,
+        latency: float = 0.0,
+        capacity: Optional[int] = None,
+        ttl: int = 60,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        refuse: bool = False,
+    ):
+        self.records: Dict[str, List[str]] = {
+            name.lower().rstrip("."): list(addresses) for name, addresses in (records or {}).items()
+        }
+        self.wildcard = (wildcard[0].lower().rstrip("."), list(wildcard[1])) if wildcard else None
+        self.latency = latency
+        self.capacity = capacity
+        self.ttl = ttl
+        self.host = host
+        self.port = port
+        self.refuse = refuse
+        self.queries = 0
+        self.servfails = 0
+        self._pending = 0
+        self._transport: Optional[asyncio.DatagramTransport] = None
+
+    @property
+    def address(self) -> Nameserver:
+        return self.host, self.port
+
+    async def start(self) -> Nameserver:
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _Protocol(self), local_addr=(self.host, self.port)
+        )
+        sock = self._transport.get_extra_info("socket")
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _RECEIVE_BUFFER_BYTES)
+        except OSError:
+            pass
+        self.port = self._transport.get_extra_info("sockname")[1]
+        return self.address
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    async def __aenter__(self) -> "StandInDnsServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+    def _addresses(self, name: str) -> Optional[List[str]]:
+        if name in self.records:
+            return self.records[name]
+        if self.wildcard and name.endswith("." + self.wildcard[0]):
+            return self.wildcard[1]
+        return None
+
+    def _answer(self, transport: asyncio.DatagramTransport, data: bytes, addr) -> None:
+        try:
+            query = dns.message.from_wire(data)
+        except Exception:
+            return
+        self.queries += 1
+        response = dns.message.make_response(query)
+        question = query.question[0]
+        name = question.name.to_text().lower().rstrip(".")
+        addresses = self._addresses(name)
+        if self.refuse:
+            response.set_rcode(dns.rcode.REFUSED)
+        elif self.capacity is not None and self._pending >= self.capacity:
+            self.servfails += 1
+            response.set_rcode(dns.rcode.SERVFAIL)
+        elif addresses is None:
+            response.set_rcode(dns.rcode.NXDOMAIN)
+        elif question.rdtype == dns.rdatatype.A:
+            response.answer.append(dns.rrset.from_text_list(question.name, self.ttl, "IN", "A", addresses))
+        wire = response.to_wire()
+        if not self.latency:
+            transport.sendto(wire, addr)
+            return
+        self._pending += 1
+
+        def send() -> None:
+            self._pending -= 1
+            if not transport.is_closing():
+                transport.sendto(wire, addr)
+
+        asyncio.get_running_loop().call_later(self.latency, send)
@@ -0,0 +1,288 @@
+"""
+Scan tracing - optional spans for enrichers, HTTP requests, DNS queries and connects.
+
+A ``Tracer`` collects spans (start/end, thread, outcome, attributes such as
+bytes or status) for one scan. It is carried in a context variable, so code
+deep inside enrichers records spans without any tracer being passed around:
+
+    tracer = Tracer("example.com")
+    result = scan_domain("example.com", tracer=tracer)
+    tracer.export_chrome_trace("scan.trace.json")   # open in chrome://tracing / Perfetto
+
+When no tracer is active every hook is a no-op. Worker threads only see the
+tracer if work is submitted through ``src.core.executor`` or with
+``submit_in_context`` (plain ``executor.submit`` does not copy context
+variables).
+"""
+
+import contextvars
+import json
+import threading
+import time
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+# Span categories.
+CATEGORY_ENRICHER = "enricher"
+CATEGORY_HTTP = "http"
+CATEGORY_DNS = "dns"
+CATEGORY_TCP = "tcp"
+CATEGORY_TLS = "tls"
+CATEGORY_ANALYSIS = "analysis"
+
+_current_tracer: contextvars.ContextVar[Optional["Tracer"]] = contextvars.ContextVar(
+    "netscout_tracer", default=None
+)
+
+
+@dataclass
+class Span:
+    """One timed operation; times are seconds since the tracer was created."""
+
+    name: str
+    category: str
+    start: float
+    end: float = 0.0
+    thread_id: int = 0
+    outcome: str = "ok"
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return max(0.0, self.end - self.start)
+
+
+class Tracer:
+    """Thread-safe span collector for one scan (or one batch)."""
+
+    def __init__(self, name: str = "scan"):
+        self.name = name
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: List[Span] = []
+
+    def now(self) -> float:
+        """Seconds since the tracer was created."""
+        return time.perf_counter() - self._origin
+
+    def record(
+        self,
+        name: str,
+        category: str,
+        start: float,
+        end: Optional[float] = None,
+        outcome: str = "ok",
+        **attrs: Any,
+    ) -> Span:
+        """Add a finished span (``end`` defaults to now) and return it."""
+        span = Span(
+            name=name,
+            category=category,
+            start=start,
+            end=self.now() if end is None else end,
+            thread_id=threading.get_ident(),
+            outcome=outcome,
+            attrs=attrs,
+        )
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    @contextmanager
+    def span(self, name: str, category: str, **attrs: Any) -> Iterator[Span]:
+        """
+        Time the enclosed block. The yielded span may be annotated
+        (``span.outcome``, ``span.attrs``); an exception marks it "error".
+        """
+        span = Span(name=name, category=category, start=self.now(),
+                    thread_id=threading.get_ident(), attrs=attrs)
+        try:
+            yield span
+        except BaseException as exc:
+            span.outcome = "error"
+            span.attrs.setdefault("error", str(exc) or type(exc).__name__)
+            raise
+        finally:
+            span.end = self.now()
+            with self._lock:
+                self.spans.append(span)
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Aggregate spans per category and name (enricher name, HTTP host, ...):
+        ``{category: {name: {"count", "seconds", "bytes"}}}``, slowest first.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        totals: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for span in spans:
+            key = span.attrs.get("host") or span.name
+            entry = totals.setdefault(span.category, {}).setdefault(
+                key, {"count": 0, "seconds": 0.0, "bytes": 0}
+            )
+            entry["count"] += 1
+            entry["seconds"] += span.duration
+            entry["bytes"] += span.attrs.get("bytes") or 0
+        return {
+            category: dict(sorted(items.items(), key=lambda kv: kv[1]["seconds"], reverse=True))
+            for category, items in totals.items()
+        }
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Spans as Chrome trace-event JSON ("X" complete events, microseconds)."""
+        with self._lock:
+            spans = list(self.spans)
+        events = [
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": round(span.start * 1e6, 1),
+                "dur": round(span.duration * 1e6, 1),
+                "pid": 1,
+                "tid": span.thread_id,
+                "args": {"outcome": span.outcome, **span.attrs},
+            }
+            for span in sorted(spans, key=lambda s: s.start)
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"trace": self.name}}
+
+    def export_chrome_trace(self, path: str) -> None:
+        """Write ``to_chrome_trace()`` to ``path``."""
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.to_chrome_trace(), fh, default=str)
+
+
+def current_tracer() -> Optional[Tracer]:
+    """Tracer active in this context, if any."""
+    return _current_tracer.get()
+
+
+def context_with_tracer(tracer: Optional[Tracer]) -> contextvars.Context:
+    """Copy of the current context with ``tracer`` active (for new tasks)."""
+    context = contextvars.copy_context()
+    context.run(_current_tracer.set, tracer)
+    return context
+
+
+@contextmanager
+def use_tracer(tracer: Optional[Tracer]) -> Iterator[Optional[Tracer]]:
+    """Activate ``tracer`` for the enclosed (synchronous) block."""
+    token = _current_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current_tracer.reset(token)
+
+
+@contextmanager
+def trace_span(name: str, category: str, **attrs: Any) -> Iterator[Span]:
+    """``current_tracer().span(...)`` when tracing, else a throwaway span."""
+    tracer = current_tracer()
+    if tracer is None:
+        yield Span(name=name, category=category, start=0.0, attrs=attrs)
+        return
+    with tracer.span(name, category, **attrs) as span:
+        yield span
+
+
+def submit_in_context(executor: Executor, fn: Callable[..., Any], *args: Any) -> Future:
+    """``executor.submit`` that carries the caller's context (and tracer) into the worker."""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+# ---------------------------------------------------------------------------
+# aiohttp instrumentation
+# ---------------------------------------------------------------------------
+
+async def _on_request_start(_session, ctx, params) -> None:
+    ctx.tracer = current_tracer()
+    if ctx.tracer is not None:
+        ctx.start = ctx.tracer.now()
+        ctx.host = urlsplit(str(params.url)).hostname or ""
+        ctx.span = None
+
+
+async def _on_request_end(_session, ctx, params) -> None:
+    tracer = ctx.tracer
+    if tracer is None:
+        return
+    host = ctx.host
+    length = params.response.headers.get("Content-Length")
+    # Body chunks arrive after this hook; they extend the span and count bytes.
+    ctx.span = tracer.record(
+        f"{params.method} {host}",
+        CATEGORY_HTTP,
+        ctx.start,
+        outcome=str(params.response.status),
+        host=host,
+        url=str(params.url),
+        bytes=int(length) if length and length.isdigit() else 0,
+    )
+    ctx.counted_body = False
+
+
+async def _on_response_chunk(_session, ctx, params) -> None:
+    span = getattr(ctx, "span", None)
+    if span is None:
+        return
+    if not ctx.counted_body:
+        span.attrs["bytes"] = 0
+        ctx.counted_body = True
+    span.attrs["bytes"] += len(params.chunk)
+    span.end = ctx.tracer.now()
+
+
+async def _on_request_exception(_session, ctx, params) -> None:
+    tracer = ctx.tracer
+    if tracer is None:
+        return
+    host = ctx.host
+    tracer.record(
+        f"{params.method} {host}",
+        CATEGORY_HTTP,
+        ctx.start,
+        outcome="error",
+        host=host,
+        url=str(params.url),
+        error=str(params.exception) or type(params.exception).__name__,
+    )
+
+
+async def _on_dns_start(_session, ctx, params) -> None:
+    if getattr(ctx, "tracer", None) is not None:
+        ctx.dns_start = ctx.tracer.now()
+
+
+async def _on_dns_end(_session, ctx, params) -> None:
+    if getattr(ctx, "tracer", None) is not None:
+        ctx.tracer.record(f"resolve {params.host}", CATEGORY_DNS, ctx.dns_start, host=params.host)
+
+
+async def _on_connect_start(_session, ctx, params) -> None:
+    if getattr(ctx, "tracer", None) is not None:
+        ctx.connect_start = ctx.tracer.now()
+
+
+async def _on_connect_end(_session, ctx, params) -> None:
+    if getattr(ctx, "tracer", None) is not None:
+        ctx.tracer.record(f"connect {ctx.host}", CATEGORY_TCP, ctx.connect_start, host=ctx.host)
+
+
+def http_trace_config() -> aiohttp.TraceConfig:
+    """aiohttp TraceConfig that records request/DNS/connect spans on the active tracer."""
+    config = aiohttp.TraceConfig()
+    config.on_request_start.append(_on_request_start)
+    config.on_request_end.append(_on_request_end)
+    config.on_request_exception.append(_on_request_exception)
+    config.on_response_chunk_received.append(_on_response_chunk)
+    config.on_dns_resolvehost_start.append(_on_dns_start)
+    config.on_dns_resolvehost_end.append(_on_dns_end)
+    config.on_connection_create_start.append(_on_connect_start)
+    config.on_connection_create_end.append(_on_connect_end)
+    return config
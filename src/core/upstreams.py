@@ -0,0 +1,388 @@
+"""
+Upstream resolver pool - hedged queries and per-upstream health.
+
+With ``DNS_UPSTREAMS`` configured, the shared resolver (src/core/resolver.py)
+sends its cache misses here instead of to the system resolver:
+
+* each query goes to the next healthy upstream (round-robin);
+* if it has not answered within its recent ``hedge_percentile`` latency
+  (``hedge_delay`` until enough samples are in), the same query is also sent
+  to the fastest other upstream, and the first answer wins;
+* SERVFAIL / REFUSED answers move on to the next upstream at once;
+* an upstream that answers REFUSED, or times out ``max_failures`` times in a
+  row, is considered to be rate-limiting and is benched for
+  ``bench_seconds``;
+* ``stats()`` reports latency percentiles, errors and hedge wins per upstream.
+
+Both a blocking variant (one thread, ``selectors`` over one UDP socket per
+attempt) and an asyncio variant are provided; truncated answers are retried
+over TCP against the upstream that sent them.
+"""
+
+import asyncio
+import itertools
+import selectors
+import socket
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import dns.asyncquery
+import dns.exception
+import dns.flags
+import dns.inet
+import dns.message
+import dns.query
+import dns.rcode
+import dns.rdataclass
+import dns.resolver
+
+from src.config.settings import (
+    DNS_HEDGE_DELAY,
+    DNS_HEDGE_MIN_DELAY,
+    DNS_HEDGE_PERCENTILE,
+    DNS_UPSTREAM_BENCH_SECONDS,
+    DNS_UPSTREAM_MAX_FAILURES,
+    DNS_UPSTREAM_TIMEOUT,
+    DNS_UPSTREAMS,
+)
+
+Nameserver = Tuple[str, int]
+
+_LATENCY_SAMPLES = 200
+# Latency samples needed before the percentile replaces ``hedge_delay``.
+_MIN_SAMPLES = 20
+_ANSWERED = (dns.rcode.NOERROR, dns.rcode.NXDOMAIN)
+
+
+def parse_nameserver(spec: str) -> Nameserver:
+    """``"1.1.1.1"``, ``"1.1.1.1:5353"`` or ``"[::1]:53"`` -> (address, port)."""
+    spec = spec.strip()
+    if spec.startswith("["):
+        host, _, rest = spec[1:].partition("]")
+        return host, int(rest.lstrip(":") or 53)
+    if spec.count(":") == 1:
+        host, _, port = spec.partition(":")
+        return host, int(port)
+    return spec, 53
+
+
+class Upstream:
+    """Health of one upstream resolver (mutated under the pool lock)."""
+
+    def __init__(self, address: str, port: int = 53):
+        self.address = address
+        self.port = port
+        self.latencies: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self.queries = 0
+        self.answers = 0
+        self.timeouts = 0
+        self.servfails = 0
+        self.refused = 0
+        self.hedge_wins = 0
+        self.benched = 0
+        self.consecutive_failures = 0
+        self.benched_until = 0.0
+
+    @property
+    def name(self) -> str:
+        return f"{self.address}:{self.port}"
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if len(self.latencies) < _MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def stats(self, now: float) -> Dict[str, Any]:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "queries": self.queries,
+            "answers": self.answers,
+            "timeouts": self.timeouts,
+            "servfails": self.servfails,
+            "refused": self.refused,
+            "hedge_wins": self.hedge_wins,
+            "benched": self.benched,
+            "healthy": self.benched_until <= now,
+            "p50_ms": None if p50 is None else round(p50 * 1000, 1),
+            "p95_ms": None if p95 is None else round(p95 * 1000, 1),
+        }
+
+
+class UpstreamPool:
+    """
+    Hedged queries across ``nameservers``; see the module docstring.
+
+    Args:
+        nameservers: (address, port) pairs.
+        timeout: Overall time budget of one query (all attempts).
+        hedge_percentile: Latency percentile of the first upstream after which
+            the query is hedged.
+        hedge_delay: Hedge delay while an upstream has too few latency samples.
+        hedge_min_delay: Lower bound on the hedge delay.
+        max_failures: Consecutive timeouts after which an upstream is benched.
+        bench_seconds: How long a rate-limiting upstream is skipped.
+    """
+
+    def __init__(
+        self,
+        nameservers: Sequence[Nameserver],
+        timeout: float = DNS_UPSTREAM_TIMEOUT,
+        hedge_percentile: float = DNS_HEDGE_PERCENTILE,
+        hedge_delay: float = DNS_HEDGE_DELAY,
+        hedge_min_delay: float = DNS_HEDGE_MIN_DELAY,
+        max_failures: int = DNS_UPSTREAM_MAX_FAILURES,
+        bench_seconds: float = DNS_UPSTREAM_BENCH_SECONDS,
+    ):
+        if not nameservers:
+            raise ValueError("UpstreamPool needs at least one nameserver")
+        self.upstreams = [Upstream(address, port) for address, port in nameservers]
+        self.timeout = timeout
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.hedge_min_delay = hedge_min_delay
+        self.max_failures = max_failures
+        self.bench_seconds = bench_seconds
+        self._lock = threading.Lock()
+        self._rotation = itertools.cycle(range(len(self.upstreams)))
+        self._hedged = 0
+
+    @classmethod
+    def from_settings(cls) -> Optional["UpstreamPool"]:
+        """Pool for ``DNS_UPSTREAMS``, or None to use the system resolver."""
+        if not DNS_UPSTREAMS:
+            return None
+        return cls([parse_nameserver(spec) for spec in DNS_UPSTREAMS])
+
+    # -- public API ---------------------------------------------------------
+
+    def query(self, qname: str, rdtype: str) -> Any:
+        """Blocking hedged query; returns an Answer or the negative exception."""
+        request = dns.message.make_query(qname, rdtype)
+        order = self._order()
+        deadline = time.monotonic() + self.timeout
+        attempts: Dict[socket.socket, Tuple[Upstream, float]] = {}
+        selector = selectors.DefaultSelector()
+        next_index = 0
+        hedge_at = 0.0
+        try:
+            while True:
+                now = time.monotonic()
+                if next_index < len(order) and (now >= hedge_at or not attempts):
+                    upstream = order[next_index]
+                    sock = self._send(request, upstream)
+                    if sock is not None:
+                        selector.register(sock, selectors.EVENT_READ)
+                        attempts[sock] = (upstream, now)
+                        if next_index:
+                            self._count_hedge()
+                        hedge_at = now + self._hedge_after(upstream)
+                    next_index += 1
+                    continue
+                if now >= deadline or not attempts:
+                    break
+                wait = deadline if next_index >= len(order) else min(deadline, hedge_at)
+                for key, _ in selector.select(max(0.0, wait - now)):
+                    upstream, sent_at = attempts.pop(key.fileobj)
+                    selector.unregister(key.fileobj)
+                    response = self._receive(key.fileobj, request, upstream)
+                    key.fileobj.close()
+                    if response is None:
+                        continue
+                    if self._accept(upstream, response, time.monotonic() - sent_at, hedged=upstream is not order[0]):
+                        if response.flags & dns.flags.TC:
+                            response = dns.query.tcp(
+                                request, upstream.address, timeout=max(0.1, deadline - time.monotonic()),
+                                port=upstream.port,
+                            )
+                        return _outcome(request, response)
+                    hedge_at = 0.0  # failed fast: move on to the next upstream now
+        finally:
+            for sock in attempts:
+                sock.close()
+            selector.close()
+        raise self._exhausted(request, attempts)
+
+    async def query_async(self, qname: str, rdtype: str) -> Any:
+        """Async counterpart of ``query``."""
+        request = dns.message.make_query(qname, rdtype)
+        order = self._order()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        attempts: Dict["asyncio.Task[Optional[dns.message.Message]]", Tuple[Upstream, float]] = {}
+        next_index = 0
+        hedge_at = 0.0
+        try:
+            while True:
+                now = loop.time()
+                if next_index < len(order) and (now >= hedge_at or not attempts):
+                    upstream = order[next_index]
+                    task = asyncio.ensure_future(self._send_async(request, upstream, deadline - now))
+                    attempts[task] = (upstream, now)
+                    if next_index:
+                        self._count_hedge()
+                    hedge_at = now + self._hedge_after(upstream)
+                    next_index += 1
+                    continue
+                if now >= deadline or not attempts:
+                    break
+                wait = deadline if next_index >= len(order) else min(deadline, hedge_at)
+                done, _ = await asyncio.wait(
+                    attempts, timeout=max(0.0, wait - now), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    upstream, sent_at = attempts.pop(task)
+                    response = task.result()
+                    if response is None:
+                        self._timed_out(upstream)
+                        hedge_at = 0.0
+                        continue
+                    if self._accept(upstream, response, loop.time() - sent_at, hedged=upstream is not order[0]):
+                        if response.flags & dns.flags.TC:
+                            response = await dns.asyncquery.tcp(
+                                request, upstream.address, timeout=max(0.1, deadline - loop.time()),
+                                port=upstream.port,
+                            )
+                        return _outcome(request, response)
+                    hedge_at = 0.0
+        finally:
+            for task in attempts:
+                task.cancel()
+        raise self._exhausted(request, attempts)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "hedged": self._hedged,
+                "upstreams": {upstream.name: upstream.stats(now) for upstream in self.upstreams},
+            }
+
+    # -- attempts -----------------------------------------------------------
+
+    def _send(self, request: dns.message.Message, upstream: Upstream) -> Optional[socket.socket]:
+        family = dns.inet.af_for_address(upstream.address)
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        try:
+            dns.query.send_udp(sock, request, (upstream.address, upstream.port))
+        except OSError:
+            sock.close()
+            self._timed_out(upstream)
+            return None
+        with self._lock:
+            upstream.queries += 1
+        return sock
+
+    def _receive(
+        self,
+        sock: socket.socket,
+        request: dns.message.Message,
+        upstream: Upstream,
+    ) -> Optional[dns.message.Message]:
+        try:
+            response, _ = dns.query.receive_udp(
+                sock, (upstream.address, upstream.port), expiration=time.time(),
+                ignore_unexpected=True, ignore_errors=True, query=request,
+            )
+            return response
+        except (dns.exception.DNSException, OSError):
+            self._timed_out(upstream)
+            return None
+
+    async def _send_async(
+        self,
+        request: dns.message.Message,
+        upstream: Upstream,
+        timeout: float,
+    ) -> Optional[dns.message.Message]:
+        with self._lock:
+            upstream.queries += 1
+        try:
+            return await dns.asyncquery.udp(
+                request, upstream.address, timeout=max(0.01, timeout), port=upstream.port,
+                ignore_unexpected=True,
+            )
+        except (dns.exception.DNSException, OSError):
+            return None
+
+    # -- health -------------------------------------------------------------
+
+    def _exhausted(
+        self,
+        request: dns.message.Message,
+        in_flight: Dict[Any, Tuple[Upstream, float]],
+    ) -> dns.exception.DNSException:
+        """Error for a query without an answer; attempts still in flight timed out."""
+        if not in_flight:
+            return dns.resolver.NoNameservers(request=request, errors=[])
+        for upstream, _ in in_flight.values():
+            self._timed_out(upstream)
+        return dns.exception.Timeout()
+
+    def _order(self) -> List[Upstream]:
+        """Next healthy upstream first, then the others fastest first."""
+        now = time.monotonic()
+        with self._lock:
+            start = next(self._rotation)
+        rotated = self.upstreams[start:] + self.upstreams[:start]
+        healthy = [u for u in rotated if u.benched_until <= now]
+        if not healthy:
+            # Everyone is benched: better a rate-limited answer than none.
+            return sorted(rotated, key=lambda u: u.benched_until)
+        first, rest = healthy[0], healthy[1:]
+        return [first, *sorted(rest, key=lambda u: u.percentile(0.5) or 0.0)]
+
+    def _hedge_after(self, upstream: Upstream) -> float:
+        with self._lock:
+            threshold = upstream.percentile(self.hedge_percentile)
+        return max(self.hedge_min_delay, self.hedge_delay if threshold is None else threshold)
+
+    def _count_hedge(self) -> None:
+        with self._lock:
+            self._hedged += 1
+
+    def _accept(self, upstream: Upstream, response: dns.message.Message, latency: float, hedged: bool) -> bool:
+        """Record ``response``; True if it is an answer (NOERROR / NXDOMAIN)."""
+        rcode = response.rcode()
+        with self._lock:
+            if rcode in _ANSWERED:
+                upstream.answers += 1
+                upstream.latencies.append(latency)
+                upstream.consecutive_failures = 0
+                if hedged:
+                    upstream.hedge_wins += 1
+                return True
+            if rcode == dns.rcode.REFUSED:
+                upstream.refused += 1
+                self._bench(upstream)
+            else:
+                upstream.servfails += 1
+        return False
+
+    def _timed_out(self, upstream: Upstream) -> None:
+        with self._lock:
+            upstream.timeouts += 1
+            upstream.consecutive_failures += 1
+            if upstream.consecutive_failures >= self.max_failures:
+                self._bench(upstream)
+
+    def _bench(self, upstream: Upstream) -> None:
+        """Skip ``upstream`` for a while (lock held)."""
+        if upstream.benched_until <= time.monotonic():
+            upstream.benched += 1
+        upstream.benched_until = time.monotonic() + self.bench_seconds
+        upstream.consecutive_failures = 0
+
+
+def _outcome(request: dns.message.Message, response: dns.message.Message) -> Any:
+    """Answer / NXDOMAIN / NoAnswer, as ``dns.resolver.resolve`` would produce."""
+    question = request.question[0]
+    if response.rcode() == dns.rcode.NXDOMAIN:
+        return dns.resolver.NXDOMAIN(qnames=[question.name], responses={question.name: response})
+    answer = dns.resolver.Answer(question.name, question.rdtype, dns.rdataclass.IN, response)
+    if answer.rrset is None:
+        return dns.resolver.NoAnswer(response=response)
+    return answer
@@ -3,24 +3,77 @@ Shared aiohttp helpers for enrichers.
 
 Centralizes the aiohttp session factory so that DNS-resolver and SSL
 behaviour stay consistent across DNS / subdomain / tech / external-APIs.
+The pipeline opens one session per scan and hands it to every async
+enricher; standalone callers fall back to a private session
+(``nullcontext(session) if session else make_aiohttp_session(...)``).
 """
 
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
 import aiohttp
+from aiohttp.abc import AbstractResolver
+
+from src.core.tracing import http_trace_config
+from src.enrichers.ssl import tls_capture_trace_config
+
+
+@dataclass(frozen=True)
+class TransportOverride:
+    """
+    Process-wide redirection of every session built by ``make_aiohttp_session``.
+
+    Used by the record/replay harness (``src/core/replay.py``): ``resolver``
+    builds the host resolver for each new session, ``verify_ssl`` overrides
+    certificate verification and ``trace_configs`` adds extra aiohttp hooks.
+    """
+
+    resolver: Optional[Callable[[], AbstractResolver]] = None
+    verify_ssl: Optional[bool] = None
+    trace_configs: Tuple[Callable[[], aiohttp.TraceConfig], ...] = ()
+
+
+_override: Optional[TransportOverride] = None
+
+
+def set_transport_override(override: Optional[TransportOverride]) -> Optional[TransportOverride]:
+    """Install ``override`` (None removes it) and return the previous one."""
+    global _override
+    previous, _override = _override, override
+    return previous
 
 
 def make_aiohttp_session(
     headers: dict,
     *,
     verify_ssl: bool = True,
+    limit_per_host: int = 0,
 ) -> aiohttp.ClientSession:
     """
     Build an aiohttp client session with a thread-pool DNS resolver.
 
     The threaded resolver avoids `aiodns` startup issues on Windows and on
     hosts where the default event loop policy isn't compatible with c-ares.
+    ``limit_per_host`` caps concurrent connections to each upstream host
+    (0 = unlimited); batch scans use it as a per-provider HTTP limit.
+    Requests record spans on the active scan tracer, if any, and fill the
+    ``TlsCapture`` passed as their ``trace_request_ctx``.
     """
+    override = _override or TransportOverride()
+    resolver = override.resolver() if override.resolver else aiohttp.resolver.ThreadedResolver()
+    if override.verify_ssl is not None:
+        verify_ssl = override.verify_ssl
     connector = aiohttp.TCPConnector(
-        resolver=aiohttp.resolver.ThreadedResolver(),
+        resolver=resolver,
         ssl=verify_ssl,
+        limit_per_host=limit_per_host,
+    )
+    return aiohttp.ClientSession(
+        headers=headers,
+        connector=connector,
+        trace_configs=[
+            http_trace_config(),
+            tls_capture_trace_config(),
+            *(factory() for factory in override.trace_configs),
+        ],
     )
-    return aiohttp.ClientSession(headers=headers, connector=connector)
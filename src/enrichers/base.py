@@ -2,8 +2,11 @@
 Abstract Enricher - base protocol for OSINT modules.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Protocol, runtime_checkable
+from typing import Any, Dict, Optional, Protocol, Tuple, runtime_checkable
+
+import aiohttp
 
 from src.core.models import DNSInfo, WhoisInfo
 
@@ -25,6 +28,15 @@ class AbstractEnricher(ABC):
     """Base class for enrichers. Each enricher enriches scan context with new data."""
 
     name: str = "base"
+    # Context fields read by ``enrich``; the pipeline starts the enricher once every
+    # producer of these fields has finished.
+    requires: Tuple[str, ...] = ()
+    # Context fields returned by ``enrich`` (keys of the result dict).
+    produces: Tuple[str, ...] = ()
+    # Subset of ``produces`` handed to the pipeline early via
+    # ``src.core.context.publish``; enrichers requiring only these fields start
+    # as soon as they are published.
+    publishes: Tuple[str, ...] = ()
 
     @abstractmethod
     def enrich(self, domain: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -39,3 +51,37 @@ class AbstractEnricher(ABC):
             Dict with enrichment result (will be merged back into context).
         """
         ...
+
+
+class AsyncEnricher(AbstractEnricher):
+    """
+    Enricher whose work is a coroutine.
+
+    The pipeline awaits ``enrich_async`` on the scan's event loop and passes the
+    scan-wide aiohttp session, so connections and DNS lookups are pooled across
+    enrichers. ``enrich`` remains available for standalone callers.
+    """
+
+    @abstractmethod
+    async def enrich_async(
+        self,
+        domain: str,
+        context: Optional[Dict[str, Any]] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> Dict[str, Any]:
+        """
+        Async counterpart of ``enrich``.
+
+        Args:
+            domain: Target domain.
+            context: Accumulated scan data from previous enrichers.
+            session: Shared HTTP session; when None the enricher opens its own.
+
+        Returns:
+            Dict with enrichment result (will be merged back into context).
+        """
+        ...
+
+    def enrich(self, domain: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run ``enrich_async`` on a private event loop (no running loop in this thread)."""
+        return asyncio.run(self.enrich_async(domain, context))
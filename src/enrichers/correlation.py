@@ -0,0 +1,77 @@
+"""
+Correlation Enricher - subdomain→IP map and reverse DNS, inside the pipeline.
+
+Runs as soon as DNS and subdomains are merged, alongside SSL / tech, instead
+of after the whole pipeline. Its ``ip_to_subdomains`` map feeds the port,
+GeoIP and external-API enrichers. Addresses the liveness pre-probe already
+resolved are reused. Certificate sharing depends on SSL results
+and is added by the orchestrator when the scan finishes.
+"""
+
+from typing import Any, Dict, List, Optional, Set
+
+from src.analysis.correlation import _resolve_subdomain_a, build_correlation_summary
+from src.analysis.normalizer import normalize_domains
+from src.core.models import DNSInfo, LivenessInfo
+from src.core.shared import ResourceLimits, SharedWork, dns_slot, shared_call
+from src.enrichers.base import AbstractEnricher
+from src.enrichers.dns import _resolve_ptr
+
+
+class CorrelationEnricher(AbstractEnricher):
+    """
+    Enricher grouping subdomains by IP, with PTR names for every IP.
+
+    PTR names of the apex A/AAAA records come from ``dns_info`` (the DNS
+    enricher already looked them up); only IPs found through subdomains are
+    reverse-resolved here. With a batch ``SharedWork`` memo, A and PTR lookups
+    are shared with other domains of the batch.
+    """
+
+    name = "correlation"
+    requires = ("dns_info", "subdomains", "liveness")
+    produces = ("correlation",)
+
+    def __init__(
+        self,
+        shared: Optional[SharedWork] = None,
+        limits: Optional[ResourceLimits] = None,
+    ):
+        self.shared = shared
+        self.limits = limits
+
+    def _resolve_a(self, subdomain: str) -> List[str]:
+        def resolve() -> List[str]:
+            with dns_slot(self.limits):
+                return _resolve_subdomain_a(subdomain)
+
+        return shared_call(self.shared, "subdomain_a", subdomain, resolve)
+
+    def _ptr(self, ip: str) -> Optional[str]:
+        _, ptr = shared_call(self.shared, "ptr", ip, lambda: _resolve_ptr(ip, self.limits))
+        return ptr.rstrip(".") if ptr else None
+
+    def enrich(self, domain: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        context = context or {}
+        dns_info: Optional[DNSInfo] = context.get("dns_info")
+        subdomains = normalize_domains(context.get("subdomains") or [])
+
+        known: Dict[str, Optional[str]] = {}
+        if dns_info and not dns_info.error:
+            looked_up: Set[str] = set(dns_info.a_records or []) | set(dns_info.aaaa_records or [])
+            known = {ip: None for ip in looked_up}
+            known.update({ip: ptr.rstrip(".") for ip, ptr in dns_info.ptr_records.items()})
+
+        def lookup(ip: str) -> Optional[str]:
+            return known[ip] if ip in known else self._ptr(ip)
+
+        liveness: Optional[LivenessInfo] = context.get("liveness")
+
+        def resolve(subdomain: str) -> List[str]:
+            entry = liveness.hosts.get(subdomain) if liveness else None
+            return list(entry.addresses) if entry is not None else self._resolve_a(subdomain)
+
+        correlation = build_correlation_summary(
+            subdomains, dns_info, None, domain, resolve=resolve, lookup=lookup
+        )
+        return {"correlation": correlation}
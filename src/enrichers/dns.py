@@ -1,9 +1,15 @@
 """
 DNS Enricher - resolves DNS records (A/AAAA/MX/TXT/NS/CNAME/SOA + reverse PTR).
+
+The apex A/AAAA addresses are published as ``ip_addresses`` as soon as they
+resolve, so the port scan starts while MX/TXT, PTR and AXFR are in flight.
+``dns_info`` is published once every record type is in, so its dependents do
+not wait for PTR lookups or zone-transfer timeouts; the final ``dns_info``
+adds those. AXFR runs against all nameservers in parallel, concurrently with
+PTR lookups.
 """
 
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import dns.exception
@@ -11,7 +17,12 @@ import dns.query
 import dns.resolver
 import dns.zone
 
+from src.core.context import publish
 from src.core.models import DNSInfo, MXRecord
+from src.core.shared import ResourceLimits, SharedWork, dns_slot, shared_call
+from src.core.executor import POOL_DNS, POOL_ENRICHER, POOL_SOCKET, get_executor
+from src.core.resolver import get_resolver
+from src.core.tracing import CATEGORY_DNS, trace_span
 from src.enrichers.base import AbstractEnricher
 
 logger = logging.getLogger(__name__)
@@ -43,16 +54,25 @@ _RESOLUTION_PLAN: List[Tuple[str, str, Callable[[Any], Any]]] = [
 ]
 
 
-def _resolve_record(domain: str, field: str, rdtype: str, mapper: Callable[[Any], Any]) -> Tuple[str, Optional[Any]]:
+def _resolve_record(
+    domain: str,
+    field: str,
+    rdtype: str,
+    mapper: Callable[[Any], Any],
+    limits: Optional[ResourceLimits] = None,
+) -> Tuple[str, Optional[Any]]:
     try:
-        return field, mapper(dns.resolver.resolve(domain, rdtype))
+        with dns_slot(limits), trace_span(f"{rdtype} {domain}", CATEGORY_DNS):
+            answers = get_resolver().resolve(domain, rdtype)
+        return field, mapper(answers)
     except _DNS_ERRORS:
         return field, None
 
 
-def _resolve_ptr(ip: str) -> Tuple[str, Optional[str]]:
+def _resolve_ptr(ip: str, limits: Optional[ResourceLimits] = None) -> Tuple[str, Optional[str]]:
     try:
-        ptr_answers = dns.resolver.resolve_address(ip)
+        with dns_slot(limits), trace_span(f"PTR {ip}", CATEGORY_DNS):
+            ptr_answers = get_resolver().resolve_address(ip)
         if ptr_answers:
             return ip, str(ptr_answers[0])
     except _DNS_ERRORS:
@@ -60,69 +80,125 @@ def _resolve_ptr(ip: str) -> Tuple[str, Optional[str]]:
     return ip, None
 
 
+def _resolve_ns_address(ns: str, limits: Optional[ResourceLimits] = None) -> Optional[str]:
+    """Resolve a nameserver host to its first IPv4 address (AXFR needs an address)."""
+    try:
+        with dns_slot(limits), trace_span(f"A {ns}", CATEGORY_DNS):
+            answers = get_resolver().resolve(ns, "A")
+        return str(answers[0]) if answers else None
+    except _DNS_ERRORS:
+        return None
+
+
 class DnsEnricher(AbstractEnricher):
-    """Enricher for DNS records (A, AAAA, MX, TXT, NS, CNAME, SOA + PTR)."""
+    """
+    Enricher for DNS records (A, AAAA, MX, TXT, NS, CNAME, SOA + PTR).
+
+    With a batch ``SharedWork`` memo, PTR lookups (keyed by IP) and nameserver
+    address lookups (keyed by NS) run once across all domains of the batch;
+    ``ResourceLimits`` caps concurrent queries.
+    """
 
     name = "dns"
+    produces = ("dns_info", "ip_addresses")
+    publishes = ("dns_info", "ip_addresses")
+
+    def __init__(
+        self,
+        shared: Optional[SharedWork] = None,
+        limits: Optional[ResourceLimits] = None,
+    ):
+        self.shared = shared
+        self.limits = limits
+
+    def _ns_address(self, ns: str) -> Optional[str]:
+        return shared_call(self.shared, "ns_address", ns, lambda: _resolve_ns_address(ns, self.limits))
+
+    def _ptr(self, ip: str) -> Tuple[str, Optional[str]]:
+        return shared_call(self.shared, "ptr", ip, lambda: _resolve_ptr(ip, self.limits))
+
+    def _axfr_one(self, domain: str, ns: str) -> bool:
+        """AXFR against one nameserver; per-NS failure is expected and silent."""
+        ns_address = self._ns_address(str(ns).rstrip("."))
+        if not ns_address:
+            return False
+        try:
+            return bool(dns.zone.from_xfr(dns.query.xfr(ns_address, domain, lifetime=5)))
+        except Exception:
+            return False
 
     def _try_zone_transfer(self, domain: str, ns_records: list) -> Tuple[bool, Optional[str]]:
-        """Attempt AXFR zone transfer for the first three NSes (informational only)."""
+        """Attempt AXFR against the first three NSes in parallel (informational only)."""
         try:
-            for ns in (ns_records or [])[:3]:
-                ns_clean = str(ns).rstrip(".")
-                try:
-                    zone = dns.zone.from_xfr(dns.query.xfr(ns_clean, domain, lifetime=5))
-                    if zone:
-                        return True, None
-                except Exception:
-                    # Per-NS failure is expected and silent: AXFR is rarely allowed.
-                    continue
+            executor = get_executor()
+            futures = [
+                executor.submit(POOL_SOCKET, self._axfr_one, domain, ns)
+                for ns in (ns_records or [])[:3]
+            ]
+            for future in executor.as_completed(futures):
+                if future.result():
+                    for other in futures:
+                        other.cancel()
+                    return True, None
         except Exception as exc:
             return False, str(exc)
         return False, None
 
     def _resolve_records(self, domain: str, result: DNSInfo) -> None:
-        with ThreadPoolExecutor(max_workers=len(_RESOLUTION_PLAN)) as executor:
-            futures = [
-                executor.submit(_resolve_record, domain, field, rdtype, mapper)
-                for field, rdtype, mapper in _RESOLUTION_PLAN
-            ]
-            for future in as_completed(futures):
-                try:
-                    field, value = future.result()
-                    if value is not None:
-                        setattr(result, field, value)
-                except Exception as exc:
-                    logger.debug("DNS resolve failed for %s: %s", domain, exc)
+        """Resolve every record type; publish the addresses once A and AAAA are in."""
+        executor = get_executor()
+        futures = {
+            executor.submit(POOL_DNS, _resolve_record, domain, field, rdtype, mapper, self.limits): field
+            for field, rdtype, mapper in _RESOLUTION_PLAN
+        }
+        pending_addresses = {"a_records", "aaaa_records"}
+        for future in executor.as_completed(futures):
+            try:
+                field, value = future.result()
+                if value is not None:
+                    setattr(result, field, value)
+            except Exception as exc:
+                logger.debug("DNS resolve failed for %s: %s", domain, exc)
+            if futures[future] in pending_addresses:
+                pending_addresses.discard(futures[future])
+                if not pending_addresses:
+                    publish({"ip_addresses": _addresses(result)})
 
     def _resolve_ptr_records(self, ips: List[str], result: DNSInfo) -> None:
-        if not ips:
-            return
-        with ThreadPoolExecutor(max_workers=min(10, len(ips))) as executor:
-            futures = {executor.submit(_resolve_ptr, ip): ip for ip in ips}
-            for future in as_completed(futures):
-                try:
-                    ip, ptr = future.result()
-                    if ptr:
-                        result.ptr_records[ip] = ptr
-                except Exception as exc:
-                    logger.debug("PTR resolve failed for %s: %s", futures[future], exc)
+        executor = get_executor()
+        futures = {executor.submit(POOL_DNS, self._ptr, ip): ip for ip in ips}
+        for future in executor.as_completed(futures):
+            try:
+                ip, ptr = future.result()
+                if ptr:
+                    result.ptr_records[ip] = ptr
+            except Exception as exc:
+                logger.debug("PTR resolve failed for %s: %s", futures[future], exc)
 
     def enrich(self, domain: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         result = DNSInfo(domain=domain)
 
         try:
             self._resolve_records(domain, result)
+            # A copy: PTR and AXFR results are filled into ``result`` below.
+            publish({"dns_info": result.model_copy(deep=True)})
 
+            executor = get_executor()
+            axfr = None
             if result.ns_records:
                 result.zone_transfer_attempted = True
-                available, err = self._try_zone_transfer(domain, result.ns_records)
-                result.zone_transfer_available = available
-                result.zone_transfer_error = err
+                axfr = executor.submit(POOL_ENRICHER, self._try_zone_transfer, domain, result.ns_records)
 
-            ips = (result.a_records or []) + (result.aaaa_records or [])
-            self._resolve_ptr_records(ips, result)
+            self._resolve_ptr_records(_addresses(result), result)
+
+            if axfr is not None:
+                for future in executor.as_completed([axfr]):
+                    result.zone_transfer_available, result.zone_transfer_error = future.result()
         except Exception as exc:
             result.error = str(exc)
 
-        return {"dns_info": result}
+        return {"dns_info": result, "ip_addresses": _addresses(result)}
+
+
+def _addresses(result: DNSInfo) -> List[str]:
+    return (result.a_records or []) + (result.aaaa_records or [])
@@ -9,7 +9,8 @@ Providers:
     * SecurityTrails  - WHOIS / tags / current DNS metadata
     * ZoomEye         - host search by domain
     * Wayback Machine - first archived snapshot
-    * SSL Labs        - TLS / cipher audit (long-poll, up to ~2 min)
+    * SSL Labs        - TLS / cipher audit (long-poll, up to ~2 min; scans
+                        query it only with SSLLABS_ENABLED)
 """
 
 import asyncio
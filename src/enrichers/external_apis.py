@@ -4,9 +4,14 @@ External APIs orchestrator.
 The actual provider clients live in :mod:`src.enrichers.external` (split by
 domain). This module owns:
 
-    * ``ExternalApiEnricher``     - the AbstractEnricher entry point used by
-      the scan pipeline; gathers all clients in parallel and merges them into
-      a single ``external_apis`` payload.
+    * ``ExternalApiEnricher``     - the AsyncEnricher entry point used by
+      the scan pipeline; gathers all clients in parallel on the scan's shared
+      session and merges them into a single ``external_apis`` payload.
+      The local TLS audit (``tls_audit``, see :mod:`src.enrichers.tls_audit`)
+      runs alongside as one more task. It starts on ``dns_info`` alone.
+    * ``ExternalIpApiEnricher``   - the per-IP providers for the subdomain
+      addresses found by correlation, as a later ``external_ip_apis``
+      section; ``merge_external_apis`` folds it into ``external_apis``.
     * ``fetch_single_external_api`` - synchronous helper used by
       Investigation mode to fetch one provider on demand.
 
@@ -21,8 +26,9 @@ To add a new provider:
 
 import asyncio
 import logging
+from contextlib import nullcontext
 from dataclasses import dataclass
-from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
 
 import aiohttp
 
@@ -32,12 +38,16 @@ from src.config.settings import (
     CRIMINALIP_API_KEY,
     PULSEDIVE_API_KEY,
     SECURITYTRAILS_API_KEY,
+    SSLLABS_ENABLED,
     USER_AGENT,
     VIRUSTOTAL_API_KEY,
     ZOOMEYE_API_KEY,
 )
+from src.analysis.correlation import correlated_ips
+from src.core.shared import ResourceLimits, SharedWork, shared_call_async
 from src.enrichers._http import make_aiohttp_session
-from src.enrichers.base import AbstractEnricher
+from src.enrichers.base import AsyncEnricher
+from src.enrichers.tls_audit import audit_tls
 from src.enrichers.external import (
     fetch_abuseipdb_check,
     fetch_alienvault_otx_domain,
@@ -69,8 +79,15 @@ class _TaskSpec:
     enabled: bool = True
 
 
-def _domain_task_specs(domain: str) -> List[_TaskSpec]:
-    """Return per-domain provider tasks (skipped silently when key is absent)."""
+def _domain_task_specs(
+    domain: str,
+    apex_ips: Sequence[str] = (),
+    limits: Optional[ResourceLimits] = None,
+) -> List[_TaskSpec]:
+    """
+    Return per-domain provider tasks (skipped silently when key is absent).
+    The local TLS audit connects under the batch ``limits``, when given.
+    """
     return [
         _TaskSpec(
             "virustotal",
@@ -102,9 +119,14 @@ def _domain_task_specs(domain: str) -> List[_TaskSpec]:
             "wayback",
             lambda session, _d=domain: fetch_wayback_first_snapshot(session, _d),
         ),
+        _TaskSpec(
+            "tls_audit",
+            lambda session, _d=domain: audit_tls(_d, apex_ips, limits=limits),
+        ),
         _TaskSpec(
             "ssllabs",
             lambda session, _d=domain: fetch_ssllabs_analyze(session, _d),
+            enabled=SSLLABS_ENABLED,
         ),
         _TaskSpec(
             "openphish",
@@ -133,20 +155,29 @@ def _domain_task_specs(domain: str) -> List[_TaskSpec]:
     ]
 
 
-def _ip_task_specs(ips: List[str]) -> List[_TaskSpec]:
-    """Return per-IP provider tasks (RIPEstat always; AbuseIPDB if key set)."""
+def _ip_task_specs(ips: List[str], shared: Optional[SharedWork] = None) -> List[_TaskSpec]:
+    """
+    Return per-IP provider tasks (RIPEstat always; AbuseIPDB if key set).
+
+    With a batch ``shared`` memo each IP is queried once per provider.
+    """
     specs: List[_TaskSpec] = []
     for ip in ips:
         specs.append(_TaskSpec(
             "ripestat",
-            lambda session, _ip=ip: fetch_ripestat_ip(session, _ip),
+            lambda session, _ip=ip: shared_call_async(
+                shared, "ripestat", _ip, lambda: fetch_ripestat_ip(session, _ip)
+            ),
         ))
     if ABUSEIPDB_API_KEY:
         for ip in ips:
             specs.append(_TaskSpec(
                 "abuseipdb",
-                lambda session, _ip=ip: fetch_abuseipdb_check(
-                    session, _ip, ABUSEIPDB_API_KEY
+                lambda session, _ip=ip: shared_call_async(
+                    shared,
+                    "abuseipdb",
+                    _ip,
+                    lambda: fetch_abuseipdb_check(session, _ip, ABUSEIPDB_API_KEY),
                 ),
             ))
     return specs
@@ -187,14 +218,20 @@ def _merge_results(
     return merged
 
 
-async def _fetch_external_apis_async(domain: str, ips: List[str]) -> Dict[str, Any]:
+async def _fetch_external_apis_async(
+    domain: str,
+    ips: List[str],
+    session: Optional[aiohttp.ClientSession] = None,
+    shared: Optional[SharedWork] = None,
+    apex_ips: Sequence[str] = (),
+    domain_tasks: bool = True,
+    limits: Optional[ResourceLimits] = None,
+) -> Dict[str, Any]:
     """Run every applicable provider in parallel and aggregate the responses."""
     headers = {"User-Agent": USER_AGENT}
-    async with make_aiohttp_session(headers) as session:
-        active = [
-            spec for spec in _domain_task_specs(domain) + _ip_task_specs(ips)
-            if spec.enabled
-        ]
+    async with (nullcontext(session) if session else make_aiohttp_session(headers)) as session:
+        specs = _domain_task_specs(domain, apex_ips, limits) if domain_tasks else []
+        active = [spec for spec in specs + _ip_task_specs(ips, shared) if spec.enabled]
         if not active:
             return {}
         results = await asyncio.gather(
@@ -204,6 +241,21 @@ async def _fetch_external_apis_async(domain: str, ips: List[str]) -> Dict[str, A
         return _merge_results(list(zip([spec.key for spec in active], results)))
 
 
+def merge_external_apis(
+    external_apis: Optional[Dict[str, Any]],
+    ip_apis: Optional[Dict[str, Any]],
+) -> Optional[Dict[str, Any]]:
+    """``external_apis`` with the per-IP sections of ``ip_apis`` (``ExternalIpApiEnricher``) merged in."""
+    if not ip_apis:
+        return external_apis
+    merged = dict(external_apis or {})
+    for key in ("ripestat", "abuseipdb"):
+        ips = (ip_apis.get(key) or {}).get("ips")
+        if ips:
+            merged[key] = {"ips": {**((merged.get(key) or {}).get("ips") or {}), **ips}}
+    return merged or None
+
+
 def fetch_single_external_api(
     api_name: str,
     domain: Optional[str] = None,
@@ -234,21 +286,24 @@ def fetch_single_external_api(
     return asyncio.run(_run())
 
 
+def _apex_ips(context: Optional[Dict[str, Any]]) -> List[str]:
+    """The apex A/AAAA addresses from ``dns_info`` (dict or model)."""
+    dns = (context or {}).get("dns_info")
+    if isinstance(dns, dict):
+        return (dns.get("a_records") or []) + (dns.get("aaaa_records") or [])
+    if dns is not None and hasattr(dns, "a_records"):
+        return list(getattr(dns, "a_records") or []) + list(getattr(dns, "aaaa_records") or [])
+    return []
+
+
 def _collect_unique_ips(context: Optional[Dict[str, Any]]) -> List[str]:
-    """Pull IPv4/IPv6 addresses from DNS + port-scan context, dedup'd and capped."""
+    """Pull IPv4/IPv6 addresses from DNS, port-scan and correlation context, dedup'd and capped."""
     if not context:
         return []
     ips: List[str] = []
     seen: Set[str] = set()
 
-    dns = context.get("dns_info")
-    if isinstance(dns, dict):
-        candidates = (dns.get("a_records") or []) + (dns.get("aaaa_records") or [])
-    elif dns is not None and hasattr(dns, "a_records"):
-        candidates = list(getattr(dns, "a_records") or []) + list(getattr(dns, "aaaa_records") or [])
-    else:
-        candidates = []
-    for ip in candidates:
+    for ip in _apex_ips(context):
         if ip and ip not in seen:
             ips.append(ip)
             seen.add(ip)
@@ -259,15 +314,70 @@ def _collect_unique_ips(context: Optional[Dict[str, Any]]) -> List[str]:
             if ip and ip not in seen:
                 ips.append(ip)
                 seen.add(ip)
+
+    for ip in correlated_ips(context.get("correlation")):
+        if ip not in seen:
+            ips.append(ip)
+            seen.add(ip)
     return ips[:_MAX_IPS]
 
 
-class ExternalApiEnricher(AbstractEnricher):
-    """Aggregate enricher that fans out to every configured external provider."""
+class ExternalApiEnricher(AsyncEnricher):
+    """
+    Aggregate enricher that fans out to every configured external provider.
 
-    name = "external_apis"
+    In the pipeline it starts as soon as DNS is merged, with the IPs known by
+    then (the apex addresses); subdomain addresses are looked up by
+    ``ExternalIpApiEnricher`` once correlation has them.
+    """
 
-    def enrich(self, domain: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    name = "external_apis"
+    requires = ("dns_info",)
+    produces = ("external_apis",)
+
+    def __init__(self, shared: Optional[SharedWork] = None, limits: Optional[ResourceLimits] = None):
+        # Batch scans share one memo so per-IP (ASN, abuse) lookups run once,
+        # and their connect budget caps the TLS audit's handshakes.
+        self.shared = shared
+        self.limits = limits
+
+    async def enrich_async(
+        self,
+        domain: str,
+        context: Optional[Dict[str, Any]] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> Dict[str, Any]:
         ips = _collect_unique_ips(context)
-        result = asyncio.run(_fetch_external_apis_async(domain, ips))
+        result = await _fetch_external_apis_async(
+            domain, ips, session, self.shared, _apex_ips(context), limits=self.limits
+        )
         return {"external_apis": result} if result else {}
+
+
+class ExternalIpApiEnricher(AsyncEnricher):
+    """
+    Per-IP providers (RIPEstat, AbuseIPDB) for the subdomain addresses from
+    correlation that ``ExternalApiEnricher`` did not see, up to ``_MAX_IPS``
+    addresses in total. Its ``external_ip_apis`` section is merged into
+    ``external_apis`` when the scan result is built.
+    """
+
+    name = "external_ip_apis"
+    requires = ("dns_info", "correlation")
+    produces = ("external_ip_apis",)
+
+    def __init__(self, shared: Optional[SharedWork] = None):
+        self.shared = shared
+
+    async def enrich_async(
+        self,
+        domain: str,
+        context: Optional[Dict[str, Any]] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> Dict[str, Any]:
+        apex = set(_apex_ips(context))
+        ips = [ip for ip in _collect_unique_ips(context) if ip not in apex]
+        if not ips:
+            return {}
+        result = await _fetch_external_apis_async(domain, ips, session, self.shared, domain_tasks=False)
+        return {"external_ip_apis": result} if result else {}
@@ -0,0 +1,419 @@
+"""
+Technology fingerprint rules - a Wappalyzer-style database compiled once per
+process and matched against every response of the tech probe.
+
+The ruleset (``TECH_FINGERPRINTS``, else ``data/fingerprints/technologies.json``;
+a directory of ``*.json`` files is merged) maps technology names to rules::
+
+    "WordPress": {
+        "cats": ["CMS"],
+        "headers": {"X-Pingback": "/xmlrpc\\.php$"},
+        "cookies": {"wordpress_test_cookie": ""},
+        "meta": {"generator": "^WordPress ?([\\d.]+)?\\;version:\\1"},
+        "scriptSrc": "/wp-(?:content|includes)/",
+        "html": "<link [^>]+/wp-(?:content|includes)/",
+        "favicon": [1234567890],
+        "implies": ["PHP", "MySQL"]
+    }
+
+Patterns are case-insensitive regexes; an empty pattern only needs the
+header, cookie or meta tag to be present. ``\\;version:\\1`` takes the
+version from a capture group. ``favicon`` lists hashes as computed by the
+tech probe.
+
+Header, cookie and meta rules are indexed by name, so only the rules of names
+a response actually has run. Body and script-source rules are prefiltered: the
+longest literal every match must contain is taken from each pattern, and all
+literals are compiled into one trie-shaped regex. One pass over the page finds
+which literals occur, and only the rules whose literal occurred are tried.
+Patterns without a usable literal are tried on every page.
+"""
+
+import json
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Pattern, Sequence, Set, Tuple
+
+from src.config.settings import TECH_FINGERPRINTS
+from src.core.models import TechDetection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FINGERPRINTS = Path(__file__).resolve().parent.parent.parent / "data" / "fingerprints" / "technologies.json"
+# Shorter literals occur on nearly every page and would not narrow anything.
+_MIN_LITERAL = 3
+_SCRIPT_SRC = re.compile(r"<script[^>]+\bsrc\s*=\s*[\"']?([^\"'\s>]+)", re.I)
+_VERSION_GROUP = re.compile(r"\\(\d)")
+
+
+@dataclass(frozen=True)
+class _Rule:
+    tech: str
+    source: str
+    regex: Optional[Pattern[str]]  # None: presence is enough
+    version: str = ""
+
+    def match(self, value: str) -> Optional[str]:
+        """Version template expanded ("" without one), or None when ``value`` does not match."""
+        if self.regex is None:
+            return ""
+        found = self.regex.search(value)
+        if found is None:
+            return None
+        if not self.version:
+            return ""
+        groups = found.groups()
+        return _VERSION_GROUP.sub(
+            lambda ref: (groups[int(ref.group(1)) - 1] or "") if 0 < int(ref.group(1)) <= len(groups) else "",
+            self.version,
+        ).strip()
+
+
+class _LiteralIndex:
+    """Rules of one text source (html, scriptSrc), prefiltered by their required literals."""
+
+    def __init__(self, rules: Iterable[Tuple[Optional[List[str]], _Rule]]):
+        self._rules: List[_Rule] = []
+        self._by_literal: Dict[str, List[int]] = {}
+        self.always: List[_Rule] = []
+        for literals, rule in rules:
+            if literals is None:
+                self.always.append(rule)
+                continue
+            for literal in literals:
+                self._by_literal.setdefault(literal, []).append(len(self._rules))
+            self._rules.append(rule)
+        self._trie: Dict[str, Any] = {}
+        for literal in self._by_literal:
+            node = self._trie
+            for char in literal:
+                node = node.setdefault(char, {})
+            node[""] = True
+        self._scanner = re.compile(_trie_pattern(self._trie)) if self._by_literal else None
+        self._contained: Dict[str, FrozenSet[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rules) + len(self.always)
+
+    def candidates(self, text: str) -> List[_Rule]:
+        """Rules that may match ``text`` (in ruleset order): those with a literal occurring in it, plus ``always``."""
+        if self._scanner is None or not text:
+            return list(self.always)
+        # Each search reports the longest literal at the first position holding
+        # one; resuming one character later also finds literals overlapping it.
+        # Shorter literals at (or inside) a reported one are its substrings.
+        text = text.lower()
+        present: Set[str] = set()
+        found = self._scanner.search(text)
+        while found is not None:
+            present |= self._substrings(found.group())
+            found = self._scanner.search(text, found.start() + 1)
+        indexes = sorted({index for literal in present for index in self._by_literal[literal]})
+        return [self._rules[index] for index in indexes] + self.always
+
+    def _substrings(self, literal: str) -> FrozenSet[str]:
+        """Literals of this index occurring in ``literal`` (itself included)."""
+        cached = self._contained.get(literal)
+        if cached is None:
+            found = set()
+            for start in range(len(literal)):
+                node = self._trie
+                for end in range(start, len(literal)):
+                    node = node.get(literal[end])
+                    if node is None:
+                        break
+                    if "" in node:
+                        found.add(literal[start:end + 1])
+            cached = self._contained[literal] = frozenset(found)
+        return cached
+
+
+def _trie_pattern(node: Dict[str, Any]) -> str:
+    """Regex matching the longest word of ``node`` at the current position."""
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    # Words continuing past this one are tried first (greedy), so the match is the longest.
+    return f"(?:{body})?" if "" in node else body
+
+
+def _alternatives(pattern: str) -> List[str]:
+    """Top-level ``|`` branches of ``pattern``; a pattern that is one group is unwrapped first."""
+    if pattern.startswith("(") and _group_spans(pattern):
+        inner = pattern[3:-1] if pattern.startswith("(?:") else pattern[1:-1]
+        if not inner.startswith("?"):  # lookarounds, inline flags, named groups
+            return _alternatives(inner)
+    branches, depth, start, i = [], 0, 0, 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            i = _class_end(pattern, i + 1)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            branches.append(pattern[start:i])
+            start = i + 1
+        i += 1
+    branches.append(pattern[start:])
+    return branches
+
+
+def _group_spans(pattern: str) -> bool:
+    """True when the group opened at ``pattern[0]`` closes at its last character."""
+    depth, i = 0, 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            i = _class_end(pattern, i + 1)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i == len(pattern) - 1
+        i += 1
+    return False
+
+
+def _class_end(pattern: str, i: int) -> int:
+    """Index just past the character class whose body starts at ``i``."""
+    # A leading "]" (or "^]") is part of the class.
+    if pattern[i:i + 1] == "^":
+        i += 1
+    if pattern[i:i + 1] == "]":
+        i += 1
+    while i < len(pattern) and pattern[i] != "]":
+        i += 2 if pattern[i] == "\\" else 1
+    return i + 1
+
+
+def _required_literals(pattern: str) -> Optional[List[str]]:
+    """One required literal per top-level alternative of ``pattern``, or None if any lacks one."""
+    literals = [_required_literal(branch) for branch in _alternatives(pattern)]
+    return None if any(literal is None for literal in literals) else literals
+
+
+def _required_literal(pattern: str) -> Optional[str]:
+    """
+    Longest literal (lowercased) every match of ``pattern`` contains, or None.
+
+    Only top-level text counts: groups, character classes, escapes such as
+    ``\\d`` and quantified characters end a literal, and a top-level ``|``
+    means no single literal is required.
+    """
+    best, current, depth, i = "", [], 0, 0
+
+    def flush() -> None:
+        nonlocal best
+        if len(current) > len(best):
+            best = "".join(current)
+        current.clear()
+
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            escaped = pattern[i + 1:i + 2]
+            i += 2
+            if escaped and not escaped.isalnum():
+                if depth == 0:
+                    current.append(escaped)
+            else:
+                flush()
+            continue
+        i += 1
+        if char == "[":
+            flush()
+            i = _class_end(pattern, i)
+        elif char == "(":
+            flush()
+            depth += 1
+        elif char == ")":
+            depth = max(0, depth - 1)
+        elif char == "|":
+            if depth == 0:
+                return None
+        elif char in "?*{":
+            # The quantified character is optional (or repeated a variable number of times).
+            if depth == 0 and current:
+                current.pop()
+            flush()
+            if char == "{":
+                close = pattern.find("}", i)
+                i = close + 1 if close != -1 else i
+        elif char == "+":
+            flush()
+        elif char in ".^$":
+            flush()
+        elif depth == 0:
+            current.append(char)
+    flush()
+    return best.lower() if len(best) >= _MIN_LITERAL else None
+
+
+def _patterns(value: Any) -> List[str]:
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else [item for item in value if isinstance(item, str)]
+
+
+def _compile(tech: str, source: str, pattern: str) -> Optional[Tuple[Optional[List[str]], _Rule]]:
+    """(required literals, rule) for one ``regex\\;version:...`` pattern; None when it does not compile."""
+    regex_src, *tags = pattern.split("\\;")
+    version = next((tag[len("version:"):] for tag in tags if tag.startswith("version:")), "")
+    if not regex_src:
+        return None, _Rule(tech, source, None, version)
+    try:
+        regex = re.compile(regex_src, re.I)
+    except re.error as exc:
+        logger.debug("Skipping %s %s pattern %r: %s", tech, source, regex_src, exc)
+        return None
+    return _required_literals(regex_src), _Rule(tech, source, regex, version)
+
+
+class Fingerprints:
+    """
+    Compiled technology rules (thread-safe once built).
+
+    Args:
+        technologies: Technology name -> rule dict (the ruleset file's shape).
+    """
+
+    def __init__(self, technologies: Dict[str, Dict[str, Any]]):
+        self.categories: Dict[str, List[str]] = {}
+        self.implies: Dict[str, List[str]] = {}
+        self._named: Dict[str, Dict[str, List[_Rule]]] = {"headers": {}, "cookies": {}, "meta": {}}
+        self._favicons: Dict[int, List[str]] = {}
+        text_rules: Dict[str, List[Tuple[Optional[List[str]], _Rule]]] = {"html": [], "scriptSrc": []}
+        for tech, spec in technologies.items():
+            if not isinstance(spec, dict):
+                continue
+            self.categories[tech] = [str(cat) for cat in spec.get("cats") or []]
+            self.implies[tech] = [item.split("\\;")[0] for item in _patterns(spec.get("implies"))]
+            for source, index in self._named.items():
+                for name, value in (spec.get(source) or {}).items():
+                    for pattern in _patterns(value):
+                        compiled = _compile(tech, source, pattern)
+                        if compiled:
+                            index.setdefault(name.lower(), []).append(compiled[1])
+            for source, key in (("html", "html"), ("scriptSrc", "scriptSrc"), ("scriptSrc", "scripts")):
+                for pattern in _patterns(spec.get(key)):
+                    compiled = _compile(tech, source, pattern) if pattern else None
+                    if compiled:
+                        text_rules[source].append(compiled)
+            for value in spec.get("favicon") or []:
+                self._favicons.setdefault(int(value), []).append(tech)
+        self._html = _LiteralIndex(text_rules["html"])
+        self._script_src = _LiteralIndex(text_rules["scriptSrc"])
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    def stats(self) -> Dict[str, int]:
+        named = sum(len(rules) for index in self._named.values() for rules in index.values())
+        return {
+            "technologies": len(self.categories),
+            "named_rules": named,
+            "text_rules": len(self._html) + len(self._script_src),
+            "unfiltered_text_rules": len(self._html.always) + len(self._script_src.always),
+            "favicons": len(self._favicons),
+        }
+
+    def match(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        cookies: Optional[Dict[str, str]] = None,
+        meta: Optional[Dict[str, str]] = None,
+        html: str = "",
+        script_srcs: Optional[Sequence[str]] = None,
+        favicon_hash: Optional[int] = None,
+    ) -> List[TechDetection]:
+        """
+        Technologies matched by one response, sorted by name (implied ones included).
+
+        ``script_srcs`` defaults to the ``<script src>`` values found in ``html``.
+        """
+        found: Dict[str, Tuple[str, Set[str]]] = {}
+
+        def hit(rule: _Rule, value: str) -> None:
+            version = rule.match(value)
+            if version is None:
+                return
+            previous, sources = found.get(rule.tech, ("", set()))
+            sources.add(rule.source)
+            found[rule.tech] = (previous or version, sources)
+
+        for source, values in (("headers", headers), ("cookies", cookies), ("meta", meta)):
+            index = self._named[source]
+            for name, value in (values or {}).items():
+                for rule in index.get(name.lower(), ()):
+                    hit(rule, value)
+        if html:
+            for rule in self._html.candidates(html):
+                hit(rule, html)
+        if script_srcs is None:
+            script_srcs = _SCRIPT_SRC.findall(html) if html else []
+        if script_srcs:
+            for rule in self._script_src.candidates("\n".join(script_srcs)):
+                for src in script_srcs:
+                    hit(rule, src)
+        for tech in self._favicons.get(favicon_hash, ()) if favicon_hash is not None else ():
+            found.setdefault(tech, ("", set()))[1].add("favicon")
+
+        detections = {
+            tech: TechDetection(
+                name=tech, version=version or None, categories=self.categories.get(tech, []), matched_by=sorted(sources)
+            )
+            for tech, (version, sources) in found.items()
+        }
+        pending = list(detections)
+        while pending:
+            for implied in self.implies.get(pending.pop(), ()):
+                if implied not in detections:
+                    detections[implied] = TechDetection(
+                        name=implied, categories=self.categories.get(implied, []), matched_by=["implies"]
+                    )
+                    pending.append(implied)
+        return [detections[tech] for tech in sorted(detections)]
+
+
+def load_fingerprints(path: Optional[Path] = None) -> Fingerprints:
+    """Compile the ruleset at ``path`` (a file, or a directory of ``*.json``); empty when unreadable."""
+    path = Path(path or TECH_FINGERPRINTS or DEFAULT_FINGERPRINTS)
+    files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+    technologies: Dict[str, Dict[str, Any]] = {}
+    for file in files:
+        try:
+            data = json.loads(file.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            logger.warning("Cannot load tech fingerprints from %s: %s", file, exc)
+            continue
+        if isinstance(data, dict):
+            technologies.update(data.get("technologies", data))
+    return Fingerprints(technologies)
+
+
+_fingerprints: Optional[Fingerprints] = None
+_fingerprints_lock = threading.Lock()
+
+
+def get_fingerprints() -> Fingerprints:
+    """Get or compile the process-wide ruleset (on first use)."""
+    global _fingerprints
+    with _fingerprints_lock:
+        if _fingerprints is None:
+            _fingerprints = load_fingerprints()
+        return _fingerprints
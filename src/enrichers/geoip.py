@@ -3,10 +3,12 @@ GeoIP Enricher — geolocation for discovered IPs using GeoLite2 database.
 Requires GeoLite2-City.mmdb (download from MaxMind, free signup).
 """
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from src.analysis.correlation import correlated_ips
+from src.core.executor import POOL_CPU, get_executor
+from src.core.shared import SharedWork, shared_call
 from src.enrichers.base import AbstractEnricher
 
 # Resolve paths: backend runs from backend/, CLI from project root
@@ -51,6 +53,12 @@ class GeoipEnricher(AbstractEnricher):
     """Enricher for IP geolocation. Requires GeoLite2-City.mmdb."""
 
     name = "geoip"
+    requires = ("dns_info", "correlation")
+    produces = ("geoip_info",)
+
+    def __init__(self, shared: Optional[SharedWork] = None):
+        # Batch scans share one memo so each IP is geolocated once.
+        self.shared = shared
 
     def enrich(self, domain: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         ips: List[str] = []
@@ -65,6 +73,11 @@ class GeoipEnricher(AbstractEnricher):
                     ips.append(ip)
                 if len(ips) >= 20:
                     break
+        for ip in correlated_ips((context or {}).get("correlation")):
+            if len(ips) >= 20:
+                break
+            if ip not in ips:
+                ips.append(ip)
 
         if not ips:
             return {}
@@ -75,16 +88,21 @@ class GeoipEnricher(AbstractEnricher):
 
         geoip_info: Dict[str, Dict[str, Any]] = {}
         try:
-            with ThreadPoolExecutor(max_workers=min(10, len(ips))) as executor:
-                futures = {executor.submit(_lookup_ip, reader, ip): ip for ip in ips}
-                for future in as_completed(futures):
-                    ip = futures[future]
-                    try:
-                        info = future.result()
-                        if info and (info.get("latitude") or info.get("country")):
-                            geoip_info[ip] = info
-                    except Exception:
-                        pass
+            executor = get_executor()
+            futures = {
+                executor.submit(
+                    POOL_CPU, shared_call, self.shared, "geoip", ip, lambda _ip=ip: _lookup_ip(reader, _ip)
+                ): ip
+                for ip in ips
+            }
+            for future in executor.as_completed(futures):
+                ip = futures[future]
+                try:
+                    info = future.result()
+                    if info and (info.get("latitude") or info.get("country")):
+                        geoip_info[ip] = info
+                except Exception:
+                    pass
         finally:
             try:
                 reader.close()
@@ -0,0 +1,235 @@
+"""
+Host Grouping Enricher - collapses subdomains that front the same endpoint.
+
+Wildcard DNS zones and catch-all front-ends make passive sources return
+hundreds of names that all land on one server. This stage runs right after
+subdomain discovery and groups the apex and its subdomains by:
+
+* wildcard fingerprint: a host whose addresses all belong to the answer for a
+  made-up label under its parent zone is a wildcard hit;
+* otherwise, resolved A address set plus CNAME target.
+
+SSL and tech probe one representative per group (``collapse_hosts``), so their
+host budgets go to hosts that actually differ. Shared addresses alone do not
+prove two names serve the same site (anycast CDNs, shared hosting), so the
+representative's result is only copied as-is to members of a wildcard group,
+or of a group sharing a CNAME target whose representative presented a
+certificate covering the member (``split_members``); other members get the
+copy marked as inferred. Port scans are keyed by IP already and need no
+grouping.
+
+At most ``HOST_GROUPING_MAX_HOSTS`` hosts are resolved, apex first, then the
+subdomains most user-facing first; the rest stay ungrouped.
+"""
+
+import hashlib
+from collections import Counter
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from src.analysis.correlation import _resolve_subdomain_a
+from src.analysis.normalizer import normalize_domains
+from src.config.settings import HOST_GROUPING, HOST_GROUPING_MAX_HOSTS
+from src.core.executor import POOL_DNS, get_executor
+from src.core.models import CertificateInfo
+from src.core.resolver import get_resolver
+from src.core.shared import ResourceLimits, SharedWork, dns_slot, shared_call
+from src.enrichers.base import AbstractEnricher
+from src.enrichers.dns import _DNS_ERRORS
+
+# Parent zones probed for a wildcard answer (most common parents first).
+_MAX_WILDCARD_PROBES = 10
+# Subdomain labels of likely user-facing services, probed first by the
+# liveness, tech and SSL stages when their host budgets run out.
+PRIORITY_PREFIXES = {
+    "account",
+    "accounts",
+    "admin",
+    "api",
+    "app",
+    "auth",
+    "login",
+    "portal",
+    "sso",
+    "vpn",
+    "www",
+}
+
+HostGroup = Dict[str, Any]
+
+
+def _wildcard_label(zone: str) -> str:
+    """Made-up label for ``zone``; deterministic so answers cache and replay."""
+    return "netscout-wc-" + hashlib.sha1(zone.encode("utf-8")).hexdigest()[:12]
+
+
+def _parent(host: str) -> str:
+    return host.split(".", 1)[1] if "." in host else ""
+
+
+def _resolve_cname(host: str) -> Optional[str]:
+    try:
+        answers = get_resolver().resolve(host, "CNAME")
+    except _DNS_ERRORS:
+        return None
+    return str(answers[0].target).rstrip(".").lower() if answers else None
+
+
+def priority_score(host: str) -> Tuple[int, str]:
+    """Sort key putting likely user-facing services first (then by name)."""
+    prefix = host.lower().split(".")[0]
+    return (0 if prefix in PRIORITY_PREFIXES else 1, host)
+
+
+def collapse_hosts(hosts: Sequence[str], host_groups: Optional[List[HostGroup]]) -> Dict[str, List[str]]:
+    """
+    Representative -> members for ``hosts`` (in order; the first host of each
+    group represents it). Hosts outside any group represent themselves.
+    """
+    group_of = {
+        host: index for index, group in enumerate(host_groups or []) for host in group.get("hosts") or []
+    }
+    collapsed: Dict[str, List[str]] = {}
+    representative_of: Dict[int, str] = {}
+    for host in dict.fromkeys(hosts):
+        index = group_of.get(host)
+        if index is None:
+            collapsed[host] = [host]
+        elif index in representative_of:
+            collapsed[representative_of[index]].append(host)
+        else:
+            representative_of[index] = host
+            collapsed[host] = [host]
+    return collapsed
+
+
+def cert_covers(cert: CertificateInfo, host: str) -> bool:
+    """Whether ``host`` matches the certificate's SANs (else its CN); ``*`` spans one label."""
+    host = host.lower()
+    for name in cert.san or [cert.subject_cn or ""]:
+        name = name.lower().rstrip(".")
+        if name == host or (name.startswith("*.") and _parent(host) == name[2:]):
+            return True
+    return False
+
+
+def split_members(
+    members: List[str],
+    host_groups: Optional[List[HostGroup]],
+    cert: Optional[CertificateInfo] = None,
+) -> Tuple[List[str], List[str]]:
+    """
+    ``members`` of a ``collapse_hosts`` entry (representative first) split into
+    the hosts a result of the representative holds for, and those it is only
+    inferred for. A wildcard group holds for every member; a group sharing a
+    CNAME target for members covered by ``cert``, the certificate the
+    representative presented. Shared addresses alone hold for none.
+    """
+    representative, others = members[0], members[1:]
+    group = next((g for g in host_groups or [] if representative in (g.get("hosts") or [])), None)
+    if group is None or not others:
+        return list(members), []
+    confirmed, inferred = [representative], []
+    for host in others:
+        same = group.get("wildcard") or (group.get("cname") and cert is not None and cert_covers(cert, host))
+        (confirmed if same else inferred).append(host)
+    return confirmed, inferred
+
+
+def group_hosts(
+    addresses: Dict[str, FrozenSet[str]],
+    cnames: Dict[str, Optional[str]],
+    wildcards: Dict[str, FrozenSet[str]],
+) -> List[HostGroup]:
+    """Groups (two or more hosts) sharing a wildcard fingerprint or addresses + CNAME target."""
+    keyed: Dict[Tuple[Any, ...], List[str]] = {}
+    for host in sorted(addresses):
+        host_addresses = addresses[host]
+        if not host_addresses:
+            continue  # unresolved hosts stay on their own
+        wildcard = wildcards.get(_parent(host))
+        if wildcard and host_addresses <= wildcard:
+            key: Tuple[Any, ...] = ("wildcard", _parent(host))
+        else:
+            key = ("addresses", host_addresses, cnames.get(host))
+        keyed.setdefault(key, []).append(host)
+
+    groups: List[HostGroup] = []
+    for key, hosts in keyed.items():
+        if len(hosts) < 2:
+            continue
+        wildcard = key[0] == "wildcard"
+        groups.append({
+            "hosts": hosts,
+            "addresses": sorted(wildcards[key[1]] if wildcard else key[1]),
+            "cname": None if wildcard else key[2],
+            "wildcard": wildcard,
+        })
+    return sorted(groups, key=lambda group: (-len(group["hosts"]), group["hosts"][0]))
+
+
+class HostGroupingEnricher(AbstractEnricher):
+    """
+    Enricher grouping the apex and subdomains that resolve to the same endpoint.
+
+    With a batch ``SharedWork`` memo, A lookups are shared with the
+    correlation enricher and other domains of the batch. Only the first
+    ``HOST_GROUPING_MAX_HOSTS`` hosts (apex, then by priority) are resolved.
+    """
+
+    name = "host_groups"
+    requires = ("subdomains",)
+    produces = ("host_groups",)
+
+    def __init__(
+        self,
+        shared: Optional[SharedWork] = None,
+        limits: Optional[ResourceLimits] = None,
+    ):
+        self.shared = shared
+        self.limits = limits
+
+    def _resolve_a(self, host: str) -> List[str]:
+        def resolve() -> List[str]:
+            with dns_slot(self.limits):
+                return _resolve_subdomain_a(host)
+
+        return shared_call(self.shared, "subdomain_a", host, resolve)
+
+    def _cname(self, host: str) -> Optional[str]:
+        def resolve() -> Optional[str]:
+            with dns_slot(self.limits):
+                return _resolve_cname(host)
+
+        return shared_call(self.shared, "cname", host, resolve)
+
+    def enrich(self, domain: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        subdomains = normalize_domains((context or {}).get("subdomains") or [])
+        if not HOST_GROUPING or not subdomains:
+            return {"host_groups": []}
+        hosts = list(dict.fromkeys([domain.lower(), *sorted(subdomains, key=priority_score)]))
+        if HOST_GROUPING_MAX_HOSTS > 0:
+            hosts = hosts[:HOST_GROUPING_MAX_HOSTS]
+        parents = Counter(_parent(host) for host in hosts if _parent(host).endswith(domain.lower()))
+        zones = [zone for zone, _ in parents.most_common(_MAX_WILDCARD_PROBES)]
+
+        executor = get_executor()
+        a_futures = {host: executor.submit(POOL_DNS, self._resolve_a, host) for host in hosts}
+        cname_futures = {host: executor.submit(POOL_DNS, self._cname, host) for host in hosts}
+        wildcard_futures = {
+            zone: executor.submit(POOL_DNS, self._resolve_a, f"{_wildcard_label(zone)}.{zone}")
+            for zone in zones
+        }
+        for _ in executor.as_completed([*a_futures.values(), *cname_futures.values(), *wildcard_futures.values()]):
+            pass
+
+        addresses = {host: frozenset(_result(future, [])) for host, future in a_futures.items()}
+        cnames = {host: _result(future, None) for host, future in cname_futures.items()}
+        wildcards = {zone: frozenset(_result(future, [])) for zone, future in wildcard_futures.items()}
+        return {"host_groups": group_hosts(addresses, cnames, wildcards)}
+
+
+def _result(future, default):
+    try:
+        return future.result()
+    except Exception:
+        return default
@@ -0,0 +1,190 @@
+"""
+Liveness Enricher - fast TCP pre-probe of the apex and every subdomain.
+
+Runs right after subdomain discovery: each host is resolved, then every
+unique address gets one short connect per ``LIVENESS_PORTS`` port (80 and
+443 by default). The resulting ``LivenessInfo`` drives the deep probes:
+
+* tech fetches only hosts with a web port open (https when 443 accepts,
+  else http) and SSL handshakes only with hosts whose 443 accepts, so their
+  host budgets go to hosts that answer, most user-facing first;
+* correlation reuses the resolved addresses instead of resolving again;
+* the subdomain port scan sweeps responsive IPs before silent ones.
+
+A refused connect still proves the address is up; only addresses where
+every probe timed out are listed as ``unresponsive``. Hosts are only ever
+skipped on that positive evidence: hosts without A records (AAAA-only,
+failed lookups) are left out of the map and probed as before.
+"""
+
+import asyncio
+import logging
+import socket
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from src.analysis.correlation import _resolve_subdomain_a
+from src.analysis.normalizer import normalize_domains
+from src.config.settings import LIVENESS_PORTS, LIVENESS_TIMEOUT
+from src.core.executor import POOL_DNS, get_executor
+from src.core.models import HostLiveness, LivenessInfo
+from src.core.shared import ResourceLimits, SharedWork, dns_slot, shared_call, shared_call_async
+from src.core.tracing import CATEGORY_TCP, trace_span
+from src.enrichers.base import AsyncEnricher
+from src.enrichers.host_groups import priority_score
+from src.enrichers.port import _connect_slots
+
+logger = logging.getLogger(__name__)
+
+# Connect outcomes.
+OPEN = "open"
+CLOSED = "closed"
+TIMEOUT = "timeout"
+
+
+async def _connect_state(ip: str, port: int, timeout: float) -> str:
+    """``OPEN`` when ``ip:port`` accepts, ``CLOSED`` when the host answers otherwise, else ``TIMEOUT``."""
+    loop = asyncio.get_running_loop()
+    try:
+        sock = socket.socket(socket.AF_INET6 if ":" in ip else socket.AF_INET, socket.SOCK_STREAM)
+    except OSError as exc:
+        logger.debug("Liveness socket error %s:%s -> %s", ip, port, exc)
+        return CLOSED
+    try:
+        sock.setblocking(False)
+        await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), timeout)
+    except asyncio.TimeoutError:
+        return TIMEOUT
+    except OSError:
+        # Refused, reset or unreachable: an answer, just not a listener.
+        return CLOSED
+    finally:
+        sock.close()
+    return OPEN
+
+
+def live_hosts(hosts: List[str], liveness: Optional[LivenessInfo], port: int) -> List[str]:
+    """
+    ``hosts`` (in order) except those the pre-probe found closed on ``port``.
+    Hosts it did not cover, and any host when ``port`` was not probed, are kept.
+    """
+    if liveness is None or port not in liveness.ports:
+        return list(hosts)
+    return [host for host in hosts if (ports := liveness.host_ports(host)) is None or port in ports]
+
+
+def web_url(host: str, liveness: Optional[LivenessInfo]) -> Optional[str]:
+    """
+    URL to fetch ``host`` at: https unless the pre-probe found 443 closed, then
+    http unless it found 80 closed too (None).
+    """
+    ports = liveness.host_ports(host) if liveness else None
+    if ports is None or 443 in ports or 443 not in liveness.ports:
+        return f"https://{host}"
+    if 80 in ports or 80 not in liveness.ports:
+        return f"http://{host}"
+    return None
+
+
+class LivenessEnricher(AsyncEnricher):
+    """
+    Enricher probing which of the apex and its subdomains answer on the web ports.
+
+    Connects hold slots of the same budget as port scans
+    (``ResourceLimits.tcp_connect`` for batch scans, else
+    ``PORT_SCAN_CONCURRENCY``) and are taken in host priority order. With a
+    batch ``SharedWork`` memo, A lookups are shared with host grouping and
+    correlation, and each address is probed once per batch.
+    """
+
+    name = "liveness"
+    requires = ("subdomains",)
+    produces = ("liveness",)
+
+    def __init__(
+        self,
+        ports: Optional[List[int]] = None,
+        timeout: Optional[float] = None,
+        shared: Optional[SharedWork] = None,
+        limits: Optional[ResourceLimits] = None,
+    ):
+        self.ports = list(dict.fromkeys(ports or LIVENESS_PORTS))
+        self.timeout = timeout or LIVENESS_TIMEOUT
+        self.shared = shared
+        self.limits = limits
+
+    def _resolve_a(self, host: str) -> List[str]:
+        def resolve() -> List[str]:
+            with dns_slot(self.limits):
+                return _resolve_subdomain_a(host)
+
+        return shared_call(self.shared, "subdomain_a", host, resolve)
+
+    async def _probe_ip(self, ip: str) -> Dict[int, str]:
+        async def probe() -> Dict[int, str]:
+            slots = _connect_slots(self.limits)
+
+            async def connect(port: int) -> str:
+                async with slots:
+                    return await _connect_state(ip, port, self.timeout)
+
+            with trace_span(f"liveness {ip}", CATEGORY_TCP, host=ip, ports=len(self.ports)) as span:
+                states = await asyncio.gather(*(connect(port) for port in self.ports))
+                span.attrs["open"] = states.count(OPEN)
+            return dict(zip(self.ports, states))
+
+        return await shared_call_async(self.shared, "liveness", (ip, tuple(self.ports)), probe)
+
+    async def enrich_async(
+        self,
+        domain: str,
+        context: Optional[Dict[str, Any]] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> Dict[str, Any]:
+        subdomains = normalize_domains((context or {}).get("subdomains") or [])
+        hosts = list(dict.fromkeys([domain.lower(), *sorted(subdomains, key=priority_score)]))
+
+        executor = get_executor()
+        resolved = await asyncio.gather(
+            *(executor.run(POOL_DNS, self._resolve_a, host) for host in hosts), return_exceptions=True
+        )
+        addresses: Dict[str, List[str]] = {}
+        for host, result in zip(hosts, resolved):
+            if isinstance(result, BaseException):
+                logger.debug("Liveness resolve failed for %s: %s", host, result)
+                result = []
+            addresses[host] = sorted(result)
+
+        # Addresses in order of their first (highest-priority) host.
+        ips = list(dict.fromkeys(ip for host in hosts for ip in addresses[host]))
+        probed = await asyncio.gather(*(self._probe_ip(ip) for ip in ips), return_exceptions=True)
+        states: Dict[str, Dict[int, str]] = {}
+        for ip, result in zip(ips, probed):
+            if isinstance(result, BaseException):
+                logger.debug("Liveness probe failed for %s: %s", ip, result)
+                result = dict.fromkeys(self.ports, TIMEOUT)
+            states[ip] = result
+
+        open_ports = {
+            ip: [port for port in self.ports if state[port] == OPEN] for ip, state in sorted(states.items())
+        }
+        # Hosts without A records (AAAA-only, failed or timed-out lookups) get
+        # no entry: the probe has no evidence about them, so they stay eligible.
+        host_entries = {
+            host: HostLiveness(
+                host=host,
+                addresses=host_ips,
+                open_ports=sorted({port for ip in host_ips for port in open_ports[ip]}),
+            )
+            for host, host_ips in addresses.items()
+            if host_ips
+        }
+        return {
+            "liveness": LivenessInfo(
+                ports=self.ports,
+                hosts=host_entries,
+                open_ports=open_ports,
+                unresponsive=sorted(ip for ip, state in states.items() if set(state.values()) == {TIMEOUT}),
+            )
+        }
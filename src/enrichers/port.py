@@ -1,15 +1,38 @@
 """
-Port Scanner Enricher - scans top ports on discovered IPs.
+Port Scanner Enrichers - asyncio connect scan of discovered IPs.
+
+``PortEnricher`` scans the apex addresses as soon as the DNS enricher
+publishes them; ``SubdomainPortEnricher`` then adds the subdomain IPs found
+by correlation.
+
+Open ports are found with plain TCP connects on the event loop; banners are
+then grabbed from the open ones as a separate, smaller stage
+(``PORT_BANNER_CONCURRENCY``), so slow banner reads never hold up the sweep.
 """
 
+import asyncio
 import logging
 import socket
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Dict, List, Optional, Set
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Dict, List, Optional, Set
 
-from src.config.settings import PORT_SCAN_TIMEOUT
-from src.core.models import OpenPort, PortScanResult
-from src.enrichers.base import AbstractEnricher
+import aiohttp
+
+from src.analysis.correlation import correlated_ips
+from src.config.settings import (
+    PORT_BANNER_CONCURRENCY,
+    PORT_SCAN_CONCURRENCY,
+    PORT_SCAN_MAX_IPS,
+    PORT_SCAN_PROFILE,
+    PORT_SCAN_TIMEOUT,
+)
+from src.core.delta import ScanBaseline
+from src.core.executor import POOL_DNS, get_executor
+from src.core.models import LivenessInfo, OpenPort, PortScanResult
+from src.core.port_cache import PortScanCache
+from src.core.shared import ResourceLimits, SharedWork, SlotPool, shared_call_async
+from src.core.tracing import CATEGORY_TCP, trace_span
+from src.enrichers.base import AsyncEnricher
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +42,60 @@ TOP_PORTS = [
     25, 110, 143, 993, 995, 389, 636, 3389, 5900, 5985,
 ]
 
+# nmap's most frequently open TCP ports (nmap-services frequencies).
+_NMAP_TOP_100 = (
+    "7,9,13,21-23,25-26,37,53,79-81,88,106,110-111,113,119,135,139,143-144,179,199,389,427,"
+    "443-445,465,513-515,543-544,548,554,587,631,646,873,990,993,995,1025-1029,1110,1433,1720,"
+    "1723,1755,1900,2000-2001,2049,2121,2717,3000,3128,3306,3389,3986,4899,5000,5009,5051,5060,"
+    "5101,5190,5357,5432,5631,5666,5800,5900,6000-6001,6646,7070,8000,8008-8009,8080-8081,8443,"
+    "8888,9100,9999-10000,32768,49152-49157"
+)
+_NMAP_TOP_1000 = (
+    "1,3-4,6-7,9,13,17,19-26,30,32-33,37,42-43,49,53,70,79-85,88-90,99-100,106,109-111,113,119,"
+    "125,135,139,143-144,146,161,163,179,199,211-212,222,254-256,259,264,280,301,306,311,340,366,"
+    "389,406-407,416-417,425,427,443-445,458,464-465,481,497,500,512-515,524,541,543-545,548,"
+    "554-555,563,587,593,616-617,625,631,636,646,648,666-668,683,687,691,700,705,711,714,720,722,"
+    "726,749,765,777,783,787,800-801,808,843,873,880,888,898,900-903,911-912,981,987,990,992-993,"
+    "995,999-1002,1007,1009-1011,1021-1100,1102,1104-1108,1110-1114,1117,1119,1121-1124,1126,"
+    "1130-1132,1137-1138,1141,1145,1147-1149,1151-1152,1154,1163-1166,1169,1174-1175,1183,"
+    "1185-1187,1192,1198-1199,1201,1213,1216-1218,1233-1234,1236,1244,1247-1248,1259,1271-1272,"
+    "1277,1287,1296,1300-1301,1309-1311,1322,1328,1334,1352,1417,1433-1434,1443,1455,1461,1494,"
+    "1500-1501,1503,1521,1524,1533,1556,1580,1583,1594,1600,1641,1658,1666,1687-1688,1700,"
+    "1717-1721,1723,1755,1761,1782-1783,1801,1805,1812,1839-1840,1862-1864,1875,1900,1914,1935,"
+    "1947,1971-1972,1974,1984,1998-2010,2013,2020-2022,2030,2033-2035,2038,2040-2043,2045-2049,"
+    "2065,2068,2099-2100,2103,2105-2107,2111,2119,2121,2126,2135,2144,2160-2161,2170,2179,"
+    "2190-2191,2196,2200,2222,2251,2260,2288,2301,2323,2366,2381-2383,2393-2394,2399,2401,2492,"
+    "2500,2522,2525,2557,2601-2602,2604-2605,2607-2608,2638,2701-2702,2710,2717-2718,2725,2800,"
+    "2809,2811,2869,2875,2909-2910,2920,2967-2968,2998,3000-3001,3003,3005-3007,3011,3013,3017,"
+    "3030-3031,3052,3071,3077,3128,3168,3211,3221,3260-3261,3268-3269,3283,3300-3301,3306,"
+    "3322-3325,3333,3351,3367,3369-3372,3389-3390,3404,3476,3493,3517,3527,3546,3551,3580,3659,"
+    "3689-3690,3703,3737,3766,3784,3800-3801,3809,3814,3826-3828,3851,3869,3871,3878,3880,3889,"
+    "3905,3914,3918,3920,3945,3971,3986,3995,3998,4000-4006,4045,4111,4125-4126,4129,4224,4242,"
+    "4279,4321,4343,4443-4446,4449,4550,4567,4662,4848,4899-4900,4998,5000-5004,5009,5030,5033,"
+    "5050-5051,5054,5060-5061,5080,5087,5100-5102,5120,5190,5200,5214,5221-5222,5225-5226,5269,"
+    "5280,5298,5357,5405,5414,5431-5432,5440,5500,5510,5544,5550,5555,5560,5566,5631,5633,5666,"
+    "5678-5679,5718,5730,5800-5802,5810-5811,5815,5822,5825,5850,5859,5862,5877,5900-5904,"
+    "5906-5907,5910-5911,5915,5922,5925,5950,5952,5959-5963,5987-5989,5998-6007,6009,6025,6059,"
+    "6100-6101,6106,6112,6123,6129,6156,6346,6389,6502,6510,6543,6547,6565-6567,6580,6646,"
+    "6666-6669,6689,6692,6699,6779,6788-6789,6792,6839,6881,6901,6969,7000-7002,7004,7007,7019,"
+    "7025,7070,7100,7103,7106,7200-7201,7402,7435,7443,7496,7512,7625,7627,7676,7741,7777-7778,"
+    "7800,7911,7920-7921,7937-7938,7999-8002,8007-8011,8021-8022,8031,8042,8045,8080-8090,8093,"
+    "8099-8100,8180-8181,8192-8194,8200,8222,8254,8290-8292,8300,8333,8383,8400,8402,8443,8500,"
+    "8600,8649,8651-8652,8654,8701,8800,8873,8888,8899,8994,9000-9003,9009-9011,9040,9050,9071,"
+    "9080-9081,9090-9091,9099-9103,9110-9111,9200,9207,9220,9290,9415,9418,9485,9500,9502-9503,"
+    "9535,9575,9593-9595,9618,9666,9876-9878,9898,9900,9917,9929,9943-9944,9968,9998-10004,"
+    "10009-10010,10012,10024-10025,10082,10180,10215,10243,10566,10616-10617,10621,10626,"
+    "10628-10629,10778,11110-11111,11967,12000,12174,12265,12345,13456,13722,13782-13783,14000,"
+    "14238,14441-14442,15000,15002-15004,15660,15742,16000-16001,16012,16016,16018,16080,16113,"
+    "16992-16993,17877,17988,18040,18101,18988,19101,19283,19315,19350,19780,19801,19842,20000,"
+    "20005,20031,20221-20222,20828,21571,22939,23502,24444,24800,25734-25735,26214,27000,"
+    "27352-27353,27355-27356,27715,28201,30000,30718,30951,31038,31337,32768-32785,33354,33899,"
+    "34571-34573,35500,38292,40193,40911,41511,42510,44176,44442-44443,44501,45100,48080,"
+    "49152-49161,49163,49165,49167,49175-49176,49400,49999-50003,50006,50300,50389,50500,50636,"
+    "50800,51103,51493,52673,52822,52848,52869,54045,54328,55055-55056,55555,55600,56737-56738,"
+    "57294,57797,58080,60020,60443,61532,61900,62078,63331,64623,64680,65000,65129,65389"
+)
+
 PORT_SERVICES = {
     80: "http", 443: "https", 22: "ssh", 21: "ftp",
     8080: "http-alt", 8443: "https-alt", 3306: "mysql", 5432: "postgresql",
@@ -31,6 +108,57 @@ _BANNER_GRAB_TIMEOUT_SECONDS = 2
 _BANNER_MAX_BYTES = 1024
 _BANNER_MAX_TEXT_LENGTH = 200
 
+# Connect budget of scans without ResourceLimits, and the banner stage's
+# budget; both process-wide and usable from any event loop.
+_CONNECT_SLOTS = SlotPool(PORT_SCAN_CONCURRENCY)
+_BANNER_SLOTS = SlotPool(PORT_BANNER_CONCURRENCY)
+
+
+def _port_range(spec: str) -> List[int]:
+    low, _, high = spec.partition("-")
+    ports = list(range(int(low), int(high or low) + 1))
+    if not ports or ports[0] < 1 or ports[-1] > 65535:
+        raise ValueError(f"Invalid port range: {spec!r}")
+    return ports
+
+
+def _profile(spec: str) -> List[int]:
+    """``TOP_PORTS`` first, then the other ports of ``spec`` in ascending order."""
+    extra = [port for part in spec.split(",") for port in _port_range(part)]
+    return list(dict.fromkeys([*TOP_PORTS, *extra]))
+
+
+# Larger profiles include the smaller ones, so widening a scan never loses ports.
+PORT_PROFILES: Dict[str, List[int]] = {
+    "top-20": list(TOP_PORTS),
+    "top-100": _profile(_NMAP_TOP_100),
+    "top-1000": _profile(_NMAP_TOP_1000),
+}
+
+
+def parse_ports(spec: str) -> List[int]:
+    """
+    Ports for ``spec``: comma-separated profile names (``PORT_PROFILES``),
+    ports and ``low-high`` ranges, in order of first appearance.
+
+    Raises:
+        ValueError: For unknown profiles and invalid ports or ranges.
+    """
+    ports: List[int] = []
+    for part in (item.strip().lower() for item in spec.split(",")):
+        if not part:
+            continue
+        if part in PORT_PROFILES:
+            ports.extend(PORT_PROFILES[part])
+            continue
+        try:
+            ports.extend(_port_range(part))
+        except ValueError:
+            raise ValueError(f"Unknown port profile or range: {part!r}") from None
+    if not ports:
+        raise ValueError(f"No ports in {spec!r}")
+    return list(dict.fromkeys(ports))
+
 
 def _decode_banner(raw: bytes) -> Optional[str]:
     for encoding in ("utf-8", "latin-1"):
@@ -42,47 +170,89 @@ def _decode_banner(raw: bytes) -> Optional[str]:
     return None
 
 
-def _scan_port(ip: str, port: int, timeout: Optional[float] = None) -> Optional[OpenPort]:
-    """Check if `ip:port` is open and best-effort grab the service banner."""
-    effective_timeout = timeout or PORT_SCAN_TIMEOUT
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.settimeout(effective_timeout)
+async def _scan_port(ip: str, port: int, timeout: Optional[float] = None) -> Optional[OpenPort]:
+    """Connect to ``ip:port``; an ``OpenPort`` (without banner) when it accepts."""
+    loop = asyncio.get_running_loop()
     try:
-        if sock.connect_ex((ip, port)) != 0:
-            return None
-
-        banner: Optional[str] = None
-        try:
-            sock.settimeout(_BANNER_GRAB_TIMEOUT_SECONDS)
-            data = sock.recv(_BANNER_MAX_BYTES)
-            if data:
-                banner = _decode_banner(data)
-        except (socket.timeout, OSError):
-            # Many services (HTTP/HTTPS) don't push a banner without a request.
-            pass
-
-        return OpenPort(port=port, protocol="tcp", service=PORT_SERVICES.get(port), banner=banner)
+        sock = socket.socket(socket.AF_INET6 if ":" in ip else socket.AF_INET, socket.SOCK_STREAM)
     except OSError as exc:
-        logger.debug("Port scan error %s:%s -> %s", ip, port, exc)
+        logger.debug("Port scan socket error %s:%s -> %s", ip, port, exc)
+        return None
+    try:
+        sock.setblocking(False)
+        await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), timeout or PORT_SCAN_TIMEOUT)
+    except (OSError, asyncio.TimeoutError):
         return None
     finally:
         sock.close()
+    return OpenPort(port=port, protocol="tcp", service=PORT_SERVICES.get(port))
 
 
-def _scan_ip_ports(ip: str, ports: List[int], timeout: Optional[float] = None) -> PortScanResult:
-    """Scan all `ports` on `ip` in parallel and return the open subset, sorted by port."""
-    open_ports: List[OpenPort] = []
-    with ThreadPoolExecutor(max_workers=min(20, len(ports))) as executor:
-        futures = {executor.submit(_scan_port, ip, port, timeout): port for port in ports}
-        for future in as_completed(futures):
-            try:
-                result = future.result()
-            except Exception as exc:
-                logger.debug("Port scan worker error %s:%s -> %s", ip, futures[future], exc)
-                continue
-            if result:
-                open_ports.append(result)
-    return PortScanResult(ip=ip, open_ports=sorted(open_ports, key=lambda x: x.port))
+async def _grab_banner(ip: str, port: int, timeout: Optional[float] = None) -> Optional[str]:
+    """Best-effort banner the service at ``ip:port`` sends on connect."""
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout or PORT_SCAN_TIMEOUT)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    try:
+        data = await asyncio.wait_for(reader.read(_BANNER_MAX_BYTES), _BANNER_GRAB_TIMEOUT_SECONDS)
+    except (OSError, asyncio.TimeoutError):
+        # Many services (HTTP/HTTPS) don't push a banner without a request.
+        return None
+    finally:
+        writer.transport.abort()
+    return _decode_banner(data) if data else None
+
+
+def _connect_slots(limits: Optional[ResourceLimits]) -> SlotPool:
+    return limits.tcp_slots if limits else _CONNECT_SLOTS
+
+
+async def _scan_ip_ports(
+    ip: str,
+    ports: List[int],
+    timeout: Optional[float] = None,
+    limits: Optional[ResourceLimits] = None,
+) -> PortScanResult:
+    """
+    Connect-scan ``ports`` on ``ip``, then grab banners of the open ones.
+
+    Every connect holds a slot of the global budget, taken in port order.
+    Sweeps yield after each connect and the budget serves waiters first come,
+    first served, so concurrent sweeps of several IPs interleave (ip1:80,
+    ip2:80, ..., ip1:443, ...) instead of hammering one host at a time.
+    """
+    slots = _connect_slots(limits)
+    probes: List["asyncio.Task[Optional[OpenPort]]"] = []
+    with trace_span(f"port scan {ip}", CATEGORY_TCP, host=ip, ports=len(ports)) as span:
+        try:
+            for port in ports:
+                await slots.acquire_async()
+                probe = asyncio.ensure_future(_scan_port(ip, port, timeout))
+                probe.add_done_callback(lambda _: slots.release())
+                probes.append(probe)
+                await asyncio.sleep(0)  # let the other sweeps take their turn
+            outcomes = await asyncio.gather(*probes, return_exceptions=True)
+        finally:
+            for probe in probes:
+                probe.cancel()
+        open_ports = [outcome for outcome in outcomes if isinstance(outcome, OpenPort)]
+        for port, outcome in zip(ports, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.debug("Port scan error %s:%s -> %s", ip, port, outcome)
+        span.attrs["open"] = len(open_ports)
+
+    async def with_banner(open_port: OpenPort) -> OpenPort:
+        async with _BANNER_SLOTS, slots:
+            banner = await _grab_banner(ip, open_port.port, timeout)
+        return open_port.model_copy(update={"banner": banner}) if banner else open_port
+
+    open_ports = list(await asyncio.gather(*(with_banner(open_port) for open_port in open_ports)))
+    return PortScanResult(
+        ip=ip,
+        open_ports=sorted(open_ports, key=lambda x: x.port),
+        observed_at=datetime.now(timezone.utc),
+    )
 
 
 def _extract_ips_from_dns(dns_info: Any) -> Set[str]:
@@ -93,30 +263,123 @@ def _extract_ips_from_dns(dns_info: Any) -> Set[str]:
     return set(a_records) | set(aaaa_records)
 
 
-class PortEnricher(AbstractEnricher):
-    """Enricher for port scanning. Uses IPs from DNS context."""
+class PortEnricher(AsyncEnricher):
+    """
+    Enricher for port scanning of the apex IPs. Starts on the DNS enricher's
+    early ``ip_addresses`` (falling back to ``dns_info``), without waiting for
+    PTR lookups, AXFR or subdomain discovery.
+
+    All IPs are swept concurrently on the event loop against one connect
+    budget: ``ResourceLimits.tcp_connect`` for batch scans, else the
+    process-wide ``PORT_SCAN_CONCURRENCY``. Ports default to the
+    ``PORT_SCAN_PROFILE`` setting (see ``parse_ports``).
+
+    With a ``SharedWork`` memo each IP is scanned once per batch, however many
+    domains resolve to it; with a ``PortScanCache`` results are reused across
+    scans for the cache TTL. With a ``ScanBaseline`` only IPs new since the
+    previous scan are scanned.
+    """
 
     name = "port"
+    requires = ("ip_addresses",)
+    produces = ("port_scan",)
 
-    def __init__(self, ports: Optional[List[int]] = None):
-        self.ports = ports or TOP_PORTS
+    def __init__(
+        self,
+        ports: Optional[List[int]] = None,
+        shared: Optional[SharedWork] = None,
+        limits: Optional[ResourceLimits] = None,
+        baseline: Optional[ScanBaseline] = None,
+        cache: Optional[PortScanCache] = None,
+    ):
+        self.ports = ports or parse_ports(PORT_SCAN_PROFILE)
+        self.shared = shared
+        self.limits = limits
+        self.baseline = baseline
+        self.cache = cache
 
-    def enrich(self, domain: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        ips: Set[str] = set()
-        if context and context.get("dns_info"):
-            ips = _extract_ips_from_dns(context["dns_info"])
+    async def _scan_ip(self, ip: str) -> PortScanResult:
+        def probe() -> Awaitable[PortScanResult]:
+            return _scan_ip_ports(ip, self.ports, limits=self.limits)
 
-        if not ips:
-            return {"port_scan": []}
+        async def scan() -> PortScanResult:
+            if self.cache is None:
+                return await probe()
+            return await self.cache.get_or_scan(ip, self.ports, probe)
+
+        return await shared_call_async(self.shared, "port_scan", (ip, tuple(self.ports)), scan)
 
-        ips_list = list(ips)
+    async def _scan_ips(self, ips_list: List[str]) -> List[PortScanResult]:
+        """Scan ``ips_list`` concurrently (baseline-unchanged IPs are carried over)."""
         results: List[PortScanResult] = []
-        with ThreadPoolExecutor(max_workers=min(10, len(ips_list))) as executor:
-            futures = {executor.submit(_scan_ip_ports, ip, self.ports): ip for ip in ips_list}
-            for future in as_completed(futures):
-                try:
-                    results.append(future.result())
-                except Exception as exc:
-                    logger.debug("Port scan IP error %s -> %s", futures[future], exc)
-
-        return {"port_scan": sorted(results, key=lambda r: r.ip)}
+        if self.baseline:
+            previous = {r.ip: r for r in self.baseline.previous.port_scan if not r.error}
+            # host_changed resolves DNS; keep it off the event loop.
+            carried, ips_list = await get_executor().run(
+                POOL_DNS, self.baseline.split, "port_scan", ips_list, previous
+            )
+            results.extend(carried.values())
+
+        scans = await asyncio.gather(*(self._scan_ip(ip) for ip in ips_list), return_exceptions=True)
+        for ip, scan in zip(ips_list, scans):
+            if isinstance(scan, BaseException):
+                logger.debug("Port scan IP error %s -> %s", ip, scan)
+            else:
+                results.append(scan)
+        return results
+
+    async def enrich_async(
+        self,
+        domain: str,
+        context: Optional[Dict[str, Any]] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> Dict[str, Any]:
+        context = context or {}
+        ips = context.get("ip_addresses")
+        if ips is None:
+            ips = _extract_ips_from_dns(context.get("dns_info")) if context.get("dns_info") else ()
+        ips_list = sorted(set(ips))[:PORT_SCAN_MAX_IPS]
+
+        if not ips_list:
+            return {"port_scan": []}
+        return {"port_scan": sorted(await self._scan_ips(ips_list), key=lambda r: r.ip)}
+
+
+def _by_liveness(ips: List[str], liveness: Optional[LivenessInfo]) -> List[str]:
+    """``ips`` with web-port listeners first and addresses that never answered the pre-probe last."""
+    if liveness is None:
+        return ips
+    unresponsive = set(liveness.unresponsive)
+    return sorted(ips, key=lambda ip: 0 if liveness.open_ports.get(ip) else 2 if ip in unresponsive else 1)
+
+
+class SubdomainPortEnricher(PortEnricher):
+    """
+    Second port-scan stage: the subdomain IPs from correlation, most-shared
+    first, up to ``PORT_SCAN_MAX_IPS`` IPs in total with the apex stage.
+    Its ``port_scan`` extends the apex results.
+
+    IPs the liveness pre-probe found listening go first and IPs that never
+    answered it go last, so they are the ones the IP budget cuts off.
+    """
+
+    name = "subdomain_ports"
+    requires = ("port_scan", "correlation", "liveness")
+    produces = ("port_scan",)
+
+    async def enrich_async(
+        self,
+        domain: str,
+        context: Optional[Dict[str, Any]] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> Dict[str, Any]:
+        context = context or {}
+        previous: List[PortScanResult] = list(context.get("port_scan") or [])
+        scanned = {r.ip for r in previous}
+        budget = max(0, PORT_SCAN_MAX_IPS - len(scanned))
+        ips_list = [ip for ip in correlated_ips(context.get("correlation")) if ip not in scanned]
+        ips_list = _by_liveness(ips_list, context.get("liveness"))[:budget]
+
+        if not ips_list:
+            return {"port_scan": previous}
+        return {"port_scan": sorted(previous + await self._scan_ips(ips_list), key=lambda r: r.ip)}
@@ -8,6 +8,7 @@ from typing import Any, Callable, Dict
 import dns.exception
 import dns.resolver
 
+from src.core.resolver import get_resolver
 from src.enrichers.base import AbstractEnricher
 
 logger = logging.getLogger(__name__)
@@ -32,8 +33,7 @@ class ReverseDnsEnricher(AbstractEnricher):
         edges = []
         source_id = f"ip_{ip}"
         try:
-            ptr_name = ".".join(reversed(ip.split("."))) + ".in-addr.arpa."
-            for record in dns.resolver.resolve(ptr_name, "PTR"):
+            for record in get_resolver().resolve_address(ip):
                 hostname = str(record).rstrip(".") if record else ""
                 if hostname:
                     nodes.append({"type": "domain", "value": hostname})
@@ -2,21 +2,34 @@
 SSL Certificate Enricher - extracts certificate info (SAN, issuer, validity).
 """
 
+import asyncio
+import hashlib
 import logging
-import socket
 import ssl
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from src.core.models import CertificateInfo, SslInfo
-from src.enrichers.base import AbstractEnricher
+import aiohttp
+
+from src.config.settings import SSL_CONCURRENCY, SSL_MAX_HOSTS
+from src.core.delta import ScanBaseline
+from src.core.executor import POOL_DNS, get_executor
+from src.core.models import CertificateInfo, LivenessInfo, SslInfo, TlsHandshake
+from src.core.shared import ResourceLimits, SharedWork, SlotPool, shared_call_async
+from src.core.tracing import CATEGORY_TLS, trace_span
+from src.enrichers.base import AsyncEnricher
+from src.enrichers.host_groups import HostGroup, collapse_hosts, priority_score, split_members
+from src.enrichers.liveness import live_hosts
 
 logger = logging.getLogger(__name__)
 
 _TLS_CONNECT_TIMEOUT_SECONDS = 5
 _SSL_DATE_FORMAT = "%b %d %H:%M:%S %Y %Z"
-_MAX_HOSTS_FROM_SUBDOMAINS = 20
+
+# Handshakes in flight across all SSL enrichers of the process (no ResourceLimits).
+_TLS_SLOTS = SlotPool(SSL_CONCURRENCY)
+
+CertResult = Tuple[TlsHandshake, Optional[CertificateInfo]]
 
 
 def _parse_ssl_date(raw: Optional[str]) -> Optional[datetime]:
@@ -30,63 +43,394 @@ def _parse_ssl_date(raw: Optional[str]) -> Optional[datetime]:
 
 def _extract_common_name(name_tuples: list) -> Optional[str]:
     """X509 names are tuples-of-tuples-of-tuples; pull the CN if present."""
-    for part in name_tuples or []:
-        if part and part[0] == ("commonName",):
-            return part[1]
+    for rdn in name_tuples or []:
+        for key, value in rdn:
+            if key == "commonName":
+                return value
     return None
 
 
-def _get_cert_info(host: str, port: int = 443) -> Optional[CertificateInfo]:
-    """Open a TLS connection to host:port and return the parsed certificate."""
+def _parse_certificate(host: str, cert: Dict[str, Any], fingerprint: Optional[str]) -> CertificateInfo:
+    san_list = [value for san_type, value in cert.get("subjectAltName", []) or [] if san_type == "DNS"]
+    not_before = _parse_ssl_date(cert.get("notBefore"))
+    not_after = _parse_ssl_date(cert.get("notAfter"))
+    # `notBefore`/`notAfter` from getpeercert are naive UTC; compare as naive.
+    is_expired = not_after is not None and datetime.utcnow() > not_after
+    return CertificateInfo(
+        host=host,
+        hosts=[host],
+        fingerprint_sha256=fingerprint,
+        subject_cn=_extract_common_name(cert.get("subject", [])),
+        issuer=_extract_common_name(cert.get("issuer", [])),
+        san=san_list,
+        not_before=not_before,
+        not_after=not_after,
+        is_expired=is_expired,
+    )
+
+
+def _elapsed_ms(since: float) -> float:
+    return round((asyncio.get_running_loop().time() - since) * 1000, 1)
+
+
+def _read_peer(handshake: TlsHandshake, ssl_object: Any) -> Optional[CertificateInfo]:
+    """Fill ``handshake`` from an established TLS session; the peer certificate, if usable."""
+    handshake.tls_version = ssl_object.version()
+    cipher = ssl_object.cipher()
+    handshake.cipher = cipher[0] if cipher else None
+    der = ssl_object.getpeercert(binary_form=True)
+    cert = ssl_object.getpeercert()
+    if not der or not cert:
+        # Unverified sessions expose the DER certificate only.
+        handshake.error = "No certificate"
+        return None
+    handshake.fingerprint_sha256 = hashlib.sha256(der).hexdigest()
+    return _parse_certificate(handshake.host, cert, handshake.fingerprint_sha256)
+
+
+async def _get_cert_info(host: str, port: int = 443, timeout: Optional[float] = None) -> CertResult:
+    """
+    Handshake with host:port; the attempt (timing, TLS version, error) and the
+    parsed certificate, or None when there is no usable certificate.
+    """
+    timeout = timeout or _TLS_CONNECT_TIMEOUT_SECONDS
+    handshake = TlsHandshake(host=host)
+    loop = asyncio.get_running_loop()
+    writer = None
     try:
-        ssl_context = ssl.create_default_context()
-        with socket.create_connection((host, port), timeout=_TLS_CONNECT_TIMEOUT_SECONDS) as sock:
-            with ssl_context.wrap_socket(sock, server_hostname=host) as ssock:
-                cert = ssock.getpeercert()
-                if not cert:
-                    return CertificateInfo(host=host, error="No certificate")
-
-                san_list = [value for san_type, value in cert.get("subjectAltName", []) or [] if san_type == "DNS"]
-                not_before = _parse_ssl_date(cert.get("notBefore"))
-                not_after = _parse_ssl_date(cert.get("notAfter"))
-                # `notBefore`/`notAfter` from getpeercert are naive UTC; compare as naive.
-                is_expired = not_after is not None and datetime.utcnow() > not_after
-
-                return CertificateInfo(
-                    host=host,
-                    subject_cn=_extract_common_name(cert.get("subject", [])),
-                    issuer=_extract_common_name(cert.get("issuer", [])),
-                    san=san_list,
-                    not_before=not_before,
-                    not_after=not_after,
-                    is_expired=is_expired,
-                )
+        started = loop.time()
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        handshake.connect_ms = _elapsed_ms(started)
+        started = loop.time()
+        await asyncio.wait_for(
+            writer.start_tls(ssl.create_default_context(), server_hostname=host), timeout
+        )
+        handshake.handshake_ms = _elapsed_ms(started)
+        return handshake, _read_peer(handshake, writer.get_extra_info("ssl_object"))
     except Exception as exc:
-        return CertificateInfo(host=host, error=str(exc))
+        handshake.error = str(exc) or type(exc).__name__
+        return handshake, None
+    finally:
+        if writer is not None:
+            writer.transport.abort()
+
+
+class TlsCapture:
+    """
+    TLS sessions behind HTTP requests, so an HTTP probe doubles as the
+    certificate check for its host.
+
+    Pass as ``trace_request_ctx``; sessions from ``make_aiohttp_session``
+    record the first session seen for each https host (redirect hops
+    included). Handshakes report ``handshake_ms`` only, TCP connect included,
+    and only when the request opened a new connection.
+
+    The prober announces the hosts it is about to fetch (``expect``), marks
+    each fetch finished (``fetched``) and closes the capture when done
+    (``close``), so a concurrent reader can wait for a host's session with
+    ``peer``.
+    so a concurrent reader can wait for a host's session with ``peer``.
+    """
+
+    def __init__(self) -> None:
+        self.results: Dict[str, CertResult] = {}
+        self._pending: Dict[str, "asyncio.Future[None]"] = {}
+        self._planned = asyncio.Event()
+
+    def record(self, url: Any, response: aiohttp.ClientResponse, handshake_ms: Optional[float]) -> None:
+        host = url.host
+        if url.scheme != "https" or not host or host in self.results:
+            return
+        ssl_object = _response_ssl_object(response)
+        if ssl_object is None:
+            return
+        handshake = TlsHandshake(host=host, handshake_ms=handshake_ms)
+        self._store(host, (handshake, _read_peer(handshake, ssl_object)))
+
+    def _store(self, host: str, result: CertResult) -> None:
+        self.results.setdefault(host, result)
+        self.fetched(host)
+
+    def expect(self, hosts: Iterable[str]) -> None:
+        """Announce the https hosts the prober fetches; ``peer`` waits for them."""
+        loop = asyncio.get_running_loop()
+        for host in hosts:
+            if host not in self.results and host not in self._pending:
+                self._pending[host] = loop.create_future()
+        self._planned.set()
+
+    def fetched(self, host: Optional[str]) -> None:
+        """The prober is done with ``host``, whether or not a session was recorded."""
+        future = self._pending.get(host) if host else None
+        if future is not None and not future.done():
+            future.set_result(None)
+
+    def close(self) -> None:
+        """The prober is finished (or gave up): release every waiter."""
+        for host in list(self._pending):
+            self.fetched(host)
+        self._planned.set()
+
+    async def peer(self, hosts: Sequence[str]) -> Optional[CertResult]:
+        """
+        The first captured session among ``hosts`` with a usable certificate,
+        waiting for the prober to plan its fetches and for those of ``hosts``
+        it fetches; None when it fetches none of them or got no certificate.
+        """
+        await self._planned.wait()
+        for host in hosts:
+            if host in self._pending:
+                await asyncio.shield(self._pending[host])
+            result = self.results.get(host)
+            if result is not None and result[1] is not None:
+                return result
+        return None
+
+    def ssl_info(self) -> Optional[SslInfo]:
+        """Captured certificates (deduplicated) and handshakes; None when nothing was captured."""
+        if not self.results:
+            return None
+        certificates = _CertificateSet()
+        for host, (_, cert) in self.results.items():
+            if cert is not None:
+                certificates.add(cert, [host])
+        return SslInfo(
+            certificates=certificates.certificates(),
+            handshakes=[handshake for handshake, _ in self.results.values()],
+        )
+
+
+def _response_ssl_object(response: aiohttp.ClientResponse) -> Any:
+    # A body read in full releases the connection before the trace hooks run;
+    # the protocol keeps its transport while the connection is pooled.
+    connection = response.connection
+    protocol = connection.protocol if connection is not None else getattr(response, "_protocol", None)
+    transport = getattr(protocol, "transport", None)
+    return transport.get_extra_info("ssl_object") if transport is not None else None
+
+
+async def _on_capture_connect_start(_session, ctx, params) -> None:
+    if isinstance(ctx.trace_request_ctx, TlsCapture):
+        ctx.tls_connect_start = asyncio.get_running_loop().time()
+
 
+async def _on_capture_connect_end(_session, ctx, params) -> None:
+    if isinstance(ctx.trace_request_ctx, TlsCapture):
+        ctx.tls_handshake_ms = _elapsed_ms(ctx.tls_connect_start)
 
-class SslEnricher(AbstractEnricher):
-    """Enricher for SSL certificate parsing. Uses subdomains from context."""
+
+async def _on_capture_response(_session, ctx, params) -> None:
+    capture = ctx.trace_request_ctx
+    if isinstance(capture, TlsCapture):
+        capture.record(params.url, params.response, getattr(ctx, "tls_handshake_ms", None))
+        ctx.tls_handshake_ms = None
+
+
+def tls_capture_trace_config() -> aiohttp.TraceConfig:
+    """aiohttp TraceConfig that fills the ``TlsCapture`` passed as ``trace_request_ctx``."""
+    config = aiohttp.TraceConfig()
+    config.on_connection_create_start.append(_on_capture_connect_start)
+    config.on_connection_create_end.append(_on_capture_connect_end)
+    config.on_request_redirect.append(_on_capture_response)
+    config.on_request_end.append(_on_capture_response)
+    return config
+
+
+def _hosts_to_check(
+    domain: str,
+    subdomains: Optional[List[str]],
+    host_groups: Optional[List[Dict[str, Any]]] = None,
+    liveness: Optional[LivenessInfo] = None,
+) -> Dict[str, List[str]]:
+    """
+    The apex and the subdomains (at most ``SSL_MAX_HOSTS``, when set), one host
+    per group: representative -> the hosts whose certificate it stands for.
+
+    Subdomains are taken most user-facing first; representatives the liveness
+    pre-probe found closed on 443 are skipped before the cap applies.
+    """
+    collapsed = collapse_hosts([domain, *sorted(subdomains or [], key=priority_score)], host_groups)
+    collapsed = {host: collapsed[host] for host in live_hosts(list(collapsed), liveness, 443)}
+    if SSL_MAX_HOSTS > 0:
+        return dict(list(collapsed.items())[:SSL_MAX_HOSTS])
+    return collapsed
+
+
+def _still_valid(cert: CertificateInfo) -> bool:
+    return cert.not_after is None or datetime.utcnow() <= cert.not_after.replace(tzinfo=None)
+
+
+def _tls_slots(limits: Optional[ResourceLimits]) -> SlotPool:
+    return limits.tcp_slots if limits else _TLS_SLOTS
+
+
+class _CertificateSet:
+    """Certificates keyed by SHA-256 fingerprint, each with the hosts serving it."""
+
+    def __init__(self) -> None:
+        self._certificates: Dict[str, CertificateInfo] = {}
+
+    def add(self, cert: CertificateInfo, hosts: List[str], inferred: Sequence[str] = ()) -> None:
+        # Certificates stored before fingerprints were recorded only merge by host.
+        key = cert.fingerprint_sha256 or f"host:{cert.host}"
+        entry = self._certificates.get(key)
+        if entry is None:
+            entry = self._certificates[key] = cert.model_copy(
+                update={"host": hosts[0], "hosts": [], "inferred_hosts": []}
+            )
+        entry.hosts.extend(host for host in hosts if host not in entry.hosts)
+        entry.inferred_hosts = [
+            host for host in dict.fromkeys([*entry.inferred_hosts, *inferred]) if host not in entry.hosts
+        ]
+
+    def add_group(
+        self, cert: CertificateInfo, members: List[str], host_groups: Optional[List[HostGroup]]
+    ) -> None:
+        """Add ``cert`` as served by ``members[0]``, which stands for the rest of its group."""
+        self.add(cert, *split_members(members, host_groups, cert))
+
+    def certificates(self) -> List[CertificateInfo]:
+        return list(self._certificates.values())
+
+
+class SslEnricher(AsyncEnricher):
+    """
+    Enricher for SSL certificate parsing. Uses subdomains from context; hosts
+    grouped by the host-grouping stage share one handshake, listed under
+    ``inferred_hosts`` unless the grouping vouches for them (``split_members``).
+
+    Every host is handshaken concurrently on the event loop against one
+    budget: ``ResourceLimits.tcp_connect`` for batch scans, else the
+    process-wide ``SSL_CONCURRENCY``. Certificates are stored once per SHA-256
+    fingerprint with the hosts serving them; every handshake, failed ones
+    included, is listed in ``SslInfo.handshakes``.
+
+    Hosts whose certificate the tech probe captures from its own HTTPS
+    connection are not handshaken again, nor are hosts the liveness pre-probe
+    found closed on 443. SSL runs alongside tech rather than after it: given
+    the tech enricher's ``TlsCapture`` (``tls_peers``), groups tech fetches
+    over https wait for its session, and only the others (and those it got
+    no certificate from) are handshaken, straight away. ``tls_peers`` in the
+    context (a finished tech run) is used too.
+    """
 
     name = "ssl"
+    requires = ("subdomains", "host_groups", "liveness")
+    produces = ("ssl_info",)
+
+    def __init__(
+        self,
+        shared: Optional[SharedWork] = None,
+        limits: Optional[ResourceLimits] = None,
+        baseline: Optional[ScanBaseline] = None,
+        tls_peers: Optional[TlsCapture] = None,
+    ):
+        # Batch scans handshake with each host once and cap concurrent connects;
+        # delta re-scans only handshake with hosts that changed.
+        self.shared = shared
+        self.limits = limits
+        self.baseline = baseline
+        self.tls_peers = tls_peers
+
+    async def _cert_for(self, host: str) -> CertResult:
+        return await shared_call_async(self.shared, "tls_cert", host, lambda: self._traced_cert_info(host))
+
+    async def _group_cert(self, host: str, members: List[str]) -> CertResult:
+        """The tech probe's session with a member of ``host``'s group, else a handshake with ``host``."""
+        if self.tls_peers is not None:
+            captured = await self.tls_peers.peer(members)
+            if captured is not None:
+                return captured
+        return await self._cert_for(host)
+
+    async def _traced_cert_info(self, host: str) -> CertResult:
+        async with _tls_slots(self.limits):
+            with trace_span(f"tls {host}", CATEGORY_TLS, host=host) as span:
+                handshake, cert = await _get_cert_info(host)
+                if cert is None:
+                    span.outcome = "error"
+                return handshake, cert
+
+    async def enrich_async(
+        self,
+        domain: str,
+        context: Optional[Dict[str, Any]] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> Dict[str, Any]:
+        context = context or {}
+        host_groups = context.get("host_groups")
+        groups = _hosts_to_check(domain, context.get("subdomains"), host_groups, context.get("liveness"))
+        certificates = _CertificateSet()
+        handshakes: List[TlsHandshake] = []
+        groups = self._reuse_peers(context.get("tls_peers"), groups, host_groups, certificates, handshakes)
+        hosts_to_check = list(groups)
+        if self.baseline:
+            # host_changed resolves DNS; keep it off the event loop.
+            hosts_to_check, carried = await get_executor().run(POOL_DNS, self._carry_forward, hosts_to_check)
+            for host, cert in carried.items():
+                certificates.add_group(cert, groups.get(host) or [host], host_groups)
+
+        results = await asyncio.gather(
+            *(self._group_cert(host, groups.get(host) or [host]) for host in hosts_to_check), return_exceptions=True
+        )
+        for host, result in zip(hosts_to_check, results):
+            if isinstance(result, BaseException):
+                logger.debug("SSL fetch failed for %s: %s", host, result)
+                handshakes.append(TlsHandshake(host=host, error=str(result) or type(result).__name__))
+                continue
+            handshake, cert = result
+            handshakes.append(handshake)
+            if cert is not None and not cert.error:
+                # A captured session may be another member's; it stands for the group.
+                members = groups.get(host) or [host]
+                members = [handshake.host, *(m for m in members if m != handshake.host)]
+                certificates.add_group(cert, members, host_groups)
+        return {"ssl_info": SslInfo(certificates=certificates.certificates(), handshakes=handshakes)}
+
+    @staticmethod
+    def _reuse_peers(
+        peers: Optional[SslInfo],
+        groups: Dict[str, List[str]],
+        host_groups: Optional[List[HostGroup]],
+        certificates: _CertificateSet,
+        handshakes: List[TlsHandshake],
+    ) -> Dict[str, List[str]]:
+        """Take certificates captured by the tech probe; the groups still to handshake with."""
+        if not peers:
+            return groups
+        captured = {host: cert for cert in peers.certificates for host in cert.all_hosts()}
+        peer_handshakes = {handshake.host: handshake for handshake in peers.handshakes}
+        remaining: Dict[str, List[str]] = {}
+        for host, members in groups.items():
+            # The tech probe may have fetched another member of the group.
+            member = next((m for m in members if m in captured), None)
+            if member is None:
+                remaining[host] = members
+                continue
+            others = [m for m in members if m != member]
+            certificates.add_group(captured[member], [member, *others], host_groups)
+            if member in peer_handshakes:
+                handshakes.append(peer_handshakes[member])
+        return remaining
 
-    def enrich(self, domain: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        hosts_to_check: List[str] = [domain]
-        if context and context.get("subdomains"):
-            hosts_to_check.extend(context["subdomains"][:_MAX_HOSTS_FROM_SUBDOMAINS])
-
-        hosts_to_check = list(dict.fromkeys(hosts_to_check))  # dedupe, preserve order
-        certificates: List[CertificateInfo] = []
-
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = {executor.submit(_get_cert_info, host): host for host in hosts_to_check}
-            for future in as_completed(futures):
-                try:
-                    cert = future.result()
-                except Exception as exc:
-                    logger.debug("SSL fetch failed for %s: %s", futures[future], exc)
-                    continue
-                if cert and not cert.error:
-                    certificates.append(cert)
-
-        return {"ssl_info": SslInfo(certificates=certificates)}
+    def _carry_forward(self, hosts: List[str]) -> Tuple[List[str], Dict[str, CertificateInfo]]:
+        """Split ``hosts`` into hosts to handshake with and certificates reused from the baseline."""
+        previous_scan = self.baseline.previous
+        # Hosts checked last time without a usable certificate carry "no certificate".
+        previous: Dict[str, Optional[CertificateInfo]] = dict.fromkeys(
+            host
+            for members in _hosts_to_check(
+                previous_scan.target_domain, previous_scan.subdomains, liveness=previous_scan.liveness
+            ).values()
+            for host in members
+        )
+        for cert in (previous_scan.ssl_info.certificates if previous_scan.ssl_info else []):
+            if cert.error:
+                continue
+            for host in cert.all_hosts():
+                if _still_valid(cert):
+                    previous[host] = cert
+                else:
+                    previous.pop(host, None)  # expired since: check for a renewal
+        carried, to_probe = self.baseline.split("ssl_info", hosts, previous, host=lambda h: h)
+        return to_probe, {host: cert for host, cert in carried.items() if cert is not None}
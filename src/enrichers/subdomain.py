@@ -1,18 +1,24 @@
 """
 Subdomain Enricher - discovers subdomains via passive (crt.sh, Crobat, etc.)
-and active (DNS brute-force) methods. Uses aiohttp for parallel HTTP fetches.
+and active (DNS brute-force, see ``src/core/bruteforce.py``) methods. Uses
+aiohttp for parallel HTTP fetches.
 """
 
 import asyncio
+import codecs
 import json
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import re
+from contextlib import nullcontext
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Set
 
 import aiohttp
 
 from src.config.settings import (
+    BRUTEFORCE_CHECKPOINT_DIR,
+    BRUTEFORCE_MAX_WORDS,
+    BRUTEFORCE_WORDLIST,
     CERTSPOTTER_API_TOKEN,
     CRTSH_TIMEOUT,
     HTTP_RETRIES,
@@ -20,15 +26,21 @@ from src.config.settings import (
     SECURITYTRAILS_API_KEY,
     USER_AGENT,
 )
+from src.core.bruteforce import BruteforceEngine, iter_wordlist
+from src.core.executor import POOL_SOCKET, get_executor
 from src.enrichers._http import make_aiohttp_session
-from src.enrichers.base import AbstractEnricher
+from src.enrichers.base import AsyncEnricher
 from src.utils.validators import is_valid_domain
 
 logger = logging.getLogger(__name__)
 
 _CRTSH_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
-_BRUTE_FORCE_WORDLIST_SIZE = 500
-_BRUTE_FORCE_CONCURRENCY = 50
+# crt.sh answers for large organisations run to hundreds of MB; they are
+# parsed as they arrive, holding one chunk plus the unfinished row.
+_CRTSH_CHUNK_BYTES = 64 * 1024
+_CRTSH_MAX_ROW_CHARS = 1024 * 1024
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_WORDLIST_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "wordlists"
 _DEFAULT_FALLBACK_WORDLIST = (
     "www mail ftp admin api dev test staging blog shop cdn static assets app web"
 ).split()
@@ -52,6 +64,8 @@ def _extract_subdomains_from_crt(domain: str, data: Iterable[dict]) -> Set[str]:
     suffix = f".{domain}"
 
     for entry in data:
+        if not isinstance(entry, dict):
+            continue
         name_value = entry.get("name_value", "")
         for raw in str(name_value).replace("\n", ",").split(","):
             cleaned = raw.strip().lower().rstrip(".")
@@ -70,10 +84,75 @@ def _extract_subdomains_from_crt(domain: str, data: Iterable[dict]) -> Set[str]:
     return subdomains
 
 
+class _JsonArrayStream:
+    """
+    Incremental parser of a top-level JSON array.
+
+    ``feed`` takes text as it arrives and returns the elements completed by
+    it; only the unfinished element is kept between calls, so memory is
+    bounded by the largest element (``max_element_chars``), not the document.
+
+    Raises:
+        json.JSONDecodeError: Malformed input, an oversized element, or (from
+            ``close``) a document that ended inside the array.
+    """
+
+    def __init__(self, max_element_chars: int = _CRTSH_MAX_ROW_CHARS):
+        self._decoder = json.JSONDecoder()
+        self._max_element_chars = max_element_chars
+        self._buffer = ""
+        # start -> (value | value_or_end) <-> separator -> end
+        self._expect = "start"
+
+    def feed(self, text: str, final: bool = False) -> List[Any]:
+        buffer = self._buffer + text if self._buffer else text
+        pos, size = 0, len(buffer)
+        elements: List[Any] = []
+        while True:
+            pos = _JSON_WHITESPACE.match(buffer, pos).end()
+            if pos == size:
+                break
+            char = buffer[pos]
+            if self._expect == "start":
+                if char != "[":
+                    raise json.JSONDecodeError("Expecting '['", buffer, pos)
+                pos, self._expect = pos + 1, "value_or_end"
+            elif self._expect == "separator" or (self._expect == "value_or_end" and char == "]"):
+                if char not in ",]":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+                pos, self._expect = pos + 1, "value" if char == "," else "end"
+            elif self._expect == "end":
+                raise json.JSONDecodeError("Extra data", buffer, pos)
+            else:
+                try:
+                    element, end = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final or size - pos > self._max_element_chars:
+                        raise
+                    break  # the element continues in the next chunk
+                if end == size and not final:
+                    break  # a number may continue in the next chunk
+                elements.append(element)
+                pos, self._expect = end, "separator"
+        self._buffer = buffer[pos:]
+        return elements
+
+    def close(self) -> List[Any]:
+        """Elements still buffered; raises if the array is unfinished."""
+        elements = self.feed("", final=True)
+        if self._expect != "end":
+            raise json.JSONDecodeError("Unterminated array", self._buffer, len(self._buffer))
+        return elements
+
+
 async def _fetch_crtsh_json_async(
-    session: aiohttp.ClientSession, url: str, timeout: int, retries: int
-) -> Optional[list]:
-    """GET `url` and parse JSON, with backoff on transient failures."""
+    session: aiohttp.ClientSession, url: str, domain: str, timeout: int, retries: int
+) -> Optional[Set[str]]:
+    """
+    GET crt.sh JSON from `url` and collect the subdomains of `domain` in it,
+    with backoff on transient failures. The body is stream-parsed, so rows are
+    never all in memory; a truncated or malformed body counts as a failure.
+    """
     last_error: Optional[str] = None
     effective_timeout = aiohttp.ClientTimeout(total=timeout or CRTSH_TIMEOUT)
 
@@ -82,8 +161,8 @@ async def _fetch_crtsh_json_async(
             async with session.get(url, timeout=effective_timeout) as resp:
                 if resp.status == 200:
                     try:
-                        return await resp.json()
-                    except (json.JSONDecodeError, aiohttp.ContentTypeError):
+                        return await _read_crtsh_subdomains(resp, domain)
+                    except ValueError:
                         last_error = "Invalid JSON response from crt.sh"
                 elif resp.status in _CRTSH_RETRYABLE_STATUS:
                     last_error = f"crt.sh HTTP {resp.status}"
@@ -102,6 +181,18 @@ async def _fetch_crtsh_json_async(
     return None
 
 
+async def _read_crtsh_subdomains(resp: aiohttp.ClientResponse, domain: str) -> Set[str]:
+    """Subdomains of `domain` in a crt.sh JSON body, extracted row by row as it streams in."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    rows = _JsonArrayStream()
+    subdomains: Set[str] = set()
+    async for chunk in resp.content.iter_chunked(_CRTSH_CHUNK_BYTES):
+        subdomains |= _extract_subdomains_from_crt(domain, rows.feed(decoder.decode(chunk)))
+    rows.feed(decoder.decode(b"", final=True))
+    subdomains |= _extract_subdomains_from_crt(domain, rows.close())
+    return subdomains
+
+
 async def _fetch_crobat_async(session: aiohttp.ClientSession, domain: str) -> Set[str]:
     """Fetch subdomains from Crobat API (sonar.omnisint.io)."""
     subdomains: Set[str] = set()
@@ -233,10 +324,10 @@ async def _fetch_crtsh_async(session: aiohttp.ClientSession, domain: str) -> Set
         f"https://crt.sh/?q=%25.{domain}&output=json",
         f"https://crt.sh/?q={domain}&output=json",
     ]
-    tasks = [_fetch_crtsh_json_async(session, url, CRTSH_TIMEOUT, HTTP_RETRIES) for url in urls]
-    for data in await asyncio.gather(*tasks, return_exceptions=True):
-        if isinstance(data, list):
-            subdomains |= _extract_subdomains_from_crt(domain, data)
+    tasks = [_fetch_crtsh_json_async(session, url, domain, CRTSH_TIMEOUT, HTTP_RETRIES) for url in urls]
+    for found in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(found, set):
+            subdomains |= found
 
     _cache_set_list(cache_key, sorted(subdomains))
     return subdomains
@@ -287,31 +378,25 @@ def _fetch_dnsdumpster(domain: str) -> Set[str]:
     return subdomains
 
 
-def _load_wordlist() -> List[str]:
-    """Load subdomain wordlist for brute-force, with a built-in fallback."""
-    paths = [
-        Path("data/wordlists/subdomains-small.txt"),
-        Path("data/wordlists/subdomains-top1mil.txt"),
-    ]
-    for path in paths:
-        if path.exists():
-            try:
-                return [
-                    line.strip()
-                    for line in path.read_text(encoding="utf-8", errors="ignore").splitlines()
-                    if line.strip()
-                ]
-            except OSError as exc:
-                logger.debug("Wordlist read failed %s: %s", path, exc)
-    return list(_DEFAULT_FALLBACK_WORDLIST)
-
-
-async def _fetch_passive_async(domain: str) -> Set[str]:
+def _wordlist_path() -> Optional[Path]:
+    """Brute-force wordlist: BRUTEFORCE_WORDLIST, else the largest bundled list."""
+    paths = [Path(BRUTEFORCE_WORDLIST)] if BRUTEFORCE_WORDLIST else []
+    paths += [_WORDLIST_DIR / "subdomains-top1mil.txt", _WORDLIST_DIR / "subdomains-small.txt"]
+    return next((path for path in paths if path.is_file()), None)
+
+
+def _checkpoint_path(domain: str) -> Optional[Path]:
+    return Path(BRUTEFORCE_CHECKPOINT_DIR) / f"{domain}.json" if BRUTEFORCE_CHECKPOINT_DIR else None
+
+
+async def _fetch_passive_async(
+    domain: str, session: Optional[aiohttp.ClientSession] = None
+) -> Set[str]:
     """Run all passive sources in parallel (crt.sh, Crobat, HackerTarget, Anubis, CertSpotter, SecurityTrails)."""
     all_subs: Set[str] = set()
     headers = {"User-Agent": USER_AGENT}
 
-    async with make_aiohttp_session(headers) as session:
+    async with (nullcontext(session) if session else make_aiohttp_session(headers)) as session:
         tasks = [
             _fetch_crtsh_async(session, domain),
             _fetch_crobat_async(session, domain),
@@ -327,82 +412,59 @@ async def _fetch_passive_async(domain: str) -> Set[str]:
     return all_subs
 
 
-class SubdomainEnricher(AbstractEnricher):
+class SubdomainEnricher(AsyncEnricher):
     """Enricher for subdomain discovery (passive + optional brute-force)."""
 
     name = "subdomain"
+    produces = ("subdomains",)
 
     def __init__(self, enable_bruteforce: bool = False):
         self.enable_bruteforce = enable_bruteforce
 
-    def _active_bruteforce(self, domain: str) -> Set[str]:
-        """Active DNS brute-force (async via aiodns when available, else sync)."""
+    async def _active_bruteforce(self, domain: str) -> Set[str]:
+        """Active DNS brute-force (streamed wordlist, wildcard hits dropped)."""
         if not self.enable_bruteforce:
             return set()
 
-        wordlist = _load_wordlist()[:_BRUTE_FORCE_WORDLIST_SIZE]
-        if not wordlist:
-            return set()
-
+        path = _wordlist_path()
+        if path is not None:
+            words: Iterable[str] = iter_wordlist(path, BRUTEFORCE_MAX_WORDS)
+            source = str(path)
+        else:
+            words, source = _DEFAULT_FALLBACK_WORDLIST, "builtin"
         try:
-            return self._bruteforce_async(domain, wordlist)
-        except ImportError:
-            return self._bruteforce_sync(domain, wordlist)
-
-    @staticmethod
-    def _bruteforce_async(domain: str, wordlist: List[str]) -> Set[str]:
-        import aiodns  # local import: optional dep
-
-        resolver = aiodns.DNSResolver()
-
-        async def _resolve_one(candidate: str) -> Optional[str]:
-            try:
-                await resolver.query(candidate, "A")
-                return candidate
-            except Exception:
-                return None
-
-        async def _run() -> Set[str]:
-            sem = asyncio.Semaphore(_BRUTE_FORCE_CONCURRENCY)
-
-            async def _limited(candidate: str) -> Optional[str]:
-                async with sem:
-                    return await _resolve_one(candidate)
-
-            tasks = [_limited(f"{sub}.{domain}") for sub in wordlist]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            return {r for r in results if isinstance(r, str)}
-
-        return asyncio.run(_run())
-
-    @staticmethod
-    def _bruteforce_sync(domain: str, wordlist: List[str]) -> Set[str]:
-        import dns.resolver  # local import (heavy module already loaded elsewhere)
-
-        found: Set[str] = set()
-        for sub in wordlist:
-            candidate = f"{sub}.{domain}"
-            try:
-                dns.resolver.resolve(candidate, "A")
-                found.add(candidate)
-            except Exception:
-                continue
-        return found
-
-    def enrich(self, domain: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+            engine = BruteforceEngine(checkpoint_path=_checkpoint_path(domain))
+        except Exception as exc:  # no usable resolver configuration
+            logger.warning("DNS brute-force disabled: %s", exc)
+            return set()
+        result = await engine.run(domain, words, source=source)
+        logger.info("DNS brute-force %s: %s", domain, result.stats())
+        return set(result.found)
+
+    async def enrich_async(
+        self,
+        domain: str,
+        context: Optional[Dict[str, Any]] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> Dict[str, Any]:
         domain = domain.lower().strip()
         all_subs: Set[str] = set()
 
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            async_future = executor.submit(asyncio.run, _fetch_passive_async(domain))
-            dnsdumpster_future = executor.submit(_fetch_dnsdumpster, domain)
-            for future in as_completed((async_future, dnsdumpster_future)):
-                try:
-                    all_subs |= future.result(timeout=CRTSH_TIMEOUT + 15)
-                except Exception as exc:
-                    logger.debug("Passive subdomain task failed: %s", exc)
+        passive_tasks = (
+            _fetch_passive_async(domain, session),
+            get_executor().run(POOL_SOCKET, _fetch_dnsdumpster, domain),  # sync client (requests)
+        )
+        results = await asyncio.gather(
+            *(asyncio.wait_for(task, CRTSH_TIMEOUT + 15) for task in passive_tasks),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.debug("Passive subdomain task failed: %s", result)
+                continue
+            all_subs |= result
 
-        all_subs |= self._active_bruteforce(domain)
+        all_subs |= await self._active_bruteforce(domain)
 
         # Deduplicate by canonical form so e.g. www.events.example.com -> events.example.com.
         seen_canonical: Set[str] = set()
@@ -6,76 +6,161 @@ Uses aiohttp for async HTTP requests.
 import asyncio
 import hashlib
 import re
+from contextlib import nullcontext
+from html.parser import HTMLParser
 from typing import Any, Dict, List, Optional
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 
 import aiohttp
 
-from src.config.settings import HTTP_TIMEOUT, HTTP_VERIFY_SSL, USER_AGENT
+from src.config.settings import HTTP_TIMEOUT, HTTP_VERIFY_SSL, TECH_BODY_MAX_BYTES, USER_AGENT
+from src.core.delta import ScanBaseline
+from src.core.executor import POOL_CPU, POOL_DNS, get_executor
 from src.core.models import SecurityHeadersInfo, TechStack
 from src.enrichers._http import make_aiohttp_session
-from src.enrichers.base import AbstractEnricher
+from src.enrichers.base import AsyncEnricher
+from src.enrichers.fingerprints import Fingerprints, get_fingerprints
+from src.enrichers.host_groups import collapse_hosts, priority_score, split_members
+from src.enrichers.liveness import web_url
+from src.enrichers.ssl import TlsCapture
 
 
 TECH_SUBDOMAIN_LIMIT = 100
-TECH_PRIORITY_PREFIXES = {
-    "account",
-    "accounts",
-    "admin",
-    "api",
-    "app",
-    "auth",
-    "login",
-    "portal",
-    "sso",
-    "vpn",
-    "www",
-}
-
-
-def _parse_meta_tags(html: str) -> tuple[Optional[str], Optional[str]]:
-    """Extract meta generator and CMS hints from HTML."""
-    generator = None
-    cms = None
+_READ_CHUNK_BYTES = 16 * 1024
+# robots.txt / security.txt are kept to 2048 characters; favicons above the
+# cap are not hashed.
+_TEXT_FILE_MAX_BYTES = 8 * 1024
+_FAVICON_MAX_BYTES = 1024 * 1024
+_META_CMS_NAME = re.compile(r"cms|generator", re.I)
+
+
+class _OriginArtifacts:
+    """
+    Favicon, robots.txt and security.txt of each final (post-redirect) origin,
+    fetched once per scan however many probed URLs end up there.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession):
+        self._session = session
+        self._fetches: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+
+    async def get(self, origin: str) -> Dict[str, Any]:
+        """``favicon_hash``, ``robots_txt`` and ``security_txt`` of ``origin``."""
+        fetch = self._fetches.get(origin)
+        if fetch is None:
+            fetch = self._fetches[origin] = asyncio.ensure_future(self._fetch(origin))
+        # One caller giving up must not cancel the fetch the others wait on.
+        return await asyncio.shield(fetch)
+
+    async def _fetch(self, origin: str) -> Dict[str, Any]:
+        favicon, robots_txt, security_txt = await asyncio.gather(
+            _fetch_favicon_async(self._session, origin),
+            _fetch_robots_txt_async(self._session, origin),
+            _fetch_security_txt_async(self._session, origin),
+        )
+        return {
+            "favicon_hash": _favicon_hash(favicon) if favicon else None,
+            "robots_txt": robots_txt,
+            "security_txt": security_txt,
+        }
+
+
+class _HeadEnd(Exception):
+    """Raised by ``_MetaExtractor`` once the document head is over."""
+
+
+class _MetaExtractor(HTMLParser):
+    """Tokenizes HTML up to ``</head>`` (or ``<body>``), collecting ``<meta>`` name (or property) -> content."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.meta: Dict[str, str] = {}
+
+    def handle_starttag(self, tag: str, attrs: List[tuple]) -> None:
+        if tag == "body":
+            raise _HeadEnd
+        if tag != "meta":
+            return
+        values = dict(attrs)
+        name = (values.get("name") or values.get("property") or "").lower()
+        content = (values.get("content") or "").strip()
+        if name and content:
+            self.meta.setdefault(name, content)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "head":
+            raise _HeadEnd
+
+
+def _head_meta(html: str) -> Dict[str, str]:
+    """Meta tags of the document head (the first of each name wins)."""
+    extractor = _MetaExtractor()
     try:
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(html[:50000], "html.parser")
-        meta_gen = soup.find("meta", attrs={"name": "generator"})
-        if meta_gen and meta_gen.get("content"):
-            generator = meta_gen["content"].strip()
-        meta_cms = soup.find("meta", attrs={"name": re.compile(r"cms|generator", re.I)})
-        if meta_cms and meta_cms.get("content"):
-            cms = meta_cms["content"].strip()
-        if not cms and "wp-content" in html:
-            cms = "WordPress"
-        elif not cms and "drupal" in html.lower():
-            cms = "Drupal"
-    except Exception:
+        extractor.feed(html)
+    except Exception:  # _HeadEnd, or markup the tokenizer gives up on
         pass
+    return extractor.meta
+
+
+def _meta_hints(meta: Dict[str, str], html: str) -> tuple[Optional[str], Optional[str]]:
+    """Meta generator and CMS hints (from ``<meta>`` tags, else body substrings)."""
+    generator = meta.get("generator")
+    cms = next((content for name, content in meta.items() if _META_CMS_NAME.search(name)), None)
+    if not cms and "wp-content" in html:
+        cms = "WordPress"
+    elif not cms and "drupal" in html.lower():
+        cms = "Drupal"
     return generator, cms
 
 
-async def _favicon_hash_async(session: aiohttp.ClientSession, url: str) -> Optional[int]:
-    """Compute favicon hash (Wappalyzer-style)."""
+def _parse_meta_tags(html: str) -> tuple[Optional[str], Optional[str]]:
+    """Extract meta generator and CMS hints from the head of an HTML page."""
+    return _meta_hints(_head_meta(html), html)
+
+
+async def _read_prefix(resp: aiohttp.ClientResponse, limit: int) -> bytes:
+    """At most ``limit`` bytes of the body; the rest is never downloaded."""
+    chunks: List[bytes] = []
+    size = 0
+    while size < limit:
+        chunk = await resp.content.read(min(_READ_CHUNK_BYTES, limit - size))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    return b"".join(chunks)
+
+
+async def _read_text_prefix(resp: aiohttp.ClientResponse, limit: int) -> str:
+    body = await _read_prefix(resp, limit)
+    return body.decode(resp.charset or "utf-8", errors="replace")
+
+
+async def _fetch_favicon_async(session: aiohttp.ClientSession, origin: str) -> Optional[bytes]:
+    """Favicon bytes of ``origin``; None when missing or oversized."""
     try:
-        favicon_url = urljoin(url.rstrip("/") + "/", "/favicon.ico")
-        async with session.get(favicon_url, timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT)) as resp:
+        async with session.get(f"{origin}/favicon.ico", timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT)) as resp:
             if resp.status == 200:
-                content = await resp.read()
-                if content:
-                    return int(hashlib.md5(content).hexdigest(), 16) & 0xFFFFFFFF
+                content = await _read_prefix(resp, _FAVICON_MAX_BYTES + 1)
+                if content and len(content) <= _FAVICON_MAX_BYTES:
+                    return content
     except Exception:
         pass
     return None
 
 
+def _favicon_hash(content: bytes) -> int:
+    """Favicon hash (Wappalyzer-style)."""
+    return int(hashlib.md5(content).hexdigest(), 16) & 0xFFFFFFFF
+
+
 async def _fetch_robots_txt_async(session: aiohttp.ClientSession, base_url: str) -> Optional[str]:
     """Fetch robots.txt content (first 2KB)."""
     try:
         url = f"{base_url}/robots.txt"
         async with session.get(url, timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT)) as resp:
             if resp.status == 200:
-                text = await resp.text()
+                text = await _read_text_prefix(resp, _TEXT_FILE_MAX_BYTES)
                 return text[:2048] if text else None
     except Exception:
         pass
@@ -89,80 +174,99 @@ async def _fetch_security_txt_async(session: aiohttp.ClientSession, base_url: st
             url = f"{base_url.rstrip('/')}{path}"
             async with session.get(url, timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT)) as resp:
                 if resp.status == 200:
-                    text = await resp.text()
+                    text = await _read_text_prefix(resp, _TEXT_FILE_MAX_BYTES)
                     return text[:2048] if text else None
     except Exception:
         pass
     return None
 
 
-async def _detect_tech_async(session: aiohttp.ClientSession, url: str) -> TechStack:
-    """Detect technologies for a URL using aiohttp."""
+async def _detect_tech_async(
+    session: aiohttp.ClientSession,
+    url: str,
+    tls_capture: Optional[TlsCapture] = None,
+    fingerprints: Optional[Fingerprints] = None,
+    artifacts: Optional[_OriginArtifacts] = None,
+) -> TechStack:
+    """
+    Detect technologies for a URL using aiohttp: headers, favicon, meta tags
+    and the fingerprint rules (TLS sessions of the page fetch go to ``tls_capture``).
+
+    Favicon, robots.txt and security.txt come from the final origin through
+    ``artifacts`` (shared by the URLs of one scan).
+    """
     try:
         async with session.get(
             url,
             timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
             allow_redirects=True,
+            trace_request_ctx=tls_capture,
         ) as resp:
-            text = await resp.text()
+            # Only the head and early body carry hints; large pages are cut off.
+            text = await _read_text_prefix(resp, TECH_BODY_MAX_BYTES)
             headers = {k.lower(): v for k, v in resp.headers.items()}
-
-            server = headers.get("server")
-            x_powered = headers.get("x-powered-by")
-            techs: List[str] = []
-
-            if server:
-                techs.append(f"Server: {server}")
-            if x_powered:
-                techs.append(f"X-Powered-By: {x_powered}")
-            if "x-aspnet-version" in headers:
-                techs.append("ASP.NET")
-            if "x-drupal-cache" in headers:
-                techs.append("Drupal")
-            if "x-generator" in headers:
-                techs.append(headers["x-generator"])
-            if "wp-" in str(text[:5000]):
-                techs.append("WordPress")
-
-            parsed = urlparse(url)
-            base = f"{parsed.scheme}://{parsed.netloc}"
-
-            favicon_hash, robots_txt, security_txt = await asyncio.gather(
-                _favicon_hash_async(session, url),
-                _fetch_robots_txt_async(session, base),
-                _fetch_security_txt_async(session, base),
-            )
-            if favicon_hash:
-                techs.append(f"Favicon hash: {favicon_hash}")
-
-            meta_generator, meta_cms = _parse_meta_tags(text)
-            if meta_generator:
-                techs.append(f"Generator: {meta_generator}")
-            if meta_cms:
-                techs.append(f"CMS: {meta_cms}")
-
-            # Extract security headers (HSTS, X-Frame-Options, CSP, etc.)
-            sec_headers = SecurityHeadersInfo(
-                strict_transport_security=headers.get("strict-transport-security"),
-                x_frame_options=headers.get("x-frame-options"),
-                content_security_policy=headers.get("content-security-policy"),
-                x_content_type_options=headers.get("x-content-type-options"),
-                referrer_policy=headers.get("referrer-policy"),
-            )
-
-            return TechStack(
-                url=url,
-                technologies=techs,
-                headers=dict(headers),
-                security_headers=sec_headers,
-                server=server,
-                x_powered_by=x_powered,
-                favicon_hash=favicon_hash,
-                robots_txt=robots_txt,
-                security_txt=security_txt,
-                meta_generator=meta_generator,
-                meta_cms=meta_cms,
-            )
+            cookies = {name: morsel.value for name, morsel in resp.cookies.items()}
+            origin = str(resp.url.origin())
+        # Leaving the response hands its connection back (closed when the body
+        # was cut off) before the origin files are fetched from the same pool.
+
+        server = headers.get("server")
+        x_powered = headers.get("x-powered-by")
+        techs: List[str] = []
+
+        if server:
+            techs.append(f"Server: {server}")
+        if x_powered:
+            techs.append(f"X-Powered-By: {x_powered}")
+        if "x-generator" in headers:
+            techs.append(headers["x-generator"])
+
+        # Subdomains redirecting to one site share its favicon and text files.
+        shared = await (artifacts or _OriginArtifacts(session)).get(origin)
+        favicon_hash = shared["favicon_hash"]
+        if favicon_hash:
+            techs.append(f"Favicon hash: {favicon_hash}")
+
+        meta = _head_meta(text)
+        meta_generator, meta_cms = _meta_hints(meta, text)
+        if meta_generator:
+            techs.append(f"Generator: {meta_generator}")
+        if meta_cms:
+            techs.append(f"CMS: {meta_cms}")
+
+        # Large rulesets take milliseconds per page; match off the event loop.
+        detections = await get_executor().run(
+            POOL_CPU, (fingerprints or get_fingerprints()).match, headers, cookies, meta, text, None, favicon_hash
+        )
+        for detection in detections:
+            label = f"{detection.name} {detection.version}" if detection.version else detection.name
+            if label not in techs:
+                techs.append(label)
+
+        # Extract security headers (HSTS, X-Frame-Options, CSP, etc.)
+        sec_headers = SecurityHeadersInfo(
+            strict_transport_security=headers.get("strict-transport-security"),
+            x_frame_options=headers.get("x-frame-options"),
+            content_security_policy=headers.get("content-security-policy"),
+            x_content_type_options=headers.get("x-content-type-options"),
+            referrer_policy=headers.get("referrer-policy"),
+        )
+
+        return TechStack(
+            url=url,
+            technologies=techs,
+            headers=dict(headers),
+            security_headers=sec_headers,
+            server=server,
+            x_powered_by=x_powered,
+            favicon_hash=favicon_hash,
+            robots_txt=shared["robots_txt"],
+            security_txt=shared["security_txt"],
+            origin=origin,
+            meta_generator=meta_generator,
+            meta_cms=meta_cms,
+            detections=detections,
+        )
     except Exception as e:
         return TechStack(url=url, error=str(e) or "Connection failed")
 
@@ -176,20 +280,34 @@ def _is_mail_subdomain(url: str) -> bool:
         return False
 
 
-def _priority_score(subdomain: str) -> tuple[int, str]:
-    """Prioritize likely user-facing services before applying the scan limit."""
-    prefix = subdomain.lower().split(".")[0]
-    return (0 if prefix in TECH_PRIORITY_PREFIXES else 1, subdomain)
-
-
-async def _fetch_tech_stack_async(urls: List[str], verify_ssl: bool = True) -> Dict[str, Any]:
+async def _fetch_tech_stack_async(
+    urls: List[str],
+    verify_ssl: bool = True,
+    session: Optional[aiohttp.ClientSession] = None,
+    tls_capture: Optional[TlsCapture] = None,
+) -> Dict[str, Any]:
     """Fetch tech stack for multiple URLs in parallel."""
     tech_stack: Dict[str, Any] = {}
     headers = {"User-Agent": USER_AGENT}
-
-    async with make_aiohttp_session(headers, verify_ssl=verify_ssl) as session:
-        tasks = [_detect_tech_async(session, url) for url in urls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+    # The shared scan session verifies TLS; opting out needs a dedicated connector.
+    if not verify_ssl:
+        session = None
+
+    # The ruleset is compiled on first use; keep that off the event loop.
+    fingerprints = await get_executor().run(POOL_CPU, get_fingerprints)
+    async with (
+        nullcontext(session) if session else make_aiohttp_session(headers, verify_ssl=verify_ssl)
+    ) as session:
+        artifacts = _OriginArtifacts(session)
+
+        async def detect(url: str) -> TechStack:
+            try:
+                return await _detect_tech_async(session, url, tls_capture, fingerprints, artifacts)
+            finally:
+                if tls_capture is not None:
+                    tls_capture.fetched(urlparse(url).hostname)
+
+        results = await asyncio.gather(*(detect(url) for url in urls), return_exceptions=True)
         for url, result in zip(urls, results):
             if isinstance(result, TechStack):
                 tech_stack[result.url] = result.model_dump()
@@ -199,23 +317,94 @@ async def _fetch_tech_stack_async(urls: List[str], verify_ssl: bool = True) -> D
     return tech_stack
 
 
-class TechEnricher(AbstractEnricher):
-    """Enricher for technology fingerprinting. Uses subdomains from context."""
+class TechEnricher(AsyncEnricher):
+    """
+    Enricher for technology fingerprinting. Uses subdomains from context.
+
+    Hosts grouped by the host-grouping stage are fetched once (the first of
+    each group by priority) and share the result; copies the grouping does
+    not vouch for (``split_members``) carry ``inferred_from``. With a
+    ``ScanBaseline`` only URLs whose host is new or changed are fetched.
+
+    The certificates of the page fetches' TLS sessions are recorded in
+    ``tls_capture`` as they are seen and returned as ``tls_peers``. The https
+    hosts to fetch are announced to the capture first, so the SSL enricher of
+    the same scan waits for those sessions instead of handshaking again.
+
+    Favicon, robots.txt and security.txt are fetched once per final origin;
+    each entry's ``origin`` names the one it was given.
+
+    Hosts the liveness pre-probe found closed on every web port are skipped
+    before ``TECH_SUBDOMAIN_LIMIT`` applies; hosts answering on 80 but not 443
+    are fetched over http.
+    """
 
     name = "tech"
+    requires = ("subdomains", "host_groups", "liveness")
+    produces = ("tech_stack", "tls_peers")
+
+    def __init__(self, baseline: Optional[ScanBaseline] = None, tls_capture: Optional[TlsCapture] = None):
+        self.baseline = baseline
+        self.tls_capture = tls_capture
+
+    async def enrich_async(
+        self,
+        domain: str,
+        context: Optional[Dict[str, Any]] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> Dict[str, Any]:
+        tls_capture = self.tls_capture or TlsCapture()
+        try:
+            return await self._probe(domain, context or {}, session, tls_capture)
+        finally:
+            # Release SSL waiters on hosts never fetched (error, timeout, cancel).
+            tls_capture.close()
+
+    async def _probe(
+        self,
+        domain: str,
+        context: Dict[str, Any],
+        session: Optional[aiohttp.ClientSession],
+        tls_capture: TlsCapture,
+    ) -> Dict[str, Any]:
+        candidates = [
+            sub for sub in sorted(context.get("subdomains") or [], key=priority_score)
+            if not _is_mail_subdomain(f"https://{sub}")
+        ]
+        host_groups = context.get("host_groups")
+        groups = collapse_hosts([domain, *candidates], host_groups)
+        liveness = context.get("liveness")
+        urls = {host: web_url(host, liveness) for host in groups}
+        hosts = [host for host, url in urls.items() if url][: TECH_SUBDOMAIN_LIMIT + 1]
+        urls_to_check = [urls[host] for host in hosts]
+        carried: Dict[str, Any] = {}
+        if self.baseline:
+            previous = {
+                url: entry for url, entry in (self.baseline.previous.tech_stack or {}).items()
+                if isinstance(entry, dict) and not entry.get("error")
+            }
+            # host_changed resolves DNS; keep it off the event loop.
+            carried, urls_to_check = await get_executor().run(
+                POOL_DNS,
+                self.baseline.split, "tech_stack", urls_to_check, previous, lambda url: urlparse(url).hostname
+            )
 
-    def enrich(self, domain: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        urls_to_check: List[str] = []
-        base = f"https://{domain}"
-        urls_to_check.append(base)
-
-        if context and context.get("subdomains"):
-            candidates = sorted(context["subdomains"], key=_priority_score)[:TECH_SUBDOMAIN_LIMIT]
-            for sub in candidates:
-                url = f"https://{sub}"
-                if not _is_mail_subdomain(url):
-                    urls_to_check.append(url)
-
-        urls_to_check = list(dict.fromkeys(urls_to_check))
-        tech_stack = asyncio.run(_fetch_tech_stack_async(urls_to_check, verify_ssl=HTTP_VERIFY_SSL))
-        return {"tech_stack": tech_stack if tech_stack else None}
+        tls_capture.expect(urlparse(url).hostname for url in urls_to_check if url.startswith("https://"))
+        tech_stack = await _fetch_tech_stack_async(
+            urls_to_check, verify_ssl=HTTP_VERIFY_SSL, session=session, tls_capture=tls_capture
+        ) if urls_to_check else {}
+        tech_stack = {**carried, **tech_stack}
+        for host in hosts:
+            entry = tech_stack.get(urls[host])
+            if not isinstance(entry, dict) or len(groups[host]) < 2:
+                continue
+            _, cert = tls_capture.results.get(host, (None, None))
+            confirmed, inferred = split_members(groups[host], host_groups, cert)
+            scheme = urls[host].split("://", 1)[0]
+            for member in confirmed[1:]:
+                url = f"{scheme}://{member}"
+                tech_stack.setdefault(url, {**entry, "url": url})
+            for member in inferred:
+                url = f"{scheme}://{member}"
+                tech_stack.setdefault(url, {**entry, "url": url, "inferred_from": urls[host]})
+        return {"tech_stack": tech_stack if tech_stack else None, "tls_peers": tls_capture.ssl_info()}
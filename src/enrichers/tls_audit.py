@@ -0,0 +1,182 @@
+"""
+Local TLS protocol and cipher audit - the SSL Labs checks that feed risk
+scoring, run directly against each HTTPS endpoint.
+
+For every endpoint (an apex address, with the domain as SNI) one handshake
+per protocol version (SSL 3.0 - TLS 1.3) and one per weak cipher family
+(TLS 1.2 and below) run concurrently against the TLS handshake budget.
+Each probe ends as:
+
+* ``supported`` - the handshake completed;
+* ``rejected``  - the server refused it (alert, reset, version mismatch);
+* ``untested``  - the local OpenSSL cannot offer it (SSLv3 and EXPORT
+  ciphers are compiled out of most builds), so nothing is known;
+* ``error``     - no TCP connection.
+
+The result has the ``weak_protocols`` / ``has_weak_protocols`` shape of
+``fetch_ssllabs_analyze``, plus ``weak_ciphers`` and per-endpoint details.
+"""
+
+import asyncio
+import ssl
+import warnings
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.core.shared import ResourceLimits
+from src.enrichers.ssl import _TLS_CONNECT_TIMEOUT_SECONDS, _tls_slots
+
+PROBE_SUPPORTED = "supported"
+PROBE_REJECTED = "rejected"
+PROBE_UNTESTED = "untested"
+PROBE_ERROR = "error"
+
+# (label, version, compiled into the local OpenSSL)
+PROTOCOLS: Tuple[Tuple[str, ssl.TLSVersion, bool], ...] = (
+    ("SSL 3.0", ssl.TLSVersion.SSLv3, ssl.HAS_SSLv3),
+    ("TLS 1.0", ssl.TLSVersion.TLSv1, ssl.HAS_TLSv1),
+    ("TLS 1.1", ssl.TLSVersion.TLSv1_1, ssl.HAS_TLSv1_1),
+    ("TLS 1.2", ssl.TLSVersion.TLSv1_2, ssl.HAS_TLSv1_2),
+    ("TLS 1.3", ssl.TLSVersion.TLSv1_3, ssl.HAS_TLSv1_3),
+)
+WEAK_PROTOCOLS = ("SSL 3.0", "TLS 1.0", "TLS 1.1")
+# (label, OpenSSL cipher string); TLS 1.3 suites are all strong.
+WEAK_CIPHERS: Tuple[Tuple[str, str], ...] = (
+    ("NULL", "eNULL"),
+    ("anonymous", "aNULL"),
+    ("EXPORT", "EXP"),
+    ("RC4", "RC4"),
+    ("DES", "DES"),
+    ("3DES", "3DES"),
+)
+# Handshake failures raised before anything reaches the server.
+_LOCAL_REASONS = {"NO_PROTOCOLS_AVAILABLE", "NO_CIPHERS_AVAILABLE", "NO_CIPHER_MATCH"}
+# Most apex addresses audited per domain.
+_MAX_ENDPOINTS = 4
+
+
+def _client_context(
+    minimum: ssl.TLSVersion,
+    maximum: ssl.TLSVersion,
+    ciphers: str = "ALL:COMPLEMENTOFALL",
+) -> Optional[ssl.SSLContext]:
+    """Unverified client context limited to ``minimum``-``maximum``; None if OpenSSL refuses it."""
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    try:
+        # Security level 0 lets OpenSSL offer legacy protocols and ciphers.
+        context.set_ciphers(f"{ciphers}:@SECLEVEL=0")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)  # offering TLS 1.0/1.1 is the point
+            context.minimum_version = minimum
+            context.maximum_version = maximum
+    except (ssl.SSLError, ValueError):
+        return None
+    return context
+
+
+async def _handshake(
+    ip: str,
+    port: int,
+    server_name: str,
+    context: ssl.SSLContext,
+    timeout: float,
+) -> Tuple[str, Optional[str]]:
+    """One probe: (outcome, negotiated cipher)."""
+    writer = None
+    try:
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+        except (OSError, asyncio.TimeoutError):
+            return PROBE_ERROR, None
+        try:
+            await asyncio.wait_for(writer.start_tls(context, server_hostname=server_name), timeout)
+        except ssl.SSLError as exc:
+            return (PROBE_UNTESTED if exc.reason in _LOCAL_REASONS else PROBE_REJECTED), None
+        except (OSError, EOFError, asyncio.TimeoutError):
+            return PROBE_REJECTED, None
+        cipher = writer.get_extra_info("cipher")
+        return PROBE_SUPPORTED, cipher[0] if cipher else None
+    finally:
+        if writer is not None:
+            writer.transport.abort()
+
+
+async def _audit_endpoint(
+    ip: str,
+    server_name: str,
+    port: int = 443,
+    timeout: Optional[float] = None,
+    limits: Optional[ResourceLimits] = None,
+) -> Dict[str, Any]:
+    """Protocol and weak-cipher probes against one endpoint."""
+    timeout = timeout or _TLS_CONNECT_TIMEOUT_SECONDS
+    slots = _tls_slots(limits)
+
+    async def probe(context: Optional[ssl.SSLContext]) -> Tuple[str, Optional[str]]:
+        if context is None:
+            return PROBE_UNTESTED, None
+        async with slots:
+            return await _handshake(ip, port, server_name, context, timeout)
+
+    protocol_contexts = [
+        _client_context(version, version) if available else None for _, version, available in PROTOCOLS
+    ]
+    cipher_contexts = [
+        _client_context(ssl.TLSVersion.MINIMUM_SUPPORTED, ssl.TLSVersion.TLSv1_2, ciphers)
+        for _, ciphers in WEAK_CIPHERS
+    ]
+    outcomes = await asyncio.gather(*(probe(context) for context in protocol_contexts + cipher_contexts))
+    protocol_outcomes, cipher_outcomes = outcomes[: len(PROTOCOLS)], outcomes[len(PROTOCOLS):]
+
+    endpoint: Dict[str, Any] = {
+        "ip": ip,
+        "protocols": {label: outcome for (label, _, _), (outcome, _) in zip(PROTOCOLS, protocol_outcomes)},
+        "weak_ciphers": [
+            {"family": label, "cipher": cipher}
+            for (label, _), (outcome, cipher) in zip(WEAK_CIPHERS, cipher_outcomes)
+            if outcome == PROBE_SUPPORTED
+        ],
+    }
+    if all(outcome == PROBE_ERROR for outcome, _ in outcomes if outcome != PROBE_UNTESTED):
+        endpoint["error"] = f"No TLS connection to {ip}:{port}"
+    return endpoint
+
+
+async def audit_tls(
+    domain: str,
+    ips: Sequence[str],
+    port: int = 443,
+    timeout: Optional[float] = None,
+    limits: Optional[ResourceLimits] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Audit every endpoint of ``domain`` (its apex ``ips``, at most four).
+
+    Returns None without endpoints, an ``error`` payload when none answered.
+    """
+    endpoints_ips = list(dict.fromkeys(ips))[:_MAX_ENDPOINTS]
+    if not endpoints_ips:
+        return None
+    endpoints = await asyncio.gather(
+        *(_audit_endpoint(ip, domain, port, timeout, limits) for ip in endpoints_ips)
+    )
+    reachable = [endpoint for endpoint in endpoints if not endpoint.get("error")]
+    if not reachable:
+        return {"domain": domain, "endpoints": endpoints, "error": "No HTTPS endpoint answered"}
+
+    weak_protocols: List[str] = [
+        label for label in WEAK_PROTOCOLS
+        if any(endpoint["protocols"].get(label) == PROBE_SUPPORTED for endpoint in reachable)
+    ]
+    weak_ciphers: List[str] = list(dict.fromkeys(
+        entry["family"] for endpoint in reachable for entry in endpoint["weak_ciphers"]
+    ))
+    return {
+        "domain": domain,
+        "endpoints": endpoints,
+        "weak_protocols": weak_protocols,
+        "has_weak_protocols": bool(weak_protocols),
+        "weak_ciphers": weak_ciphers,
+        "has_weak_ciphers": bool(weak_ciphers),
+    }
@@ -211,6 +211,7 @@ class WhoisEnricher(AbstractEnricher):
     """Enricher for WHOIS registration data."""
 
     name = "whois"
+    produces = ("whois_info",)
 
     def enrich(self, domain: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         cache_key = f"whois:{domain}"
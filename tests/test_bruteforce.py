@@ -0,0 +1,162 @@
+"""
+Tests for the DNS brute-force engine (src/core/bruteforce.py).
+
+Queries go to an in-process stand-in server (src/core/standin_dns.py) on
+127.0.0.1; nothing leaves the machine.
+"""
+
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core.bruteforce import AdaptiveLimit, BruteforceEngine, iter_wordlist, parse_nameserver
+from src.core.standin_dns import StandInDnsServer
+
+_RECORDS = {
+    "www.example.com": ["10.0.0.1"],
+    "api.example.com": ["10.0.0.2"],
+    "mail.example.com": ["10.0.0.3"],
+}
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class TestWordlist(unittest.TestCase):
+    def test_streams_valid_words_up_to_limit(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "words.txt"
+            path.write_text("# comment\nWWW\n\nbad word\napi\ndev.api\nmail\n", encoding="utf-8")
+            self.assertEqual(list(iter_wordlist(path)), ["www", "api", "dev.api", "mail"])
+            self.assertEqual(list(iter_wordlist(path, limit=2)), ["www", "api"])
+
+    def test_parse_nameserver(self):
+        self.assertEqual(parse_nameserver("1.1.1.1"), ("1.1.1.1", 53))
+        self.assertEqual(parse_nameserver("127.0.0.1:5353"), ("127.0.0.1", 5353))
+        self.assertEqual(parse_nameserver("[::1]:5300"), ("::1", 5300))
+
+
+class TestAdaptiveLimit(unittest.TestCase):
+    def test_grows_without_errors_and_halves_on_errors(self):
+        limit = AdaptiveLimit(100, minimum=10, maximum=1000, window=10)
+        for _ in range(100):
+            limit.record(True)
+        self.assertEqual(limit.limit, 110)
+        for _ in range(110):
+            limit.record(False)
+        self.assertEqual(limit.limit, 55)
+
+    def test_stragglers_from_before_a_decrease_ignored(self):
+        limit = AdaptiveLimit(100, minimum=10, maximum=1000, window=10)
+        for _ in range(100):
+            limit.record(False, epoch=0)
+        for _ in range(200):
+            limit.record(False, epoch=0)
+        self.assertEqual(limit.limit, 50)
+
+    def test_settles_around_upstream_capacity(self):
+        # Upstream answering at most 40 queries at once: every query beyond
+        # that fails, whatever the machine's speed.
+        capacity = 40
+        limit = AdaptiveLimit(200, minimum=10, maximum=400, window=10)
+        limits = []
+        for _ in range(60):
+            epoch, in_flight = limit.epoch, limit.limit
+            for slot in range(in_flight):
+                limit.record(slot < capacity, epoch)
+            limits.append(limit.limit)
+        self.assertEqual(limits[:3], [100, 50, 25])
+        # Afterwards it climbs back toward the capacity and halves soon after
+        # passing it (once over 5% of a round fails), never reaching the floor.
+        self.assertTrue(all(capacity // 2 <= value <= capacity * 1.2 for value in limits[3:]), limits)
+        self.assertGreater(max(limits[3:]), capacity)
+
+
+class TestBruteforceEngine(unittest.TestCase):
+    def test_finds_existing_names(self):
+        async def scenario():
+            async with StandInDnsServer(_RECORDS) as server:
+                engine = BruteforceEngine(nameservers=[server.address], timeout=1)
+                return await engine.run("example.com", iter(["www", "api", "nope", "mail", "ftp"]))
+
+        result = _run(scenario())
+        self.assertEqual(sorted(result.found), ["api.example.com", "mail.example.com", "www.example.com"])
+        self.assertEqual(result.found["api.example.com"], ["10.0.0.2"])
+        self.assertEqual(result.wildcard_addresses, [])
+        self.assertEqual(result.candidates, 5)
+
+    def test_wildcard_hits_filtered(self):
+        async def scenario():
+            server = StandInDnsServer(_RECORDS, wildcard=("example.com", ["10.9.9.9"]))
+            async with server:
+                engine = BruteforceEngine(nameservers=[server.address], timeout=1)
+                words = ["www", "anything", "else", "api"] + [f"w{i}" for i in range(50)]
+                return await engine.run("example.com", words)
+
+        result = _run(scenario())
+        self.assertEqual(sorted(result.found), ["api.example.com", "www.example.com"])
+        self.assertEqual(result.wildcard_addresses, ["10.9.9.9"])
+        self.assertEqual(result.wildcard_filtered, 52)
+
+    def test_concurrency_backs_off_when_upstream_overloaded(self):
+        async def scenario():
+            server = StandInDnsServer(_RECORDS, latency=0.02, capacity=40)
+            async with server:
+                engine = BruteforceEngine(
+                    nameservers=[server.address], concurrency=200, max_concurrency=400, timeout=1
+                )
+                words = ["www"] + [f"w{i}" for i in range(600)]
+                return await engine.run("example.com", words), server
+
+        result, server = _run(scenario())
+        self.assertGreater(server.servfails, 0)
+        self.assertIn("www.example.com", result.found)
+        self.assertEqual(result.peak_concurrency, 200)
+        self.assertLess(result.final_concurrency, 100)
+
+    def test_resumes_from_checkpoint(self):
+        words = ["www", "api", "mail", "nope"]
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = Path(tmp) / "example.com.json"
+            checkpoint.write_text(json.dumps({
+                "domain": "example.com",
+                "source": "words",
+                "position": 2,
+                "found": {"www.example.com": ["10.0.0.1"]},
+            }), encoding="utf-8")
+
+            async def scenario():
+                async with StandInDnsServer(_RECORDS) as server:
+                    engine = BruteforceEngine(nameservers=[server.address], checkpoint_path=checkpoint)
+                    result = await engine.run("example.com", iter(words), source="words")
+                    return result, server.queries
+
+            result, queries = _run(scenario())
+            self.assertFalse(checkpoint.exists())
+        self.assertEqual(result.resumed_from, 2)
+        self.assertEqual(sorted(result.found), ["mail.example.com", "www.example.com"])
+        self.assertEqual(queries, 3 + 2)  # wildcard probes + remaining words
+
+    def test_cancelled_run_writes_checkpoint(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = Path(tmp) / "example.com.json"
+
+            async def scenario():
+                async with StandInDnsServer(_RECORDS, latency=0.5) as server:
+                    engine = BruteforceEngine(
+                        nameservers=[server.address], concurrency=10, checkpoint_path=checkpoint
+                    )
+                    with self.assertRaises(asyncio.TimeoutError):
+                        await asyncio.wait_for(engine.run("example.com", ["www"] * 100), timeout=0.8)
+
+            _run(scenario())
+            state = json.loads(checkpoint.read_text(encoding="utf-8"))
+        self.assertEqual(state["domain"], "example.com")
+        self.assertLess(state["position"], 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,7 +13,9 @@ import unittest
 from unittest.mock import patch
 
 from src.core.models import DNSInfo
-from src.analysis.correlation import build_correlation_summary
+from src.analysis.correlation import build_correlation_summary, correlated_ips
+from src.core.orchestrator import build_scan_result
+from src.enrichers.correlation import CorrelationEnricher
 
 
 def _make_dns(domain: str = "example.com",
@@ -259,5 +261,42 @@ class TestBuildCorrelationSummarySharedCerts(unittest.TestCase):
         self.assertIn("www.example.com", result["shared_certificate_hosts"])
 
 
+class TestCorrelationEnricher(unittest.TestCase):
+
+    def test_reuses_dns_ptr_and_resolves_only_new_ips(self):
+        dns = _make_dns(a_records=["1.2.3.4"])
+        dns.ptr_records = {"1.2.3.4": "web.example.net."}
+        context = {"dns_info": dns, "subdomains": ["www.example.com", "mail.example.com"]}
+        addresses = {"www.example.com": ["1.2.3.4"], "mail.example.com": ["5.6.7.8"]}
+        with (
+            patch("src.enrichers.correlation._resolve_subdomain_a", side_effect=addresses.get),
+            patch("src.enrichers.correlation._resolve_ptr",
+                  return_value=("5.6.7.8", "mx.example.net.")) as mock_ptr,
+        ):
+            result = CorrelationEnricher().enrich("example.com", context)["correlation"]
+        mock_ptr.assert_called_once()
+        self.assertEqual(mock_ptr.call_args[0][0], "5.6.7.8")
+        self.assertEqual(result["ptr_records"], {"1.2.3.4": "web.example.net", "5.6.7.8": "mx.example.net"})
+        self.assertEqual(result["ip_to_subdomains"]["1.2.3.4"], ["example.com", "www.example.com"])
+        self.assertEqual(correlated_ips(result), ["1.2.3.4", "5.6.7.8"])
+
+    def test_scan_result_uses_pipeline_correlation(self):
+        data = {
+            "dns_info": _make_dns(a_records=["1.2.3.4"]),
+            "subdomains": [],
+            "correlation": {"unique_ips": 3, "ip_to_subdomains": {}, "ptr_records": {}},
+            "section_status": {"correlation": "complete"},
+        }
+        with (
+            patch("src.core.orchestrator.build_correlation_summary") as mock_build,
+            patch("src.core.orchestrator.shared_certificate_hosts", return_value=[]),
+        ):
+            result = build_scan_result("example.com", data)
+        mock_build.assert_not_called()
+        self.assertEqual(result.correlation["unique_ips"], 3)
+        self.assertEqual(result.correlation["shared_certificate_hosts"], [])
+        self.assertEqual(result.summary.total_ip_addresses, 3)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,145 @@
+"""
+Tests for delta re-scans (src/core/delta.py) and the enrichers that use a baseline.
+"""
+
+import asyncio
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from src.core.delta import ScanBaseline
+from src.core.models import CertificateInfo, OpenPort, PortScanResult, ScanResult, SslInfo, TlsHandshake
+from src.core.orchestrator import rescan_domain
+from src.enrichers.port import PortEnricher
+from src.enrichers.ssl import SslEnricher
+from src.enrichers.tech import TechEnricher
+
+
+def _previous(**overrides) -> ScanResult:
+    data = dict(
+        target_domain="example.com",
+        scan_date=datetime.utcnow() - timedelta(hours=24),
+        subdomains=["www.example.com"],
+        port_scan=[PortScanResult(ip="1.1.1.1", open_ports=[OpenPort(port=443, service="https")])],
+        ssl_info=SslInfo(certificates=[
+            CertificateInfo(host="example.com", not_after=datetime.utcnow() + timedelta(days=30)),
+        ]),
+        tech_stack={
+            "https://example.com": {"url": "https://example.com", "server": "nginx"},
+            "https://www.example.com": {"url": "https://www.example.com", "error": "timeout"},
+        },
+        correlation={"ip_to_subdomains": {"1.1.1.1": ["example.com", "www.example.com"]}},
+    )
+    data.update(overrides)
+    return ScanResult(**data)
+
+
+def _resolver(mapping):
+    return lambda host: mapping.get(host, [])
+
+
+class TestScanBaseline(unittest.TestCase):
+    def test_split_carries_unchanged_and_probes_new(self):
+        baseline = ScanBaseline(_previous(), resolve=_resolver({}))
+        carried, to_probe = baseline.split("port_scan", ["1.1.1.1", "2.2.2.2"], {"1.1.1.1": "old"})
+        self.assertEqual(carried, {"1.1.1.1": "old"})
+        self.assertEqual(to_probe, ["2.2.2.2"])
+        self.assertEqual(baseline.carried_forward()["port_scan"]["1.1.1.1"], baseline.scan_date)
+
+    def test_host_with_changed_addresses_is_probed(self):
+        baseline = ScanBaseline(
+            _previous(),
+            resolve=_resolver({"example.com": ["1.1.1.1"], "www.example.com": ["9.9.9.9"]}),
+        )
+        carried, to_probe = baseline.split(
+            "ssl_info", ["example.com", "www.example.com"],
+            {"example.com": None, "www.example.com": None}, host=lambda h: h,
+        )
+        self.assertEqual(list(carried), ["example.com"])
+        self.assertEqual(to_probe, ["www.example.com"])
+
+    def test_incomplete_section_is_probed_in_full(self):
+        baseline = ScanBaseline(_previous(section_status={"port_scan": "timeout"}), resolve=_resolver({}))
+        carried, to_probe = baseline.split("port_scan", ["1.1.1.1"], {"1.1.1.1": "old"})
+        self.assertEqual(carried, {})
+        self.assertEqual(to_probe, ["1.1.1.1"])
+
+    def test_stale_results_are_probed_and_original_timestamps_kept(self):
+        probed = datetime.utcnow() - timedelta(days=3)
+        previous = _previous(carried_forward={"port_scan": {"1.1.1.1": probed}})
+        fresh = ScanBaseline(previous, max_age=timedelta(days=7), resolve=_resolver({}))
+        fresh.split("port_scan", ["1.1.1.1"], {"1.1.1.1": "old"})
+        self.assertEqual(fresh.carried_forward()["port_scan"]["1.1.1.1"], probed)
+
+        stale = ScanBaseline(previous, max_age=timedelta(days=2), resolve=_resolver({}))
+        _, to_probe = stale.split("port_scan", ["1.1.1.1"], {"1.1.1.1": "old"})
+        self.assertEqual(to_probe, ["1.1.1.1"])
+        self.assertEqual(stale.carried_forward(), {})
+
+
+class TestDeltaEnrichers(unittest.TestCase):
+    def setUp(self):
+        self.baseline = ScanBaseline(
+            _previous(),
+            resolve=_resolver({"example.com": ["1.1.1.1"], "www.example.com": ["1.1.1.1"]}),
+        )
+
+    def test_port_enricher_scans_only_new_ips(self):
+        context = {"dns_info": {"a_records": ["1.1.1.1", "2.2.2.2"], "aaaa_records": []}}
+        with patch("src.enrichers.port._scan_ip_ports",
+                   return_value=PortScanResult(ip="2.2.2.2")) as mock_scan:
+            result = PortEnricher(baseline=self.baseline).enrich("example.com", context)
+        mock_scan.assert_called_once()
+        self.assertEqual(mock_scan.call_args[0][0], "2.2.2.2")
+        self.assertEqual([r.ip for r in result["port_scan"]], ["1.1.1.1", "2.2.2.2"])
+        self.assertEqual(result["port_scan"][0].open_ports[0].port, 443)
+
+    def test_ssl_enricher_reuses_certificates_of_unchanged_hosts(self):
+        context = {"subdomains": ["www.example.com", "new.example.com"]}
+        async def fake_cert(host, **kw):
+            return TlsHandshake(host=host), CertificateInfo(host=host, hosts=[host])
+
+        with patch("src.enrichers.ssl._get_cert_info", side_effect=fake_cert) as mock_get:
+            result = SslEnricher(baseline=self.baseline).enrich("example.com", context)
+        self.assertEqual([c.args[0] for c in mock_get.call_args_list], ["new.example.com"])
+        hosts = sorted(c.host for c in result["ssl_info"].certificates)
+        self.assertEqual(hosts, ["example.com", "new.example.com"])
+
+    def test_ssl_enricher_rechecks_expired_certificate(self):
+        expired = SslInfo(certificates=[
+            CertificateInfo(host="example.com", not_after=datetime.utcnow() - timedelta(days=1)),
+        ])
+        baseline = ScanBaseline(_previous(ssl_info=expired), resolve=_resolver({"example.com": ["1.1.1.1"]}))
+        async def no_cert(host, **kw):
+            return TlsHandshake(host=host, error="timeout"), None
+
+        with patch("src.enrichers.ssl._get_cert_info", side_effect=no_cert) as mock_get:
+            SslEnricher(baseline=baseline).enrich("example.com", {})
+        mock_get.assert_called_once()
+
+    def test_tech_enricher_fetches_only_changed_or_failed_urls(self):
+        async def fake_fetch(urls, verify_ssl=True, session=None, tls_capture=None):
+            return {url: {"url": url, "server": "caddy"} for url in urls}
+
+        context = {"subdomains": ["www.example.com"]}
+        with patch("src.enrichers.tech._fetch_tech_stack_async", side_effect=fake_fetch) as mock_fetch:
+            result = asyncio.run(TechEnricher(baseline=self.baseline).enrich_async("example.com", context))
+        self.assertEqual(mock_fetch.call_args[0][0], ["https://www.example.com"])
+        self.assertEqual(result["tech_stack"]["https://example.com"]["server"], "nginx")
+        self.assertEqual(result["tech_stack"]["https://www.example.com"]["server"], "caddy")
+
+
+class TestRescanDomain(unittest.TestCase):
+    def test_rejects_previous_scan_of_other_domain(self):
+        with self.assertRaises(ValueError):
+            rescan_domain("example.org", _previous())
+
+    def test_carried_forward_set_on_result(self):
+        def fake_scan(domain, on_progress=None, pipeline=None, deadline=None, tracer=None):
+            port = next(e for e in pipeline.enrichers if e.name == "port")
+            port.baseline.split("port_scan", ["1.1.1.1"], {"1.1.1.1": None})
+            return ScanResult(target_domain=domain)
+
+        with patch("src.core.orchestrator.scan_domain", side_effect=fake_scan):
+            result = rescan_domain("example.com", _previous())
+        self.assertIn("1.1.1.1", result.carried_forward["port_scan"])
@@ -0,0 +1,84 @@
+"""
+Tests for DNS Enricher (src/enrichers/dns.py).
+
+Resolver and AXFR calls are mocked; no packets are sent.
+"""
+
+import threading
+import unittest
+from unittest.mock import patch
+
+from src.enrichers.dns import DnsEnricher
+
+_RECORDS = {
+    "A": ["1.1.1.1"],
+    "AAAA": ["2606:4700::1111"],
+    "NS": ["ns1.example.com.", "ns2.example.com.", "ns3.example.com."],
+}
+
+
+def _fake_resolve_record(domain, field, rdtype, mapper, limits=None):
+    return field, _RECORDS.get(rdtype)
+
+
+class TestDnsEnricher(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            patch("src.enrichers.dns._resolve_record", side_effect=_fake_resolve_record),
+            patch("src.enrichers.dns._resolve_ptr", side_effect=lambda ip, limits=None: (ip, None)),
+            patch("src.enrichers.dns._resolve_ns_address", side_effect=lambda ns, limits=None: ns),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_publishes_addresses_before_finishing(self):
+        published = []
+        with (
+            patch("src.enrichers.dns.publish", side_effect=published.append),
+            patch.object(DnsEnricher, "_axfr_one", return_value=False),
+        ):
+            result = DnsEnricher().enrich("example.com")
+        self.assertEqual(published[0], {"ip_addresses": ["1.1.1.1", "2606:4700::1111"]})
+        self.assertEqual(list(published[1]), ["dns_info"])
+        self.assertEqual(published[1]["dns_info"].ns_records, _RECORDS["NS"])
+        self.assertEqual(result["ip_addresses"], ["1.1.1.1", "2606:4700::1111"])
+        self.assertTrue(result["dns_info"].zone_transfer_attempted)
+        self.assertFalse(result["dns_info"].zone_transfer_available)
+
+    def test_dns_info_published_before_zone_transfer_finishes(self):
+        published = threading.Event()
+        waited = []
+
+        def slow_axfr(_self, domain, ns):
+            waited.append(published.wait(5))  # True only if dns_info came out first
+            return False
+
+        def on_publish(data):
+            if "dns_info" in data:
+                self.assertFalse(data["dns_info"].zone_transfer_attempted)
+                published.set()
+
+        with (
+            patch("src.enrichers.dns.publish", side_effect=on_publish),
+            patch.object(DnsEnricher, "_axfr_one", slow_axfr),
+        ):
+            result = DnsEnricher().enrich("example.com")
+        self.assertEqual(waited, [True] * 3)
+        self.assertTrue(result["dns_info"].zone_transfer_attempted)
+
+    def test_zone_transfer_tries_nameservers_in_parallel(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def axfr_one(_self, domain, ns):
+            barrier.wait()  # breaks (and fails the test) if the NSes ran one by one
+            return ns == "ns2.example.com."
+
+        with patch.object(DnsEnricher, "_axfr_one", axfr_one):
+            available, error = DnsEnricher()._try_zone_transfer("example.com", _RECORDS["NS"])
+        self.assertTrue(available)
+        self.assertIsNone(error)
+
+
+if __name__ == "__main__":
+    unittest.main()
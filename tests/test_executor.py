@@ -0,0 +1,106 @@
+"""
+Tests for the process-wide executor (src/core/executor.py).
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+
+from src.core.executor import POOL_DNS, POOL_SOCKET, ExecutorService, get_executor
+from src.core.tracing import Tracer, current_tracer, use_tracer
+
+
+class TestExecutorService(unittest.TestCase):
+    def test_rejects_non_positive_max_workers(self):
+        with self.assertRaises(ValueError):
+            ExecutorService(max_workers=0)
+
+    def test_pool_limit_respected(self):
+        executor = ExecutorService(max_workers=8, limits={POOL_DNS: 2})
+        lock = threading.Lock()
+        running = peak = 0
+
+        def task():
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+        futures = [executor.submit(POOL_DNS, task) for _ in range(8)]
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual(peak, 2)
+
+    def test_nested_submission_does_not_deadlock(self):
+        executor = ExecutorService(max_workers=2, limits={POOL_DNS: 1, POOL_SOCKET: 1})
+
+        def probe(n):
+            return n * 2
+
+        def per_ip(ip):
+            futures = [executor.submit(POOL_SOCKET, probe, n) for n in range(5)]
+            return sum(f.result() for f in executor.as_completed(futures))
+
+        outer = [executor.submit(POOL_SOCKET, per_ip, ip) for ip in range(3)]
+        results = [f.result(timeout=5) for f in outer]
+        self.assertEqual(results, [20, 20, 20])
+
+    def test_as_completed_yields_every_future(self):
+        executor = ExecutorService(max_workers=4)
+        futures = {executor.submit(POOL_DNS, lambda n=n: n): n for n in range(10)}
+        done = [f.result() for f in executor.as_completed(futures)]
+        self.assertEqual(sorted(done), list(range(10)))
+
+    def test_exceptions_set_on_future(self):
+        executor = ExecutorService(max_workers=1)
+
+        def boom():
+            raise RuntimeError("boom")
+
+        future = executor.submit(POOL_DNS, boom)
+        with self.assertRaises(RuntimeError):
+            future.result(timeout=5)
+
+    def test_context_follows_task(self):
+        executor = ExecutorService(max_workers=2)
+        tracer = Tracer()
+        with use_tracer(tracer):
+            future = executor.submit(POOL_DNS, current_tracer)
+        self.assertIs(future.result(timeout=5), tracer)
+
+    def test_cancelled_queued_task_not_run(self):
+        executor = ExecutorService(max_workers=1, limits={POOL_DNS: 1})
+        release = threading.Event()
+        ran = []
+        blocker = executor.submit(POOL_DNS, release.wait)
+        queued = executor.submit(POOL_DNS, ran.append, 1)
+        self.assertTrue(queued.cancel())
+        release.set()
+        blocker.result(timeout=5)
+        time.sleep(0.05)
+        self.assertEqual(ran, [])
+
+    def test_run_from_event_loop(self):
+        executor = ExecutorService(max_workers=2)
+        self.assertEqual(asyncio.run(executor.run(POOL_DNS, sum, [1, 2, 3])), 6)
+
+    def test_stats_report_pools(self):
+        executor = ExecutorService(max_workers=4, limits={POOL_DNS: 2})
+        executor.submit(POOL_DNS, lambda: None).result(timeout=5)
+        stats = executor.stats()
+        self.assertEqual(stats["max_workers"], 4)
+        self.assertEqual(stats["queued"], 0)
+        self.assertEqual(stats["pools"][POOL_DNS]["limit"], 2)
+        self.assertEqual(stats["pools"][POOL_DNS]["submitted"], 1)
+        self.assertLessEqual(stats["peak_workers"], 4)
+
+    def test_get_executor_is_shared(self):
+        self.assertIs(get_executor(), get_executor())
+
+
+if __name__ == "__main__":
+    unittest.main()
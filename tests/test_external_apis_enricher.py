@@ -13,13 +13,17 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 from src.enrichers.external_apis import (
     ExternalApiEnricher,
+    ExternalIpApiEnricher,
+    merge_external_apis,
     _flatten_virustotal,
     _collect_unique_ips,
     _merge_results,
+    _domain_task_specs,
     fetch_single_external_api,
     _MAX_IPS,
 )
 from src.core.models import DNSInfo
+from src.core.shared import ResourceLimits
 
 
 # ---------------------------------------------------------------------------
@@ -297,6 +301,23 @@ class TestExternalApiEnricher(unittest.TestCase):
             result = enricher.enrich("example.com", context)
         self.assertIn("virustotal", result["external_apis"])
 
+    def test_tls_audit_gets_batch_limits(self):
+        limits = ResourceLimits(tcp_connect=4)
+        passed = []
+
+        async def fake_fetch(domain, ips, session=None, shared=None, apex_ips=(), domain_tasks=True, limits=None):
+            passed.append(limits)
+            return {}
+
+        with patch("src.enrichers.external_apis._fetch_external_apis_async", side_effect=fake_fetch):
+            ExternalApiEnricher(limits=limits).enrich("example.com", {"dns_info": _dns_obj(a_records=["1.2.3.4"])})
+        self.assertEqual(passed, [limits])
+
+        spec = next(spec for spec in _domain_task_specs("example.com", ["1.2.3.4"], limits) if spec.key == "tls_audit")
+        with patch("src.enrichers.external_apis.audit_tls", new=AsyncMock(return_value=None)) as audit:
+            asyncio.run(spec.coro_factory(None))
+        audit.assert_awaited_once_with("example.com", ["1.2.3.4"], limits=limits)
+
     def test_all_providers_none_returns_no_external_apis_key(self):
         # enrich returns {} (not {"external_apis": {}}) when result is empty/falsy
         enricher = ExternalApiEnricher()
@@ -307,5 +328,39 @@ class TestExternalApiEnricher(unittest.TestCase):
         self.assertEqual(result, {})
 
 
+
+class TestExternalIpApiEnricher(unittest.TestCase):
+
+    def test_domain_stage_does_not_wait_for_correlation(self):
+        self.assertEqual(ExternalApiEnricher.requires, ("dns_info",))
+        self.assertIn("correlation", ExternalIpApiEnricher.requires)
+
+    def test_looks_up_only_subdomain_ips(self):
+        calls = []
+
+        async def fake_fetch(domain, ips, session=None, shared=None, apex_ips=(), domain_tasks=True):
+            calls.append((ips, domain_tasks))
+            return {"ripestat": {"ips": {ip: {"ip": ip, "asn": 1} for ip in ips}}}
+
+        context = {
+            "dns_info": _dns_obj(a_records=["1.1.1.1"]),
+            "correlation": {"ip_to_subdomains": {"1.1.1.1": ["example.com"], "2.2.2.2": ["a.example.com"]}},
+        }
+        with patch("src.enrichers.external_apis._fetch_external_apis_async", side_effect=fake_fetch):
+            result = ExternalIpApiEnricher().enrich("example.com", context)
+        self.assertEqual(calls, [(["2.2.2.2"], False)])
+        self.assertEqual(list(result["external_ip_apis"]["ripestat"]["ips"]), ["2.2.2.2"])
+
+    def test_merge_adds_ip_sections(self):
+        merged = merge_external_apis(
+            {"urlscan": {"total": 1}, "ripestat": {"ips": {"1.1.1.1": {"asn": 1}}}},
+            {"ripestat": {"ips": {"2.2.2.2": {"asn": 2}}}, "abuseipdb": {"ips": {"2.2.2.2": {"score": 0}}}},
+        )
+        self.assertEqual(merged["urlscan"], {"total": 1})
+        self.assertEqual(sorted(merged["ripestat"]["ips"]), ["1.1.1.1", "2.2.2.2"])
+        self.assertEqual(merged["abuseipdb"], {"ips": {"2.2.2.2": {"score": 0}}})
+        self.assertIsNone(merge_external_apis(None, None))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,119 @@
+"""
+Tests for the technology fingerprint rules (src/enrichers/fingerprints.py).
+"""
+
+import json
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.enrichers.fingerprints import Fingerprints, _required_literal, _required_literals, load_fingerprints
+
+_PAGE = """<!doctype html><html><head>
+<meta name="generator" content="WordPress 6.5.2">
+<link rel="stylesheet" href="https://example.com/wp-content/themes/x/style.css">
+<script src="/wp-includes/js/jquery/jquery.min.js?ver=3.7.1"></script>
+</head><body><div data-reactroot=""></div>
+<script src="https://code.jquery.com/jquery-3.7.1.min.js"></script></body></html>"""
+
+
+class TestRequiredLiteral(unittest.TestCase):
+    def test_longest_top_level_literal(self):
+        self.assertEqual(_required_literal(r"googletagmanager\.com/gtm\.js"), "googletagmanager.com/gtm.js")
+        self.assertEqual(_required_literal(r"^WordPress ?([\d.]+)?"), "wordpress")
+        self.assertEqual(_required_literal(r"jquery(?:-(\d+\.\d+))?(?:\.min)?\.js"), "jquery")
+        self.assertEqual(_required_literal(r"<script[^>]+/wp-(?:content|includes)/"), "<script")
+
+    def test_optional_or_alternative_text_is_not_required(self):
+        self.assertEqual(_required_literal(r"abcdx?"), "abcd")
+        self.assertEqual(_required_literal(r"abx{2,3}"), None)
+        self.assertIsNone(_required_literal(r"wordpress|drupal"))
+        self.assertIsNone(_required_literal(r"[a-z]+\d"))
+
+    def test_one_literal_per_alternative(self):
+        self.assertEqual(
+            _required_literals(r"(?:<title>phpMyAdmin</title>|pma_[pu]\w+|/(?:js|static)/mage)"),
+            ["<title>phpmyadmin</title>", "pma_", "/mage"],
+        )
+        self.assertEqual(_required_literals(r"(?:drupal\.js)"), ["drupal.js"])
+        self.assertIsNone(_required_literals(r"wordpress|\d+"))
+        self.assertIsNone(_required_literals(r"(?=abc)"))
+
+
+class TestFingerprints(unittest.TestCase):
+    def test_named_rules_versions_and_implies(self):
+        fingerprints = Fingerprints({
+            "Nginx": {"cats": ["Web servers"], "headers": {"Server": r"nginx(?:/([\d.]+))?\;version:\1"}},
+            "PHP": {"cookies": {"PHPSESSID": ""}},
+            "Laravel": {"cookies": {"laravel_session": ""}, "implies": ["PHP\\;confidence:50"]},
+            "Hugo": {"meta": {"generator": r"^Hugo ([\d.]+)\;version:\1"}},
+            "Shop": {"favicon": [42]},
+        })
+        detections = fingerprints.match(
+            headers={"server": "nginx/1.24.0"},
+            cookies={"laravel_session": "x"},
+            meta={"generator": "Hugo 0.120.4"},
+            favicon_hash=42,
+        )
+        found = {d.name: (d.version, d.matched_by) for d in detections}
+        self.assertEqual(found, {
+            "Hugo": ("0.120.4", ["meta"]),
+            "Laravel": (None, ["cookies"]),
+            "Nginx": ("1.24.0", ["headers"]),
+            "PHP": (None, ["implies"]),
+            "Shop": (None, ["favicon"]),
+        })
+        self.assertEqual(detections[2].categories, ["Web servers"])
+        self.assertEqual(fingerprints.match(headers={"x-server": "nginx"}), [])
+
+    def test_prefilter_finds_overlapping_and_nested_literals(self):
+        patterns = {
+            "A": r"jquery", "B": r"query\.min", "C": r"wp-", "D": r"/wp-content/",
+            "E": r"content/themes", "F": r"ery\.m", "G": r"data-react(?:root)?", "H": r"zzz-absent",
+            "I": r"(?:zzz-absent|doctype html)",
+        }
+        fingerprints = Fingerprints({name: {"html": pattern} for name, pattern in patterns.items()})
+        expected = sorted(name for name, pattern in patterns.items() if re.search(pattern, _PAGE, re.I))
+        self.assertEqual([d.name for d in fingerprints.match(html=_PAGE)], expected)
+        self.assertEqual(fingerprints.stats()["unfiltered_text_rules"], 0)
+
+    def test_prefilter_agrees_with_every_rule_run_alone(self):
+        words = ["wp-content", "jquery", "react", "themes", "min.js", "ver=3", "doctype", "generator", "absent"]
+        patterns = [f"{a}[^<]*{b}" for a in words for b in words if a != b] + [rf"{w}(?:\.x)?" for w in words]
+        fingerprints = Fingerprints({str(i): {"html": pattern} for i, pattern in enumerate(patterns)})
+        expected = sorted(str(i) for i, pattern in enumerate(patterns) if re.search(pattern, _PAGE, re.I))
+        self.assertTrue(expected)
+        self.assertEqual([d.name for d in fingerprints.match(html=_PAGE)], expected)
+
+    def test_bundled_ruleset(self):
+        fingerprints = load_fingerprints()
+        self.assertGreater(len(fingerprints), 50)
+        detections = {d.name: d for d in fingerprints.match(
+            headers={"server": "nginx/1.24.0", "x-powered-by": "PHP/8.2"},
+            meta={"generator": "WordPress 6.5.2"},
+            html=_PAGE,
+        )}
+        self.assertEqual(detections["WordPress"].version, "6.5.2")
+        self.assertEqual(detections["WordPress"].matched_by, ["html", "meta", "scriptSrc"])
+        self.assertEqual(detections["jQuery"].version, "3.7.1")
+        self.assertEqual((detections["PHP"].version, detections["Nginx"].version), ("8.2", "1.24.0"))
+        self.assertIn("MySQL", detections)
+
+    def test_loads_wappalyzer_style_directory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, "a.json").write_text(json.dumps({"Alpha": {"html": "alpha-marker"}}), encoding="utf-8")
+            Path(tmp, "b.json").write_text(
+                json.dumps({"technologies": {"Beta": {"scriptSrc": "beta\\.js", "html": "(unbalanced"}}}),
+                encoding="utf-8",
+            )
+            Path(tmp, "broken.json").write_text("{", encoding="utf-8")
+            with self.assertLogs("src.enrichers.fingerprints", "WARNING"):
+                fingerprints = load_fingerprints(Path(tmp))
+        self.assertEqual(len(fingerprints), 2)
+        names = [d.name for d in fingerprints.match(html='alpha-marker <script src="/beta.js"></script>')]
+        self.assertEqual(names, ["Alpha", "Beta"])
+
+
+if __name__ == "__main__":
+    unittest.main()
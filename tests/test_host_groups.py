@@ -0,0 +1,179 @@
+"""
+Tests for the host grouping stage (src/enrichers/host_groups.py) and how
+SSL / tech probe one host per group.
+"""
+
+import unittest
+from unittest.mock import patch
+
+from src.core.models import CertificateInfo, TechStack, TlsHandshake
+from src.enrichers.host_groups import (
+    HostGroupingEnricher,
+    _wildcard_label,
+    cert_covers,
+    collapse_hosts,
+    group_hosts,
+    split_members,
+)
+from src.enrichers.ssl import SslEnricher
+from src.enrichers.tech import TechEnricher
+
+_WILDCARD_IP = "10.9.9.9"
+
+
+def _fake_a(host):
+    if host.startswith("netscout-wc-"):
+        return [_WILDCARD_IP] if host.endswith(".example.com") else []
+    return {
+        "example.com": ["10.0.0.1"],
+        "www.example.com": ["10.0.0.1"],
+        "app.example.com": ["10.0.0.2", "10.0.0.3"],
+        "portal.example.com": ["10.0.0.3", "10.0.0.2"],
+        "cdn.example.com": ["10.0.0.2", "10.0.0.3"],
+        "random1.example.com": [_WILDCARD_IP],
+        "random2.example.com": [_WILDCARD_IP],
+        "dev.example.com": ["10.0.0.4"],
+    }.get(host, [])
+
+
+def _fake_cname(host):
+    return "edge.cdn.net" if host == "cdn.example.com" else None
+
+
+class TestGroupHosts(unittest.TestCase):
+    def test_groups_by_addresses_cname_and_wildcard(self):
+        with (
+            patch("src.enrichers.host_groups._resolve_subdomain_a", side_effect=_fake_a),
+            patch("src.enrichers.host_groups._resolve_cname", side_effect=_fake_cname),
+        ):
+            result = HostGroupingEnricher().enrich("example.com", {"subdomains": [
+                "www.example.com", "app.example.com", "portal.example.com", "cdn.example.com",
+                "random1.example.com", "random2.example.com", "dev.example.com",
+            ]})
+        groups = {tuple(group["hosts"]): group for group in result["host_groups"]}
+        self.assertEqual(set(groups), {
+            ("example.com", "www.example.com"),
+            ("app.example.com", "portal.example.com"),
+            ("random1.example.com", "random2.example.com"),
+        })
+        self.assertTrue(groups[("random1.example.com", "random2.example.com")]["wildcard"])
+        self.assertEqual(groups[("app.example.com", "portal.example.com")]["addresses"], ["10.0.0.2", "10.0.0.3"])
+
+    def test_unresolved_hosts_not_grouped(self):
+        groups = group_hosts(
+            {"a.example.com": frozenset(), "b.example.com": frozenset()},
+            {},
+            {},
+        )
+        self.assertEqual(groups, [])
+
+    def test_wildcard_label_is_deterministic(self):
+        self.assertEqual(_wildcard_label("example.com"), _wildcard_label("example.com"))
+        self.assertNotEqual(_wildcard_label("example.com"), _wildcard_label("dev.example.com"))
+
+    def test_resolves_at_most_the_cap_by_priority(self):
+        resolved = []
+
+        def fake_a(host):
+            resolved.append(host)
+            return []
+
+        with (
+            patch("src.enrichers.host_groups._resolve_subdomain_a", side_effect=fake_a),
+            patch("src.enrichers.host_groups._resolve_cname", return_value=None) as cname,
+            patch("src.enrichers.host_groups.HOST_GROUPING_MAX_HOSTS", 3),
+        ):
+            HostGroupingEnricher().enrich("example.com", {"subdomains": [
+                "a.example.com", "b.example.com", "www.example.com", "c.example.com",
+            ]})
+        self.assertEqual(
+            sorted(call.args[0] for call in cname.call_args_list),
+            ["a.example.com", "example.com", "www.example.com"],
+        )
+        self.assertEqual(
+            sorted(host for host in resolved if not host.startswith("netscout-wc-")),
+            ["a.example.com", "example.com", "www.example.com"],
+        )
+
+    def test_split_members_needs_wildcard_or_cname_and_certificate(self):
+        members = ["a.example.com", "b.example.com", "c.other.org"]
+        cert = CertificateInfo(host="a.example.com", san=["*.example.com"])
+        wildcard = [{"hosts": members, "wildcard": True}]
+        cname = [{"hosts": members, "cname": "edge.cdn.net", "wildcard": False}]
+        addresses = [{"hosts": members, "cname": None, "wildcard": False}]
+        self.assertEqual(split_members(members, wildcard), (members, []))
+        self.assertEqual(split_members(members, cname, cert), (members[:2], ["c.other.org"]))
+        self.assertEqual(split_members(members, cname), (members[:1], members[1:]))
+        self.assertEqual(split_members(members, addresses, cert), (members[:1], members[1:]))
+        self.assertEqual(split_members(["x.example.com"], addresses), (["x.example.com"], []))
+
+    def test_cert_covers_san_and_single_label_wildcards(self):
+        cert = CertificateInfo(host="example.com", san=["example.com", "*.example.com"])
+        self.assertTrue(cert_covers(cert, "WWW.example.com"))
+        self.assertTrue(cert_covers(cert, "example.com"))
+        self.assertFalse(cert_covers(cert, "a.b.example.com"))
+        self.assertTrue(cert_covers(CertificateInfo(host="x", subject_cn="x.example.com"), "x.example.com"))
+
+    def test_collapse_uses_first_host_of_each_group(self):
+        groups = [{"hosts": ["a.example.com", "b.example.com", "c.example.com"]}]
+        collapsed = collapse_hosts(["x.example.com", "b.example.com", "a.example.com"], groups)
+        self.assertEqual(collapsed, {
+            "x.example.com": ["x.example.com"],
+            "b.example.com": ["b.example.com", "a.example.com"],
+        })
+
+
+class TestGroupedProbes(unittest.TestCase):
+    _HOSTS = ["a.example.com", "b.example.com", "c.example.com"]
+    _CONTEXT = {
+        "subdomains": _HOSTS,
+        "host_groups": [{"hosts": _HOSTS, "addresses": ["10.0.0.1"], "cname": None, "wildcard": False}],
+    }
+
+    def test_ssl_handshakes_once_per_group(self):
+        async def fake_cert(host, port=443, timeout=None):
+            return TlsHandshake(host=host), CertificateInfo(host=host, hosts=[host], subject_cn=host)
+
+        with patch("src.enrichers.ssl._get_cert_info", side_effect=fake_cert) as get_cert:
+            result = SslEnricher().enrich("example.com", self._CONTEXT)
+        self.assertEqual(sorted(call.args[0] for call in get_cert.call_args_list), ["a.example.com", "example.com"])
+        certificates = {cert.host: cert for cert in result["ssl_info"].certificates}
+        self.assertEqual(set(certificates), {"example.com", "a.example.com"})
+        # Shared addresses alone: the other members are only inferred to share it.
+        self.assertEqual(certificates["a.example.com"].hosts, ["a.example.com"])
+        self.assertEqual(certificates["a.example.com"].inferred_hosts, ["b.example.com", "c.example.com"])
+
+    def test_ssl_attributes_certificate_within_cname_group_it_covers(self):
+        async def fake_cert(host, port=443, timeout=None):
+            cert = CertificateInfo(host=host, hosts=[host], san=["a.example.com", "b.example.com"])
+            return TlsHandshake(host=host), cert
+
+        context = {**self._CONTEXT, "host_groups": [{**self._CONTEXT["host_groups"][0], "cname": "edge.cdn.net"}]}
+        with patch("src.enrichers.ssl._get_cert_info", side_effect=fake_cert):
+            result = SslEnricher().enrich("example.com", context)
+        cert = next(cert for cert in result["ssl_info"].certificates if cert.host == "a.example.com")
+        self.assertEqual((cert.hosts, cert.inferred_hosts), (["a.example.com", "b.example.com"], ["c.example.com"]))
+
+    def test_tech_fetches_once_per_group(self):
+        fetched = []
+
+        async def fake_fetch(urls, verify_ssl=True, session=None, tls_capture=None):
+            fetched.extend(urls)
+            return {url: TechStack(url=url, server="nginx").model_dump() for url in urls}
+
+        with patch("src.enrichers.tech._fetch_tech_stack_async", side_effect=fake_fetch):
+            result = TechEnricher().enrich("example.com", self._CONTEXT)
+        self.assertEqual(fetched, ["https://example.com", "https://a.example.com"])
+        copy = result["tech_stack"]["https://c.example.com"]
+        self.assertEqual((copy["url"], copy["server"]), ("https://c.example.com", "nginx"))
+        self.assertEqual(copy["inferred_from"], "https://a.example.com")
+        self.assertIsNone(result["tech_stack"]["https://a.example.com"]["inferred_from"])
+
+        context = {**self._CONTEXT, "host_groups": [{**self._CONTEXT["host_groups"][0], "wildcard": True}]}
+        with patch("src.enrichers.tech._fetch_tech_stack_async", side_effect=fake_fetch):
+            result = TechEnricher().enrich("example.com", context)
+        self.assertIsNone(result["tech_stack"]["https://c.example.com"]["inferred_from"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+"""
+Tests for the liveness pre-probe (src/enrichers/liveness.py) and how SSL,
+tech, correlation and the subdomain port scan use its map.
+"""
+
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from src.core.models import CertificateInfo, HostLiveness, LivenessInfo, PortScanResult, TechStack, TlsHandshake
+from src.enrichers.correlation import CorrelationEnricher
+from src.enrichers.liveness import CLOSED, OPEN, TIMEOUT, LivenessEnricher, _connect_state, live_hosts, web_url
+from src.enrichers.port import SubdomainPortEnricher
+from src.enrichers.ssl import SslEnricher
+from src.enrichers.tech import TechEnricher
+
+
+async def _listener():
+    async def handle(reader, writer):
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def _liveness(**hosts):
+    """LivenessInfo for 80/443 from ``name=[open ports]`` (underscores become dots)."""
+    entries = {
+        name.replace("_", "."): HostLiveness(host=name.replace("_", "."), addresses=["10.0.0.1"], open_ports=ports)
+        for name, ports in hosts.items()
+    }
+    return LivenessInfo(ports=[80, 443], hosts=entries)
+
+
+class TestLivenessProbe(unittest.TestCase):
+    def test_connect_state_open_and_closed(self):
+        async def scenario():
+            server, port = await _listener()
+            closed_server, closed = await _listener()
+            closed_server.close()
+            await closed_server.wait_closed()
+            async with server:
+                return await _connect_state("127.0.0.1", port, 1), await _connect_state("127.0.0.1", closed, 1)
+
+        self.assertEqual(asyncio.run(scenario()), (OPEN, CLOSED))
+
+    def test_enricher_builds_map_probing_each_address_once(self):
+        addresses = {
+            "example.com": ["10.0.0.1"],
+            "www.example.com": ["10.0.0.1"],
+            "api.example.com": ["10.0.0.2"],
+            "old.example.com": ["10.0.0.3"],
+            "gone.example.com": [],
+        }
+        states = {("10.0.0.1", 443): OPEN, ("10.0.0.2", 80): OPEN, ("10.0.0.2", 443): CLOSED}
+        probed = []
+
+        async def fake_connect(ip, port, timeout):
+            probed.append((ip, port))
+            return states.get((ip, port), TIMEOUT)
+
+        with (
+            patch("src.enrichers.liveness._resolve_subdomain_a", side_effect=lambda host: addresses[host]),
+            patch("src.enrichers.liveness._connect_state", side_effect=fake_connect),
+        ):
+            result = LivenessEnricher(ports=[80, 443]).enrich("example.com", {"subdomains": list(addresses)[1:]})
+        liveness = result["liveness"]
+        self.assertEqual(sorted(probed), sorted((ip, port) for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3")
+                                                for port in (80, 443)))
+        self.assertEqual(liveness.open_ports, {"10.0.0.1": [443], "10.0.0.2": [80], "10.0.0.3": []})
+        self.assertEqual(liveness.unresponsive, ["10.0.0.3"])
+        self.assertEqual(liveness.host_ports("www.example.com"), [443])
+        self.assertIsNone(liveness.host_ports("unknown.example.com"))
+
+    def test_hosts_without_addresses_stay_eligible(self):
+        def resolve(host):
+            if host == "flaky.example.com":
+                raise OSError("lookup timed out")
+            return {"www.example.com": ["10.0.0.1"]}.get(host, [])  # the apex is AAAA-only
+
+        async def fake_connect(ip, port, timeout):
+            return CLOSED
+
+        with (
+            patch("src.enrichers.liveness._resolve_subdomain_a", side_effect=resolve),
+            patch("src.enrichers.liveness._connect_state", side_effect=fake_connect),
+        ):
+            liveness = LivenessEnricher(ports=[80, 443]).enrich(
+                "example.com", {"subdomains": ["www.example.com", "flaky.example.com"]}
+            )["liveness"]
+        self.assertEqual(list(liveness.hosts), ["www.example.com"])
+        hosts = ["example.com", "www.example.com", "flaky.example.com"]
+        self.assertEqual(live_hosts(hosts, liveness, 443), ["example.com", "flaky.example.com"])
+        self.assertEqual(
+            [web_url(host, liveness) for host in hosts],
+            ["https://example.com", None, "https://flaky.example.com"],
+        )
+
+    def test_host_selection_helpers(self):
+        liveness = _liveness(a_example_com=[443], b_example_com=[80], c_example_com=[])
+        hosts = ["a.example.com", "b.example.com", "c.example.com", "d.example.com"]
+        self.assertEqual(live_hosts(hosts, liveness, 443), ["a.example.com", "d.example.com"])
+        self.assertEqual(live_hosts(hosts, liveness, 8443), hosts)
+        self.assertEqual(live_hosts(hosts, None, 443), hosts)
+        self.assertEqual(
+            [web_url(host, liveness) for host in hosts],
+            ["https://a.example.com", "http://b.example.com", None, "https://d.example.com"],
+        )
+
+
+class TestLivenessConsumers(unittest.TestCase):
+    _CONTEXT = {
+        "subdomains": ["dev.example.com", "www.example.com", "legacy.example.com", "dead.example.com"],
+        "host_groups": [],
+        "liveness": _liveness(
+            example_com=[80, 443], www_example_com=[443], legacy_example_com=[80], dead_example_com=[],
+        ),
+    }
+
+    def test_ssl_skips_hosts_closed_on_443(self):
+        async def fake_cert(host, port=443, timeout=None):
+            return TlsHandshake(host=host), CertificateInfo(host=host, hosts=[host], subject_cn=host)
+
+        with patch("src.enrichers.ssl._get_cert_info", side_effect=fake_cert) as get_cert:
+            SslEnricher().enrich("example.com", self._CONTEXT)
+        self.assertEqual(
+            sorted(call.args[0] for call in get_cert.call_args_list),
+            ["dev.example.com", "example.com", "www.example.com"],
+        )
+
+    def test_tech_skips_dead_hosts_and_falls_back_to_http(self):
+        fetched = []
+
+        async def fake_fetch(urls, verify_ssl=True, session=None, tls_capture=None):
+            fetched.extend(urls)
+            return {url: TechStack(url=url).model_dump() for url in urls}
+
+        with (
+            patch("src.enrichers.tech._fetch_tech_stack_async", side_effect=fake_fetch),
+            patch("src.enrichers.tech.TECH_SUBDOMAIN_LIMIT", 2),
+        ):
+            TechEnricher().enrich("example.com", self._CONTEXT)
+        # www first by priority; dead dropped before the limit applies.
+        self.assertEqual(fetched, ["https://example.com", "https://www.example.com", "https://dev.example.com"])
+
+        fetched.clear()
+        with patch("src.enrichers.tech._fetch_tech_stack_async", side_effect=fake_fetch):
+            TechEnricher().enrich("example.com", self._CONTEXT)
+        self.assertIn("http://legacy.example.com", fetched)
+        self.assertNotIn("https://dead.example.com", fetched)
+
+    def test_correlation_reuses_resolved_addresses(self):
+        with (
+            patch("src.enrichers.correlation._resolve_subdomain_a", return_value=["10.9.9.9"]) as resolve,
+            patch("src.enrichers.correlation._resolve_ptr", return_value=(None, None)),
+        ):
+            result = CorrelationEnricher().enrich("example.com", {
+                "dns_info": None,
+                "subdomains": ["www.example.com", "new.example.com"],
+                "liveness": _liveness(www_example_com=[443]),
+            })
+        resolve.assert_called_once_with("new.example.com")
+        self.assertEqual(result["correlation"]["ip_to_subdomains"]["10.0.0.1"], ["www.example.com"])
+
+    def test_subdomain_ports_deprioritise_unresponsive_ips(self):
+        context = {
+            "port_scan": [],
+            "correlation": {"ip_to_subdomains": {
+                "1.1.1.1": ["a.example.com", "b.example.com", "c.example.com"],
+                "2.2.2.2": ["d.example.com", "e.example.com"],
+                "3.3.3.3": ["f.example.com"],
+            }},
+            "liveness": LivenessInfo(
+                ports=[80, 443],
+                open_ports={"1.1.1.1": [], "2.2.2.2": [], "3.3.3.3": [443]},
+                unresponsive=["1.1.1.1"],
+            ),
+        }
+        with (
+            patch("src.enrichers.port.PORT_SCAN_MAX_IPS", 2),
+            patch("src.enrichers.port._scan_ip_ports",
+                  side_effect=lambda ip, ports, **kw: PortScanResult(ip=ip)),
+        ):
+            result = SubdomainPortEnricher().enrich("example.com", context)
+        self.assertEqual([r.ip for r in result["port_scan"]], ["2.2.2.2", "3.3.3.3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
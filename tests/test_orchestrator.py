@@ -5,12 +5,20 @@ The enricher pipeline is completely mocked so no network calls are made.
 Tests verify domain validation, normalization, and ScanResult structure.
 """
 
+import asyncio
 import unittest
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
 from src.core.models import DNSInfo, ScanResult, ScanSummary
-from src.core.orchestrator import scan_domain
+from src.core.orchestrator import (
+    ANALYSIS_FIELDS,
+    SCAN_RESULT_EVENT,
+    STREAMED_FIELDS,
+    scan_domain,
+    scan_domains,
+    stream_scan_domain,
+)
 
 
 def _make_pipeline_data(domain: str = "example.com") -> dict:
@@ -133,6 +141,18 @@ class TestScanDomainResult(unittest.TestCase):
         for sub in result.subdomains:
             self.assertEqual(sub, sub.lower())
 
+    def test_section_status_carried_into_result(self):
+        data = _make_pipeline_data()
+        data["section_status"] = {"dns_info": "complete", "ssl_info": "timeout"}
+        mock_pipeline = MagicMock()
+        mock_pipeline.run.return_value = data
+
+        with patch("src.core.orchestrator.build_correlation_summary", return_value={}):
+            result = scan_domain("example.com", pipeline=mock_pipeline, deadline=30)
+
+        mock_pipeline.run.assert_called_once_with("example.com", deadline=30, tracer=None)
+        self.assertEqual(result.section_status["ssl_info"], "timeout")
+
 
 class TestScanDomainProgressCallback(unittest.TestCase):
 
@@ -184,3 +204,100 @@ class TestScanDomainProgressCallback(unittest.TestCase):
 
 if __name__ == "__main__":
     unittest.main()
+
+
+class TestStreamScanDomain(unittest.TestCase):
+
+    def _collect(self, domain: str = "example.com"):
+        data = _make_pipeline_data(domain)
+
+        async def _fake_stream(_domain, context=None, session=None, deadline=None, tracer=None):
+            sections = (
+                ("dns", {"dns_info": data["dns_info"], "ip_addresses": ["93.184.216.34"]}),
+                ("host_groups", {"host_groups": []}),
+                ("subdomain", {"subdomains": data["subdomains"]}),
+            )
+            for name, partial in sections:
+                context.merge(partial)
+                yield name, partial
+
+        mock_pipeline = MagicMock()
+        mock_pipeline.stream = _fake_stream
+
+        async def _run():
+            return [item async for item in stream_scan_domain(domain, pipeline=mock_pipeline)]
+
+        with patch("src.core.orchestrator.build_correlation_summary",
+                   return_value={"unique_ips": 1, "subdomain_count": 1,
+                                 "ip_to_subdomains": {}, "ptr_records": {},
+                                 "shared_certificate_hosts": []}):
+            return asyncio.run(_run())
+
+    def test_sections_yielded_before_result(self):
+        items = self._collect()
+        self.assertEqual([name for name, _ in items], ["dns", "subdomain", SCAN_RESULT_EVENT])
+
+    def test_only_result_sections_streamed(self):
+        items = dict(self._collect()[:-1])
+        self.assertEqual(list(items["dns"]), ["dns_info"])
+        rendered = set(STREAMED_FIELDS) | set(ANALYSIS_FIELDS)
+        self.assertEqual(rendered, set(ScanResult.model_fields) - {"carried_forward"})
+
+    def test_final_result_is_scan_result(self):
+        name, result = self._collect()[-1]
+        self.assertEqual(name, SCAN_RESULT_EVENT)
+        self.assertIsInstance(result, ScanResult)
+        self.assertEqual(result.subdomains, ["www.example.com"])
+
+    def test_invalid_domain_raises_value_error(self):
+        async def _run():
+            async for _ in stream_scan_domain("bad..domain.com", pipeline=MagicMock()):
+                pass
+
+        with self.assertRaises(ValueError):
+            asyncio.run(_run())
+
+
+class TestScanDomains(unittest.TestCase):
+
+    def _run(self, domains, **kwargs):
+        from src.core.pipeline import EnricherPipeline
+        from src.enrichers.base import AbstractEnricher
+
+        builds = []
+
+        class _Dns(AbstractEnricher):
+            name = "dns"
+            produces = ("dns_info",)
+
+            def enrich(self, domain, context=None):
+                return {"dns_info": _make_pipeline_data(domain)["dns_info"]}
+
+        def _fake_build(on_progress=None, shared=None, limits=None):
+            builds.append((shared, limits))
+            return EnricherPipeline([_Dns()])
+
+        with (
+            patch("src.core.orchestrator._build_pipeline", side_effect=_fake_build),
+            patch("src.core.orchestrator.build_correlation_summary",
+                  return_value={"unique_ips": 1, "subdomain_count": 0,
+                                "ip_to_subdomains": {}, "ptr_records": {},
+                                "shared_certificate_hosts": []}),
+        ):
+            results = list(scan_domains(domains, **kwargs))
+        return results, builds
+
+    def test_yields_one_result_per_valid_domain(self):
+        results, _ = self._run(["example.com", "EXAMPLE.com", "example.org", "bad..domain"])
+        self.assertEqual(sorted(r.target_domain for r in results), ["example.com", "example.org"])
+        self.assertTrue(all(isinstance(r, ScanResult) for r in results))
+
+    def test_pipelines_share_memo_and_limits(self):
+        _, builds = self._run(["example.com", "example.org", "example.net"], concurrency=2)
+        self.assertEqual(len(builds), 3)
+        self.assertEqual(len({id(shared) for shared, _ in builds}), 1)
+        self.assertEqual(len({id(limits) for _, limits in builds}), 1)
+
+    def test_invalid_concurrency_raises(self):
+        with self.assertRaises(ValueError):
+            list(scan_domains(["example.com"], concurrency=0))
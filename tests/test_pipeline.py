@@ -2,18 +2,27 @@
 Tests for EnricherPipeline (src/core/pipeline.py).
 
 Uses lightweight mock enrichers to verify:
-- Phases 1/2/3 run enrichers in correct order.
+- Enrichers start only after the producers of their required fields finish.
+- Independent enrichers do not wait on unrelated slow ones.
 - Progress callback receives calls with monotonically increasing values.
-- If a Phase-1 enricher raises, the pipeline continues and still runs Phase 2/3.
+- If an upstream enricher raises, the pipeline continues and still runs dependents.
 - add_enricher() returns the pipeline for chaining.
 - run() returns a context dict with merged keys.
+- stream() yields each enricher's merged fields as soon as it finishes.
+- Deadlines and per-enricher budgets cut slow enrichers and record section status.
+- Fields an enricher publishes early start their dependents before it finishes.
 """
 
+import asyncio
+import threading
+import time
 import unittest
 from typing import Any, Dict, Optional
+from unittest.mock import MagicMock
 
-from src.core.pipeline import EnricherPipeline, PHASE1_ENRICHERS, PHASE2_ENRICHERS, PHASE3_ENRICHERS
-from src.enrichers.base import AbstractEnricher
+from src.core.context import ScanContextData, publish
+from src.core.pipeline import EnricherPipeline
+from src.enrichers.base import AbstractEnricher, AsyncEnricher
 
 
 # ---------------------------------------------------------------------------
@@ -34,6 +43,55 @@ class _DummyEnricher(AbstractEnricher):
         return {self._return_key: self._return_value}
 
 
+class _DependentEnricher(_DummyEnricher):
+    """Declares its inputs/outputs and records the context snapshot it received."""
+
+    def __init__(self, name: str, return_key: str, requires=(), return_value: Any = True):
+        super().__init__(name, return_key, return_value)
+        self.requires = tuple(requires)
+        self.produces = (return_key,)
+        self.seen_context: Optional[Dict[str, Any]] = None
+
+    def enrich(self, domain: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        self.seen_context = dict(context or {})
+        return super().enrich(domain, context)
+
+
+class _AsyncDummyEnricher(AsyncEnricher):
+    """Async enricher that records the session and loop it ran on."""
+
+    def __init__(self, name: str, return_key: str, return_value: Any = True):
+        self.name = name
+        self._return_key = return_key
+        self._return_value = return_value
+        self.sessions = []
+        self.loops = []
+
+    async def enrich_async(self, domain, context=None, session=None):
+        self.sessions.append(session)
+        self.loops.append(asyncio.get_running_loop())
+        return {self._return_key: self._return_value}
+
+
+class _PublishingEnricher(AbstractEnricher):
+    """Publishes ``ip_addresses`` early, then blocks until released."""
+
+    name = "dns"
+    produces = ("dns_info", "ip_addresses")
+    publishes = ("ip_addresses",)
+
+    def __init__(self, fail: bool = False):
+        self.release = threading.Event()
+        self.fail = fail
+
+    def enrich(self, domain: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        publish({"ip_addresses": ["1.1.1.1"], "dns_info": "ignored"})
+        self.release.wait(timeout=5)
+        if self.fail:
+            raise RuntimeError("late failure")
+        return {"dns_info": {"a_records": ["1.1.1.1"]}, "ip_addresses": ["1.1.1.1"]}
+
+
 class _RaisingEnricher(AbstractEnricher):
     """Always raises RuntimeError to simulate a failed enricher."""
 
@@ -84,10 +142,10 @@ class TestEnricherPipelineBasics(unittest.TestCase):
         self.assertIn("subdomains", result)
 
 
-class TestEnricherPipelinePhases(unittest.TestCase):
+class TestEnricherPipelineFullGraph(unittest.TestCase):
 
     def _build_full_pipeline(self):
-        """Return a pipeline with one mock enricher per phase."""
+        """Return a pipeline with one mock enricher per stock enricher name."""
         dns = _DummyEnricher("dns", "dns_info", {"a_records": ["1.1.1.1"]})
         whois = _DummyEnricher("whois", "whois_info", {"registrar": "Test"})
         sub = _DummyEnricher("subdomain", "subdomains", ["www.example.com"])
@@ -117,6 +175,254 @@ class TestEnricherPipelinePhases(unittest.TestCase):
             self.assertEqual(enricher.call_count, 1, f"{name} not called once")
 
 
+class TestEnricherPipelineDependencies(unittest.TestCase):
+
+    def test_dependent_enricher_sees_required_field(self):
+        dns = _DependentEnricher("dns", "dns_info", return_value={"a_records": ["1.1.1.1"]})
+        port = _DependentEnricher("port", "port_scan", requires=("dns_info",), return_value=[])
+        EnricherPipeline([port, dns]).run("example.com")
+        self.assertEqual(port.seen_context["dns_info"], {"a_records": ["1.1.1.1"]})
+
+    def test_independent_enricher_does_not_wait_for_slow_sibling(self):
+        release_ssl = threading.Event()
+        geo_done = threading.Event()
+
+        class _SlowSsl(_DependentEnricher):
+            def enrich(self, domain, context=None):
+                # Blocks until geoip has finished; deadlocks if geoip waited on ssl.
+                release_ssl.wait(timeout=5)
+                return super().enrich(domain, context)
+
+        class _Geo(_DependentEnricher):
+            def enrich(self, domain, context=None):
+                result = super().enrich(domain, context)
+                geo_done.set()
+                release_ssl.set()
+                return result
+
+        dns = _DependentEnricher("dns", "dns_info", return_value={"a_records": []})
+        sub = _DependentEnricher("subdomain", "subdomains", return_value=["www.example.com"])
+        ssl = _SlowSsl("ssl", "ssl_info", requires=("subdomains",))
+        geo = _Geo("geoip", "geoip_info", requires=("dns_info",))
+
+        EnricherPipeline([dns, sub, ssl, geo]).run("example.com")
+        self.assertTrue(geo_done.is_set())
+        self.assertIsNone(geo.seen_context.get("ssl_info"))
+
+    def test_dependent_runs_when_producer_fails(self):
+        failing_dns = _RaisingEnricher("dns")
+        failing_dns.produces = ("dns_info",)
+        port = _DependentEnricher("port", "port_scan", requires=("dns_info",), return_value=[])
+        result = EnricherPipeline([failing_dns, port]).run("example.com")
+        self.assertEqual(port.call_count, 1)
+        self.assertIn("port_scan", result)
+
+    def test_missing_producer_is_treated_as_satisfied(self):
+        tech = _DependentEnricher("tech", "tech_stack", requires=("subdomains",), return_value={})
+        EnricherPipeline([tech]).run("example.com")
+        self.assertEqual(tech.call_count, 1)
+
+    def test_dependency_cycle_raises(self):
+        a = _DependentEnricher("a", "field_a", requires=("field_b",))
+        b = _DependentEnricher("b", "field_b", requires=("field_a",))
+        with self.assertRaises(ValueError):
+            EnricherPipeline([a, b]).run("example.com")
+
+
+class TestEnricherPipelinePublication(unittest.TestCase):
+
+    def _run(self, dns):
+        class _Port(_DependentEnricher):
+            def enrich(self, domain, context=None):
+                # Deadlocks (until the wait times out) if port waited for dns to finish.
+                result = super().enrich(domain, context)
+                dns.release.set()
+                return result
+
+        port = _Port("port", "port_scan", requires=("ip_addresses",), return_value=[])
+        context = ScanContextData(domain="example.com")
+
+        async def _collect():
+            stream = EnricherPipeline([dns, port]).stream(
+                "example.com", session=MagicMock(), context=context
+            )
+            return [item async for item in stream]
+
+        return asyncio.run(_collect()), port, context
+
+    def test_dependent_starts_on_published_field(self):
+        dns = _PublishingEnricher()
+        started = time.monotonic()
+        items, port, context = self._run(dns)
+        self.assertLess(time.monotonic() - started, 4)
+        self.assertEqual(port.seen_context["ip_addresses"], ["1.1.1.1"])
+        self.assertIsNone(port.seen_context["dns_info"])
+        self.assertEqual(items[0], ("dns", {"ip_addresses": ["1.1.1.1"]}))
+        self.assertEqual(context.dns_info, {"a_records": ["1.1.1.1"]})
+
+    def test_published_field_survives_later_failure(self):
+        items, _, context = self._run(_PublishingEnricher(fail=True))
+        self.assertEqual(context.ip_addresses, ["1.1.1.1"])
+        self.assertEqual(context.section_status["ip_addresses"], "complete")
+        self.assertEqual(context.section_status["dns_info"], "error")
+
+    def test_publish_outside_pipeline_is_noop(self):
+        publish({"ip_addresses": ["1.1.1.1"]})
+
+
+class TestEnricherPipelineAsync(unittest.TestCase):
+
+    def test_async_enrichers_share_one_loop_and_session(self):
+        sub = _AsyncDummyEnricher("subdomain", "subdomains", ["www.example.com"])
+        tech = _AsyncDummyEnricher("tech", "tech_stack", {})
+        whois = _DummyEnricher("whois", "whois_info", {"registrar": "IANA"})
+        session = MagicMock()
+
+        result = asyncio.run(
+            EnricherPipeline([sub, tech, whois]).run_async("example.com", session=session)
+        )
+
+        self.assertIs(sub.sessions[0], session)
+        self.assertIs(tech.sessions[0], session)
+        self.assertIs(sub.loops[0], tech.loops[0])
+        self.assertEqual(whois.call_count, 1)
+        self.assertEqual(result["subdomains"], ["www.example.com"])
+
+    def test_sync_run_wraps_async_enrichers(self):
+        sub = _AsyncDummyEnricher("subdomain", "subdomains", ["api.example.com"])
+        result = EnricherPipeline([sub]).run("example.com")
+        self.assertEqual(result["subdomains"], ["api.example.com"])
+        self.assertIsNotNone(sub.sessions[0])
+
+    def test_async_enricher_standalone_enrich(self):
+        tech = _AsyncDummyEnricher("tech", "tech_stack", {"k": 1})
+        self.assertEqual(tech.enrich("example.com"), {"tech_stack": {"k": 1}})
+        self.assertIsNone(tech.sessions[0])
+
+
+class TestEnricherPipelineStream(unittest.TestCase):
+
+    @staticmethod
+    def _collect(pipeline, **kwargs):
+        async def _run():
+            return [item async for item in pipeline.stream("example.com", session=MagicMock(), **kwargs)]
+        return asyncio.run(_run())
+
+    def test_stream_yields_each_enricher_partial(self):
+        dns = _DependentEnricher("dns", "dns_info", return_value={"a": 1})
+        geo = _DependentEnricher("geoip", "geoip_info", requires=("dns_info",))
+        items = self._collect(EnricherPipeline([geo, dns]))
+        self.assertEqual(items, [("dns", {"dns_info": {"a": 1}}), ("geoip", {"geoip_info": True})])
+
+    def test_failed_enricher_yields_nothing(self):
+        items = self._collect(EnricherPipeline([
+            _RaisingEnricher("whois"),
+            _DummyEnricher("dns", "dns_info"),
+        ]))
+        self.assertEqual([name for name, _ in items], ["dns"])
+
+    def test_stream_merges_into_given_context(self):
+        from src.core.context import ScanContextData
+
+        context = ScanContextData(domain="example.com")
+        self._collect(EnricherPipeline([_DummyEnricher("ssl", "ssl_info", {"x": 1})]), context=context)
+        self.assertEqual(context.to_dict()["ssl_info"], {"x": 1})
+
+    def test_closing_stream_cancels_running_enrichers(self):
+        cancelled = asyncio.Event()
+
+        class _Hanging(AsyncEnricher):
+            name = "hanging"
+
+            async def enrich_async(self, domain, context=None, session=None):
+                try:
+                    await asyncio.sleep(60)
+                finally:
+                    cancelled.set()
+                return {}
+
+        async def _run():
+            stream = EnricherPipeline([_DummyEnricher("dns", "dns_info"), _Hanging()]).stream(
+                "example.com", session=MagicMock()
+            )
+            first = await stream.__anext__()
+            await stream.aclose()
+            return first
+
+        self.assertEqual(asyncio.run(_run())[0], "dns")
+        self.assertTrue(cancelled.is_set())
+
+
+class _SlowEnricher(_DependentEnricher):
+    """Blocks its worker thread for ``delay`` seconds."""
+
+    def __init__(self, name: str, return_key: str, delay: float, requires=()):
+        super().__init__(name, return_key, requires=requires)
+        self.delay = delay
+
+    def enrich(self, domain, context=None):
+        time.sleep(self.delay)
+        return super().enrich(domain, context)
+
+
+class TestEnricherPipelineDeadline(unittest.TestCase):
+
+    def test_all_sections_complete_without_deadline(self):
+        result = EnricherPipeline([_DependentEnricher("dns", "dns_info")]).run("example.com")
+        self.assertEqual(result["section_status"], {"dns_info": "complete"})
+
+    def test_deadline_returns_partial_results(self):
+        pipeline = EnricherPipeline([
+            _DependentEnricher("dns", "dns_info"),
+            _SlowEnricher("whois", "whois_info", delay=2),
+        ])
+        started = time.monotonic()
+        result = pipeline.run("example.com", deadline=0.2)
+
+        self.assertLess(time.monotonic() - started, 1.5)
+        self.assertTrue(result["dns_info"])
+        self.assertIsNone(result["whois_info"])
+        self.assertEqual(result["section_status"]["dns_info"], "complete")
+        self.assertEqual(result["section_status"]["whois_info"], "timeout")
+
+    def test_dependents_of_timed_out_producer_are_skipped(self):
+        pipeline = EnricherPipeline([
+            _SlowEnricher("subdomain", "subdomains", delay=2),
+            _DependentEnricher("ssl", "ssl_info", requires=("subdomains",)),
+        ])
+        result = pipeline.run("example.com", deadline=0.2)
+        self.assertEqual(result["section_status"]["subdomains"], "timeout")
+        self.assertEqual(result["section_status"]["ssl_info"], "skipped")
+
+    def test_budget_cancels_async_enricher(self):
+        cancelled = threading.Event()
+
+        class _Polling(AsyncEnricher):
+            name = "external_apis"
+            produces = ("external_apis",)
+
+            async def enrich_async(self, domain, context=None, session=None):
+                try:
+                    await asyncio.sleep(60)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+                return {}
+
+        pipeline = EnricherPipeline(
+            [_Polling(), _DependentEnricher("dns", "dns_info")],
+            budgets={"external_apis": 0.1},
+        )
+        result = pipeline.run("example.com")
+        self.assertTrue(cancelled.is_set())
+        self.assertEqual(result["section_status"]["external_apis"], "timeout")
+        self.assertEqual(result["section_status"]["dns_info"], "complete")
+
+    def test_failed_enricher_marked_error(self):
+        result = EnricherPipeline([_RaisingEnricher("whois")]).run("example.com")
+        self.assertEqual(result["section_status"], {"whois": "error"})
+
+
 class TestEnricherPipelineProgress(unittest.TestCase):
 
     def test_progress_callback_is_called(self):
@@ -160,7 +466,7 @@ class TestEnricherPipelineProgress(unittest.TestCase):
 
 class TestEnricherPipelineErrorHandling(unittest.TestCase):
 
-    def test_failing_phase1_enricher_does_not_crash_pipeline(self):
+    def test_failing_upstream_enricher_does_not_crash_pipeline(self):
         failing_dns = _RaisingEnricher("dns")
         whois = _DummyEnricher("whois", "whois_info", {"registrar": "IANA"})
 
@@ -170,7 +476,7 @@ class TestEnricherPipelineErrorHandling(unittest.TestCase):
         self.assertIsInstance(result, dict)
         self.assertIn("whois_info", result)
 
-    def test_failing_phase2_enricher_does_not_crash_pipeline(self):
+    def test_failing_midstream_enricher_does_not_crash_pipeline(self):
         dns = _DummyEnricher("dns", "dns_info", {"a_records": ["1.1.1.1"]})
         sub = _DummyEnricher("subdomain", "subdomains", ["www.example.com"])
         failing_ssl = _RaisingEnricher("ssl")
@@ -182,7 +488,7 @@ class TestEnricherPipelineErrorHandling(unittest.TestCase):
         self.assertIsInstance(result, dict)
         self.assertIn("port_scan", result)
 
-    def test_failing_phase3_enricher_does_not_crash_pipeline(self):
+    def test_failing_downstream_enricher_does_not_crash_pipeline(self):
         dns = _DummyEnricher("dns", "dns_info", {"a_records": ["1.1.1.1"]})
         failing_ext = _RaisingEnricher("external_apis")
 
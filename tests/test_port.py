@@ -2,31 +2,97 @@
 Tests for Port Scanner Enricher
 """
 
+import asyncio
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
-from src.enrichers.port import _scan_port, PortEnricher
+from src.core.models import OpenPort
+from src.core.shared import ResourceLimits
+from src.enrichers.port import (
+    PORT_PROFILES,
+    TOP_PORTS,
+    PortEnricher,
+    SubdomainPortEnricher,
+    _scan_ip_ports,
+    _scan_port,
+    parse_ports,
+)
+
+
+async def _listener(banner=b""):
+    """Local TCP server that sends ``banner`` on connect; returns (server, port)."""
+    async def handle(reader, writer):
+        if banner:
+            writer.write(banner)
+            await writer.drain()
+        await asyncio.sleep(0.05)
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def _free_port():
+    async def pick():
+        server, port = await _listener()
+        server.close()
+        await server.wait_closed()
+        return port
+
+    return asyncio.run(pick())
 
 
 class TestPortScanner(unittest.TestCase):
-    @patch("src.enrichers.port.socket.socket")
-    def test_scan_port_closed_returns_none(self, mock_socket):
-        mock_sock = MagicMock()
-        mock_socket.return_value = mock_sock
-        mock_sock.connect_ex.return_value = 1
-        result = _scan_port("127.0.0.1", 80)
-        self.assertIsNone(result)
-
-    @patch("src.enrichers.port.socket.socket")
-    def test_scan_port_open_returns_open_port(self, mock_socket):
-        mock_sock = MagicMock()
-        mock_socket.return_value = mock_sock
-        mock_sock.connect_ex.return_value = 0
-        mock_sock.recv.return_value = b"HTTP/1.1 200 OK"
-        result = _scan_port("127.0.0.1", 80)
-        self.assertIsNotNone(result)
-        self.assertEqual(result.port, 80)
-        self.assertEqual(result.service, "http")
+    def test_scan_port_closed_returns_none(self):
+        self.assertIsNone(asyncio.run(_scan_port("127.0.0.1", _free_port(), timeout=1)))
+
+    def test_scan_ip_ports_finds_open_port_and_banner(self):
+        closed = _free_port()
+
+        async def scenario():
+            server, port = await _listener(b"SSH-2.0-OpenSSH_9.6\r\n")
+            async with server:
+                return port, await _scan_ip_ports("127.0.0.1", [port, closed], timeout=1)
+
+        port, result = asyncio.run(scenario())
+        self.assertEqual([p.port for p in result.open_ports], [port])
+        self.assertEqual(result.open_ports[0].banner, "SSH-2.0-OpenSSH_9.6")
+
+    def test_sweep_interleaves_ips_within_global_budget(self):
+        order, active, peak = [], [0], [0]
+
+        async def fake_scan(ip, port, timeout=None):
+            order.append(ip)
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.01)
+            active[0] -= 1
+            return OpenPort(port=port) if port == 443 else None
+
+        async def scenario():
+            limits = ResourceLimits(tcp_connect=3)
+            return await asyncio.gather(*(
+                _scan_ip_ports(ip, list(range(440, 450)), limits=limits) for ip in ("10.0.0.1", "10.0.0.2")
+            ))
+
+        with (
+            patch("src.enrichers.port._scan_port", side_effect=fake_scan),
+            patch("src.enrichers.port._grab_banner", return_value=None),
+        ):
+            results = asyncio.run(scenario())
+        self.assertLessEqual(peak[0], 3)
+        self.assertEqual(order[:4], ["10.0.0.1", "10.0.0.2", "10.0.0.1", "10.0.0.2"])
+        self.assertEqual([[p.port for p in r.open_ports] for r in results], [[443], [443]])
+
+    def test_parse_ports_profiles_and_ranges(self):
+        self.assertEqual(parse_ports("top-20"), TOP_PORTS)
+        self.assertEqual(len(PORT_PROFILES["top-1000"]), 1003)
+        self.assertTrue(set(PORT_PROFILES["top-100"]) <= set(PORT_PROFILES["top-1000"]))
+        self.assertEqual(parse_ports("22, 8000-8002,22"), [22, 8000, 8001, 8002])
+        with self.assertRaises(ValueError):
+            parse_ports("top-7")
+        with self.assertRaises(ValueError):
+            parse_ports("0-10")
 
 
 class TestPortEnricher(unittest.TestCase):
@@ -35,3 +101,44 @@ class TestPortEnricher(unittest.TestCase):
         result = enricher.enrich("example.com", {})
         self.assertIn("port_scan", result)
         self.assertEqual(result["port_scan"], [])
+
+    def test_shared_memo_scans_each_ip_once_across_domains(self):
+        from src.core.models import PortScanResult
+        from src.core.shared import SharedWork
+
+        shared = SharedWork()
+        context = {"dns_info": {"a_records": ["93.184.216.34"], "aaaa_records": []}}
+        with patch("src.enrichers.port._scan_ip_ports",
+                   return_value=PortScanResult(ip="93.184.216.34", open_ports=[])) as mock_scan:
+            PortEnricher(shared=shared).enrich("example.com", context)
+            result = PortEnricher(shared=shared).enrich("example.org", context)
+        self.assertEqual(mock_scan.call_count, 1)
+        self.assertEqual(result["port_scan"][0].ip, "93.184.216.34")
+
+    def test_prefers_published_ip_addresses(self):
+        from src.core.models import PortScanResult
+
+        context = {"ip_addresses": ["2.2.2.2"], "dns_info": None}
+        with patch("src.enrichers.port._scan_ip_ports",
+                   side_effect=lambda ip, ports, **kw: PortScanResult(ip=ip)):
+            result = PortEnricher().enrich("example.com", context)
+        self.assertEqual([r.ip for r in result["port_scan"]], ["2.2.2.2"])
+
+    def test_subdomain_stage_extends_apex_results(self):
+        from src.core.models import PortScanResult
+
+        context = {
+            "port_scan": [PortScanResult(ip="1.1.1.1")],
+            "correlation": {"ip_to_subdomains": {
+                "1.1.1.1": ["example.com"],
+                "2.2.2.2": ["a.example.com"],
+                "3.3.3.3": ["b.example.com", "c.example.com"],
+            }},
+        }
+        with (
+            patch("src.enrichers.port.PORT_SCAN_MAX_IPS", 2),
+            patch("src.enrichers.port._scan_ip_ports",
+                  side_effect=lambda ip, ports, **kw: PortScanResult(ip=ip)),
+        ):
+            result = SubdomainPortEnricher().enrich("example.com", context)
+        self.assertEqual([r.ip for r in result["port_scan"]], ["1.1.1.1", "3.3.3.3"])
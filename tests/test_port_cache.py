@@ -0,0 +1,166 @@
+"""
+Tests for the port scan result store (src/core/port_cache.py).
+
+Probes are fake coroutines; the Redis tier runs against an in-memory stand-in.
+"""
+
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from src.core.models import OpenPort, PortScanResult
+from src.core.port_cache import PortScanCache, profile_key
+from src.enrichers.port import PortEnricher
+
+_IP = "93.184.216.34"
+_PORTS = [80, 443]
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def exists(self, key):
+        return int(key in self.store)
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+
+def _probe(calls, error=None):
+    async def scan():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return PortScanResult(ip=_IP, open_ports=[OpenPort(port=443, service="https")], error=error)
+
+    return scan
+
+
+class TestPortScanCache(unittest.TestCase):
+    def test_concurrent_scans_share_one_probe(self):
+        cache = PortScanCache(use_redis=False)
+        calls = []
+
+        async def scenario():
+            return await asyncio.gather(*(cache.get_or_scan(_IP, _PORTS, _probe(calls)) for _ in range(5)))
+
+        results = asyncio.run(scenario())
+        again = asyncio.run(cache.get_or_scan(_IP, list(reversed(_PORTS)), _probe(calls)))
+        self.assertEqual(len(calls), 1)
+        self.assertIsNotNone(results[0].observed_at)
+        self.assertTrue(all(r.observed_at == results[0].observed_at for r in results))
+        self.assertEqual(again.observed_at, results[0].observed_at)
+        stats = cache.stats()
+        self.assertEqual((stats["probes"], stats["coalesced"], stats["hits"]), (1, 4, 1))
+
+    def test_timed_out_caller_does_not_cancel_other_waiters(self):
+        cache = PortScanCache(use_redis=False)
+        calls = []
+
+        def slow_probe():
+            async def scan():
+                calls.append(1)
+                await asyncio.sleep(0.2)
+                return PortScanResult(ip=_IP)
+
+            return scan
+
+        async def scenario():
+            hurried = asyncio.ensure_future(asyncio.wait_for(cache.get_or_scan(_IP, _PORTS, slow_probe()), 0.05))
+            await asyncio.sleep(0)
+            patient = asyncio.ensure_future(cache.get_or_scan(_IP, _PORTS, slow_probe()))
+            return await asyncio.gather(hurried, patient, return_exceptions=True)
+
+        hurried, patient = asyncio.run(scenario())
+        self.assertIsInstance(hurried, asyncio.TimeoutError)
+        self.assertEqual(patient.ip, _IP)
+        self.assertEqual(len(calls), 2)
+
+    def test_profiles_and_failures_are_not_shared(self):
+        cache = PortScanCache(use_redis=False)
+        calls = []
+        asyncio.run(cache.get_or_scan(_IP, _PORTS, _probe(calls, error="timeout")))
+        asyncio.run(cache.get_or_scan(_IP, _PORTS, _probe(calls)))
+        asyncio.run(cache.get_or_scan(_IP, [22], _probe(calls)))
+        self.assertEqual(len(calls), 3)
+        self.assertNotEqual(profile_key(_PORTS), profile_key([22]))
+
+    def test_zero_ttl_always_probes(self):
+        cache = PortScanCache(ttl=0, use_redis=False)
+        calls = []
+        for _ in range(2):
+            result = asyncio.run(cache.get_or_scan(_IP, _PORTS, _probe(calls)))
+        self.assertEqual(len(calls), 2)
+        self.assertIsNotNone(result.observed_at)
+
+    def test_redis_tier_shared_between_processes(self):
+        redis = _FakeRedis()
+        calls = []
+        with (
+            patch("src.core.port_cache.get_shared_redis", return_value=redis),
+            patch("src.services.cache_service.get_shared_redis", return_value=redis),
+        ):
+            first = asyncio.run(PortScanCache().get_or_scan(_IP, _PORTS, _probe(calls)))
+            other = PortScanCache()
+            second = asyncio.run(other.get_or_scan(_IP, _PORTS, _probe(calls)))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(second.observed_at, first.observed_at)
+        self.assertEqual(second.open_ports[0].port, 443)
+        self.assertEqual(other.stats()["redis_hits"], 1)
+        self.assertFalse(any(key.startswith("portscan-lock:") for key in redis.store))
+
+    def test_waits_for_probe_running_in_another_process(self):
+        redis = _FakeRedis()
+        key = f"{_IP}|{profile_key(_PORTS)}"
+        redis.store["portscan-lock:" + key] = "peer"
+        peer_result = PortScanResult(ip=_IP, observed_at=datetime.now(timezone.utc) - timedelta(seconds=5))
+        calls = []
+
+        async def scenario(cache):
+            async def peer_finishes():
+                await asyncio.sleep(0.05)
+                redis.store["portscan:" + key] = peer_result.model_dump_json()
+                del redis.store["portscan-lock:" + key]
+
+            finished = asyncio.ensure_future(peer_finishes())
+            result = await cache.get_or_scan(_IP, _PORTS, _probe(calls))
+            await finished
+            return result
+
+        with (
+            patch("src.core.port_cache.get_shared_redis", return_value=redis),
+            patch("src.services.cache_service.get_shared_redis", return_value=redis),
+            patch("src.core.port_cache._POLL_SECONDS", 0.01),
+        ):
+            result = asyncio.run(scenario(PortScanCache()))
+        self.assertEqual(calls, [])
+        self.assertEqual(result.observed_at, peer_result.observed_at)
+
+    def test_enricher_reuses_cached_results_across_scans(self):
+        cache = PortScanCache(use_redis=False)
+        context = {"ip_addresses": [_IP]}
+        with patch(
+            "src.enrichers.port._scan_ip_ports",
+            side_effect=lambda ip, ports, **kw: PortScanResult(ip=ip),
+        ) as scan:
+            first = PortEnricher(ports=_PORTS, cache=cache).enrich("example.com", context)
+            second = PortEnricher(ports=_PORTS, cache=cache).enrich("example.org", context)
+        self.assertEqual(scan.call_count, 1)
+        self.assertEqual(second["port_scan"][0].observed_at, first["port_scan"][0].observed_at)
+
+
+if __name__ == "__main__":
+    unittest.main()
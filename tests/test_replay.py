@@ -0,0 +1,173 @@
+"""
+Tests for the record/replay harness (src/core/replay.py).
+"""
+
+import asyncio
+import base64
+import importlib.util
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import dns.message
+import dns.rrset
+import dns.resolver
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.core.models import OpenPort
+from src.core.replay import (
+    HTTP_MISS_STATUS,
+    Cassette,
+    Recorder,
+    ReplayEnvironment,
+    ReplayLatency,
+    dns_key,
+    http_key,
+)
+from src.enrichers import port as port_enricher
+from src.enrichers._http import make_aiohttp_session
+
+_HAS_CRYPTOGRAPHY = importlib.util.find_spec("cryptography") is not None
+
+
+def _a_response_wire(name: str, address: str) -> str:
+    query = dns.message.make_query(name, "A")
+    response = dns.message.make_response(query)
+    response.answer.append(dns.rrset.from_text(name, 300, "IN", "A", address))
+    return base64.b64encode(response.to_wire()).decode("ascii")
+
+
+def _cassette() -> Cassette:
+    return Cassette(
+        domain="example.com",
+        dns={
+            dns_key("example.com", "A"): {"wire": _a_response_wire("example.com.", "93.184.216.34")},
+            dns_key("missing.example.com", "A"): {"rcode": "NXDOMAIN"},
+        },
+        http={
+            http_key("GET", "https://crt.sh/?q=example.com&output=json"): [
+                {"status": 200, "headers": [["Content-Type", "application/json"]],
+                 "body": b'[{"name_value": "www.example.com"}]'},
+            ],
+            http_key("GET", "https://api.ssllabs.com/api/v3/analyze?host=example.com"): [
+                {"status": 200, "headers": [], "body": b"IN_PROGRESS"},
+                {"status": 200, "headers": [], "body": b"READY"},
+            ],
+        },
+        calls={"port": {"93.184.216.34:443": {"port": 443, "service": "https", "banner": None}}},
+    )
+
+
+class TestCassette(unittest.TestCase):
+    def test_save_and_load_round_trip(self):
+        cassette = _cassette()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cassette.json")
+            cassette.save(path)
+            loaded = Cassette.load(path)
+        self.assertEqual(loaded.dns, cassette.dns)
+        self.assertEqual(loaded.calls, cassette.calls)
+        key = http_key("GET", "https://crt.sh/?q=example.com&output=json")
+        self.assertEqual(loaded.http[key][0]["body"], b'[{"name_value": "www.example.com"}]')
+
+    def test_unknown_version_rejected(self):
+        with self.assertRaises(ValueError):
+            Cassette.from_dict({"version": 99})
+
+    def test_dns_key_normalizes_name_and_type(self):
+        self.assertEqual(dns_key("Example.COM", 1), "example.com.|A")
+        self.assertEqual(dns_key("example.com.", "mx"), "example.com.|MX")
+
+
+class TestRecorder(unittest.TestCase):
+    def test_records_function_taps(self):
+        cassette = Cassette(domain="example.com")
+        open_port = OpenPort(port=443, service="https")
+        with patch.object(port_enricher, "_scan_port", return_value=open_port):
+            with Recorder(cassette):
+                result = asyncio.run(port_enricher._scan_port("93.184.216.34", 443))
+            self.assertIs(result, open_port)
+        self.assertEqual(cassette.calls["port"]["93.184.216.34:443"]["service"], "https")
+
+    def test_records_http_responses_with_body(self):
+        async def handler(request):
+            return web.json_response({"ok": True})
+
+        async def run(cassette):
+            app = web.Application()
+            app.router.add_get("/data", handler)
+            async with TestServer(app) as server:
+                with Recorder(cassette):
+                    async with make_aiohttp_session({}) as session:
+                        async with session.get(server.make_url("/data")) as resp:
+                            await resp.json()
+                return str(server.make_url("/data"))
+
+        cassette = Cassette()
+        url = asyncio.run(run(cassette))
+        [entry] = cassette.http[http_key("GET", url)]
+        self.assertEqual(entry["status"], 200)
+        self.assertEqual(bytes(entry["body"]), b'{"ok": true}')
+
+
+@unittest.skipUnless(_HAS_CRYPTOGRAPHY, "cryptography not installed")
+class TestReplayEnvironment(unittest.TestCase):
+    def test_dns_served_from_cassette(self):
+        with ReplayEnvironment(_cassette()) as env:
+            answers = dns.resolver.resolve("example.com", "A")
+            with self.assertRaises(dns.resolver.NXDOMAIN):
+                dns.resolver.resolve("missing.example.com", "A")
+            with self.assertRaises(dns.resolver.NoNameservers):
+                dns.resolver.resolve("other.example.com", "A")
+        self.assertEqual([str(r) for r in answers], ["93.184.216.34"])
+        self.assertEqual(env.misses, ["dns other.example.com.|A"])
+
+    def test_default_resolver_restored(self):
+        before = dns.resolver.default_resolver
+        with ReplayEnvironment(_cassette()):
+            self.assertIsNot(dns.resolver.default_resolver, before)
+        self.assertIs(dns.resolver.default_resolver, before)
+
+    def test_http_served_in_recorded_order(self):
+        async def fetch_all():
+            bodies = []
+            async with make_aiohttp_session({}) as session:
+                async with session.get("https://crt.sh/?q=example.com&output=json") as resp:
+                    bodies.append(await resp.json())
+                for _ in range(3):
+                    async with session.get("https://api.ssllabs.com/api/v3/analyze?host=example.com") as resp:
+                        bodies.append(await resp.text())
+                async with session.get("http://unknown.example/") as resp:
+                    bodies.append(resp.status)
+            return bodies
+
+        with ReplayEnvironment(_cassette(), ReplayLatency(http=0.01)) as env:
+            bodies = asyncio.run(fetch_all())
+        self.assertEqual(bodies[0], [{"name_value": "www.example.com"}])
+        self.assertEqual(bodies[1:4], ["IN_PROGRESS", "READY", "READY"])
+        self.assertEqual(bodies[4], HTTP_MISS_STATUS)
+        self.assertEqual(env.misses, ["http GET http://unknown.example/"])
+
+    def test_function_taps_replay_and_restore(self):
+        original = port_enricher._scan_port
+        with ReplayEnvironment(_cassette()) as env:
+            open_port = asyncio.run(port_enricher._scan_port("93.184.216.34", 443))
+            closed = asyncio.run(port_enricher._scan_port("93.184.216.34", 22))
+            banner = asyncio.run(port_enricher._grab_banner("93.184.216.34", 443))
+        self.assertEqual(open_port.service, "https")
+        self.assertIsNone(closed)
+        self.assertIsNone(banner)
+        self.assertIn("port_banner 93.184.216.34:443", env.misses)
+        self.assertIs(port_enricher._scan_port, original)
+
+    def test_recorder_captures_dns_answers(self):
+        cassette = Cassette(domain="example.com")
+        with ReplayEnvironment(_cassette()):
+            with Recorder(cassette):
+                dns.resolver.resolve("example.com", "A")
+                with self.assertRaises(dns.resolver.NXDOMAIN):
+                    dns.resolver.resolve("missing.example.com", "A")
+        self.assertIn("wire", cassette.dns["example.com.|A"])
+        self.assertEqual(cassette.dns["missing.example.com.|A"], {"rcode": "NXDOMAIN"})
@@ -0,0 +1,191 @@
+"""
+Tests for the shared DNS resolver (src/core/resolver.py).
+
+Upstream queries are mocked at ``dns.resolver.resolve`` /
+``dns.asyncresolver.Resolver.resolve``; no packets are sent.
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import dns.exception
+import dns.message
+import dns.rdata
+import dns.rdataclass
+import dns.rrset
+import dns.resolver
+
+from src.core.resolver import DnsResolverService
+
+_UPSTREAM = "src.core.resolver.dns.resolver.resolve"
+
+
+class _Answer:
+    """Minimal stand-in for ``dns.resolver.Answer``."""
+
+    def __init__(self, *addresses, ttl=300):
+        self.expiration = time.time() + ttl
+        self._rdata = [dns.rdata.from_text(dns.rdataclass.IN, "A", a) for a in addresses]
+
+    def __iter__(self):
+        return iter(self._rdata)
+
+
+def _nxdomain(soa_ttl=None):
+    if soa_ttl is None:
+        return dns.resolver.NXDOMAIN()
+    query = dns.message.make_query("missing.example.com", "A")
+    response = dns.message.make_response(query)
+    response.authority.append(
+        dns.rrset.from_text("example.com.", 3600, "IN", "SOA", f"ns. host. 1 7200 900 1209600 {soa_ttl}")
+    )
+    return dns.resolver.NXDOMAIN(qnames=[query.question[0].name], responses={query.question[0].name: response})
+
+
+class TestDnsResolverService(unittest.TestCase):
+    def setUp(self):
+        self.resolver = DnsResolverService(use_redis=False)
+
+    def test_positive_answer_cached(self):
+        with patch(_UPSTREAM, return_value=_Answer("1.2.3.4")) as upstream:
+            first = self.resolver.resolve("Example.COM", "A")
+            second = self.resolver.resolve("example.com.", "A")
+        upstream.assert_called_once()
+        self.assertEqual([str(r) for r in first], ["1.2.3.4"])
+        self.assertEqual([str(r) for r in second], ["1.2.3.4"])
+        stats = self.resolver.stats()
+        self.assertEqual((stats["hits"], stats["upstream_queries"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_expired_answer_requeried(self):
+        with patch(_UPSTREAM, return_value=_Answer("1.2.3.4", ttl=0)) as upstream:
+            self.resolver.resolve("example.com")
+            self.resolver.resolve("example.com")
+        self.assertEqual(upstream.call_count, 2)
+
+    def test_ttl_capped_by_max_ttl(self):
+        resolver = DnsResolverService(max_ttl=10, use_redis=False)
+        with patch(_UPSTREAM, return_value=_Answer("1.2.3.4", ttl=86400)) as upstream:
+            resolver.resolve("example.com")
+            with patch("src.core.resolver.time.time", return_value=time.time() + 11):
+                resolver.resolve("example.com")
+        self.assertEqual(upstream.call_count, 2)
+
+    def test_nxdomain_cached_for_soa_negative_ttl(self):
+        with patch(_UPSTREAM, side_effect=_nxdomain(soa_ttl=30)) as upstream:
+            for _ in range(2):
+                with self.assertRaises(dns.resolver.NXDOMAIN):
+                    self.resolver.resolve("missing.example.com")
+            with patch("src.core.resolver.time.time", return_value=time.time() + 31):
+                with self.assertRaises(dns.resolver.NXDOMAIN):
+                    self.resolver.resolve("missing.example.com")
+        self.assertEqual(upstream.call_count, 2)
+        self.assertEqual(self.resolver.stats()["negative_hits"], 1)
+
+    def test_no_answer_cached(self):
+        with patch(_UPSTREAM, side_effect=dns.resolver.NoAnswer()) as upstream:
+            for _ in range(2):
+                with self.assertRaises(dns.resolver.NoAnswer):
+                    self.resolver.resolve("example.com", "AAAA")
+        upstream.assert_called_once()
+
+    def test_timeouts_not_cached(self):
+        with patch(_UPSTREAM, side_effect=dns.exception.Timeout()) as upstream:
+            for _ in range(2):
+                with self.assertRaises(dns.exception.Timeout):
+                    self.resolver.resolve("example.com")
+        self.assertEqual(upstream.call_count, 2)
+        self.assertEqual(self.resolver.stats()["upstream_errors"], 2)
+
+    def test_concurrent_queries_coalesced(self):
+        release = threading.Event()
+
+        def slow_upstream(name, rdtype):
+            release.wait(5)
+            return _Answer("1.2.3.4")
+
+        results = []
+        with patch(_UPSTREAM, side_effect=slow_upstream) as upstream:
+            threads = [
+                threading.Thread(target=lambda: results.append(self.resolver.resolve("example.com")))
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            while self.resolver.stats()["coalesced"] < 3:
+                time.sleep(0.01)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+        upstream.assert_called_once()
+        self.assertEqual(len(results), 4)
+
+    def test_lru_eviction(self):
+        resolver = DnsResolverService(max_entries=1, use_redis=False)
+        with patch(_UPSTREAM, return_value=_Answer("1.2.3.4")) as upstream:
+            resolver.resolve("a.example.com")
+            resolver.resolve("b.example.com")
+            resolver.resolve("a.example.com")
+        self.assertEqual(upstream.call_count, 3)
+        self.assertEqual(resolver.stats()["entries"], 1)
+
+    def test_async_resolution_shares_cache(self):
+        async_upstream = AsyncMock(return_value=_Answer("5.6.7.8"))
+        with (
+            patch("src.core.resolver.dns.asyncresolver.Resolver.resolve", async_upstream),
+            patch(_UPSTREAM) as sync_upstream,
+        ):
+            answers = asyncio.run(self.resolver.resolve_async("example.com", "A"))
+            again = self.resolver.resolve("example.com", "A")
+        async_upstream.assert_awaited_once()
+        sync_upstream.assert_not_called()
+        self.assertEqual([str(r) for r in answers], [str(r) for r in again])
+
+    def test_cancelled_lookup_does_not_fail_coalesced_waiters(self):
+        async def slow_upstream(*args, **kwargs):
+            await asyncio.sleep(0.1)
+            return _Answer("5.6.7.8")
+
+        async def scenario():
+            owner = asyncio.ensure_future(self.resolver.resolve_async("example.com", "A"))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(self.resolver.resolve_async("example.com", "A"))
+            await asyncio.sleep(0.02)
+            owner.cancel()
+            return await waiter, await asyncio.gather(owner, return_exceptions=True)
+
+        with patch("src.core.resolver.dns.asyncresolver.Resolver.resolve", side_effect=slow_upstream) as upstream:
+            answers, (cancelled,) = asyncio.run(scenario())
+        self.assertEqual([str(r) for r in answers], ["5.6.7.8"])
+        self.assertIsInstance(cancelled, asyncio.CancelledError)
+        self.assertEqual(upstream.call_count, 2)
+        self.assertEqual(self.resolver.stats()["upstream_errors"], 0)
+
+    def test_redis_tier_shared_between_instances(self):
+        store = {}
+        cache = MagicMock()
+        cache.get.side_effect = store.get
+        cache.set.side_effect = lambda key, value, ttl: store.__setitem__(key, value)
+        with (
+            patch("src.core.resolver.get_shared_redis", return_value=object()),
+            patch("src.core.resolver.cache_service", cache),
+            patch(_UPSTREAM, return_value=_Answer("1.2.3.4")) as upstream,
+        ):
+            DnsResolverService().resolve("example.com")
+            other = DnsResolverService()
+            answers = other.resolve("example.com")
+        upstream.assert_called_once()
+        self.assertIn("dns:example.com.|A", store)
+        self.assertEqual([str(r) for r in answers], ["1.2.3.4"])
+        self.assertEqual(other.stats()["redis_hits"], 1)
+
+    def test_rejects_non_positive_max_entries(self):
+        with self.assertRaises(ValueError):
+            DnsResolverService(max_entries=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
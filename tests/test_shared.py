@@ -0,0 +1,206 @@
+"""
+Tests for batch-wide shared state (src/core/shared.py).
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.pipeline import EnricherPipeline
+from src.core.shared import ResourceLimits, SharedWork, SlotPool, shared_call, shared_call_async
+from src.enrichers.base import AsyncEnricher
+
+
+class TestSharedWork(unittest.TestCase):
+
+    def test_concurrent_callers_compute_once(self):
+        shared = SharedWork()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return "scanned"
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(
+                lambda _: shared.get_or_compute("port_scan", "1.2.3.4", compute), range(8)
+            ))
+
+        self.assertEqual(results, ["scanned"] * 8)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(shared.misses, 1)
+        self.assertEqual(shared.hits, 7)
+
+    def test_kinds_are_separate_keys(self):
+        shared = SharedWork()
+        self.assertEqual(shared.get_or_compute("geoip", "1.2.3.4", lambda: "geo"), "geo")
+        self.assertEqual(shared.get_or_compute("ptr", "1.2.3.4", lambda: "ptr"), "ptr")
+
+    def test_failure_is_not_cached(self):
+        shared = SharedWork()
+
+        def boom():
+            raise RuntimeError("timeout")
+
+        with self.assertRaises(RuntimeError):
+            shared.get_or_compute("ptr", "1.2.3.4", boom)
+        self.assertEqual(shared.get_or_compute("ptr", "1.2.3.4", lambda: "ok"), "ok")
+
+    def test_async_waiters_share_one_computation(self):
+        shared = SharedWork()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"asn": 15133}
+
+        async def _run():
+            return await asyncio.gather(*[
+                shared.get_or_compute_async("ripestat", "93.184.216.34", compute) for _ in range(5)
+            ])
+
+        results = asyncio.run(_run())
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r == {"asn": 15133} for r in results))
+
+    def test_cancelled_owner_hands_over_to_waiter(self):
+        shared = SharedWork()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "scanned"
+
+        async def _run():
+            owner = asyncio.ensure_future(shared.get_or_compute_async("port_scan", "1.2.3.4", compute))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(shared.get_or_compute_async("port_scan", "1.2.3.4", compute))
+            cancelled_waiter = asyncio.ensure_future(shared.get_or_compute_async("port_scan", "1.2.3.4", compute))
+            await asyncio.sleep(0.01)
+            owner.cancel()
+            cancelled_waiter.cancel()
+            return await waiter, await asyncio.gather(owner, cancelled_waiter, return_exceptions=True)
+
+        result, cancelled = asyncio.run(_run())
+        self.assertEqual(result, "scanned")
+        self.assertTrue(all(isinstance(exc, asyncio.CancelledError) for exc in cancelled))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(shared.get_or_compute("port_scan", "1.2.3.4", lambda: "again"), "scanned")
+
+    def test_one_scans_budget_does_not_cancel_another(self):
+        shared = SharedWork()
+
+        class _Port(AsyncEnricher):
+            name = "port"
+            produces = ("port_scan",)
+
+            async def enrich_async(self, domain, context=None, session=None):
+                async def scan():
+                    await asyncio.sleep(0.3)
+                    return ["1.2.3.4:443"]
+
+                return {"port_scan": await shared_call_async(shared, "port_scan", "1.2.3.4", scan)}
+
+        async def _run():
+            budgeted = EnricherPipeline([_Port()], budgets={"port": 0.05})
+            unbounded = EnricherPipeline([_Port()])
+            return await asyncio.gather(budgeted.run_async("a.example"), unbounded.run_async("b.example"))
+
+        budgeted, unbounded = asyncio.run(_run())
+        self.assertEqual(budgeted["section_status"]["port_scan"], "timeout")
+        self.assertEqual(unbounded["section_status"]["port_scan"], "complete")
+        self.assertEqual(unbounded["port_scan"], ["1.2.3.4:443"])
+
+    def test_shared_call_without_memo_calls_through(self):
+        self.assertEqual(shared_call(None, "geoip", "x", lambda: 1), 1)
+
+        async def compute():
+            return 2
+
+        self.assertEqual(asyncio.run(shared_call_async(None, "geoip", "x", compute)), 2)
+
+
+class TestResourceLimits(unittest.TestCase):
+
+    def test_tcp_slots_cap_concurrency(self):
+        limits = ResourceLimits(tcp_connect=2)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def work(_):
+            with limits.tcp_slots:
+                with lock:
+                    active.append(1)
+                    peak.append(len(active))
+                time.sleep(0.02)
+                with lock:
+                    active.pop()
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(work, range(6)))
+        self.assertLessEqual(max(peak), 2)
+
+    def test_slot_pool_shared_by_threads_and_event_loop(self):
+        pool = SlotPool(2)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def enter():
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+
+        def leave():
+            with lock:
+                active.pop()
+
+        def thread_work(_):
+            with pool:
+                enter()
+                time.sleep(0.02)
+                leave()
+
+        async def loop_work():
+            async def one():
+                async with pool:
+                    enter()
+                    await asyncio.sleep(0.02)
+                    leave()
+
+            await asyncio.gather(*(one() for _ in range(4)))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(thread_work, i) for i in range(4)]
+            asyncio.run(loop_work())
+            for future in futures:
+                future.result()
+        self.assertLessEqual(max(peak), 2)
+        self.assertEqual(len(peak), 8)
+
+    def test_cancelled_waiter_gives_slot_back(self):
+        pool = SlotPool(1)
+
+        async def scenario():
+            await pool.acquire_async()
+            waiter = asyncio.ensure_future(pool.acquire_async())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            pool.release()
+            await asyncio.wait_for(pool.acquire_async(), timeout=1)
+
+        asyncio.run(scenario())
+
+    def test_invalid_limit_raises(self):
+        with self.assertRaises(ValueError):
+            ResourceLimits(dns=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,25 +2,148 @@
 Tests for SSL Certificate Enricher
 """
 
+import asyncio
+import ssl
+import tempfile
 import unittest
-from unittest.mock import patch, MagicMock
+from pathlib import Path
+from unittest.mock import patch
 
-from src.enrichers.ssl import _get_cert_info, SslEnricher
+import aiohttp
+from aiohttp import web
+
+from src.core.models import CertificateInfo, TlsHandshake
+from src.core.shared import SlotPool
+from src.core.replay import _self_signed_context
+from src.enrichers.ssl import _extract_common_name, _get_cert_info, SslEnricher, TlsCapture, tls_capture_trace_config
+from src.enrichers.tech import _detect_tech_async
+
+
+def _fake_cert_info(certs):
+    """Async stand-in for ``_get_cert_info``: host -> fingerprint (None = handshake fails)."""
+
+    async def fake(host, port=443, timeout=None):
+        fingerprint = certs.get(host)
+        if fingerprint is None:
+            return TlsHandshake(host=host, connect_ms=1.0, error="Connection refused"), None
+        handshake = TlsHandshake(host=host, connect_ms=1.0, handshake_ms=2.0, fingerprint_sha256=fingerprint)
+        cert = CertificateInfo(host=host, hosts=[host], fingerprint_sha256=fingerprint, subject_cn=f"cn-{fingerprint}")
+        return handshake, cert
+
+    return fake
 
 
 class TestSslEnricher(unittest.TestCase):
-    def test_get_cert_info_with_error_returns_certificate_info(self):
-        with patch("socket.create_connection") as mock_conn:
-            mock_conn.side_effect = Exception("Connection refused")
-            result = _get_cert_info("test.example.com")
-            self.assertIsNotNone(result)
-            self.assertEqual(result.host, "test.example.com")
-            self.assertIsNotNone(result.error)
+    def test_get_cert_info_with_error_returns_failed_handshake(self):
+        with patch("asyncio.open_connection", side_effect=ConnectionRefusedError("Connection refused")):
+            handshake, cert = asyncio.run(_get_cert_info("test.example.com"))
+        self.assertEqual(handshake.host, "test.example.com")
+        self.assertEqual(handshake.error, "Connection refused")
+        self.assertIsNone(cert)
 
     def test_ssl_enricher_returns_ssl_info(self):
-        with patch("src.enrichers.ssl._get_cert_info") as mock_get:
-            mock_get.return_value = None
+        with patch("src.enrichers.ssl._get_cert_info", side_effect=_fake_cert_info({})):
             enricher = SslEnricher()
             result = enricher.enrich("example.com")
             self.assertIn("ssl_info", result)
             self.assertIsNotNone(result["ssl_info"])
+
+    def test_certificates_deduplicated_by_fingerprint(self):
+        subdomains = [f"s{i}.example.com" for i in range(5)]
+        certs = dict.fromkeys(subdomains, "aa" * 32)
+        certs["example.com"] = "bb" * 32
+        with patch("src.enrichers.ssl._get_cert_info", side_effect=_fake_cert_info(certs)) as get_cert:
+            ssl_info = SslEnricher().enrich("example.com", {"subdomains": subdomains})["ssl_info"]
+        self.assertEqual(get_cert.call_count, 6)
+        self.assertEqual(len(ssl_info.certificates), 2)
+        wildcard = next(c for c in ssl_info.certificates if c.fingerprint_sha256 == "aa" * 32)
+        self.assertEqual(wildcard.host, "s0.example.com")
+        self.assertEqual(sorted(wildcard.hosts), subdomains)
+        self.assertEqual(len(ssl_info.handshakes), 6)
+
+    def test_starts_without_waiting_for_tech_and_reads_its_capture_live(self):
+        self.assertNotIn("tls_peers", SslEnricher.requires)
+        capture = TlsCapture()
+        fake = _fake_cert_info({"example.com": "aa" * 32, "www.example.com": "bb" * 32})
+
+        async def handshake_while_tech_fetches(host, port=443, timeout=None):
+            # Tech captures the apex's session while SSL handshakes with www.
+            capture.results["example.com"] = await fake("example.com")
+            return await fake(host)
+
+        with (
+            patch("src.enrichers.ssl._TLS_SLOTS", SlotPool(1)),
+            patch("src.enrichers.ssl._get_cert_info", side_effect=handshake_while_tech_fetches) as get_cert,
+        ):
+            ssl_info = SslEnricher(tls_peers=capture).enrich(
+                "example.com", {"subdomains": ["www.example.com"]}
+            )["ssl_info"]
+        # Least user-facing first; the apex was captured by the time it got a slot.
+        self.assertEqual([call.args[0] for call in get_cert.call_args_list], ["www.example.com"])
+        self.assertEqual(sorted(cert.host for cert in ssl_info.certificates), ["example.com", "www.example.com"])
+        self.assertEqual(len(ssl_info.handshakes), 2)
+
+    def test_extract_common_name_reads_rdn_pairs(self):
+        subject = ((("countryName", "US"),), (("organizationName", "Example"), ("commonName", "example.com")))
+        self.assertEqual(_extract_common_name(subject), "example.com")
+        self.assertIsNone(_extract_common_name(((("countryName", "US"),),)))
+
+    def test_failed_handshakes_are_recorded(self):
+        with patch("src.enrichers.ssl._get_cert_info", side_effect=_fake_cert_info({"example.com": "aa" * 32})):
+            ssl_info = SslEnricher().enrich("example.com", {"subdomains": ["down.example.com"]})["ssl_info"]
+        self.assertEqual([c.host for c in ssl_info.certificates], ["example.com"])
+        errors = {h.host: h.error for h in ssl_info.handshakes}
+        self.assertEqual(errors, {"example.com": None, "down.example.com": "Connection refused"})
+
+
+class TestTlsCapture(unittest.TestCase):
+    async def _probe(self, workdir):
+        """Tech-probe a local HTTPS server that redirects / to /home."""
+        async def redirect(request):
+            raise web.HTTPFound("/home")
+
+        async def home(request):
+            return web.Response(text="<html></html>")
+
+        app = web.Application()
+        app.router.add_get("/", redirect)
+        app.router.add_get("/home", home)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0, ssl_context=_self_signed_context(workdir)).start()
+        port = runner.addresses[0][1]
+        client_context = ssl.create_default_context(cafile=str(workdir / "replay.crt"))
+        client_context.check_hostname = False  # the certificate names "netscout-replay"
+        capture = TlsCapture()
+        try:
+            async with aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(ssl=client_context),
+                trace_configs=[tls_capture_trace_config()],
+            ) as session:
+                stack = await _detect_tech_async(session, f"https://127.0.0.1:{port}/", capture)
+        finally:
+            await runner.cleanup()
+        return stack, capture
+
+    def test_tech_probe_certificate_replaces_handshake(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            stack, capture = asyncio.run(self._probe(Path(workdir)))
+        self.assertIsNone(stack.error)
+        handshake, cert = capture.results["127.0.0.1"]
+        self.assertEqual(cert.subject_cn, "netscout-replay")
+        self.assertEqual(cert.fingerprint_sha256, handshake.fingerprint_sha256)
+        self.assertEqual(len(handshake.fingerprint_sha256), 64)
+        self.assertIsNotNone(handshake.tls_version)
+        self.assertIsNotNone(handshake.cipher)
+        self.assertIsNotNone(handshake.handshake_ms)
+
+        context = {"subdomains": ["www.127.0.0.1"], "tls_peers": capture.ssl_info()}
+        with patch("src.enrichers.ssl._get_cert_info", side_effect=_fake_cert_info({})) as get_cert:
+            ssl_info = SslEnricher().enrich("127.0.0.1", context)["ssl_info"]
+        self.assertEqual([call.args[0] for call in get_cert.call_args_list], ["www.127.0.0.1"])
+        self.assertEqual(ssl_info.certificates[0].hosts, ["127.0.0.1"])
+        self.assertEqual(len(ssl_info.handshakes), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
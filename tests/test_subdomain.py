@@ -2,15 +2,35 @@
 Tests for the subdomain enricher.
 """
 
+import asyncio
+import json
+import tracemalloc
 import unittest
 from unittest.mock import patch
 
+import aiohttp
+from aiohttp import web
+
 from src.enrichers.subdomain import (
     SubdomainEnricher,
     _extract_subdomains_from_crt,
+    _fetch_crtsh_json_async,
+    _JsonArrayStream,
+)
+
+_CRT_ROW = (
+    '{{"issuer_ca_id":183267,"issuer_name":"C=US, O=Let\'s Encrypt, CN=R3","common_name":"{name}",'
+    '"name_value":"{name}\\n*.{name}","id":{id},"entry_timestamp":"2024-03-01T10:00:00.123",'
+    '"not_before":"2024-03-01T09:00:00","not_after":"2024-05-30T09:00:00","serial_number":"04a1b2c3d4e5f6"}}'
 )
 
 
+def _crt_rows(count, names):
+    """Synthetic crt.sh rows (JSON text) cycling through ``names`` subdomains of example.com."""
+    for i in range(count):
+        yield _CRT_ROW.format(name=f"host{i % names}.example.com", id=10_000_000 + i)
+
+
 class TestExtractSubdomainsFromCrt(unittest.TestCase):
     def test_extract_subdomains(self):
         data = [
@@ -38,10 +58,88 @@ class TestExtractSubdomainsFromCrt(unittest.TestCase):
         self.assertEqual(len(result), 0)
 
 
+class TestCrtshStreaming(unittest.TestCase):
+    def test_array_stream_matches_json_at_every_split(self):
+        document = json.dumps([{"name_value": "a.example.com\nb.example.com"}, 12, [1, {"x": "]"}], "s,", None])
+        for split in range(len(document) + 1):
+            rows = _JsonArrayStream()
+            parsed = rows.feed(document[:split]) + rows.feed(document[split:]) + rows.close()
+            self.assertEqual(parsed, json.loads(document), split)
+
+    def test_array_stream_rejects_malformed_or_truncated(self):
+        for document in ('{"name_value": "a"}', '[{"a": 1}{"b": 2}]', '[1,]', '[1] 2', '[{"a": 1}, {"b"'):
+            rows = _JsonArrayStream()
+            with self.assertRaises(json.JSONDecodeError, msg=document):
+                rows.feed(document)
+                rows.close()
+        with self.assertRaises(json.JSONDecodeError):
+            _JsonArrayStream(max_element_chars=100).feed('[{"name_value": "' + "a" * 200)
+
+    def test_large_response_parsed_in_bounded_memory(self):
+        batches, names = 60, 500
+        batch = ",".join(_crt_rows(names, names)).encode("utf-8")
+        body_bytes = batches * (len(batch) + 1) + 1
+
+        async def serve(request):
+            resp = web.StreamResponse(headers={"Content-Type": "application/json"})
+            await resp.prepare(request)
+            for index in range(batches):
+                await resp.write((b"[" if index == 0 else b",") + batch)
+            await resp.write(b"]")
+            await resp.write_eof()
+            return resp
+
+        async def scenario():
+            app = web.Application()
+            app.router.add_get("/", serve)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            try:
+                async with aiohttp.ClientSession() as session:
+                    tracemalloc.start()
+                    try:
+                        found = await _fetch_crtsh_json_async(session, f"http://127.0.0.1:{port}/", "example.com", 30, 1)
+                        _, peak = tracemalloc.get_traced_memory()
+                    finally:
+                        tracemalloc.stop()
+            finally:
+                await runner.cleanup()
+            return found, peak
+
+        found, peak = asyncio.run(scenario())
+        self.assertEqual(found, {f"host{i}.example.com" for i in range(names)})
+        self.assertGreater(body_bytes, 8_000_000)
+        # Peak covers the server side too; the whole body never is.
+        self.assertLess(peak, body_bytes // 4)
+
+    def test_truncated_response_is_a_failure(self):
+        async def serve(request):
+            return web.Response(body=b'[{"name_value": "a.example.com"}, {"name_', content_type="application/json")
+
+        async def scenario():
+            app = web.Application()
+            app.router.add_get("/", serve)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            try:
+                async with aiohttp.ClientSession() as session:
+                    return await _fetch_crtsh_json_async(session, f"http://127.0.0.1:{port}/", "example.com", 30, 1)
+            finally:
+                await runner.cleanup()
+
+        self.assertIsNone(asyncio.run(scenario()))
+
+
 class TestSubdomainEnricher(unittest.TestCase):
     @patch("src.enrichers.subdomain._fetch_passive_async")
     def test_enrich_returns_subdomains(self, mock_passive):
-        async def _fake_passive(_domain):
+        async def _fake_passive(_domain, _session=None):
             return {"www.example.com", "mail.example.com"}
 
         mock_passive.side_effect = _fake_passive
@@ -7,25 +7,45 @@ No real network requests are made.
 
 import asyncio
 import unittest
+from http.cookies import SimpleCookie
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from src.enrichers.tech import TechEnricher
+import aiohttp
+from aiohttp import web
+from yarl import URL
+
+from src.enrichers.tech import TechEnricher, _fetch_tech_stack_async, _parse_meta_tags, _read_text_prefix
 
 
 # ---------------------------------------------------------------------------
 # aiohttp mock helpers
 # ---------------------------------------------------------------------------
 
+class _MockContent:
+    """Minimal aiohttp.StreamReader mock; records how much was read."""
+
+    def __init__(self, body: bytes):
+        self._body = body
+        self.consumed = 0
+
+    async def read(self, n: int = -1) -> bytes:
+        end = len(self._body) if n < 0 else self.consumed + n
+        chunk = self._body[self.consumed:end]
+        self.consumed += len(chunk)
+        return chunk
+
+
 class _MockResponse:
     """Minimal aiohttp.ClientResponse mock."""
 
-    def __init__(self, status: int, headers: dict, text_body: str = ""):
+    def __init__(self, status: int, headers: dict, text_body: str = "", cookies: str = "",
+                 url: str = "https://example.com/"):
         self.status = status
         self.headers = headers
-        self._text_body = text_body
-
-    async def text(self) -> str:
-        return self._text_body
+        self.url = URL(url)
+        self.cookies = SimpleCookie(cookies)
+        self.charset = "utf-8"
+        self.content = _MockContent(text_body.encode("utf-8"))
 
     async def __aenter__(self):
         return self
@@ -181,6 +201,141 @@ class TestTechEnricherCmsDetection(unittest.TestCase):
         result = self._run_with_body('<meta name="generator" content="Drupal 10">')
         self.assertIn("tech_stack", result)
 
+    def test_fingerprint_rules_detect_versions_and_implied_technologies(self):
+        response = _MockResponse(
+            status=200,
+            headers={"Server": "nginx/1.24.0", "X-Powered-By": "Express"},
+            text_body='<head><meta name="generator" content="WordPress 6.5"></head>',
+            cookies="PHPSESSID=abc",
+        )
+        with patch("src.enrichers.tech.make_aiohttp_session", return_value=_mock_session(response)):
+            result = TechEnricher().enrich("example.com", {"subdomains": []})
+        entry = result["tech_stack"]["https://example.com"]
+        detections = {d["name"]: d for d in entry["detections"]}
+        self.assertEqual(detections["WordPress"]["version"], "6.5")
+        self.assertEqual(detections["PHP"]["matched_by"], ["cookies"])
+        self.assertEqual(detections["Node.js"]["matched_by"], ["implies"])
+        self.assertIn("Nginx 1.24.0", entry["technologies"])
+
+
+class TestTechBodyParsing(unittest.TestCase):
+    """Bounded body reads and the head-only meta tokenizer."""
+
+    def test_meta_generator_and_cms_from_head(self):
+        html = (
+            '<html><head><META NAME="Generator" CONTENT=" Hugo 0.120 ">'
+            '<meta name="x-cms" content="Craft"></head>'
+        )
+        self.assertEqual(_parse_meta_tags(html), ("Hugo 0.120", "Hugo 0.120"))
+        self.assertEqual(
+            _parse_meta_tags('<meta name="cms-engine" content="Ghost"><meta name="generator" content="X">'),
+            ("X", "Ghost"),
+        )
+
+    def test_meta_tags_after_head_are_ignored(self):
+        html = '<head><title>t</title></head><body><meta name="generator" content="Late">'
+        self.assertEqual(_parse_meta_tags(html), (None, None))
+        self.assertEqual(_parse_meta_tags("<body>" + "x" * 100 + "/wp-content/a.css"), (None, "WordPress"))
+        self.assertEqual(_parse_meta_tags("<p>Powered by DRUPAL</p>"), (None, "Drupal"))
+
+    def test_body_read_stops_at_limit(self):
+        response = _MockResponse(status=200, headers={}, text_body="é" * 100_000)
+        text = asyncio.run(_read_text_prefix(response, 1001))
+        self.assertEqual(response.content.consumed, 1001)
+        # The code point cut at the limit decodes to a replacement character.
+        self.assertEqual(text, "é" * 500 + "\ufffd")
+
+    def test_enricher_reads_only_body_prefix(self):
+        page = '<head><meta name="generator" content="WordPress 6.5"></head>' + "x" * 500_000
+        responses = []
+
+        def get(url, **kwargs):
+            responses.append(_MockResponse(status=200, headers={}, text_body=page))
+            return responses[-1]
+
+        session = _mock_session(None)
+        session.get = MagicMock(side_effect=get)
+        with patch("src.enrichers.tech.make_aiohttp_session", return_value=session), \
+                patch("src.enrichers.tech.TECH_BODY_MAX_BYTES", 4096):
+            result = TechEnricher().enrich("example.com", {"subdomains": ["www.example.com"]})
+        self.assertEqual(responses[0].content.consumed, 4096)
+        self.assertEqual(result["tech_stack"]["https://www.example.com"]["meta_generator"], "WordPress 6.5")
+
+
+class TestTechOriginArtifacts(unittest.TestCase):
+    """Favicon / robots.txt / security.txt are fetched once per final origin."""
+
+    def test_redirected_hosts_share_auxiliary_fetches(self):
+        requested = []
+        final = {"https://a.example.com": "https://www.example.com/", "https://b.example.com": "https://www.example.com/"}
+
+        def get(url, **kwargs):
+            requested.append(url)
+            if url.endswith("/favicon.ico"):
+                return _MockResponse(200, {}, "ICON", url=url)
+            if url.endswith("robots.txt"):
+                return _MockResponse(200, {}, "User-agent: *", url=url)
+            if "security.txt" in url:
+                return _MockResponse(404, {}, url=url)
+            return _MockResponse(200, {"Server": "nginx"}, "<p>hi</p>", url=final.get(url, url + "/"))
+
+        session = _mock_session(None)
+        session.get = MagicMock(side_effect=get)
+        with patch("src.enrichers.tech.make_aiohttp_session", return_value=session):
+            result = TechEnricher().enrich("example.com", {"subdomains": ["a.example.com", "b.example.com"]})
+
+        stack = result["tech_stack"]
+        self.assertEqual(stack["https://a.example.com"]["origin"], "https://www.example.com")
+        self.assertEqual(stack["https://example.com"]["origin"], "https://example.com")
+        aux = sorted(url for url in requested if url.endswith(("favicon.ico", ".txt")))
+        self.assertEqual(aux, sorted(
+            f"{origin}{path}"
+            for origin in ("https://example.com", "https://www.example.com")
+            for path in ("/favicon.ico", "/robots.txt", "/.well-known/security.txt", "/security.txt")
+        ))
+        self.assertEqual(len({entry["favicon_hash"] for entry in stack.values()}), 1)
+        self.assertEqual(stack["https://b.example.com"]["robots_txt"], "User-agent: *")
+        self.assertIsNotNone(stack["https://example.com"]["favicon_hash"])
+
+
+
+class TestTechConnectionPool(unittest.TestCase):
+    """Page connections go back to the pool before the origin files are fetched."""
+
+    def test_large_pages_do_not_starve_a_small_pool(self):
+        page = b"<head><title>big</title></head>" + b"x" * (2 * 1024 * 1024)
+
+        async def handle(request):
+            if request.path == "/favicon.ico":
+                return web.Response(body=b"ICON")
+            if request.path.endswith(".txt"):
+                return web.Response(status=404)
+            return web.Response(body=page, content_type="text/html")
+
+        async def scenario():
+            app = web.Application()
+            app.router.add_get("/{tail:.*}", handle)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            urls = []
+            for _ in range(10):  # one origin per port
+                site = web.TCPSite(runner, "127.0.0.1", 0)
+                await site.start()
+                urls.append(f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}")
+            try:
+                async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=5)) as session:
+                    started = asyncio.get_running_loop().time()
+                    stack = await _fetch_tech_stack_async(urls, session=session)
+                    return stack, asyncio.get_running_loop().time() - started
+            finally:
+                await runner.cleanup()
+
+        with patch("src.enrichers.tech.HTTP_TIMEOUT", 5), patch("src.enrichers.tech.TECH_BODY_MAX_BYTES", 4096):
+            stack, elapsed = asyncio.run(scenario())
+        self.assertEqual([entry["error"] for entry in stack.values()], [None] * 10)
+        self.assertTrue(all(entry["favicon_hash"] for entry in stack.values()))
+        self.assertLess(elapsed, 5)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,73 @@
+"""
+Tests for the local TLS protocol / cipher audit (src/enrichers/tls_audit.py).
+
+Endpoints are local TLS listeners (self-signed certificate) restricted to
+chosen protocol versions and cipher sets.
+"""
+
+import asyncio
+import ssl
+import tempfile
+import unittest
+import warnings
+from pathlib import Path
+
+from src.analysis.risk import detect_weak_tls_risks
+from src.core.replay import _self_signed_context
+from src.enrichers.tls_audit import PROBE_REJECTED, PROBE_SUPPORTED, audit_tls
+
+
+def _audit_listener(minimum, maximum, ciphers=None):
+    """Run ``audit_tls`` against a listener accepting ``minimum``-``maximum``."""
+
+    async def close(reader, writer):
+        writer.close()
+
+    async def scenario():
+        with tempfile.TemporaryDirectory() as workdir:
+            context = _self_signed_context(Path(workdir))
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            context.minimum_version = minimum
+            context.maximum_version = maximum
+        if ciphers:
+            context.set_ciphers(ciphers)
+        server = await asyncio.start_server(close, "127.0.0.1", 0, ssl=context)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await audit_tls("example.com", ["127.0.0.1"], port=port, timeout=2)
+        finally:
+            server.close()
+
+    return asyncio.run(scenario())
+
+
+class TestTlsAudit(unittest.TestCase):
+    def test_modern_endpoint_has_no_weak_protocols(self):
+        result = _audit_listener(ssl.TLSVersion.TLSv1_2, ssl.TLSVersion.TLSv1_3)
+        protocols = result["endpoints"][0]["protocols"]
+        self.assertEqual(protocols["TLS 1.2"], PROBE_SUPPORTED)
+        self.assertEqual(protocols["TLS 1.1"], PROBE_REJECTED)
+        self.assertEqual((result["weak_protocols"], result["has_weak_protocols"]), ([], False))
+        self.assertEqual(detect_weak_tls_risks({"tls_audit": result}), [])
+
+    @unittest.skipUnless(ssl.HAS_TLSv1, "local OpenSSL cannot offer TLS 1.0")
+    def test_legacy_endpoint_reports_weak_protocols_and_ciphers(self):
+        result = _audit_listener(ssl.TLSVersion.TLSv1, ssl.TLSVersion.TLSv1_2, "ALL:@SECLEVEL=0")
+        self.assertEqual(result["endpoints"][0]["protocols"]["TLS 1.3"], PROBE_REJECTED)
+        self.assertEqual(result["weak_protocols"], ["TLS 1.0", "TLS 1.1"])
+        self.assertTrue(result["has_weak_protocols"])
+        self.assertIn("anonymous", result["weak_ciphers"])
+        alerts = detect_weak_tls_risks({"tls_audit": result})
+        self.assertEqual([alert.type for alert in alerts], ["weak_tls", "weak_tls"])
+        self.assertEqual(alerts[0].details["weak_protocols"], ["TLS 1.0", "TLS 1.1"])
+
+    def test_unreachable_endpoint_is_an_error(self):
+        result = asyncio.run(audit_tls("example.com", ["127.0.0.1"], port=1, timeout=1))
+        self.assertEqual(result["error"], "No HTTPS endpoint answered")
+        self.assertNotIn("weak_protocols", result)
+        self.assertIsNone(asyncio.run(audit_tls("example.com", [])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+Tests for scan tracing (src/core/tracing.py) and its pipeline / aiohttp hooks.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.core.pipeline import EnricherPipeline
+from src.core.tracing import (
+    CATEGORY_DNS,
+    CATEGORY_ENRICHER,
+    CATEGORY_HTTP,
+    Tracer,
+    submit_in_context,
+    trace_span,
+    use_tracer,
+)
+from src.enrichers._http import make_aiohttp_session
+from src.enrichers.base import AbstractEnricher
+
+
+class _LookupEnricher(AbstractEnricher):
+    """Sync enricher that records a DNS-style span from a nested worker thread."""
+
+    name = "dns"
+    produces = ("dns_info",)
+
+    def enrich(self, domain: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        def lookup():
+            with trace_span(f"A {domain}", CATEGORY_DNS):
+                return ["93.184.216.34"]
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            submit_in_context(executor, lookup).result()
+        return {"dns_info": {"a_records": ["93.184.216.34"]}}
+
+
+class TestTracer(unittest.TestCase):
+
+    def test_span_records_outcome_and_attrs(self):
+        tracer = Tracer()
+        with tracer.span("GET api.example.com", CATEGORY_HTTP, host="api.example.com") as span:
+            span.attrs["bytes"] = 512
+        self.assertEqual(len(tracer.spans), 1)
+        self.assertEqual(tracer.spans[0].outcome, "ok")
+        self.assertGreaterEqual(tracer.spans[0].end, tracer.spans[0].start)
+
+    def test_span_marks_error_on_exception(self):
+        tracer = Tracer()
+        with self.assertRaises(RuntimeError):
+            with tracer.span("whois", CATEGORY_ENRICHER):
+                raise RuntimeError("socket timeout")
+        self.assertEqual(tracer.spans[0].outcome, "error")
+        self.assertEqual(tracer.spans[0].attrs["error"], "socket timeout")
+
+    def test_trace_span_without_tracer_is_noop(self):
+        with trace_span("A example.com", CATEGORY_DNS) as span:
+            span.outcome = "ok"
+
+    def test_summary_groups_by_host(self):
+        tracer = Tracer()
+        tracer.record("GET crt.sh", CATEGORY_HTTP, 0.0, 2.0, host="crt.sh", bytes=100)
+        tracer.record("GET crt.sh", CATEGORY_HTTP, 2.0, 3.0, host="crt.sh", bytes=50)
+        tracer.record("GET stat.ripe.net", CATEGORY_HTTP, 0.0, 0.5, host="stat.ripe.net")
+        http = tracer.summary()[CATEGORY_HTTP]
+        self.assertEqual(list(http), ["crt.sh", "stat.ripe.net"])
+        self.assertEqual(http["crt.sh"]["count"], 2)
+        self.assertEqual(http["crt.sh"]["bytes"], 150)
+
+    def test_chrome_trace_export(self):
+        tracer = Tracer("example.com")
+        tracer.record("dns", CATEGORY_ENRICHER, 0.001, 0.004)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            tracer.export_chrome_trace(path)
+            with open(path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        event = data["traceEvents"][0]
+        self.assertEqual(event["ph"], "X")
+        self.assertEqual(event["ts"], 1000.0)
+        self.assertEqual(event["dur"], 3000.0)
+
+
+class TestPipelineTracing(unittest.TestCase):
+
+    def test_enricher_and_nested_thread_spans_recorded(self):
+        tracer = Tracer()
+        EnricherPipeline([_LookupEnricher()]).run("example.com", tracer=tracer)
+        categories = {(s.category, s.name) for s in tracer.spans}
+        self.assertIn((CATEGORY_ENRICHER, "dns"), categories)
+        self.assertIn((CATEGORY_DNS, "A example.com"), categories)
+        enricher_span = next(s for s in tracer.spans if s.category == CATEGORY_ENRICHER)
+        self.assertEqual(enricher_span.outcome, "complete")
+        self.assertEqual(enricher_span.attrs["domain"], "example.com")
+
+    def test_no_spans_without_tracer(self):
+        tracer = Tracer()
+        EnricherPipeline([_LookupEnricher()]).run("example.com")
+        self.assertEqual(tracer.spans, [])
+
+
+class TestHttpTracing(unittest.TestCase):
+
+    def test_request_span_has_status_and_bytes(self):
+        async def handler(_request):
+            return web.Response(body=b"x" * 1000)
+
+        async def _run(tracer):
+            app = web.Application()
+            app.router.add_get("/", handler)
+            async with TestServer(app) as server:
+                with use_tracer(tracer):
+                    async with make_aiohttp_session({}) as session:
+                        async with session.get(server.make_url("/")) as resp:
+                            await resp.read()
+
+        tracer = Tracer()
+        asyncio.run(_run(tracer))
+        http = [s for s in tracer.spans if s.category == CATEGORY_HTTP]
+        self.assertEqual(len(http), 1)
+        self.assertEqual(http[0].outcome, "200")
+        self.assertEqual(http[0].attrs["bytes"], 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Tests for the hedged upstream resolver pool (src/core/upstreams.py).
+
+Upstreams are stand-in servers (src/core/standin_dns.py) on 127.0.0.1, run
+on an event loop in a background thread so the blocking path can query them.
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+
+import dns.resolver
+
+from src.core.resolver import DnsResolverService
+from src.core.standin_dns import StandInDnsServer
+from src.core.upstreams import UpstreamPool
+
+_RECORDS = {"www.example.com": ["10.0.0.1"]}
+
+
+class _Servers:
+    """Stand-in servers on a background event loop."""
+
+    def __init__(self, *servers):
+        self.servers = servers
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        for server in self.servers:
+            asyncio.run_coroutine_threadsafe(server.start(), self.loop).result(timeout=5)
+        return [server.address for server in self.servers]
+
+    def __exit__(self, *exc):
+        for server in self.servers:
+            self.loop.call_soon_threadsafe(server.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        self.loop.close()
+
+
+def _pool(nameservers, **kwargs):
+    kwargs.setdefault("timeout", 2.0)
+    kwargs.setdefault("hedge_delay", 0.05)
+    kwargs.setdefault("hedge_min_delay", 0.01)
+    return UpstreamPool(nameservers, **kwargs)
+
+
+class TestUpstreamPool(unittest.TestCase):
+    def test_slow_upstream_is_hedged(self):
+        slow, fast = StandInDnsServer(_RECORDS, latency=0.5), StandInDnsServer(_RECORDS)
+        with _Servers(slow, fast) as nameservers:
+            pool = _pool(nameservers)
+            started = time.monotonic()
+            answer = pool.query("www.example.com", "A")
+            elapsed = time.monotonic() - started
+        self.assertEqual([str(r) for r in answer], ["10.0.0.1"])
+        self.assertLess(elapsed, 0.4)
+        stats = pool.stats()
+        self.assertEqual(stats["hedged"], 1)
+        self.assertEqual(stats["upstreams"][f"127.0.0.1:{fast.port}"]["hedge_wins"], 1)
+
+    def test_async_query_is_hedged(self):
+        async def scenario():
+            async with StandInDnsServer(_RECORDS, latency=0.5) as slow, StandInDnsServer(_RECORDS) as fast:
+                pool = _pool([slow.address, fast.address])
+                started = time.monotonic()
+                answer = await pool.query_async("www.example.com", "A")
+                return pool, answer, time.monotonic() - started
+
+        pool, answer, elapsed = asyncio.run(scenario())
+        self.assertEqual([str(r) for r in answer], ["10.0.0.1"])
+        self.assertLess(elapsed, 0.4)
+        self.assertEqual(pool.stats()["hedged"], 1)
+
+    def test_refusing_upstream_is_benched(self):
+        refusing, good = StandInDnsServer(_RECORDS, refuse=True), StandInDnsServer(_RECORDS)
+        with _Servers(refusing, good) as nameservers:
+            pool = _pool(nameservers, hedge_delay=1.0)
+            started = time.monotonic()
+            for _ in range(4):
+                pool.query("www.example.com", "A")
+            elapsed = time.monotonic() - started
+        self.assertLess(elapsed, 0.5)  # REFUSED moves on without waiting to hedge
+        self.assertEqual(refusing.queries, 1)
+        refused = pool.stats()["upstreams"][f"127.0.0.1:{refusing.port}"]
+        self.assertEqual((refused["refused"], refused["benched"], refused["healthy"]), (1, 1, False))
+
+    def test_resolver_uses_pool_for_negative_answers(self):
+        with _Servers(StandInDnsServer(_RECORDS)) as nameservers:
+            resolver = DnsResolverService(use_redis=False, upstreams=_pool(nameservers))
+            with self.assertRaises(dns.resolver.NXDOMAIN):
+                resolver.resolve("missing.example.com", "A")
+            with self.assertRaises(dns.resolver.NoAnswer):
+                resolver.resolve("www.example.com", "MX")
+            self.assertEqual([str(r) for r in resolver.resolve("www.example.com", "A")], ["10.0.0.1"])
+        upstream = resolver.stats()["upstreams"]["upstreams"]["%s:%d" % nameservers[0]]
+        self.assertEqual(upstream["answers"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()